@@ -3,7 +3,7 @@
 Architecture (post-Phase 6C-3, 2026-04-21):
 - Docker runs `uvicorn api.app:api_app`.
 - ``api_app`` is the OUTER FastAPI app: owns middleware (Sentry, Session,
-  ApiAuth) and mounts the router sub-app at ``/api``.
+  ApiAuth, RequestMetrics) and mounts the router sub-app at ``/api``.
 - ``api_sub_app`` is the INNER FastAPI app: owns all domain routers (quotes,
   admin, deals, ...). Its router paths DO NOT include ``/api/`` — the mount
   provides the prefix, so ``@router.get("/health")`` is served at
@@ -21,6 +21,7 @@ Contracts preserved from the pre-6C-3 FastHTML era:
 """
 
 import os
+from contextlib import asynccontextmanager
 
 import sentry_sdk
 from dotenv import load_dotenv
@@ -30,8 +31,11 @@ from starlette.middleware.sessions import SessionMiddleware
 
 from api.auth import ApiAuthMiddleware
 from api.lib.errors import error_response
+from api.lib.request_metrics import RequestMetricsMiddleware
+from services import job_service, rate_resolver
 from api.routers import (
     admin,
+    changes,
     chat,
     cost_analysis,
     cron,
@@ -42,12 +46,14 @@ from api.routers import (
     geo,
     integrations,
     invoices,
+    jobs,
     kp,
     logistics,
     notes,
     plan_fact,
     public,
     quotes,
+    search,
     workspace,
 )
 
@@ -119,14 +125,39 @@ api_sub_app.include_router(customs.router, prefix="/customs")  # → /api/custom
 api_sub_app.include_router(logistics.router, prefix="/logistics")  # → /api/logistics/*
 api_sub_app.include_router(notes.router, prefix="/notes")  # → /api/notes
 api_sub_app.include_router(workspace.router, prefix="/workspace")  # → /api/workspace/*
+api_sub_app.include_router(jobs.router, prefix="/jobs")  # → /api/jobs/{id}
+api_sub_app.include_router(search.router, prefix="/search")  # → /api/search
+api_sub_app.include_router(changes.router, prefix="/changes")  # → /api/changes/stream
 # integrations.router spans /telegram/* + /internal/* — no single prefix fits.
 api_sub_app.include_router(integrations.router)
 
 # ---------------------------------------------------------------------------
 # Outer app: what Docker serves. Adds middleware + mounts the sub-app at /api.
 # ---------------------------------------------------------------------------
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Process-level background work. Lives on the OUTER app — Starlette
+    does not run lifespans of mounted sub-apps.
+
+    - tnved_rates.last_used_at write-behind flusher (rate_resolver):
+      started here, stopped + drained on shutdown.
+    - background job worker (job_service): claims kvota.background_jobs;
+      JOB_WORKER_IN_PROCESS=0 leaves that to scripts/run_job_worker.py.
+    """
+    rate_resolver.start_last_used_flusher()
+    job_service.start_worker()
+    try:
+        yield
+    finally:
+        job_service.stop_worker()
+        rate_resolver.stop_last_used_flusher()
+
+
 api_app = FastAPI(
     title="OneStack",
+    lifespan=lifespan,
     docs_url=None,  # docs live on the sub-app at /api/docs
     openapi_url=None,
     redoc_url=None,
@@ -139,5 +170,8 @@ api_app.add_middleware(
     secret_key=os.getenv("APP_SECRET", "dev-secret-change-in-production"),
 )
 api_app.add_middleware(ApiAuthMiddleware)
+# Outermost: counts PostgREST / external HTTP calls of the whole request
+# (auth included) and reports them in a Server-Timing header.
+api_app.add_middleware(RequestMetricsMiddleware)
 
 api_app.mount("/api", api_sub_app)
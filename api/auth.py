@@ -27,6 +27,10 @@ PUBLIC_API_PATHS = {
     "/api/cron/revalidate-rates",
     "/api/cron/sla-check",
     "/api/cron/refresh-exchange-rates",
+    "/api/cron/backfill-exchange-rates",
+    "/api/cron/purge-render-cache",
+    "/api/cron/purge-change-events",
+    "/api/metrics",  # X-Cron-Secret protected (api/routers/public.py)
 }
 
 # Paths that STRICTLY require JWT (no session fallback).
@@ -25,6 +25,7 @@ import logging
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
+from api.lib.conditional import conditional_json
 from api.lib.errors import error_response
 from services.database import get_supabase
 
@@ -188,6 +189,7 @@ async def get_calc_step_info(
         403 FORBIDDEN — auth ok but no organization membership
         404 NOT_FOUND — quote doesn't exist for this org
     Side Effects: none — read-only.
+    Caching: ETag / 304 Not Modified via api.lib.conditional.
     Roles: any authenticated org member (RLS scopes data).
     """
     user, err = _resolve_auth(request)
@@ -197,7 +199,19 @@ async def get_calc_step_info(
     org_id = user["org_id"]
 
     supabase = get_supabase()
+    return await conditional_json(
+        request,
+        sb=supabase,
+        route="calc-step-info",
+        quote_id=quote_id,
+        organization_id=org_id,
+        audience=[org_id],
+        build=lambda: _calc_step_info_response(supabase, quote_id, org_id),
+    )
+
 
+async def _calc_step_info_response(supabase, quote_id: str, org_id: str) -> JSONResponse:
+    """Body of :func:`get_calc_step_info` after authentication."""
     # 1. Verify quote exists in caller's org (cheap RLS-equivalent guard).
     quote_res = (
         supabase.table("quotes")
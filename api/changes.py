@@ -0,0 +1,213 @@
+"""Change feed /api/changes/* endpoints.
+
+Handler module (not router). Registered via thin wrapper in
+api/routers/changes.py. Streams the caller's organization's change events
+(quote workflow transitions, per-brand procurement sub-status moves, new
+quote comments — migration 348) as server-sent events, so open views
+patch their state in place instead of refetching after every mutation
+(services/change_feed_service.py).
+
+Browsers' EventSource cannot send an Authorization header; the Next.js
+client reads the stream with fetch() and a ReadableStream instead, which
+also lets it resume with the Last-Event-ID header.
+
+Auth: dual — JWT (Next.js) via ApiAuthMiddleware (request.state.api_user),
+or legacy session (FastHTML). Events are scoped to the caller's
+organization and visibility: sales-only users get events of the quotes
+they can open (search_service.resolve_scope), regular procurement (МОЗ)
+only the kanban moves of their own brand slices.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import AsyncIterator, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+
+from api.lib.errors import error_response
+from services import change_feed_service, search_service
+from services.change_feed_service import Audience, ChangeEvent, Subscription
+from services.database import get_supabase
+from services.role_service import get_user_role_codes
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15.0        # below proxy idle timeouts (nginx: 60 s)
+RETRY_MS = 3000                 # client reconnect delay
+
+# Roles that see every brand slice on the kanban (api/procurement.py
+# _BROADER_SCOPE_ROLES, plus top_manager); other procurement users only
+# get brand_substatus events of slices they are assigned to.
+_ALL_SLICES_ROLES = {"admin", "top_manager", "head_of_procurement", "procurement_senior"}
+
+
+def _resolve_org(request: Request) -> tuple[str | None, str | None]:
+    """(user_id, org_id) from JWT or legacy session; (None, None) if anonymous."""
+    api_user = getattr(request.state, "api_user", None)
+    if api_user:
+        user_id = str(api_user.id)
+        om = (
+            get_supabase()
+            .table("organization_members")
+            .select("organization_id")
+            .eq("user_id", user_id)
+            .limit(1)
+            .execute()
+        )
+        return user_id, (om.data[0]["organization_id"] if om.data else None)
+
+    try:
+        session = request.session
+    except (AssertionError, AttributeError):
+        return None, None
+    user = session.get("user") if session else None
+    if not user:
+        return None, None
+    return user.get("id"), user.get("org_id")
+
+
+def _resolve_audience(user_id: str, org_id: str) -> Optional[Audience]:
+    """The caller's visibility; None when they see every event of the org."""
+    roles = get_user_role_codes(user_id, org_id)
+    scope = search_service.resolve_scope(user_id, org_id, roles)
+    procurement_user_id = (
+        user_id if "procurement" in roles and not _ALL_SLICES_ROLES & set(roles) else None
+    )
+    if scope.customer_ids is None and procurement_user_id is None:
+        return None
+    return Audience(
+        customer_ids=frozenset(scope.customer_ids) if scope.customer_ids is not None else None,
+        quote_creator_ids=frozenset(scope.quote_creator_ids or ()),
+        procurement_user_id=procurement_user_id,
+    )
+
+
+def _can_open_quote(quote_id: str, org_id: str, audience: Optional[Audience]) -> bool:
+    """Whether the quote is in the org, not deleted, and visible to ``audience``."""
+    try:
+        resp = (
+            get_supabase()
+            .table("quotes")
+            .select("id, customer_id, created_by")
+            .eq("id", quote_id)
+            .eq("organization_id", org_id)
+            .is_("deleted_at", None)
+            .limit(1)
+            .execute()
+        )
+    except Exception as exc:       # malformed id
+        logger.info("stream_changes: quote %s lookup failed: %s", quote_id, exc)
+        return False
+    if not resp.data:
+        return False
+    quote = resp.data[0]
+    return audience is None or audience.sees_quote(quote.get("customer_id"), quote.get("created_by"))
+
+
+async def _event_stream(
+    request: Request,
+    sub: Subscription,
+    backlog: list[ChangeEvent],
+) -> AsyncIterator[str]:
+    hub = change_feed_service.hub
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        for event in backlog:
+            yield event.to_sse()
+        while True:
+            try:
+                event = await sub.get(HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                yield "event: reset\ndata: {}\n\n"
+                break
+            yield event.to_sse()
+    finally:
+        hub.unsubscribe(sub)
+
+
+async def stream_changes(request: Request) -> StreamingResponse | JSONResponse:
+    """Server-sent change events of the caller's organization.
+
+    Path: GET /api/changes/stream
+    Params:
+        kinds: str (optional) — comma-separated subset of
+               quote_status,brand_substatus,comment (default: all)
+        quote_id: str (optional) — only events of this quote (quote page)
+        after: int (optional) — resume after this event id; the
+               Last-Event-ID header takes precedence
+    Returns:
+        text/event-stream. Each frame:
+            id: <event id>
+            event: quote_status | brand_substatus | comment
+            data: {id, kind, quote_id, actor_id, payload, created_at}
+        payload per kind:
+            quote_status    — {from, to, idn_quote}
+            brand_substatus — {brand, from, to} (from is null for a new row)
+            comment         — {comment_id, mentions}
+        ``event: reset`` means the client fell too far behind and must
+        refetch its view; ``: keepalive`` comments arrive every 15 s.
+    Errors:
+        400 — unknown kind or non-integer cursor
+        401 — no auth
+        403 — no organization
+        404 — quote_id not found or not visible to the caller
+    Roles: any authenticated user with an organization. Sales-only users
+        get events of their assigned customers' and their own quotes only;
+        regular procurement gets brand_substatus events of its own brand
+        slices only.
+    """
+    user_id, org_id = _resolve_org(request)
+    if not user_id:
+        return error_response("UNAUTHORIZED", "Unauthorized", status_code=401)
+    if not org_id:
+        return error_response("FORBIDDEN", "No organization", status_code=403)
+
+    raw_kinds = request.query_params.get("kinds", "")
+    kinds = {k.strip() for k in raw_kinds.split(",") if k.strip()} or None
+    unknown = sorted((kinds or set()) - set(change_feed_service.KINDS))
+    if unknown:
+        return error_response(
+            "VALIDATION_ERROR",
+            f"Неизвестный тип события: {', '.join(unknown)}",
+            status_code=400,
+        )
+
+    raw_after = request.headers.get("last-event-id") or request.query_params.get("after")
+    after: Optional[int] = None
+    if raw_after:
+        try:
+            after = int(raw_after)
+        except ValueError:
+            return error_response(
+                "VALIDATION_ERROR", "Некорректный идентификатор события", status_code=400
+            )
+
+    quote_id = request.query_params.get("quote_id") or None
+
+    try:
+        audience = await asyncio.to_thread(_resolve_audience, user_id, org_id)
+        if quote_id and not await asyncio.to_thread(_can_open_quote, quote_id, org_id, audience):
+            return error_response("NOT_FOUND", "КП не найдено", status_code=404)
+        sub, backlog = await change_feed_service.hub.subscribe(
+            org_id, kinds=kinds, quote_id=quote_id, after=after, audience=audience
+        )
+    except Exception as exc:
+        logger.error("stream_changes: backlog for org %s failed: %s", org_id, exc)
+        return error_response("INTERNAL_ERROR", "Не удалось открыть поток событий", status_code=500)
+
+    return StreamingResponse(
+        _event_stream(request, sub, backlog),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",      # nginx: flush each frame
+        },
+    )
@@ -29,6 +29,7 @@ from typing import Optional
 
 from starlette.responses import JSONResponse
 
+from api.lib.conditional import conditional_json
 from services.composition_service import (
     ConcurrencyError,
     ValidationError,
@@ -262,6 +263,8 @@ async def get_composition(request, quote_id: str) -> JSONResponse:
         403 INSUFFICIENT_PERMISSIONS — role not in COMPOSITION_READ_ROLES
         404 NOT_FOUND — quote not visible to user (cross-org or missing)
 
+    Caching: ETag / 304 Not Modified via api.lib.conditional.
+
     Roles: sales, head_of_sales, procurement, procurement_senior,
         head_of_procurement, admin, top_manager, finance, quote_controller,
         spec_controller
@@ -279,18 +282,29 @@ async def get_composition(request, quote_id: str) -> JSONResponse:
         return org_err
 
     sb = get_supabase()
-    try:
-        view = get_composition_view(quote_id, sb, user_id=user["id"])
-    except Exception as e:
-        logger.error("Failed to load composition view for quote %s: %s", quote_id, e)
-        return JSONResponse(
-            {"success": False, "error": {"code": "INTERNAL_ERROR", "message": "Failed to load composition"}},
-            status_code=500,
-        )
-
-    view["can_edit"] = bool(user_roles.intersection(COMPOSITION_WRITE_ROLES))
+    can_edit = bool(user_roles.intersection(COMPOSITION_WRITE_ROLES))
 
-    return JSONResponse({"success": True, "data": view}, status_code=200)
+    async def build() -> JSONResponse:
+        try:
+            view = get_composition_view(quote_id, sb, user_id=user["id"])
+        except Exception as e:
+            logger.error("Failed to load composition view for quote %s: %s", quote_id, e)
+            return JSONResponse(
+                {"success": False, "error": {"code": "INTERNAL_ERROR", "message": "Failed to load composition"}},
+                status_code=500,
+            )
+        view["can_edit"] = can_edit
+        return JSONResponse({"success": True, "data": view}, status_code=200)
+
+    return await conditional_json(
+        request,
+        sb=sb,
+        route="composition",
+        quote_id=quote_id,
+        organization_id=user["org_id"],
+        audience=[user["org_id"], f"can_edit={can_edit}"],
+        build=build,
+    )
 
 
 # ============================================================================
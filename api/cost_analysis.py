@@ -20,6 +20,7 @@ from typing import Any
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
+from api.lib.conditional import conditional_json
 from api.lib.errors import error_response
 from services.database import get_supabase
 
@@ -264,6 +265,7 @@ async def get_cost_analysis(
         derived: {direct_costs, gross_profit, financial_expenses, net_profit,
                   markup_pct, sale_purchase_ratio}
     Side Effects: none (read-only).
+    Caching: ETag / 304 Not Modified via api.lib.conditional.
     Roles: finance, top_manager, admin, quote_controller.
     """
     user, err = _resolve_user(request)
@@ -272,7 +274,19 @@ async def get_cost_analysis(
     assert user is not None  # for type-checker
 
     sb = get_supabase()
+    return await conditional_json(
+        request,
+        sb=sb,
+        route="cost-analysis",
+        quote_id=quote_id,
+        organization_id=user["org_id"],
+        audience=[user["org_id"]],
+        build=lambda: _cost_analysis_response(sb, quote_id, user),
+    )
+
 
+async def _cost_analysis_response(sb: Any, quote_id: str, user: dict) -> JSONResponse:
+    """Body of :func:`get_cost_analysis` after authentication."""
     # Fetch the quote with customer name. ``customers!customer_id`` disambiguates
     # the FK per project convention — ``customers`` auto-detection would be
     # ambiguous if the table grows more FK paths.
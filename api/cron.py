@@ -5,11 +5,15 @@ GET  /api/cron/check-overdue          — Find overdue quotes and send Telegram
 POST /api/cron/sla-check              — Send invoice SLA reminders/overdue pings (Task 12)
 POST /api/cron/revalidate-rates       — Weekly customs rate revalidation (REQ-6 customs-phase-1)
 POST /api/cron/refresh-exchange-rates — Refresh CBR FX rates into kvota.exchange_rates
+POST /api/cron/backfill-exchange-rates — Backfill CBR FX rate history for a date range
+POST /api/cron/purge-render-cache     — Drop stale rendered PDF/DOCX cache entries
+POST /api/cron/purge-change-events    — Drop change feed events past retention
 
 Auth: X-Cron-Secret header validated against CRON_SECRET env var.
 These endpoints are in PUBLIC_API_PATHS (no JWT required).
 """
 
+import asyncio
 import logging
 import os
 from datetime import date, datetime, timedelta, timezone
@@ -19,12 +23,14 @@ from typing import Any
 import httpx
 from starlette.responses import JSONResponse
 
+from services import cbr_rates_service
 from services.alta_client import AltaApiError, notify_admin
 from services.database import get_supabase
-from services.rate_resolver import _bulk_upsert
+from services.rate_resolver import _bulk_upsert, flush_last_used_at
 from services.stage_timer_service import (
+    claim_overdue_notification,
     format_elapsed,
-    get_overdue_quotes,
+    iter_overdue_quotes,
     mark_overdue_notified,
 )
 
@@ -73,14 +79,86 @@ def _validate_cron_secret(request) -> JSONResponse | None:
     return None
 
 
+# Keyset page size of the overdue / SLA scans.
+CRON_SCAN_PAGE_SIZE = 500
+
+# Organizations scanned at once by check-overdue.
+CRON_ORG_CONCURRENCY = int(os.environ.get("CRON_ORG_CONCURRENCY", "4"))
+
+# Notifications in flight per organization (Telegram sends are the slow part).
+CRON_NOTIFY_CONCURRENCY = int(os.environ.get("CRON_NOTIFY_CONCURRENCY", "4"))
+
+
+async def _notify_overdue_quote(q: dict, send_overdue_notification) -> int:
+    """Claim and send the overdue ping of one quote. Returns messages sent."""
+    quote_id = q["quote_id"]
+    stage = q["stage"]
+
+    # Ledger first: a rerun, or a second cron racing this one, skips here.
+    claimed = await asyncio.to_thread(
+        claim_overdue_notification, quote_id, stage, q["stage_entered_at"]
+    )
+    sent_count = 0
+    if claimed:
+        stage_name = _STATUS_NAMES_RU.get(stage, stage)
+        elapsed = format_elapsed(q["elapsed_hours"])
+
+        # Collect unique user IDs to notify (assigned user + manager)
+        user_ids: set[str] = set()
+        if q.get("assigned_user_id"):
+            user_ids.add(q["assigned_user_id"])
+        if q.get("manager_id"):
+            user_ids.add(q["manager_id"])
+
+        for user_id in user_ids:
+            sent = await send_overdue_notification(
+                user_id=user_id,
+                quote_id=quote_id,
+                quote_idn=q.get("idn", ""),
+                stage_name=stage_name,
+                elapsed=elapsed,
+                deadline_hours=q["deadline_hours"],
+            )
+            if sent:
+                sent_count += 1
+
+    # Also when the claim was lost: an earlier run sent but died before this.
+    await asyncio.to_thread(mark_overdue_notified, quote_id)
+    return sent_count
+
+
+async def _check_overdue_for_org(org_id: str, send_overdue_notification) -> int:
+    """Stream one org's overdue quotes page by page and notify them."""
+    pages = iter_overdue_quotes(org_id, CRON_SCAN_PAGE_SIZE)
+    slots = asyncio.Semaphore(CRON_NOTIFY_CONCURRENCY)
+
+    async def notify(q: dict) -> int:
+        async with slots:
+            return await _notify_overdue_quote(q, send_overdue_notification)
+
+    notified = 0
+    while True:
+        page = await asyncio.to_thread(next, pages, None)
+        if page is None:
+            return notified
+        notified += sum(await asyncio.gather(*(notify(q) for q in page)))
+
+
 async def cron_check_overdue(request) -> JSONResponse:
     """GET /api/cron/check-overdue
 
     Find all overdue quotes across all organizations and send Telegram
     notifications to the assigned user and quote manager.
 
+    Organizations are scanned concurrently (CRON_ORG_CONCURRENCY), each as
+    a keyset-paginated stream (stage_timer_service.iter_overdue_quotes)
+    with up to CRON_NOTIFY_CONCURRENCY notifications in flight. Each ping
+    is claimed in kvota.quote_overdue_notifications_sent (migration 349)
+    before sending, so reruns and overlapping runs never notify twice.
+    One failing organization does not stop the others.
+
     Auth: X-Cron-Secret header.
-    Returns: {"success": true, "notified": <count>}
+    Returns: {"success": true, "notified": <count>, "failed_orgs": <count>}
     """
     err = _validate_cron_secret(request)
     if err:
@@ -89,48 +167,38 @@ async def cron_check_overdue(request) -> JSONResponse:
     sb = get_supabase()
 
     # Fetch all organizations
-    orgs_resp = sb.table("organizations").select("id").execute()
+    orgs_resp = await asyncio.to_thread(sb.table("organizations").select("id").execute)
     orgs = orgs_resp.data or []
 
     from services.telegram_service import send_overdue_notification
 
-    notified_count = 0
+    org_slots = asyncio.Semaphore(CRON_ORG_CONCURRENCY)
 
-    for org in orgs:
-        org_id = org["id"]
-        overdue = get_overdue_quotes(org_id)
-
-        for q in overdue:
-            quote_id = q["quote_id"]
-            stage = q["stage"]
-            stage_name = _STATUS_NAMES_RU.get(stage, stage)
-            elapsed = format_elapsed(q["elapsed_hours"])
-            deadline_hours = q["deadline_hours"]
-
-            # Collect unique user IDs to notify (assigned user + manager)
-            user_ids: set[str] = set()
-            if q.get("assigned_user_id"):
-                user_ids.add(q["assigned_user_id"])
-            if q.get("manager_id"):
-                user_ids.add(q["manager_id"])
-
-            for user_id in user_ids:
-                sent = await send_overdue_notification(
-                    user_id=user_id,
-                    quote_id=quote_id,
-                    quote_idn=q.get("idn", ""),
-                    stage_name=stage_name,
-                    elapsed=elapsed,
-                    deadline_hours=deadline_hours,
-                )
-                if sent:
-                    notified_count += 1
+    async def run_org(org_id: str) -> int:
+        async with org_slots:
+            return await _check_overdue_for_org(org_id, send_overdue_notification)
 
-            mark_overdue_notified(quote_id)
+    results = await asyncio.gather(
+        *(run_org(org["id"]) for org in orgs), return_exceptions=True
+    )
 
-    logger.info(f"Cron check-overdue: {notified_count} notifications sent across {len(orgs)} orgs")
+    notified_count = 0
+    failed_orgs = 0
+    for org, result in zip(orgs, results):
+        if isinstance(result, BaseException):
+            failed_orgs += 1
+            logger.error(f"Cron check-overdue: org {org['id']} failed: {result}")
+        else:
+            notified_count += result
 
-    return JSONResponse({"success": True, "notified": notified_count})
+    logger.info(
+        f"Cron check-overdue: {notified_count} notifications sent across {len(orgs)} orgs"
+        f" ({failed_orgs} failed)"
+    )
+
+    return JSONResponse(
+        {"success": True, "notified": notified_count, "failed_orgs": failed_orgs}
+    )
 
 
 # ----------------------------------------------------------------------------
@@ -207,6 +275,16 @@ def _head_user_ids_for_org(sb: Any, org_id: str, role_slug: str) -> list[str]:
     return [r["user_id"] for r in (ur_resp.data or []) if r.get("user_id")]
 
 
+def _sla_head_user_ids(sb: Any, org_id: str) -> list[str]:
+    """Recipients of SLA overdue pings: both head roles, deduped."""
+    return list(
+        dict.fromkeys(
+            _head_user_ids_for_org(sb, org_id, "head_of_logistics")
+            + _head_user_ids_for_org(sb, org_id, "head_of_customs")
+        )
+    )
+
+
 def _quote_org_id(sb: Any, quote_id: str | None) -> str | None:
     """Resolve organization_id for the invoice's quote."""
     if not quote_id:
@@ -269,19 +347,103 @@ async def _notify_users(
     return sent
 
 
+_SLA_INVOICE_COLUMNS = (
+    "id, quote_id, invoice_number, "
+    "logistics_deadline_at, logistics_completed_at, assigned_logistics_user, "
+    "customs_deadline_at, customs_completed_at, assigned_customs_user"
+)
+
+# Ids per ``.in_()`` lookup: 100 UUIDs keep the PostgREST URL near 4 KB
+# (a whole 500-invoice page is ~19 KB and risks 414 URI Too Long).
+_SLA_LOOKUP_CHUNK = 100
+
+
+def _iter_sla_invoice_pages(sb: Any, horizon_iso: str, page_size: int):
+    """Yield invoices with an open side due before ``horizon_iso``, by id pages.
+
+    Only sides still in work qualify (partial indexes
+    idx_invoices_open_*_sla, migration 349), so finished invoices drop out
+    of the scan instead of being re-read every run.
+    """
+    last_id = None
+    while True:
+        query = (
+            sb.table("invoices")
+            .select(_SLA_INVOICE_COLUMNS)
+            .or_(
+                f"and(logistics_completed_at.is.null,logistics_deadline_at.lte.{horizon_iso}),"
+                f"and(customs_completed_at.is.null,customs_deadline_at.lte.{horizon_iso})"
+            )
+        )
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows = query.order("id").limit(page_size).execute().data or []
+        if not rows:
+            return
+        yield [r for r in rows if isinstance(r, dict)]
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]["id"]
+
+
+def _load_sla_page_context(
+    sb: Any, invoices: list[dict]
+) -> tuple[dict[str, set[str]], dict[str, str]]:
+    """({invoice_id: kinds already sent}, {quote_id: organization_id}) for a page.
+
+    Two queries per ``_SLA_LOOKUP_CHUNK`` ids instead of a ledger INSERT per
+    already-notified side and an org lookup per invoice.
+    """
+    invoice_ids = [inv["id"] for inv in invoices]
+    quote_ids = list({inv["quote_id"] for inv in invoices if inv.get("quote_id")})
+
+    sent: dict[str, set[str]] = {}
+    for i in range(0, len(invoice_ids), _SLA_LOOKUP_CHUNK):
+        resp = (
+            sb.table("invoice_sla_notifications_sent")
+            .select("invoice_id, kind")
+            .in_("invoice_id", invoice_ids[i:i + _SLA_LOOKUP_CHUNK])
+            .execute()
+        )
+        for row in resp.data or []:
+            sent.setdefault(row["invoice_id"], set()).add(row["kind"])
+
+    orgs: dict[str, str] = {}
+    for i in range(0, len(quote_ids), _SLA_LOOKUP_CHUNK):
+        resp = (
+            sb.table("quotes")
+            .select("id, organization_id")
+            .in_("id", quote_ids[i:i + _SLA_LOOKUP_CHUNK])
+            .execute()
+        )
+        orgs.update(
+            (r["id"], r["organization_id"]) for r in resp.data or [] if r.get("organization_id")
+        )
+    return sent, orgs
+
+
 async def _process_invoice_sla(
     sb: Any,
     invoice: dict,
     now: datetime,
     counters: dict[str, int],
+    *,
+    sent_kinds: frozenset[str] | set[str] = frozenset(),
+    org_id: str | None = None,
+    head_cache: dict[str, list[str]] | None = None,
 ) -> None:
-    """Evaluate one invoice and, if due, send reminder/overdue for each side."""
+    """Evaluate one invoice and, if due, send reminder/overdue for each side.
+
+    ``sent_kinds`` (preloaded ledger rows) skips sides notified by an
+    earlier run without touching the database; the ledger INSERT still
+    decides races. ``head_cache`` shares head-role lookups per org
+    across one run.
+    """
     invoice_id = invoice["id"]
     invoice_number = invoice.get("invoice_number") or ""
     quote_id = invoice.get("quote_id")
-
-    # Resolve org lazily — only when we're about to notify a head role.
-    org_id: str | None = None
+    if head_cache is None:
+        head_cache = {}
 
     for side in ("logistics", "customs"):
         completed_at = invoice.get(f"{side}_completed_at")
@@ -301,23 +463,18 @@ async def _process_invoice_sla(
 
         # --- Overdue (takes precedence over reminder when both windows elapsed) ---
         if now >= deadline_at:
-            if _try_mark_sent(sb, invoice_id, overdue_kind):
+            if overdue_kind not in sent_kinds and await asyncio.to_thread(
+                _try_mark_sent, sb, invoice_id, overdue_kind
+            ):
                 if org_id is None:
-                    org_id = _quote_org_id(sb, quote_id)
+                    org_id = await asyncio.to_thread(_quote_org_id, sb, quote_id)
                 # head_of_logistics ↔ head_of_customs are dual-hat (PR #105):
                 # either head role oversees BOTH domains, so notify both lists
                 # for any SLA breach regardless of side. Dedupe in case a user
                 # holds both roles.
-                recipients = (
-                    list(
-                        dict.fromkeys(
-                            _head_user_ids_for_org(sb, org_id, "head_of_logistics")
-                            + _head_user_ids_for_org(sb, org_id, "head_of_customs")
-                        )
-                    )
-                    if org_id
-                    else []
-                )
+                if org_id and org_id not in head_cache:
+                    head_cache[org_id] = await asyncio.to_thread(_sla_head_user_ids, sb, org_id)
+                recipients = head_cache.get(org_id, []) if org_id else []
                 text = _format_sla_message(
                     kind=overdue_kind,
                     invoice_number=invoice_number,
@@ -332,7 +489,9 @@ async def _process_invoice_sla(
         # --- Reminder: within 24h window before deadline ---
         reminder_start = deadline_at - timedelta(hours=REMINDER_WINDOW_HOURS)
         if reminder_start <= now < deadline_at:
-            if _try_mark_sent(sb, invoice_id, reminder_kind):
+            if reminder_kind not in sent_kinds and await asyncio.to_thread(
+                _try_mark_sent, sb, invoice_id, reminder_kind
+            ):
                 assignee_col = (
                     "assigned_logistics_user"
                     if side == "logistics"
@@ -363,6 +522,10 @@ async def cron_sla_check(request) -> JSONResponse:
     `kvota.invoice_sla_notifications_sent` (migration 295). Safe to call
     repeatedly (every ~10 min).
 
+    Invoices are read in keyset pages (CRON_SCAN_PAGE_SIZE). Per page the
+    ledger and quote orgs are loaded in bulk, then invoices are processed
+    concurrently — at most CRON_NOTIFY_CONCURRENCY per organization.
+
     Auth: X-Cron-Secret header.
     Returns: {"success": true, "data": {"scanned": N, "sent": {kind: count, ...}}}
     """
@@ -374,33 +537,39 @@ async def cron_sla_check(request) -> JSONResponse:
     now = datetime.now(timezone.utc)
 
     # Candidate window: deadline is in past OR within the reminder window.
-    # Filter down in Python (simpler than composing an OR-of-ranges in PostgREST).
+    # Exact per-side windows are evaluated in _process_invoice_sla.
     horizon = (now + timedelta(hours=REMINDER_WINDOW_HOURS)).isoformat()
 
-    resp = (
-        sb.table("invoices")
-        .select(
-            "id, quote_id, invoice_number, "
-            "logistics_deadline_at, logistics_completed_at, assigned_logistics_user, "
-            "customs_deadline_at, customs_completed_at, assigned_customs_user"
-        )
-        .or_(
-            f"logistics_deadline_at.lte.{horizon},"
-            f"customs_deadline_at.lte.{horizon}"
-        )
-        .execute()
-    )
-    invoices = resp.data or []
-
     counters: dict[str, int] = {k: 0 for k in _ALL_SLA_KINDS}
+    head_cache: dict[str, list[str]] = {}
+    org_slots: dict[str | None, asyncio.Semaphore] = {}
     scanned = 0
-    for inv in invoices:
-        if not isinstance(inv, dict):
-            continue
-        if inv.get("logistics_completed_at") and inv.get("customs_completed_at"):
+
+    async def process(inv: dict, sent_kinds: set[str], org_id: str | None) -> None:
+        slots = org_slots.setdefault(org_id, asyncio.Semaphore(CRON_NOTIFY_CONCURRENCY))
+        async with slots:
+            await _process_invoice_sla(
+                sb, inv, now, counters,
+                sent_kinds=sent_kinds, org_id=org_id, head_cache=head_cache,
+            )
+
+    pages = _iter_sla_invoice_pages(sb, horizon, CRON_SCAN_PAGE_SIZE)
+    while True:
+        page = await asyncio.to_thread(next, pages, None)
+        if page is None:
+            break
+        invoices = [
+            inv for inv in page
+            if not (inv.get("logistics_completed_at") and inv.get("customs_completed_at"))
+        ]
+        if not invoices:
             continue
-        scanned += 1
-        await _process_invoice_sla(sb, inv, now, counters)
+        scanned += len(invoices)
+        sent, orgs = await asyncio.to_thread(_load_sla_page_context, sb, invoices)
+        await asyncio.gather(*(
+            process(inv, sent.get(inv["id"], set()), orgs.get(inv.get("quote_id")))
+            for inv in invoices
+        ))
 
     logger.info(
         f"Cron sla-check: scanned {scanned} invoices, sent={counters}"
@@ -426,14 +595,21 @@ REVALIDATE_BATCH_SIZE = 1000
 # cache gets.
 REVALIDATE_MAX_FETCH = 5000
 
+# Keyset page size for streaming stale rows (PostgREST default max-rows).
+REVALIDATE_PAGE_SIZE = 1000
+
+# Max Alta calls in flight at once. Each call still costs one packet, so
+# this bounds wall time, not spend.
+REVALIDATE_CONCURRENCY = int(os.environ.get("REVALIDATE_CONCURRENCY", "8"))
+
+# Pairs per chunk — the unit of batched DB writes and progress logging.
+REVALIDATE_CHUNK_SIZE = 50
+
 # Packet floor — abort the loop and admin-alert when Alta packet drops
 # below this. Tighter than the AltaClient warning threshold (100) so we
 # stop *before* the resolver-driven user requests start failing.
 REVALIDATE_PACKET_FLOOR = 50
 
-# Periodic progress logging frequency (every Nth processed pair).
-REVALIDATE_LOG_EVERY = 100
-
 # Failure-ratio threshold above which an admin alert fires at end of run.
 # Tuned to catch the "Alta partially up — most calls error" case without
 # false-firing on a handful of bad TNVED codes (M8 review fix).
@@ -451,6 +627,9 @@ POISON_PILL_FAILURE_THRESHOLD = 3
 POISON_PILL_BACKOFF = timedelta(days=7)
 POISON_PILL_ALERT_COUNT = 10
 
+# ids per ``UPDATE ... WHERE id IN (...)`` when bumping failure counters.
+_POISON_PILL_UPDATE_CHUNK = 200
+
 # Throttle for cron-level Telegram alerts. Truncation, failure-ratio,
 # and poison-pill alerts each get their own key so they don't suppress
 # one another.
@@ -533,9 +712,16 @@ async def cron_revalidate_rates(request, alta_client) -> JSONResponse:
           automatically by the UNIQUE constraint, no explicit
           ``UPDATE … SET valid_to = now()`` needed (REQ-6 AC#3).
         - Telegram admin alert on AltaApiError(140) (insufficient funds)
-          or packet_left below the floor — loop aborts immediately.
+          or packet_left below the floor — no further Alta calls are
+          started once either is seen.
     Roles: cron-only (no user role check; X-Cron-Secret is the gate).
 
+    Pairs are processed in chunks of REVALIDATE_CHUNK_SIZE with at most
+    REVALIDATE_CONCURRENCY Alta calls in flight. The first call runs
+    alone so packet_left is known before fanning out. DB writes are
+    batched per chunk: one upsert for all fetched rates, one failure
+    bump per distinct new count and one reset per country.
+
     The handler is idempotent — a re-run within 7 days finds no stale
     rows and returns processed=0 without contacting Alta.
     """
@@ -546,42 +732,42 @@ async def cron_revalidate_rates(request, alta_client) -> JSONResponse:
     sb = get_supabase()
     now_dt = datetime.now(timezone.utc)
 
-    # Fetch stale rows (bounded). PostgREST has no MAX() aggregation in
-    # select so we group/sort in Python — bounded by REVALIDATE_MAX_FETCH
-    # so memory stays predictable even for cold caches. Pull the
-    # poison-pill columns too so we can filter chronically-failing pairs
-    # without an extra round-trip (M9 review fix).
+    # Drain this worker's buffered last_used_at touches so the ranking
+    # below sees them (rate_resolver write-behind buffer).
+    flush_last_used_at(sb)
+
+    # Stream stale rows page by page (keyset on id) and drop poison-pill
+    # rows as they arrive — a chronically-failing pair otherwise keeps
+    # burning Alta packet quota every weekly cron run (M9 review fix).
+    # Backoff expires after 7 days so we re-try in case Alta has
+    # restored the code.
     cutoff = (now_dt - REVALIDATE_STALE_WINDOW).isoformat()
-    resp = (
-        sb.table("tnved_rates")
-        .select(
-            "tnved_code, country_or_areal, last_used_at, "
-            "revalidate_failure_count, revalidate_failed_at"
+    poison_cutoff = (now_dt - POISON_PILL_BACKOFF).isoformat()
+    stale_rows: list[dict[str, Any]] = []
+    fetched = 0
+    for page in _iter_stale_rate_pages(sb, cutoff):
+        fetched += len(page)
+        stale_rows.extend(
+            row for row in page
+            if not _is_poison_pill(row, poison_cutoff_iso=poison_cutoff)
         )
-        .lt("source_fetched_at", cutoff)
-        .execute()
-    )
-    stale_rows: list[dict[str, Any]] = list(getattr(resp, "data", None) or [])
-    if len(stale_rows) >= REVALIDATE_MAX_FETCH:
+    if fetched >= REVALIDATE_MAX_FETCH:
         # Defensive: should never happen in practice for a 7-day window
         # since the cache is bounded by user activity. When it does, ops
         # need to know — top-1000 ranking only sees the truncated slice
         # and stale-coverage may be incomplete (M6 review fix).
-        original_count = len(stale_rows)
-        stale_rows = stale_rows[:REVALIDATE_MAX_FETCH]
-        await _maybe_alert_truncation(original_count)
-
-    # Drop poison-pill rows BEFORE ranking — a chronically-failing pair
-    # otherwise keeps burning Alta packet quota every weekly cron run
-    # (M9 review fix). Backoff expires after 7 days so we re-try in case
-    # Alta has restored the code.
-    poison_cutoff = (now_dt - POISON_PILL_BACKOFF).isoformat()
-    stale_rows = [
-        row for row in stale_rows
-        if not _is_poison_pill(row, poison_cutoff_iso=poison_cutoff)
-    ]
+        await _maybe_alert_truncation(fetched)
 
     pairs = _rank_revalidation_pairs(stale_rows, limit=REVALIDATE_BATCH_SIZE)
+    # Areal-keyed rows can't be re-fetched per-country (Alta is
+    # country-bound). Base rates (NULL country) likewise have no
+    # per-country lookup. Skip silently — they refresh organically when
+    # a user-driven resolve hits them.
+    jobs = [
+        (tnved_code, country_or_areal, oksm)
+        for tnved_code, country_or_areal in pairs
+        if (oksm := _country_or_areal_to_oksm(country_or_areal)) is not None
+    ]
 
     stats: dict[str, Any] = {
         "processed": 0,
@@ -591,105 +777,26 @@ async def cron_revalidate_rates(request, alta_client) -> JSONResponse:
         "packet_left_at_end": None,
     }
 
-    today = date.today()
-    for tnved_code, country_or_areal in pairs:
-        oksm = _country_or_areal_to_oksm(country_or_areal)
-        if oksm is None:
-            # Areal-keyed rows can't be re-fetched per-country (Alta is
-            # country-bound). Base rates (NULL country) likewise have no
-            # per-country lookup. Skip silently — they refresh organically
-            # when a user-driven resolve hits them.
-            continue
-
-        try:
-            new_rates = await alta_client.get_rates(
-                tncode=tnved_code,
-                country=oksm,
-                date_=today,
-            )
-        except AltaApiError as exc:
-            stats["failures"] += 1
-            if exc.code == 140:
-                logger.error(
-                    "Cron revalidate-rates: AltaApiError(140) insufficient "
-                    "funds — aborting after %d processed",
-                    stats["processed"],
-                )
-                await notify_admin(
-                    "🛑 Cron revalidate-rates aborted: Alta API returned "
-                    "code 140 (insufficient funds). Top up the Alta "
-                    "packet to resume revalidation."
-                )
-                break
-            logger.warning(
-                "Cron revalidate-rates: AltaApiError(%d) for tnved=%s "
-                "country=%s — skipping",
-                exc.code, tnved_code, oksm,
-            )
-            _record_poison_pill_failure(sb, tnved_code, country_or_areal)
-            continue
-        except Exception as exc:
-            stats["failures"] += 1
-            logger.warning(
-                "Cron revalidate-rates: Alta call failed for tnved=%s "
-                "country=%s: %s",
-                tnved_code, oksm, exc,
-            )
-            _record_poison_pill_failure(sb, tnved_code, country_or_areal)
-            continue
-
-        # Pragmatic upsert (REQ-6 AC#3): the UNIQUE constraint
-        # (tnved_code, payment_type, country_or_areal, valid_from,
-        #  certificate_required, sp_certificate_required) means a rate
-        # with unchanged valid_from is updated in place — refreshing
-        # source_fetched_at and value fields. If Alta returns a new
-        # valid_from (rate change with new effective date), a fresh row
-        # is inserted alongside the existing one, preserving history.
-        try:
-            _bulk_upsert(sb, new_rates, source="alta-revalidate")
-            if new_rates:
-                stats["updates"] += 1
-            else:
-                stats["hits"] += 1
-        except Exception as exc:
-            stats["failures"] += 1
-            logger.warning(
-                "Cron revalidate-rates: upsert failed for tnved=%s "
-                "country=%s: %s",
-                tnved_code, oksm, exc,
-            )
-            _record_poison_pill_failure(sb, tnved_code, country_or_areal)
-            continue
-
-        # Success path — clear any prior poison-pill state for this pair
-        # (M9 review fix). Reset is per-pair (matches all valid_from
-        # generations) because the poison-pill signal is pair-level.
-        _reset_poison_pill_failure(sb, tnved_code, country_or_areal)
-        stats["processed"] += 1
-
-        # Periodic progress log
-        if stats["processed"] % REVALIDATE_LOG_EVERY == 0:
-            logger.info(
-                "Cron revalidate-rates progress: processed=%d hits=%d "
-                "updates=%d failures=%d packet_left=%s",
-                stats["processed"], stats["hits"], stats["updates"],
-                stats["failures"],
-                getattr(alta_client, "last_packet_left", None),
-            )
+    run = _RevalidateRun(alta_client, today=date.today())
+    for start in range(0, len(jobs), REVALIDATE_CHUNK_SIZE):
+        chunk = jobs[start:start + REVALIDATE_CHUNK_SIZE]
+        outcomes = await run.fetch_chunk(chunk)
+        _apply_revalidate_chunk(sb, outcomes, stats)
+
+        logger.info(
+            "Cron revalidate-rates progress: processed=%d hits=%d "
+            "updates=%d failures=%d packet_left=%s",
+            stats["processed"], stats["hits"], stats["updates"],
+            stats["failures"],
+            getattr(alta_client, "last_packet_left", None),
+        )
 
-        # Packet floor check — bail out before we starve real users.
-        packet_left = getattr(alta_client, "last_packet_left", None)
-        if packet_left is not None and packet_left < REVALIDATE_PACKET_FLOOR:
+        if run.abort_message is not None:
             logger.error(
-                "Cron revalidate-rates: packet_left=%d below floor %d — "
-                "aborting after %d processed",
-                packet_left, REVALIDATE_PACKET_FLOOR, stats["processed"],
-            )
-            await notify_admin(
-                f"🛑 Cron revalidate-rates aborted: Alta packet_left="
-                f"{packet_left} below floor {REVALIDATE_PACKET_FLOOR}. "
-                f"Top up the Alta packet to resume."
+                "Cron revalidate-rates: %s — aborting after %d processed",
+                run.abort_reason, stats["processed"],
             )
+            await notify_admin(run.abort_message)
             break
 
     stats["packet_left_at_end"] = getattr(
@@ -711,6 +818,233 @@ async def cron_revalidate_rates(request, alta_client) -> JSONResponse:
     return JSONResponse({"success": True, "data": stats})
 
 
+def _iter_stale_rate_pages(sb: Any, cutoff_iso: str):
+    """Yield pages of stale tnved_rates rows, keyset-paginated on ``id``.
+
+    Stops after REVALIDATE_MAX_FETCH rows in total so memory stays
+    predictable even for cold caches. PostgREST has no MAX() aggregation
+    in select so grouping happens in Python afterwards; the poison-pill
+    columns come along to avoid an extra round-trip (M9 review fix).
+    """
+    fetched = 0
+    last_id: str | None = None
+    while fetched < REVALIDATE_MAX_FETCH:
+        page_size = min(REVALIDATE_PAGE_SIZE, REVALIDATE_MAX_FETCH - fetched)
+        query = (
+            sb.table("tnved_rates")
+            .select(
+                "id, tnved_code, country_or_areal, last_used_at, "
+                "revalidate_failure_count, revalidate_failed_at"
+            )
+            .lt("source_fetched_at", cutoff_iso)
+        )
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        resp = query.order("id").limit(page_size).execute()
+        page: list[dict[str, Any]] = list(getattr(resp, "data", None) or [])
+        if page:
+            yield page
+        fetched += len(page)
+        if len(page) < page_size:
+            return
+        last_id = page[-1].get("id")
+
+
+class _RevalidateRun:
+    """Bounded-concurrency Alta fetcher for one cron run.
+
+    Holds the shared abort state: once AltaApiError(140) or a packet
+    below REVALIDATE_PACKET_FLOOR is seen, no further calls are started.
+    Calls already in flight finish and their results are still written.
+    """
+
+    def __init__(self, alta_client: Any, *, today: date) -> None:
+        self._alta = alta_client
+        self._today = today
+        self._semaphore = asyncio.Semaphore(max(1, REVALIDATE_CONCURRENCY))
+        self._in_flight = 0
+        self._probed = False
+        self._probe_done = False
+        self.abort_reason: str | None = None
+        self.abort_message: str | None = None
+
+    def _abort(self, reason: str, message: str) -> None:
+        if self.abort_reason is None:
+            self.abort_reason = reason
+            self.abort_message = message
+
+    def _packet_budget_exhausted(self) -> bool:
+        """True when the calls already in flight could take the packet
+        below the floor — checked before each new call is started.
+
+        Not applied to the probe call: ``last_packet_left`` may still be
+        left over from an earlier request on a shared client.
+        """
+        packet_left = getattr(self._alta, "last_packet_left", None)
+        if not self._probe_done or packet_left is None:
+            return False
+        if packet_left - self._in_flight < REVALIDATE_PACKET_FLOOR:
+            self._abort(
+                f"packet_left={packet_left} below floor "
+                f"{REVALIDATE_PACKET_FLOOR}",
+                f"🛑 Cron revalidate-rates aborted: Alta packet_left="
+                f"{packet_left} below floor {REVALIDATE_PACKET_FLOOR}. "
+                f"Top up the Alta packet to resume.",
+            )
+            return True
+        return False
+
+    async def fetch_chunk(
+        self, chunk: list[tuple[str, str, int]]
+    ) -> list[tuple[str, str, int, list[Any] | None]]:
+        """Fetch a chunk of (tnved_code, country_or_areal, oksm) jobs.
+
+        Returns one ``(tnved_code, country_or_areal, oksm, rates)`` tuple
+        per job that was attempted; ``rates`` is None when the call
+        failed. Jobs skipped because of an abort are omitted.
+        """
+        if not self._probed and chunk:
+            # Run the very first call alone so packet_left is known (and
+            # a code-140 is seen) before any fan-out.
+            self._probed = True
+            head = await self._fetch_one(chunk[0])
+            self._probe_done = True
+            results = [head] + list(
+                await asyncio.gather(*(self._fetch_one(j) for j in chunk[1:]))
+            )
+        else:
+            results = list(
+                await asyncio.gather(*(self._fetch_one(j) for j in chunk))
+            )
+        return [r for r in results if r is not None]
+
+    async def _fetch_one(
+        self, job: tuple[str, str, int]
+    ) -> tuple[str, str, int, list[Any] | None] | None:
+        tnved_code, country_or_areal, oksm = job
+        async with self._semaphore:
+            if self.abort_reason is not None or self._packet_budget_exhausted():
+                return None
+            self._in_flight += 1
+            try:
+                new_rates = await self._alta.get_rates(
+                    tncode=tnved_code,
+                    country=oksm,
+                    date_=self._today,
+                )
+            except AltaApiError as exc:
+                if exc.code == 140:
+                    self._abort(
+                        "AltaApiError(140) insufficient funds",
+                        "🛑 Cron revalidate-rates aborted: Alta API returned "
+                        "code 140 (insufficient funds). Top up the Alta "
+                        "packet to resume revalidation.",
+                    )
+                    # Out-of-funds is not the pair's fault — no poison-pill
+                    # bump, but it still counts toward failures.
+                    return (tnved_code, None, oksm, None)
+                logger.warning(
+                    "Cron revalidate-rates: AltaApiError(%d) for tnved=%s "
+                    "country=%s — skipping",
+                    exc.code, tnved_code, oksm,
+                )
+                return (tnved_code, country_or_areal, oksm, None)
+            except Exception as exc:
+                logger.warning(
+                    "Cron revalidate-rates: Alta call failed for tnved=%s "
+                    "country=%s: %s",
+                    tnved_code, oksm, exc,
+                )
+                return (tnved_code, country_or_areal, oksm, None)
+            finally:
+                self._in_flight -= 1
+
+        # Packet floor check — stop starting new calls before we starve
+        # real users. This pair's own result is still written.
+        packet_left = getattr(self._alta, "last_packet_left", None)
+        if packet_left is not None and packet_left < REVALIDATE_PACKET_FLOOR:
+            self._abort(
+                f"packet_left={packet_left} below floor "
+                f"{REVALIDATE_PACKET_FLOOR}",
+                f"🛑 Cron revalidate-rates aborted: Alta packet_left="
+                f"{packet_left} below floor {REVALIDATE_PACKET_FLOOR}. "
+                f"Top up the Alta packet to resume.",
+            )
+        return (tnved_code, country_or_areal, oksm, list(new_rates or []))
+
+
+def _apply_revalidate_chunk(
+    sb: Any,
+    outcomes: list[tuple[str, str | None, int, list[Any] | None]],
+    stats: dict[str, Any],
+) -> None:
+    """Write one chunk's results and fold them into ``stats``.
+
+    Pragmatic upsert (REQ-6 AC#3): the UNIQUE constraint
+    (tnved_code, payment_type, country_or_areal, valid_from,
+     certificate_required, sp_certificate_required) means a rate with
+    unchanged valid_from is updated in place — refreshing
+    source_fetched_at and value fields. If Alta returns a new valid_from
+    (rate change with new effective date), a fresh row is inserted
+    alongside the existing one, preserving history.
+
+    All fetched rates go out in a single upsert. If that fails the chunk
+    is retried pair by pair so one bad payload only poisons its own pair.
+    """
+    failed: list[tuple[str, str | None]] = []
+    fetched: list[tuple[str, str | None, int, list[Any]]] = []
+    for tnved_code, country_or_areal, oksm, rates in outcomes:
+        if rates is None:
+            stats["failures"] += 1
+            if country_or_areal is not None:
+                failed.append((tnved_code, country_or_areal))
+            continue
+        fetched.append((tnved_code, country_or_areal, oksm, rates))
+
+    succeeded: list[tuple[str, str | None, int, list[Any]]] = []
+    combined = [rate for *_, rates in fetched for rate in rates]
+    try:
+        if combined:
+            _bulk_upsert(sb, combined, source="alta-revalidate")
+        succeeded = fetched
+    except Exception as exc:
+        logger.warning(
+            "Cron revalidate-rates: chunk upsert of %d rates failed (%s) — "
+            "retrying per pair",
+            len(combined), exc,
+        )
+        for tnved_code, country_or_areal, oksm, rates in fetched:
+            try:
+                _bulk_upsert(sb, rates, source="alta-revalidate")
+            except Exception as pair_exc:
+                stats["failures"] += 1
+                logger.warning(
+                    "Cron revalidate-rates: upsert failed for tnved=%s "
+                    "country=%s: %s",
+                    tnved_code, oksm, pair_exc,
+                )
+                failed.append((tnved_code, country_or_areal))
+                continue
+            succeeded.append((tnved_code, country_or_areal, oksm, rates))
+
+    for _code, _country, _oksm, rates in succeeded:
+        if rates:
+            stats["updates"] += 1
+        else:
+            stats["hits"] += 1
+        stats["processed"] += 1
+
+    # Success path — clear any prior poison-pill state (M9 review fix).
+    # Reset is per-pair (matches all valid_from generations) because the
+    # poison-pill signal is pair-level. Every succeeded pair is included:
+    # a counter may sit on a row of the pair that was not stale.
+    _reset_poison_pill_failures(
+        sb,
+        [(code, country) for code, country, _oksm, _rates in succeeded],
+    )
+    _record_poison_pill_failures(sb, failed)
+
+
 def _rank_revalidation_pairs(
     rows: list[dict[str, Any]], *, limit: int
 ) -> list[tuple[str, str | None]]:
@@ -785,8 +1119,8 @@ def _is_poison_pill(row: dict[str, Any], *, poison_cutoff_iso: str) -> bool:
       - revalidate_failed_at is more recent than (now - POISON_PILL_BACKOFF).
 
     After the backoff window expires, the row is re-tried; success will
-    reset the counter via ``_reset_poison_pill_failure``, another failure
-    will bump it via ``_record_poison_pill_failure``.
+    reset the counter via ``_reset_poison_pill_failures``, another failure
+    will bump it via ``_record_poison_pill_failures``.
     """
     count = row.get("revalidate_failure_count") or 0
     if count < POISON_PILL_FAILURE_THRESHOLD:
@@ -799,76 +1133,123 @@ def _is_poison_pill(row: dict[str, Any], *, poison_cutoff_iso: str) -> bool:
     return str(failed_at) >= poison_cutoff_iso
 
 
-def _record_poison_pill_failure(
-    sb: Any, tnved_code: str, country_or_areal: str | None
+def _record_poison_pill_failures(
+    sb: Any, pairs: list[tuple[str, str | None]]
 ) -> None:
-    """Bump revalidate_failure_count and stamp revalidate_failed_at for the
-    pair. Per-pair update (matches all valid_from generations) so the
-    poison-pill signal stays coherent across rate revisions.
+    """Bump revalidate_failure_count and stamp revalidate_failed_at for
+    every row of the given pairs. Per-pair update (matches all valid_from
+    generations) so the poison-pill signal stays coherent across rate
+    revisions.
+
+    Rows are read per country (``tnved_code IN (...)``, chunked and
+    keyset-paginated on ``id`` so no read hits the PostgREST row cap),
+    then one UPDATE per distinct new count (``id IN (...)``, chunked)
+    instead of one UPDATE per row.
 
     Failures here are non-critical — log and swallow so a flaky write
     doesn't abort the whole cron run.
     """
+    if not pairs:
+        return
+    wanted = set(pairs)
     try:
         # PostgREST UPDATE doesn't support ``column = column + 1`` directly
         # via the python client; read-then-write is acceptable because the
         # cron handler is the sole writer of these columns and runs at
         # most once a week.
-        resp = (
-            sb.table("tnved_rates")
-            .select("id, revalidate_failure_count")
-            .eq("tnved_code", tnved_code)
-            .eq("country_or_areal", country_or_areal)
-            .execute()
-        )
-        rows = list(getattr(resp, "data", None) or [])
+        codes_by_country: dict[str | None, set[str]] = {}
+        for tnved_code, country_or_areal in wanted:
+            codes_by_country.setdefault(country_or_areal, set()).add(tnved_code)
+
+        ids_by_count: dict[int, list[str]] = {}
+        for country_or_areal, codes in codes_by_country.items():
+            for row in _iter_pair_rate_rows(sb, country_or_areal, sorted(codes)):
+                row_id = row.get("id")
+                if not row_id:
+                    continue
+                current = row.get("revalidate_failure_count") or 0
+                ids_by_count.setdefault(current + 1, []).append(row_id)
+
         now_iso = datetime.now(timezone.utc).isoformat()
-        for row in rows:
-            row_id = row.get("id")
-            if not row_id:
-                continue
-            current = row.get("revalidate_failure_count") or 0
-            (
-                sb.table("tnved_rates")
-                .update({
-                    "revalidate_failure_count": current + 1,
-                    "revalidate_failed_at": now_iso,
-                })
-                .eq("id", row_id)
-                .execute()
-            )
+        for new_count, ids in ids_by_count.items():
+            for i in range(0, len(ids), _POISON_PILL_UPDATE_CHUNK):
+                (
+                    sb.table("tnved_rates")
+                    .update({
+                        "revalidate_failure_count": new_count,
+                        "revalidate_failed_at": now_iso,
+                    })
+                    .in_("id", ids[i:i + _POISON_PILL_UPDATE_CHUNK])
+                    .execute()
+                )
     except Exception as exc:  # noqa: BLE001 — non-critical fire-and-forget
         logger.warning(
             "Cron revalidate-rates: failed to record poison-pill failure "
-            "for tnved=%s country=%s: %s",
-            tnved_code, country_or_areal, exc,
+            "for %d pairs: %s",
+            len(wanted), exc,
         )
 
 
-def _reset_poison_pill_failure(
-    sb: Any, tnved_code: str, country_or_areal: str | None
+def _iter_pair_rate_rows(
+    sb: Any, country_or_areal: str | None, codes: list[str]
+):
+    """Yield every tnved_rates row of ``codes`` in one country_or_areal.
+
+    Codes go out ``_POISON_PILL_UPDATE_CHUNK`` at a time; each chunk is
+    keyset-paginated on ``id`` (REVALIDATE_PAGE_SIZE rows per read).
+    """
+    for i in range(0, len(codes), _POISON_PILL_UPDATE_CHUNK):
+        chunk = codes[i:i + _POISON_PILL_UPDATE_CHUNK]
+        last_id: str | None = None
+        while True:
+            query = (
+                sb.table("tnved_rates")
+                .select("id, tnved_code, country_or_areal, revalidate_failure_count")
+                .eq("country_or_areal", country_or_areal)
+                .in_("tnved_code", chunk)
+            )
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            resp = query.order("id").limit(REVALIDATE_PAGE_SIZE).execute()
+            page = list(getattr(resp, "data", None) or [])
+            yield from page
+            if len(page) < REVALIDATE_PAGE_SIZE:
+                break
+            last_id = page[-1].get("id")
+
+
+def _reset_poison_pill_failures(
+    sb: Any, pairs: list[tuple[str, str | None]]
 ) -> None:
-    """Clear poison-pill state for the pair after a successful Alta fetch.
+    """Clear poison-pill state for pairs after a successful Alta fetch.
 
-    Idempotent — a no-op write against rows that were already at zero.
+    Groups by country_or_areal so a chunk costs one UPDATE per country
+    (``tnved_code IN (...)``). Only rows with a non-zero counter are
+    written, so resetting clean pairs costs no row updates.
     """
-    try:
-        (
-            sb.table("tnved_rates")
-            .update({
-                "revalidate_failure_count": 0,
-                "revalidate_failed_at": None,
-            })
-            .eq("tnved_code", tnved_code)
-            .eq("country_or_areal", country_or_areal)
-            .execute()
-        )
-    except Exception as exc:  # noqa: BLE001 — non-critical fire-and-forget
-        logger.warning(
-            "Cron revalidate-rates: failed to reset poison-pill state "
-            "for tnved=%s country=%s: %s",
-            tnved_code, country_or_areal, exc,
-        )
+    codes_by_country: dict[str | None, set[str]] = {}
+    for tnved_code, country_or_areal in pairs:
+        codes_by_country.setdefault(country_or_areal, set()).add(tnved_code)
+
+    for country_or_areal, codes in codes_by_country.items():
+        try:
+            (
+                sb.table("tnved_rates")
+                .update({
+                    "revalidate_failure_count": 0,
+                    "revalidate_failed_at": None,
+                })
+                .eq("country_or_areal", country_or_areal)
+                .in_("tnved_code", sorted(codes))
+                .gt("revalidate_failure_count", 0)
+                .execute()
+            )
+        except Exception as exc:  # noqa: BLE001 — non-critical fire-and-forget
+            logger.warning(
+                "Cron revalidate-rates: failed to reset poison-pill state "
+                "for %d codes in country=%s: %s",
+                len(codes), country_or_areal, exc,
+            )
 
 
 async def _maybe_alert_poison_pill_count(sb: Any) -> None:
@@ -1101,6 +1482,7 @@ async def cron_refresh_exchange_rates(request) -> JSONResponse:
         sb.table("exchange_rates").upsert(
             rows, on_conflict="from_currency,to_currency,fetched_at"
         ).execute()
+        cbr_rates_service.invalidate_history()
     except Exception as exc:
         logger.error(
             "cron_refresh_exchange_rates: upsert of %d rows failed (fetched_at=%s): %s",
@@ -1127,3 +1509,167 @@ async def cron_refresh_exchange_rates(request) -> JSONResponse:
             "data": {"rows_written": len(rows), "currencies": len(rows)},
         }
     )
+
+
+# Longest range one backfill call may request (~10 years).
+BACKFILL_MAX_DAYS = 3660
+BACKFILL_DEFAULT_DAYS = 365
+
+
+async def cron_backfill_exchange_rates(request) -> JSONResponse:
+    """Backfill the CBR rate history in kvota.exchange_rates for a date range.
+
+    Path: POST /api/cron/backfill-exchange-rates
+    Params:
+        from: YYYY-MM-DD (query, optional; default: 365 days before ``to``)
+        to: YYYY-MM-DD (query, optional; default: today)
+    Auth: X-Cron-Secret header (PUBLIC_API_PATHS, no JWT middleware)
+    Returns:
+        On success: {"success": true,
+                     "data": {"rows_written": <int>, "currencies": <int>,
+                              "failed": [<code>, ...]}}
+        On failure: {"success": false, "error": {...}} — 400 bad range,
+                    500 DB write.
+    Side Effects:
+        - One CBR XML_dynamic request per supported currency for the whole
+          range; UPSERTs the days the history does not have yet
+          (services.cbr_rates_service.backfill_range). Re-runnable.
+    Roles: cron-only (no user role check; X-Cron-Secret is the gate).
+    """
+    err = _validate_cron_secret(request)
+    if err:
+        return err
+
+    try:
+        end = date.fromisoformat(request.query_params.get("to") or date.today().isoformat())
+        raw_start = request.query_params.get("from")
+        start = (
+            date.fromisoformat(raw_start) if raw_start
+            else end - timedelta(days=BACKFILL_DEFAULT_DAYS)
+        )
+    except ValueError:
+        start = end = None
+    if start is None or start > end or (end - start).days > BACKFILL_MAX_DAYS:
+        return JSONResponse(
+            {
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": (
+                        "from/to must be YYYY-MM-DD, from <= to, "
+                        f"at most {BACKFILL_MAX_DAYS} days apart"
+                    ),
+                },
+            },
+            status_code=400,
+        )
+
+    try:
+        summary = await asyncio.to_thread(cbr_rates_service.backfill_range, start, end)
+    except Exception as exc:
+        logger.error(
+            "cron_backfill_exchange_rates: %s..%s failed: %s", start, end, exc,
+        )
+        return JSONResponse(
+            {
+                "success": False,
+                "error": {
+                    "code": "EXCHANGE_RATES_WRITE_FAILED",
+                    "message": f"Failed to backfill exchange rates: {exc}",
+                },
+            },
+            status_code=500,
+        )
+
+    logger.info(
+        "cron_backfill_exchange_rates: %s..%s wrote %d rows, failed=%s",
+        start, end, summary["rows_written"], summary["failed"],
+    )
+    return JSONResponse({"success": True, "data": summary})
+
+
+# ----------------------------------------------------------------------------
+# Render cache housekeeping
+# ----------------------------------------------------------------------------
+
+
+async def cron_purge_render_cache(request) -> JSONResponse:
+    """Drop stale entries from the document render cache.
+
+    Path: POST /api/cron/purge-render-cache
+    Params: none (X-Cron-Secret header is the only input)
+    Auth: X-Cron-Secret header (PUBLIC_API_PATHS, no JWT middleware)
+    Returns:
+        On success: {"success": true, "data": {"purged": <int>}}
+        On failure: {"success": false, "error": {...}} with status 500.
+    Side Effects:
+        Deletes kvota.render_cache rows (and their kvota-render-cache
+        objects) rendered with an outdated template version or not served
+        for services.render_cache.RETENTION. Re-runnable.
+    Roles: cron-only (no user role check; X-Cron-Secret is the gate).
+    """
+    err = _validate_cron_secret(request)
+    if err:
+        return err
+
+    from services import render_cache
+
+    try:
+        purged = await asyncio.to_thread(render_cache.purge_stale)
+    except Exception as exc:
+        logger.error("cron_purge_render_cache failed: %s", exc)
+        return JSONResponse(
+            {
+                "success": False,
+                "error": {
+                    "code": "RENDER_CACHE_PURGE_FAILED",
+                    "message": f"Failed to purge render cache: {exc}",
+                },
+            },
+            status_code=500,
+        )
+
+    return JSONResponse({"success": True, "data": {"purged": purged}})
+
+
+# ----------------------------------------------------------------------------
+# Change feed housekeeping
+# ----------------------------------------------------------------------------
+
+
+async def cron_purge_change_events(request) -> JSONResponse:
+    """Drop change feed events older than the resume window.
+
+    Path: POST /api/cron/purge-change-events
+    Params: none (X-Cron-Secret header is the only input)
+    Auth: X-Cron-Secret header (PUBLIC_API_PATHS, no JWT middleware)
+    Returns:
+        On success: {"success": true, "data": {"purged": <int>}}
+        On failure: {"success": false, "error": {...}} with status 500.
+    Side Effects:
+        Deletes kvota.change_events rows older than
+        services.change_feed_service.RETENTION. Re-runnable.
+    Roles: cron-only (no user role check; X-Cron-Secret is the gate).
+    """
+    err = _validate_cron_secret(request)
+    if err:
+        return err
+
+    from services import change_feed_service
+
+    try:
+        purged = await asyncio.to_thread(change_feed_service.purge_old)
+    except Exception as exc:
+        logger.error("cron_purge_change_events failed: %s", exc)
+        return JSONResponse(
+            {
+                "success": False,
+                "error": {
+                    "code": "CHANGE_EVENTS_PURGE_FAILED",
+                    "message": f"Failed to purge change events: {exc}",
+                },
+            },
+            status_code=500,
+        )
+
+    return JSONResponse({"success": True, "data": {"purged": purged}})
@@ -38,7 +38,7 @@ from starlette.responses import JSONResponse
 from postgrest.exceptions import APIError as PostgrestAPIError
 
 from api.lib.errors import error_response
-from services import rate_resolver
+from services import rate_resolver, reference_cache, tnved_suggestion_index
 from services.alta_client import AltaApiError
 from services.database import get_supabase
 from services.role_service import get_user_role_codes
@@ -333,7 +333,7 @@ async def autofill_handler(
         force_live: bool (optional, default False) — REQ-5 AC#3:
             when True AND the historical lookup yielded no suggestion for
             an item that supplied tnved_code+country_oksm, fall back to
-            ``services.rate_resolver.resolve_rate(...)`` and emit a
+            ``services.rate_resolver.resolve_rates_batch(...)`` and emit a
             suggestion populated from the live (or cached) Alta result.
     Returns (envelope: {"success": true, "data": ...}):
         suggestions: list of {
@@ -353,7 +353,7 @@ async def autofill_handler(
             customs_rates_summary,     — REQ-5 (force_live only)
         }
     Side Effects: none (read-only). When ``force_live=True`` triggers
-        ``rate_resolver.resolve_rate``, that function may UPDATE
+        ``rate_resolver.resolve_rates_batch``, that function may UPDATE
         ``tnved_rates.last_used_at`` (cron revalidation hint) — see
         ``services/rate_resolver.py``.
     Roles: customs, admin, head_of_customs, head_of_logistics.
@@ -361,6 +361,9 @@ async def autofill_handler(
     Strategy: for each (brand, product_code) pair, fetch the newest
     quote_items row WHERE hs_code IS NOT NULL and the hit belongs to the
     caller's organization. Results are scoped to org via quote.organization_id.
+    Pairs without such a row fall back to the org's TN ВЭД suggestion index
+    (``services.tnved_suggestion_index``): a hit emits a suggestion with only
+    ``hs_code`` set plus ``hs_code_source='classification_history'``.
     """
     user, role_codes = _resolve_dual_auth(request)
     if not user:
@@ -438,6 +441,7 @@ async def autofill_handler(
     suggestions: list[dict] = []
     source_quote_ids: set[str] = set()
     resolved: list[tuple[list[str], dict]] = []
+    index_hits: list[tuple[list[str], tnved_suggestion_index.Suggestion]] = []
 
     for (brand, product_code), item_ids in keys_by_pair.items():
         select_cols = ", ".join(
@@ -461,6 +465,15 @@ async def autofill_handler(
 
         row = (result.data or [None])[0]
         if not row:
+            # No quote_items row carries an hs_code for this pair yet —
+            # fall back to confirmed classification picks.
+            hit = tnved_suggestion_index.lookup(
+                org_id, brand=brand, product_code=product_code, sb=supabase,
+            )
+            if hit is not None:
+                if hit.source_quote_id:
+                    source_quote_ids.add(hit.source_quote_id)
+                index_hits.append((item_ids, hit))
             continue
         source_quote_ids.add(row["quote_id"])
         resolved.append((item_ids, row))
@@ -493,6 +506,25 @@ async def autofill_handler(
             suggestions.append({"item_id": item_id, **base})
             items_with_history.add(item_id)
 
+    # Classification-index hits carry only the code. Items that also sent
+    # a country get the code threaded into the force_live context below
+    # so the resolver can fill the rates.
+    for item_ids, hit in index_hits:
+        base = {
+            "source_quote_id": hit.source_quote_id,
+            "source_quote_idn": idn_by_quote.get(hit.source_quote_id or "", ""),
+            "source_created_at": hit.source_created_at,
+        }
+        for field in _AUTOFILL_FIELDS:
+            base[field] = None
+        base["hs_code"] = hit.code
+        base["hs_code_source"] = "classification_history"
+        for item_id in item_ids:
+            suggestions.append({"item_id": item_id, **base})
+            ctx = item_context[item_id]
+            if not ctx.get("tnved_code"):
+                ctx["tnved_code"] = hit.code
+
     # REQ-5 AC#3 — force_live fallback: items with tnved_code+country_oksm but
     # no historical hit get a suggestion synthesised from the live resolver.
     # The Alta client is injected by the router via Depends; if absent (e.g.
@@ -530,15 +562,16 @@ async def _append_resolver_suggestions(
 ) -> None:
     """Synthesise suggestions for items without a historical match via the resolver.
 
-    Only runs when ``force_live=True`` was set on the autofill request. The
-    resolver is consulted once per item that supplied tnved_code+country_oksm
-    and lacks a historical hit. New optional fields are appended to each
-    suggestion: ``customs_rates_source``, ``customs_rates_fetched_at``,
-    ``customs_rates_summary``. Existing ``_AUTOFILL_FIELDS`` are populated
+    Only runs when ``force_live=True`` was set on the autofill request. Every
+    item that supplied tnved_code+country_oksm and lacks a historical hit is
+    resolved in ONE ``rate_resolver.resolve_rates_batch`` call. New optional
+    fields are appended to each suggestion: ``customs_rates_source``,
+    ``customs_rates_fetched_at``, ``customs_rates_summary``. Existing ``_AUTOFILL_FIELDS`` are populated
     from the resolved rate where derivable (``customs_duty`` from a percent
     slot 1; otherwise None to keep the contract additive).
     """
     today = date.today()
+    requests: dict[str, rate_resolver.RateRequest] = {}
     for item_id, ctx in item_context.items():
         if item_id in items_with_history:
             continue
@@ -550,22 +583,28 @@ async def _append_resolver_suggestions(
             country_oksm_int = int(country_oksm)
         except (TypeError, ValueError):
             continue
+        requests[item_id] = rate_resolver.RateRequest(
+            tnved_code=tnved_code,
+            country_oksm=country_oksm_int,
+            target_date=today,
+            has_certificate=ctx.get("has_origin_certificate", False),
+        )
+    if not requests:
+        return
 
-        try:
-            result = await rate_resolver.resolve_rate(
-                tnved_code=tnved_code,
-                payment_type="IMP",
-                country_oksm=country_oksm_int,
-                target_date=today,
-                has_certificate=ctx.get("has_origin_certificate", False),
-                alta_client=alta_client,
-            )
-        except Exception as exc:
-            logger.warning(
-                "customs.autofill force_live resolve failed for %s: %s",
-                item_id, exc,
-            )
-            continue
+    # One batch call for every eligible item — identical (code, country)
+    # pairs share a single cache sweep and at most one Alta packet.
+    try:
+        batch = await rate_resolver.resolve_rates_batch(
+            list(requests.values()), ("IMP",), alta_client=alta_client,
+        )
+    except Exception as exc:
+        logger.warning("customs.autofill force_live batch resolve failed: %s", exc)
+        return
+
+    for (item_id, req), item_result in zip(requests.items(), batch):
+        ctx = item_context[item_id]
+        result = item_result.result_for("IMP")
         # Autofill is best-effort — both NOT_FOUND and ALTA_ERROR mean
         # we have no suggestion to emit. Skip silently either way.
         if result.outcome != rate_resolver.ResolveOutcome.FOUND:
@@ -581,7 +620,7 @@ async def _append_resolver_suggestions(
         for field in _AUTOFILL_FIELDS:
             sug[field] = None
         sug["customs_duty"] = customs_duty
-        sug["country_of_origin_oksm"] = country_oksm_int
+        sug["country_of_origin_oksm"] = req.country_oksm
         sug["has_origin_certificate"] = ctx.get("has_origin_certificate", False)
         sug["has_fta_certificate"] = ctx.get("has_fta_certificate", False)
         sug["customs_rates_source"] = resolved.source
@@ -601,19 +640,14 @@ async def _append_resolver_suggestions(
 def _validate_country_oksm(country_oksm: int) -> JSONResponse | None:
     """Verify country_oksm exists in kvota.countries; None on success.
 
+    Served from the reference-cache snapshot of ``countries``.
+
     Distinguishes a genuine missing-country (400 INVALID_OKSM) from supabase
     connectivity / query failures (503 DB_ERROR) so callers can retry on the
     latter without misleading users that their input is invalid.
     """
-    sb = get_supabase()
     try:
-        result = (
-            sb.table("countries")
-            .select("oksm_digital")
-            .eq("oksm_digital", country_oksm)
-            .limit(1)
-            .execute()
-        )
+        known = reference_cache.country_exists(country_oksm, sb=get_supabase())
     except Exception as exc:
         # Connectivity / RLS / network failure — never treat as bad input.
         logger.warning("countries lookup failed: %s", exc)
@@ -622,18 +656,7 @@ def _validate_country_oksm(country_oksm: int) -> JSONResponse | None:
             "Country verification failed; please retry",
             503,
         )
-    # `result is None` shouldn't happen on the supabase-py path, but guard
-    # defensively — same DB_ERROR signal as a raised exception.
-    if result is None:
-        logger.warning(
-            "countries lookup returned None for oksm=%s", country_oksm
-        )
-        return error_response(
-            "DB_ERROR",
-            "Country verification failed; please retry",
-            503,
-        )
-    if not (result.data or []):
+    if not known:
         return error_response(
             "INVALID_OKSM",
             f"country_oksm {country_oksm} not found in kvota.countries",
@@ -1333,6 +1356,7 @@ def _serialize_classify_result(r) -> dict:
         "quote_item_id": r.quote_item_id,
         "candidates": [_serialize_candidate(c) for c in r.candidates],
         "error": r.error,
+        "source": r.source,
     }
 
 
@@ -1343,10 +1367,12 @@ async def classify_handler(request: Request, alta_client) -> JSONResponse:
     Auth: dual — JWT (Next.js) or legacy session (FastHTML).
     Params (JSON body):
         items: list[{name: str, brand?: str, description?: str,
-                     quote_item_id?: uuid}]  (required, non-empty)
+                     quote_item_id?: uuid, product_code?: str}]
+                     (required, non-empty)
     Returns:
         Success (200): {success: true, data: {results, packet_left,
-            packet_used, request_id}}
+            packet_used, request_id, index_hits}} — results answered from
+            the org's classification history carry source='history'.
         Errors:
             - 400 BAD_REQUEST — empty items list, malformed JSON
             - 401 UNAUTHORIZED — no auth
@@ -1357,7 +1383,8 @@ async def classify_handler(request: Request, alta_client) -> JSONResponse:
 
     Side Effects:
         - Burns 1 Alta Express packet per batch (idempotent on same-day
-          retries via stable request_id).
+          retries via stable request_id); none when every item is answered
+          from classification history.
         - Writes one audit row per item to kvota.tnved_classification_log
           (method='express'). chosen_code is filled by /select later.
     Roles: customs, admin, head_of_customs, head_of_logistics.
@@ -1410,6 +1437,7 @@ async def classify_handler(request: Request, alta_client) -> JSONResponse:
                 brand=(raw.get("brand") or None),
                 description=(raw.get("description") or None),
                 quote_item_id=(raw.get("quote_item_id") or None),
+                product_code=(raw.get("product_code") or None),
             )
         )
 
@@ -1418,6 +1446,7 @@ async def classify_handler(request: Request, alta_client) -> JSONResponse:
             inputs,
             alta_client=alta_client,
             user_id=user.get("id"),
+            organization_id=user["org_id"],
         )
     except ClassifierError as e:
         # Map service-level error codes to HTTP status.
@@ -1438,6 +1467,8 @@ async def classify_handler(request: Request, alta_client) -> JSONResponse:
             "item_count": len(inputs),
             "request_id": outcome.request_id,
             "packet_left": outcome.packet_left,
+            "index_hits": outcome.index_hits,
+            "index_stats": tnved_suggestion_index.stats(),
         },
     )
 
@@ -1448,6 +1479,7 @@ async def classify_handler(request: Request, alta_client) -> JSONResponse:
             "packet_left": outcome.packet_left,
             "packet_used": outcome.packet_used,
             "request_id": outcome.request_id,
+            "index_hits": outcome.index_hits,
         },
     })
 
@@ -1556,6 +1588,7 @@ async def classify_select_handler(request: Request) -> JSONResponse:
     Side Effects:
         - UPDATE kvota.quote_items SET hs_code = chosen_code WHERE id=...
         - INSERT into kvota.tnved_classification_log with chosen_code set.
+        - Adds the pick to this worker's TN ВЭД suggestion index.
     Roles: customs, admin, head_of_customs, head_of_logistics.
     """
     user, role_codes = _resolve_dual_auth(request)
@@ -1635,6 +1668,17 @@ async def classify_select_handler(request: Request) -> JSONResponse:
         method="express",
         input_text=input_text,
     )
+    updated_row = update_resp.data[0] if isinstance(update_resp.data, list) else {}
+    if isinstance(updated_row, dict):
+        tnved_suggestion_index.record_choice(
+            user["org_id"],
+            name=input_text or updated_row.get("product_name") or "",
+            code=chosen_code,
+            brand=updated_row.get("brand"),
+            product_code=updated_row.get("product_code"),
+            quote_item_id=quote_item_id,
+            quote_id=updated_row.get("quote_id"),
+        )
 
     logger.info(
         "customs_classify_select",
@@ -13,6 +13,7 @@ from datetime import date, datetime
 
 from starlette.responses import JSONResponse
 
+from services import document_numbering
 from services.database import get_supabase
 from services.deal_data_service import fetch_items_with_buyer_companies, fetch_enrichment_data
 from services.logistics_service import initialize_logistics_stages
@@ -26,18 +27,10 @@ logger = logging.getLogger(__name__)
 def _generate_deal_number(sb, org_id: str) -> str:
     """Generate sequential deal number: DEAL-{year}-{NNNN}.
 
-    Counts existing deals for the current year within the organization.
+    Taken from the organization's atomic yearly counter
+    (services/document_numbering.py) — unique under concurrent creates.
     """
-    year = date.today().year
-    count_result = (
-        sb.table("deals")
-        .select("id", count="exact")
-        .eq("organization_id", org_id)
-        .gte("created_at", f"{year}-01-01")
-        .execute()
-    )
-    seq_num = (count_result.count or 0) + 1
-    return f"DEAL-{year}-{seq_num:04d}"
+    return document_numbering.generate(org_id, document_numbering.KIND_DEAL, "DEAL", sb=sb)
 
 
 def _try_generate_invoices(
@@ -195,7 +188,14 @@ async def create_deal(request) -> JSONResponse:
     seller_company = {"id": sc.get("id"), "name": sc.get("name"), "entity_type": "seller_company"} if sc.get("id") else {}
 
     # --- Step 3: Generate deal number ---
-    deal_number = _generate_deal_number(sb, org_id)
+    try:
+        deal_number = _generate_deal_number(sb, org_id)
+    except Exception as e:
+        logger.error("Failed to generate deal number for org %s: %s", org_id, e)
+        return JSONResponse(
+            {"success": False, "error": {"code": "INTERNAL_ERROR", "message": "Failed to generate deal number"}},
+            status_code=500,
+        )
 
     # --- Step 4: Update specification status to 'signed' ---
     try:
@@ -1,4 +1,4 @@
-"""Document /api/documents/* endpoints — signed-URL download + delete.
+"""Document /api/documents/* endpoints — signed-URL download, ZIP bundle, delete.
 
 Handler module (not router). Registered via thin wrapper in
 api/routers/documents.py. Moved verbatim from main.py @rt decorators
@@ -10,18 +10,29 @@ or legacy session (FastHTML) via Starlette's SessionMiddleware.
 The download endpoint returns an HTTP 302 RedirectResponse pointing at a
 Supabase storage signed URL. Frontend <a href> tags rely on the 302 to
 trigger browser downloads — DO NOT convert to JSON.
+
+The bundle endpoint streams every document of a quote or deal as one ZIP
+(services.document_zip) — no signed URL per file.
 """
 
 from __future__ import annotations
 
 import logging
+from urllib.parse import quote as url_quote
 
 from starlette.requests import Request
-from starlette.responses import JSONResponse, RedirectResponse, Response
+from starlette.responses import JSONResponse, RedirectResponse, Response, StreamingResponse
 
 from api.lib.errors import error_response
 from services.database import get_supabase
-from services.document_service import delete_document, get_download_url
+from services.deal_service import get_deal
+from services.document_service import (
+    delete_document,
+    get_all_documents_for_quote,
+    get_documents_for_entity,
+    get_download_url,
+)
+from services.document_zip import stream_documents_zip
 from services.role_service import get_user_role_codes
 
 logger = logging.getLogger(__name__)
@@ -107,6 +118,84 @@ async def download_document(request: Request, document_id: str) -> Response:
     return RedirectResponse(download_url, status_code=302)
 
 
+async def download_documents_zip(request: Request) -> Response:
+    """GET /api/documents/bundle — all documents of a quote or deal as one ZIP.
+
+    Path: GET /api/documents/bundle?quote_id=<uuid> | ?deal_id=<uuid>
+    Auth: dual — JWT (Next.js) or legacy session (FastHTML).
+    Params:
+        quote_id: documents linked to the quote (parent_quote_id), or
+        deal_id: documents of the deal's quote plus those attached to the deal.
+        Exactly one is required.
+    Returns:
+        200 streaming ``application/zip`` (files grouped by document type;
+        unreadable files listed in НЕ_ЗАГРУЖЕНО.txt inside the archive).
+        400 when neither / both params are given.
+        401 when unauthenticated, 403 without a role in the organization.
+        404 when the quote / deal is not in the user's org or has no documents.
+    Roles: any role in the organization — the same rule as
+        documents_select_policy (m143), which the service-role reads here
+        would otherwise bypass. Documents of other organizations are never
+        included.
+    """
+    user, role_codes = _resolve_dual_auth(request)
+    if not user:
+        return error_response("UNAUTHORIZED", "Unauthorized", status_code=401)
+
+    quote_id = request.query_params.get("quote_id")
+    deal_id = request.query_params.get("deal_id")
+    if bool(quote_id) == bool(deal_id):
+        return error_response(
+            "VALIDATION_ERROR", "Provide exactly one of quote_id or deal_id", status_code=400
+        )
+
+    org_id = user.get("org_id")
+    if not org_id or not role_codes:
+        return error_response("FORBIDDEN", "Forbidden", status_code=403)
+
+    if deal_id:
+        deal = get_deal(deal_id, organization_id=org_id)
+        if not deal:
+            return error_response("NOT_FOUND", "Deal not found", status_code=404)
+        documents = get_all_documents_for_quote(deal.quote_id) + get_documents_for_entity(
+            "deal", deal_id
+        )
+        label = deal.deal_number or deal_id
+    else:
+        sb = get_supabase()
+        quote_rows = (
+            sb.table("quotes")
+            .select("id, idn_quote")
+            .eq("id", quote_id)
+            .eq("organization_id", org_id)
+            .limit(1)
+            .execute()
+        ).data
+        if not quote_rows:
+            return error_response("NOT_FOUND", "Quote not found", status_code=404)
+        documents = get_all_documents_for_quote(quote_id)
+        label = quote_rows[0].get("idn_quote") or quote_id
+
+    unique = {}
+    for doc in documents:
+        if doc.organization_id == org_id:
+            unique.setdefault(doc.id, doc)
+    if not unique:
+        return error_response("NOT_FOUND", "No documents found", status_code=404)
+
+    filename = f"documents-{label}.zip"
+    return StreamingResponse(
+        stream_documents_zip(list(unique.values())),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="documents.zip"; '
+                f"filename*=UTF-8''{url_quote(filename)}"
+            )
+        },
+    )
+
+
 async def delete_document_api(request: Request, document_id: str) -> JSONResponse:
     """DELETE /api/documents/{document_id}.
 
@@ -17,6 +17,8 @@ Auth: JWT via ApiAuthMiddleware (request.state.api_user).
 Roles: procurement, procurement_senior, admin, head_of_procurement
 """
 
+import asyncio
+import base64
 import logging
 from datetime import datetime, timezone
 from typing import Any
@@ -234,6 +236,11 @@ async def import_invoice_xls(request, id: str) -> JSONResponse:
     Path: POST /api/invoices/{id}/import-xls
     Params:
         file: multipart/form-data — xlsx matching the «Скачать XLS» template
+    Headers:
+        Prefer: respond-async (optional) — run the import as a background
+            job; 202 ``{job_id, status, status_url}``, poll GET
+            /api/jobs/{job_id}. Failures land in the job's ``error`` /
+            ``result`` (``{"code": "DUPLICATES", "duplicates": [...]}``).
     Returns:
         200 ``{"success": true, "data": {"updated": N, "skipped": [...],
         "total_in_file": M}}`` on success.
@@ -283,13 +290,28 @@ async def import_invoice_xls(request, id: str) -> JSONResponse:
         )
 
     # ---- Dispatch to the service ------------------------------------------
+    from api.jobs import accepted_response, wants_async
+
+    if wants_async(request):
+        from services import job_service
+
+        job = job_service.enqueue(
+            "invoice_xls_import",
+            {"invoice_id": id, "file_b64": base64.b64encode(file_bytes).decode("ascii")},
+            organization_id=user["org_id"],
+            created_by=user.get("id"),
+            dedupe_key=f"invoice_xls_import:{id}",
+            max_attempts=2,
+        )
+        return accepted_response(job)
+
     from services.xls_import_service import (
         DuplicateArticlesError,
         import_invoice_xls as _import,
     )
 
     try:
-        summary = _import(invoice_id=id, file_bytes=file_bytes)
+        summary = await asyncio.to_thread(_import, invoice_id=id, file_bytes=file_bytes)
     except DuplicateArticlesError as exc:
         return JSONResponse(
             {
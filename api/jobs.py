@@ -0,0 +1,96 @@
+"""Background job status /api/jobs/* endpoints.
+
+Handler module (not router). Registered via thin wrapper in
+api/routers/jobs.py. Jobs are queued by endpoints that accept
+``Prefer: respond-async`` (workflow transition, XLS import) and run by
+services/job_service.py; clients poll GET /api/jobs/{id} until the status
+is ``succeeded`` or ``failed``.
+
+Auth: dual — JWT (Next.js) via ApiAuthMiddleware (request.state.api_user),
+or legacy session (FastHTML). A job is visible to members of the
+organization it was queued for.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from api.lib.errors import error_response, success_response
+from services import job_service
+from services.database import get_supabase
+
+logger = logging.getLogger(__name__)
+
+
+def wants_async(request: Request) -> bool:
+    """True when the client sent ``Prefer: respond-async`` (RFC 7240)."""
+    prefer = request.headers.get("prefer", "")
+    return any(p.strip().lower() == "respond-async" for p in prefer.split(","))
+
+
+def accepted_response(job: job_service.Job) -> JSONResponse:
+    """202 Accepted pointing at the job status endpoint."""
+    location = f"/api/jobs/{job.id}"
+    response = success_response(
+        {"job_id": job.id, "status": job.status, "status_url": location},
+        status_code=202,
+    )
+    response.headers["Location"] = location
+    response.headers["Preference-Applied"] = "respond-async"
+    return response
+
+
+def _resolve_user(request: Request) -> tuple[str | None, str | None]:
+    """(user_id, org_id) from JWT or legacy session; (None, None) if anonymous."""
+    api_user = getattr(request.state, "api_user", None)
+    if api_user:
+        user_id = str(api_user.id)
+        om = (
+            get_supabase()
+            .table("organization_members")
+            .select("organization_id")
+            .eq("user_id", user_id)
+            .limit(1)
+            .execute()
+        )
+        return user_id, (om.data[0]["organization_id"] if om.data else None)
+
+    try:
+        session = request.session
+    except (AssertionError, AttributeError):
+        return None, None
+    user = session.get("user") if session else None
+    if not user:
+        return None, None
+    return user.get("id"), user.get("org_id")
+
+
+async def get_job_status(request: Request, job_id: str) -> JSONResponse:
+    """Status of a background job.
+
+    Path: GET /api/jobs/{job_id}
+    Returns:
+        data: {id, kind, status, attempts, max_attempts, result, error,
+               created_at, updated_at, finished_at}
+        ``status`` is one of queued | running | succeeded | failed |
+        cancelled; ``result`` holds the handler's return value on success
+        and failure details (e.g. duplicates) on failure.
+    Errors:
+        401 — no auth
+        403 — no organization
+        404 — no such job in the caller's organization
+    Roles: any member of the job's organization.
+    """
+    user_id, org_id = _resolve_user(request)
+    if not user_id:
+        return error_response("UNAUTHORIZED", "Unauthorized", status_code=401)
+    if not org_id:
+        return error_response("FORBIDDEN", "No organization", status_code=403)
+
+    job = job_service.get_job(job_id, organization_id=org_id)
+    if job is None:
+        return error_response("NOT_FOUND", "Задача не найдена", status_code=404)
+    return success_response(job.to_public_dict())
@@ -8,7 +8,9 @@ Iteration 1 contract (REQ-14, REQ-18, REQ-19, REQ-20):
 - JSON body, all fields optional, defaults to empty / empty list
 - ``application/pdf`` response on success with date-stamped filename
 - Auth: JWT only (no session fallback — this is a Next.js-only feature)
-- No DB writes, no Supabase reads, no side effects beyond the structured log line
+- Rendered PDFs are content-addressed in services.render_cache (an identical
+  proposal is served from storage instead of re-launching Chromium); no
+  other DB access, no side effects beyond the structured log line
 """
 
 from __future__ import annotations
@@ -22,6 +24,7 @@ from typing import Any
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
 
+from services import render_cache
 from services.kp_export import (
     KpItem,
     KpPackagingItem,
@@ -188,9 +191,11 @@ async def render_pdf(request: Request) -> Response:
         on success.
 
     Side Effects:
-        None. The renderer never touches the database (REQ-20). The only
-        observable side effect is a structured log line with request_id,
-        user_id, org_id, payload size, render duration, and outcome.
+        The renderer itself never touches the database (REQ-20). The PDF
+        is cached by content in services.render_cache (storage bucket +
+        kvota.render_cache row); cache failures fall back to rendering.
+        A structured log line records request_id, user_id, org_id,
+        payload size, render duration, and outcome.
 
     Roles: any authenticated user (no role gating in iteration 1, REQ-18.4).
     """
@@ -225,7 +230,9 @@ async def render_pdf(request: Request) -> Response:
     proposal = _build_proposal(body)
     started = time.perf_counter()
     try:
-        pdf_bytes = await render_proposal_pdf_async(proposal)
+        pdf_bytes = await render_cache.get_or_render_async(
+            "kp_pdf", proposal, lambda: render_proposal_pdf_async(proposal)
+        )
     except Exception:
         duration_ms = int((time.perf_counter() - started) * 1000)
         logger.exception(
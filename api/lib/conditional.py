@@ -0,0 +1,184 @@
+"""Conditional GET (ETag / 304) for read-heavy quote views.
+
+The quote page polls several read-only views; each poll used to rebuild and
+re-serialize the payload even when nothing changed. ``conditional_json``
+wraps such a handler:
+
+1. read the quote's content version — one primary-key lookup of the quote,
+   scoped to the caller's organization, embedding
+   ``kvota.quote_content_versions`` (migration 344; bumped by triggers on the
+   quote and every child table the views read);
+2. derive a weak ETag from (route, quote, version, audience, time window);
+3. ``If-None-Match`` matches → ``304 Not Modified``, nothing else is read;
+4. otherwise serve a short-lived process-local copy of the same response, or
+   build it, cache it and return it with the ETag.
+
+The organization check comes first: a quote that is missing, deleted or in
+another organization has no version here, so the caller never gets a 304
+or a cached copy for it — ``build()`` runs and answers with its own
+404 / 403, revealing neither existence nor version.
+
+``audience`` must hold everything besides the quote that changes the
+payload or who may see it — callers pass the org id and, where the payload
+depends on them, the role slugs.
+
+Reference rows the views join (customer / supplier names, locations,
+profiles, exchange rates) do not bump a quote's version; the time window in
+the ETag bounds how long such a change can go unnoticed to
+ETAG_WINDOW_SECONDS.
+
+When the version cannot be read (table missing, DB hiccup, mocked client)
+or the quote is not visible, the handler runs unconditionally.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+
+ETAG_WINDOW_SECONDS = 300
+RESPONSE_CACHE_TTL_SECONDS = 30
+RESPONSE_CACHE_MAX_ENTRIES = 512
+
+CACHE_CONTROL = "private, no-cache"  # always revalidate; 304 makes that cheap
+
+_cache: "OrderedDict[tuple, tuple[float, bytes, str]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def clear_cache() -> None:
+    """Drop cached responses (tests)."""
+    with _cache_lock:
+        _cache.clear()
+
+
+def get_quote_version(sb: Any, quote_id: str, organization_id: str) -> int | None:
+    """Content version of ``quote_id`` (0 if never bumped).
+
+    None when the quote is not a live quote of ``organization_id`` or the
+    version cannot be read.
+    """
+    try:
+        resp = (
+            sb.table("quotes")
+            .select("id, quote_content_versions(version)")
+            .eq("id", quote_id)
+            .eq("organization_id", organization_id)
+            .is_("deleted_at", None)
+            .limit(1)
+            .execute()
+        )
+    except Exception as e:
+        logger.warning("quote_content_versions lookup failed for %s: %s", quote_id, e)
+        return None
+    rows = getattr(resp, "data", None)
+    if not isinstance(rows, list) or not rows or not isinstance(rows[0], dict):
+        return None
+    if "quote_content_versions" not in rows[0]:
+        return None
+    embedded = rows[0]["quote_content_versions"]
+    if isinstance(embedded, list):  # to-many embedding
+        embedded = embedded[0] if embedded else None
+    if embedded is None:
+        return 0
+    version = embedded.get("version") if isinstance(embedded, dict) else None
+    return version if isinstance(version, int) else None
+
+
+def make_etag(route: str, quote_id: str, version: int, audience: Iterable[str] = ()) -> str:
+    window = int(time.time() // ETAG_WINDOW_SECONDS)
+    raw = "|".join([route, quote_id, str(version), str(window), *sorted(audience)])
+    return 'W/"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """RFC 9110 weak comparison against ``If-None-Match``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def _cache_get(key: tuple) -> tuple[bytes, str] | None:
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        expires, body, media_type = entry
+        if expires < now:
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return body, media_type
+
+
+def _cache_put(key: tuple, body: bytes, media_type: str) -> None:
+    with _cache_lock:
+        _cache[key] = (time.monotonic() + RESPONSE_CACHE_TTL_SECONDS, body, media_type)
+        _cache.move_to_end(key)
+        while len(_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+async def conditional_json(
+    request: Request,
+    *,
+    sb: Any,
+    route: str,
+    quote_id: str,
+    organization_id: str,
+    audience: Iterable[str],
+    build: Callable[[], Awaitable[Response]],
+) -> Response:
+    """Serve ``build()`` for a quote view with ETag / 304 / short-lived caching.
+
+    ``organization_id`` is the caller's organization; only its quotes get
+    conditional or cached responses. ``build`` must be the full handler body
+    after authentication, including its own quote access check; non-200
+    responses it returns are passed through without ETag or caching.
+    """
+    version = get_quote_version(sb, quote_id, organization_id)
+    if version is None:
+        return await build()
+
+    audience = tuple(sorted(audience))
+    etag = make_etag(route, quote_id, version, audience)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    key = (route, quote_id, etag)
+    cached = _cache_get(key)
+    if cached is not None:
+        body, media_type = cached
+        return Response(
+            body, media_type=media_type,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+        )
+
+    response = await build()
+    if response.status_code != 200:
+        return response
+    body = getattr(response, "body", None)
+    if isinstance(body, bytes):
+        _cache_put(key, body, response.media_type or "application/json")
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
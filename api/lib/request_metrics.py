@@ -0,0 +1,66 @@
+"""Per-request round-trip metrics middleware.
+
+Opens a services.request_metrics tracker for every HTTP request, adds a
+``Server-Timing`` header (one metric per target — ``db``, ``storage``,
+``alta``, ``cbr``, ``dadata``, ``here``, ... — plus ``app`` for the whole
+handler) and logs ``slow_request`` when a request is over the time or
+PostgREST-call threshold. Request latency per route template also goes to
+the ``http_request_duration_seconds`` histogram served by GET /api/metrics.
+
+Pure ASGI rather than BaseHTTPMiddleware so streaming responses (ZIP
+downloads) pass through untouched and the tracker's context reaches the
+endpoint unchanged.
+"""
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from services import metrics as _metrics
+from services import request_metrics
+
+_REQUEST_SECONDS = _metrics.histogram(
+    "http_request_duration_seconds",
+    "API request latency by route template",
+    ("method", "route", "status"),
+)
+
+
+def _route_template(scope: Scope) -> str:
+    """``/api/quotes/{quote_id}`` rather than the concrete path (bounded labels)."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return "unmatched"
+    return scope.get("root_path", "") + path
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        request_metrics.install()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        with request_metrics.track(scope.get("path", "")) as metrics:
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", metrics.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                method = scope.get("method", "")
+                _REQUEST_SECONDS.observe(
+                    metrics.elapsed_ms() / 1000,
+                    method=method, route=_route_template(scope), status=str(status),
+                )
+                request_metrics.log_if_slow(metrics, method, scope.get("path", ""), status)
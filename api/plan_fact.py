@@ -503,6 +503,10 @@ async def quotes_search(request):
 
     Search quotes by idn_quote (ILIKE), returning only those with a linked deal.
     Joins: quotes -> specifications -> deals, quotes -> customers.
+
+    The deal filter is an inner join, so the 20-row limit counts quotes that
+    have a deal; the ILIKE is served by the idn_quote trigram index
+    (migration 346).
     """
     user, err = _get_api_user(request)
     if err:
@@ -523,13 +527,13 @@ async def quotes_search(request):
 
     sb = get_supabase()
 
-    # Search quotes by idn_quote, scoped to user's org
+    # Search quotes by idn_quote, scoped to user's org; only quotes with a deal
     result = (
         sb.table("quotes")
         .select(
             "id, idn_quote, "
             "customers!customer_id(name), "
-            "specifications(id, deals(id, deal_number))"
+            "specifications!inner(id, deals!inner(id, deal_number))"
         )
         .eq("organization_id", user["org_id"])
         .ilike("idn_quote", f"%{q}%")
@@ -21,6 +21,7 @@ from typing import Any
 
 from starlette.responses import JSONResponse
 
+from api.lib.conditional import conditional_json
 from services.database import get_supabase
 from services.workflow_service import (
     get_pause_history,
@@ -984,13 +985,41 @@ async def get_status_history(request, id: str) -> JSONResponse:
         id, brand, from_status, from_substatus, to_status, to_substatus,
         transitioned_at, transitioned_by, transitioned_by_name, reason.
         `brand` is null for quote-level transitions, non-null for per-brand ones.
+        404 QUOTE_NOT_FOUND when the quote is not in the caller's organization.
     Roles: procurement, admin, head_of_procurement, sales, head_of_sales
     """
-    _, err = _resolve_user_context(request, _READ_HISTORY_ROLES)
+    user, err = _resolve_user_context(request, _READ_HISTORY_ROLES)
     if err:
         return err
 
     sb = get_supabase()
+    return await conditional_json(
+        request,
+        sb=sb,
+        route="status-history",
+        quote_id=id,
+        organization_id=user["org_id"],
+        audience=[user["org_id"]],
+        build=lambda: _status_history_response(sb, id, user["org_id"]),
+    )
+
+
+async def _status_history_response(sb, id: str, org_id: str) -> JSONResponse:
+    """Body of :func:`get_status_history` after authorization."""
+    quote_result = (
+        sb.table("quotes")
+        .select("id")
+        .eq("id", id)
+        .eq("organization_id", org_id)
+        .is_("deleted_at", None)
+        .limit(1)
+        .execute()
+    )
+    if not _rows(quote_result):
+        return JSONResponse(
+            {"success": False, "error": {"code": "QUOTE_NOT_FOUND", "message": "Quote not found"}},
+            status_code=404,
+        )
 
     history_result = (
         sb.table("status_history")
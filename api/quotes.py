@@ -16,6 +16,7 @@ in main.py so existing callers (calculation-action-bar.tsx, sales-action-bar
 .tsx) continue to work unchanged.
 """
 
+import asyncio
 import json
 import logging
 from datetime import datetime, timezone
@@ -25,9 +26,11 @@ from typing import Any, Dict, cast
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
 
+from api.jobs import accepted_response, wants_async
 from api.lib.errors import error_response
 from calculation_engine import calculate_multiproduct_quote
 from calculation_mapper import safe_decimal, safe_int
+from services import job_service
 from services.composition_service import get_composed_items
 from services.currency_service import convert_amount
 from services.database import get_supabase
@@ -36,7 +39,6 @@ from services.export_validation_service import create_validation_excel
 from services.quote_version_service import (
     can_update_version,
     create_quote_version,
-    get_current_quote_version,
     list_quote_versions,
     update_quote_version,
 )
@@ -657,7 +659,9 @@ async def calculate_quote(
 
         try:
             existing_versions = list_quote_versions(quote_id, org_id)
-            current_version = get_current_quote_version(quote_id, org_id) if existing_versions else None
+            # Listing is newest-first and carries the id — no need to load the
+            # latest version's full snapshot just to update it.
+            current_version = existing_versions[0] if existing_versions else None
             reason_text = change_reason if change_reason else "Calculation saved"
 
             # Phase 5d: items sourced from composition_service inside the
@@ -967,6 +971,7 @@ async def cancel_quote(
                 "cancelled_at": datetime.now(timezone.utc).isoformat(),
                 "cancelled_by": user_id,
                 "stage_entered_at": datetime.now(timezone.utc).isoformat(),
+                "stage_entered_by": user_id,
                 "overdue_notified_at": None,
             }) \
             .eq("id", quote_id) \
@@ -1046,6 +1051,11 @@ async def transition_workflow(
         action: str — special action: ``complete_procurement`` or
                       ``complete_customs``
         comment: str (optional) — transition comment
+    Headers:
+        Prefer: respond-async (optional) — queue a ``to_status`` transition
+            as a background job (services/job_service.py) and return 202
+            ``{job_id, status, status_url}``; poll GET /api/jobs/{job_id}.
+            Use for → approved, where the customs freeze can take minutes.
     Returns:
         success: bool
         from_status: str — status before the transition (on success)
@@ -1110,7 +1120,25 @@ async def transition_workflow(
     else:
         if not to_status:
             return error_response("VALIDATION_ERROR", "to_status is required", status_code=400)
-        result = transition_quote_status(
+        if wants_async(request):
+            job = job_service.enqueue(
+                "quote_transition",
+                {
+                    "quote_id": quote_id,
+                    "to_status": to_status,
+                    "actor_id": user_id,
+                    "actor_roles": user_roles,
+                    "comment": comment,
+                },
+                organization_id=org_id,
+                created_by=user_id,
+                dedupe_key=f"quote_transition:{quote_id}",
+            )
+            return accepted_response(job)
+        # Off the event loop: → APPROVED runs the customs freeze, which can
+        # take minutes and would otherwise stall every request on this worker.
+        result = await asyncio.to_thread(
+            transition_quote_status,
             quote_id=quote_id,
             to_status=to_status,
             actor_id=user_id,
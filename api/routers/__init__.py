@@ -7,6 +7,7 @@ their path decorators — the mount in main.py provides it.
 
 from api.routers import (  # re-export
     admin,
+    changes,
     chat,
     cost_analysis,
     cron,
@@ -17,17 +18,20 @@ from api.routers import (  # re-export
     geo,
     integrations,
     invoices,
+    jobs,
     kp,
     logistics,
     notes,
     plan_fact,
     public,
     quotes,
+    search,
     workspace,
 )
 
 __all__ = [
     "admin",
+    "changes",
     "chat",
     "cost_analysis",
     "cron",
@@ -38,11 +42,13 @@ __all__ = [
     "geo",
     "integrations",
     "invoices",
+    "jobs",
     "kp",
     "logistics",
     "notes",
     "plan_fact",
     "public",
     "quotes",
+    "search",
     "workspace",
 ]
@@ -0,0 +1,19 @@
+"""Change feed /api/changes/* endpoints.
+
+Thin wrapper over api.changes handlers. Mounted with prefix="/changes".
+See api/changes.py for business logic + docstrings.
+"""
+
+from fastapi import APIRouter
+from starlette.requests import Request
+from starlette.responses import Response
+
+from api.changes import stream_changes as _stream_changes
+
+router = APIRouter(tags=["changes"])
+
+
+@router.get("/stream")
+async def get_stream(request: Request) -> Response:
+    """Server-sent change events (quote status, brand substatus, comments)."""
+    return await _stream_changes(request)
@@ -9,7 +9,10 @@ from starlette.requests import Request
 from starlette.responses import JSONResponse
 
 from api.cron import (
+    cron_backfill_exchange_rates as _cron_backfill_exchange_rates,
     cron_check_overdue as _cron_check_overdue,
+    cron_purge_change_events as _cron_purge_change_events,
+    cron_purge_render_cache as _cron_purge_render_cache,
     cron_refresh_exchange_rates as _cron_refresh_exchange_rates,
     cron_revalidate_rates as _cron_revalidate_rates,
     cron_sla_check as _cron_sla_check,
@@ -65,3 +68,32 @@ async def post_refresh_exchange_rates(request: Request) -> JSONResponse:
     Restores the feed the decommissioned lisa backend used to maintain.
     """
     return await _cron_refresh_exchange_rates(request)
+
+
+@router.post("/backfill-exchange-rates")
+async def post_backfill_exchange_rates(request: Request) -> JSONResponse:
+    """Backfill CBR FX rate history for ``?from=YYYY-MM-DD&to=YYYY-MM-DD``.
+
+    Run once after deploy (and after any feed outage) with X-Cron-Secret.
+    Fetches each supported currency's whole range in one CBR request and
+    stores the days missing from kvota.exchange_rates. Re-runnable.
+    """
+    return await _cron_backfill_exchange_rates(request)
+
+
+@router.post("/purge-render-cache")
+async def post_purge_render_cache(request: Request) -> JSONResponse:
+    """Drop render-cache entries of outdated templates or unused for 30 days.
+
+    Called on a schedule (e.g. nightly) with X-Cron-Secret. Re-runnable.
+    """
+    return await _cron_purge_render_cache(request)
+
+
+@router.post("/purge-change-events")
+async def post_purge_change_events(request: Request) -> JSONResponse:
+    """Drop change feed events older than 24 hours.
+
+    Called on a schedule (e.g. hourly) with X-Cron-Secret. Re-runnable.
+    """
+    return await _cron_purge_change_events(request)
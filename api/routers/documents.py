@@ -14,11 +14,18 @@ from starlette.responses import JSONResponse, Response
 from api.documents import (
     delete_document_api as _delete_document,
     download_document as _download_document,
+    download_documents_zip as _download_documents_zip,
 )
 
 router = APIRouter(tags=["documents"])
 
 
+@router.get("/bundle")
+async def get_bundle(request: Request) -> Response:
+    """Stream all documents of a quote (?quote_id=) or deal (?deal_id=) as a ZIP."""
+    return await _download_documents_zip(request)
+
+
 @router.get("/{document_id}/download")
 async def get_download(request: Request, document_id: str) -> Response:
     """Issue 302 redirect to the signed storage URL."""
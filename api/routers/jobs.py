@@ -0,0 +1,19 @@
+"""Background job /api/jobs/* endpoints.
+
+Thin wrapper over api.jobs handlers. Mounted with prefix="/jobs".
+See api/jobs.py for business logic + docstrings.
+"""
+
+from fastapi import APIRouter
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from api.jobs import get_job_status as _get_job_status
+
+router = APIRouter(tags=["jobs"])
+
+
+@router.get("/{job_id}")
+async def get_job(request: Request, job_id: str) -> JSONResponse:
+    """Poll a background job queued with ``Prefer: respond-async``."""
+    return await _get_job_status(request, job_id)
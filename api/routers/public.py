@@ -3,15 +3,16 @@
 Currently hosts:
 - GET /api/health    — liveness probe for Docker/Caddy/monitoring.
 - GET /api/changelog — release notes (public, non-sensitive).
+- GET /api/metrics   — Prometheus scrape target; X-Cron-Secret instead of JWT.
 
-Both are listed in `api.auth.PUBLIC_API_PATHS` so the JWT middleware passes them
+All are listed in `api.auth.PUBLIC_API_PATHS` so the JWT middleware passes them
 through without auth. Path convention: router paths do NOT include /api/ — the
 mount in main.py adds it.
 """
 
 from fastapi import APIRouter
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
 router = APIRouter(tags=["public"])
 
@@ -22,6 +23,23 @@ async def health(request: Request) -> JSONResponse:
     return JSONResponse({"success": True, "status": "ok"})
 
 
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request) -> Response:
+    """Process metrics in Prometheus text format (services/metrics.py).
+
+    Path: GET /api/metrics
+    Auth: X-Cron-Secret header (same secret as /api/cron/*) — the output
+    names routes, caches and quota balances, so it is not public.
+    """
+    from api.cron import _validate_cron_secret
+    from services import metrics
+
+    err = _validate_cron_secret(request)
+    if err:
+        return err
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @router.get("/changelog")
 async def get_changelog(request: Request) -> JSONResponse:
     """Return changelog entries as JSON.
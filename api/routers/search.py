@@ -0,0 +1,19 @@
+"""Global search /api/search endpoint.
+
+Thin wrapper over api.search handlers. Mounted with prefix="/search".
+See api/search.py for business logic + docstrings.
+"""
+
+from fastapi import APIRouter
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from api.search import global_search as _global_search
+
+router = APIRouter(tags=["search"])
+
+
+@router.get("")
+async def get_search(request: Request) -> JSONResponse:
+    """Ranked search across quotes, customers, suppliers and locations."""
+    return await _global_search(request)
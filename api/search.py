@@ -0,0 +1,103 @@
+"""Global search /api/search endpoint.
+
+Handler module (not router). Registered via thin wrapper in
+api/routers/search.py. One ranked, indexed query across quotes, customers,
+suppliers and locations (services/search_service.py, migration 346) for
+search-as-you-type.
+
+Auth: dual — JWT (Next.js) via ApiAuthMiddleware (request.state.api_user),
+or legacy session (FastHTML). Results are scoped to the caller's
+organization and to the records their roles let them open
+(search_service.resolve_scope).
+"""
+
+from __future__ import annotations
+
+import logging
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from api.lib.errors import error_response, success_response
+from services import search_service
+from services.database import get_supabase
+from services.role_service import get_user_role_codes
+
+logger = logging.getLogger(__name__)
+
+
+def _resolve_org(request: Request) -> tuple[str | None, str | None]:
+    """(user_id, org_id) from JWT or legacy session; (None, None) if anonymous."""
+    api_user = getattr(request.state, "api_user", None)
+    if api_user:
+        user_id = str(api_user.id)
+        om = (
+            get_supabase()
+            .table("organization_members")
+            .select("organization_id")
+            .eq("user_id", user_id)
+            .limit(1)
+            .execute()
+        )
+        return user_id, (om.data[0]["organization_id"] if om.data else None)
+
+    try:
+        session = request.session
+    except (AssertionError, AttributeError):
+        return None, None
+    user = session.get("user") if session else None
+    if not user:
+        return None, None
+    return user.get("id"), user.get("org_id")
+
+
+async def global_search(request: Request) -> JSONResponse:
+    """Search quotes, customers, suppliers and locations at once.
+
+    Path: GET /api/search
+    Params:
+        q: str (required) — at least 2 characters
+        kinds: str (optional) — comma-separated subset of
+               quote,customer,supplier,location (default: all)
+        limit: int (optional) — max hits per kind, 1..25 (default 8)
+    Returns:
+        data: list of {kind, id, title, subtitle}, grouped by kind, best
+              match first (exact → prefix → substring, then similarity)
+    Errors:
+        400 — q shorter than 2 characters, or unknown kind
+        401 — no auth
+        403 — no organization
+    Roles: any authenticated user with an organization. Sales-only users
+        find only their assigned customers and those customers' quotes;
+        suppliers only for procurement roles, admin and top_manager
+        (procurement-only: assigned suppliers).
+    """
+    user_id, org_id = _resolve_org(request)
+    if not user_id:
+        return error_response("UNAUTHORIZED", "Unauthorized", status_code=401)
+    if not org_id:
+        return error_response("FORBIDDEN", "No organization", status_code=403)
+
+    q = request.query_params.get("q", "").strip()
+    if len(q) < search_service.MIN_QUERY_LENGTH:
+        return error_response(
+            "VALIDATION_ERROR",
+            f"Запрос должен содержать не менее {search_service.MIN_QUERY_LENGTH} символов",
+        )
+
+    kinds = None
+    raw_kinds = request.query_params.get("kinds")
+    if raw_kinds:
+        kinds = [k.strip() for k in raw_kinds.split(",") if k.strip()]
+        unknown = [k for k in kinds if k not in search_service.SEARCH_KINDS]
+        if unknown:
+            return error_response("VALIDATION_ERROR", f"Unknown kinds: {', '.join(unknown)}")
+
+    try:
+        limit = int(request.query_params.get("limit", search_service.DEFAULT_LIMIT_PER_KIND))
+    except ValueError:
+        limit = search_service.DEFAULT_LIMIT_PER_KIND
+
+    scope = search_service.resolve_scope(user_id, org_id, get_user_role_codes(user_id, org_id))
+    hits = search_service.global_search(org_id, q, kinds=kinds, limit=limit, scope=scope)
+    return success_response([h.to_dict() for h in hits])
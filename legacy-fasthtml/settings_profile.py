@@ -12,7 +12,7 @@ Contents:
   - GET    /profile                                         — own profile view + edit form
   - POST   /profile                                         — save own profile
   - POST   /profile/{user_id}                               — admin save other user's profile
-  - GET    /profile/{user_id}                               — admin/self profile view with tabs (general/specifications/customers)
+  - GET    /profile/{user_id}                               — admin/self profile view with tabs (general/specifications/customers, paged by ?page=)
   - GET    /profile/{user_id}/edit-field/{field_name}       — inline-edit HTMX fragment
   - POST   /profile/{user_id}/update-field/{field_name}     — inline-edit save
   - GET    /profile/{user_id}/cancel-edit/{field_name}      — inline-edit cancel
@@ -628,7 +628,7 @@ def post(session, user_id: str, full_name: str, phone: str = "", date_of_birth:
 # ============================================================================
 
 # @rt("/profile/{user_id}")  # decorator removed; file is archived and not mounted
-def get(user_id: str, session, tab: str = "general"):
+def get(user_id: str, session, tab: str = "general", page: int = 1):
     """User profile view page with statistics, specifications, and customers."""
     redirect = require_login(session)
     if redirect:
@@ -652,7 +652,8 @@ def get(user_id: str, session, tab: str = "general"):
         get_user_profile,
         get_user_statistics,
         get_user_specifications,
-        get_user_customers
+        get_user_customers_page,
+        USER_CUSTOMERS_PAGE_SIZE,
     )
 
     # Get user profile
@@ -861,8 +862,14 @@ def get(user_id: str, session, tab: str = "general"):
         )
 
     elif tab == "customers":
-        # Get customers
-        customers = get_user_customers(user_id, org_id)
+        # Get one page of customers and the size of the whole portfolio
+        page = max(page, 1)
+        customers, total_customers = get_user_customers_page(
+            user_id, org_id,
+            limit=USER_CUSTOMERS_PAGE_SIZE,
+            offset=(page - 1) * USER_CUSTOMERS_PAGE_SIZE,
+        )
+        total_pages = max(1, -(-total_customers // USER_CUSTOMERS_PAGE_SIZE))
 
         # Build customers table
         customer_rows = []
@@ -897,8 +904,17 @@ def get(user_id: str, session, tab: str = "general"):
                 )
             )
 
+        pagination = Div(
+            btn_link("Назад", href=f"/profile/{user_id}?tab=customers&page={page - 1}",
+                     variant="secondary", icon_name="arrow-left") if page > 1 else "",
+            Span(f"Страница {page} из {total_pages}", style="color: #666;"),
+            btn_link("Далее", href=f"/profile/{user_id}?tab=customers&page={page + 1}",
+                     variant="secondary", icon_name="arrow-right", icon_right=True) if page < total_pages else "",
+            style="display: flex; gap: 1rem; align-items: center; justify-content: center; margin-top: 1rem;"
+        ) if total_pages > 1 else ""
+
         tab_content = Div(
-            H3(f"Клиенты ({len(customers)})", style="margin-bottom: 1rem;"),
+            H3(f"Клиенты ({total_customers})", style="margin-bottom: 1rem;"),
             Div(
                 Table(
                     Thead(
@@ -921,6 +937,7 @@ def get(user_id: str, session, tab: str = "general"):
             ) if customers else Div(
                 P("Нет клиентов", style="text-align: center; color: #999; padding: 2rem;")
             ),
+            pagination,
             id="tab-content"
         )
 
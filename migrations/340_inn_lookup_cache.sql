@@ -0,0 +1,36 @@
+-- Migration 340: inn_lookup_cache — durable cache of DaData findById/party answers.
+--
+-- Every spec / invoice / contract export used to call DaData for each INN of
+-- seller, customer and organization (sync, 10 s timeout), and the INN card in
+-- the customer form did the same. Company data changes rarely, so answers are
+-- kept here and shared by all workers (services/inn_cache.py keeps an
+-- in-memory LRU in front of this table).
+--
+--   found = TRUE   → company holds the normalized DaData payload
+--                    (dadata_service.normalize_dadata_result shape)
+--   found = FALSE  → negative entry: DaData has no such INN; expires sooner
+--
+-- Expiry is decided by the service from fetched_at (positive / negative TTL),
+-- so changing TTLs needs no migration. Transport errors are never stored.
+--
+-- Not org-scoped: INN → legal entity is public registry data.
+-- Idempotent: CREATE TABLE IF NOT EXISTS, CREATE INDEX IF NOT EXISTS.
+
+SET search_path TO kvota;
+
+CREATE TABLE IF NOT EXISTS kvota.inn_lookup_cache (
+    inn         VARCHAR(12)  PRIMARY KEY,
+    found       BOOLEAN      NOT NULL,
+    company     JSONB,
+    fetched_at  TIMESTAMPTZ  NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_inn_lookup_cache_fetched_at
+    ON kvota.inn_lookup_cache(fetched_at);
+
+-- Service-role only (backend); no policies for authenticated users.
+ALTER TABLE kvota.inn_lookup_cache ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE kvota.inn_lookup_cache IS
+    'DaData INN lookup cache shared by exports and the INN card. '
+    'found=false rows are negative entries (INN unknown to DaData).';
@@ -0,0 +1,139 @@
+-- Migration 341: get_export_bundle — everything a customer document needs,
+-- in ONE round trip.
+--
+-- fetch_export_data (spec/invoice PDF, validation XLSX),
+-- fetch_specification_data (spec PDF from specifications) and
+-- fetch_contract_spec_data (contract spec PDF/DOCX) each issued 8–12
+-- sequential PostgREST reads, plus one quote_calculation_results read PER ITEM
+-- in two of them. This function returns the same data as a single JSONB
+-- document; services/export_loader.py is the only caller.
+--
+-- Call with either p_quote_id (quote exports) or p_spec_id (specification
+-- exports); both are scoped to p_org_id. Returns NULL when the quote / spec
+-- does not exist in that org.
+--
+-- Shape (keys are always present; missing rows are NULL / []):
+--   quote, specification (+ customer_contracts{id, contract_number,
+--   contract_date}), spec_position (1-based among the contract's specs by
+--   created_at), customer, organization, seller_company, signatory{name,
+--   position}, bank_accounts[] (active, default first), quote_items[] (by
+--   position), coverage[] ({invoice_item_id, quote_item_id, ratio,
+--   invoice_items{...}} — same shape as the PostgREST embed used by
+--   composition_service), calc_results[] ({quote_item_id, phase_results}),
+--   variables, summary.
+--
+-- Date: 2026-10-18
+
+CREATE OR REPLACE FUNCTION kvota.get_export_bundle(
+    p_org_id   UUID,
+    p_quote_id UUID DEFAULT NULL,
+    p_spec_id  UUID DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql STABLE AS $$
+DECLARE
+    v_spec          kvota.specifications%ROWTYPE;
+    v_quote         kvota.quotes%ROWTYPE;
+    v_spec_json     JSONB;
+    v_spec_position INT := 1;
+BEGIN
+    IF p_spec_id IS NOT NULL THEN
+        SELECT * INTO v_spec
+          FROM kvota.specifications
+         WHERE id = p_spec_id AND organization_id = p_org_id;
+        IF NOT FOUND THEN
+            RETURN NULL;
+        END IF;
+
+        SELECT * INTO v_quote FROM kvota.quotes WHERE id = v_spec.quote_id;
+
+        v_spec_json := to_jsonb(v_spec) || jsonb_build_object(
+            'customer_contracts',
+            (SELECT jsonb_build_object(
+                        'id', cc.id,
+                        'contract_number', cc.contract_number,
+                        'contract_date', cc.contract_date)
+               FROM kvota.customer_contracts cc
+              WHERE cc.id = v_spec.contract_id)
+        );
+
+        IF v_spec.contract_id IS NOT NULL THEN
+            SELECT s.pos INTO v_spec_position
+              FROM (SELECT id, row_number() OVER (ORDER BY created_at) AS pos
+                      FROM kvota.specifications
+                     WHERE contract_id = v_spec.contract_id) s
+             WHERE s.id = p_spec_id;
+        END IF;
+    ELSE
+        SELECT * INTO v_quote
+          FROM kvota.quotes
+         WHERE id = p_quote_id AND organization_id = p_org_id;
+        IF NOT FOUND THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'quote',
+            CASE WHEN v_quote.id IS NULL THEN NULL ELSE to_jsonb(v_quote) END,
+        'specification', v_spec_json,
+        'spec_position', COALESCE(v_spec_position, 1),
+        'customer',
+            (SELECT to_jsonb(c) FROM kvota.customers c
+              WHERE c.id = v_quote.customer_id),
+        'organization',
+            (SELECT to_jsonb(o) FROM kvota.organizations o
+              WHERE o.id = p_org_id),
+        'seller_company',
+            (SELECT to_jsonb(sc) FROM kvota.seller_companies sc
+              WHERE sc.id = v_quote.seller_company_id),
+        'signatory',
+            (SELECT jsonb_build_object('name', cc.name, 'position', cc.position)
+               FROM kvota.customer_contacts cc
+              WHERE cc.customer_id = v_quote.customer_id
+                AND cc.is_signatory
+              LIMIT 1),
+        'bank_accounts', COALESCE(
+            (SELECT jsonb_agg(to_jsonb(b) ORDER BY b.is_default DESC, b.currency)
+               FROM kvota.bank_accounts b
+              WHERE b.entity_type = 'seller_company'
+                AND b.entity_id = v_quote.seller_company_id
+                AND b.is_active),
+            '[]'::jsonb),
+        'quote_items', COALESCE(
+            (SELECT jsonb_agg(to_jsonb(qi) ORDER BY qi.position)
+               FROM kvota.quote_items qi
+              WHERE qi.quote_id = v_quote.id),
+            '[]'::jsonb),
+        'coverage', COALESCE(
+            (SELECT jsonb_agg(jsonb_build_object(
+                        'invoice_item_id', cov.invoice_item_id,
+                        'quote_item_id', cov.quote_item_id,
+                        'ratio', cov.ratio,
+                        'invoice_items', to_jsonb(ii)))
+               FROM kvota.invoice_item_coverage cov
+               JOIN kvota.invoice_items ii ON ii.id = cov.invoice_item_id
+               JOIN kvota.quote_items qi ON qi.id = cov.quote_item_id
+              WHERE qi.quote_id = v_quote.id),
+            '[]'::jsonb),
+        'calc_results', COALESCE(
+            (SELECT jsonb_agg(jsonb_build_object(
+                        'quote_item_id', r.quote_item_id,
+                        'phase_results', r.phase_results))
+               FROM kvota.quote_calculation_results r
+               JOIN kvota.quote_items qi ON qi.id = r.quote_item_id
+              WHERE qi.quote_id = v_quote.id),
+            '[]'::jsonb),
+        'variables',
+            (SELECT v.variables FROM kvota.quote_calculation_variables v
+              WHERE v.quote_id = v_quote.id LIMIT 1),
+        'summary',
+            (SELECT to_jsonb(s) FROM kvota.quote_calculation_summaries s
+              WHERE s.quote_id = v_quote.id LIMIT 1)
+    );
+END;
+$$;
+
+COMMENT ON FUNCTION kvota.get_export_bundle(UUID, UUID, UUID) IS
+    'Single-round-trip loader for customer document exports '
+    '(services/export_loader.py).';
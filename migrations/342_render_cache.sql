@@ -0,0 +1,60 @@
+-- Migration 342: render_cache — content-addressed cache of rendered documents.
+--
+-- Specification / invoice / contract PDFs (WeasyPrint), contract and
+-- currency-invoice DOCX (python-docx) and KP PDFs (headless Chromium) were
+-- re-rendered on every download click, even when nothing changed. The bytes
+-- of each render are now stored in the 'kvota-render-cache' storage bucket
+-- and indexed here (services/render_cache.py).
+--
+--   cache_key         sha256 of (kind, template_version, render date for
+--                     dated kinds, normalized document input)
+--   template_version  hash of the renderer's template sources / assets;
+--                     a template change yields new keys, old rows are
+--                     purged by POST /api/cron/purge-render-cache
+--   last_hit_at       bumped on every hit; rows unused for the retention
+--                     window are purged by the same cron
+--
+-- Not org-scoped on purpose: the key is derived from the full document
+-- input (which includes org-scoped ids), and the table is service-role only.
+-- Idempotent: IF NOT EXISTS / ON CONFLICT DO NOTHING.
+
+SET search_path TO kvota;
+
+CREATE TABLE IF NOT EXISTS kvota.render_cache (
+    cache_key         CHAR(64)     PRIMARY KEY,
+    kind              VARCHAR(40)  NOT NULL,
+    template_version  VARCHAR(32)  NOT NULL,
+    storage_path      TEXT         NOT NULL,
+    content_type      VARCHAR(120) NOT NULL,
+    size_bytes        INTEGER      NOT NULL,
+    render_ms         INTEGER,
+    created_at        TIMESTAMPTZ  NOT NULL DEFAULT now(),
+    last_hit_at       TIMESTAMPTZ  NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_render_cache_kind_template
+    ON kvota.render_cache(kind, template_version);
+
+CREATE INDEX IF NOT EXISTS idx_render_cache_last_hit_at
+    ON kvota.render_cache(last_hit_at);
+
+-- Service-role only (backend); no policies for authenticated users.
+ALTER TABLE kvota.render_cache ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE kvota.render_cache IS
+    'Index of rendered PDF/DOCX exports stored in the kvota-render-cache '
+    'bucket, keyed by a hash of the normalized input + template version.';
+
+-- Private bucket: objects are only read back by the backend (service role).
+INSERT INTO storage.buckets (id, name, public, file_size_limit, allowed_mime_types)
+VALUES (
+    'kvota-render-cache',
+    'kvota-render-cache',
+    false,
+    52428800, -- 50 MB
+    ARRAY[
+        'application/pdf',
+        'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+    ]
+)
+ON CONFLICT (id) DO NOTHING;
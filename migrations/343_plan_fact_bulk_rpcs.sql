@@ -0,0 +1,129 @@
+-- Migration 343: set-based plan-fact writes — bulk item insert and bulk
+-- payment registration, each in ONE transaction.
+--
+-- bulk_create_plan_fact_items issued one INSERT per item and
+-- bulk_register_payments one read + one UPDATE per payment, so generating or
+-- regenerating a deal's plan-fact took O(rows) round trips and an error in the
+-- middle left the deal half-generated (regenerate deleted first, then
+-- inserted item by item). services/plan_fact_service.py now validates a whole
+-- batch in Python and hands it to these functions.
+--
+-- insert_plan_fact_items(p_deal_id, p_items, p_replace)
+--   p_items: [{category_id, planned_amount, planned_date, planned_currency,
+--              description, created_by}, ...]
+--   Locks the deal row (concurrent generations for one deal serialize),
+--   optionally deletes the deal's existing items, inserts all rows and returns
+--   them. Any failure rolls back the delete as well.
+--
+-- register_plan_fact_payments(p_payments)
+--   p_payments: [{id, actual_amount, actual_date, actual_currency,
+--                 actual_exchange_rate, payment_document, notes}, ...]
+--   Locks the target items and raises unless every one exists and is still
+--   unpaid, then records all payments in one UPDATE. The variance trigger runs
+--   per row as before. NULL exchange rate / document / notes keep the stored
+--   value (same as record_actual_payment).
+--
+-- Date: 2026-10-18
+
+CREATE OR REPLACE FUNCTION kvota.insert_plan_fact_items(
+    p_deal_id UUID,
+    p_items   JSONB,
+    p_replace BOOLEAN DEFAULT FALSE
+)
+RETURNS SETOF kvota.plan_fact_items
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM 1 FROM kvota.deals WHERE id = p_deal_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Deal not found: %', p_deal_id USING ERRCODE = 'P0002';
+    END IF;
+
+    IF p_replace THEN
+        DELETE FROM kvota.plan_fact_items WHERE deal_id = p_deal_id;
+    END IF;
+
+    RETURN QUERY
+    WITH input AS (
+        SELECT e.item, e.ord
+          FROM jsonb_array_elements(COALESCE(p_items, '[]'::jsonb)) WITH ORDINALITY AS e(item, ord)
+    ),
+    inserted AS (
+        INSERT INTO kvota.plan_fact_items (
+            deal_id, category_id, planned_amount, planned_currency,
+            planned_date, description, created_by
+        )
+        SELECT p_deal_id,
+               (item->>'category_id')::UUID,
+               (item->>'planned_amount')::NUMERIC,
+               COALESCE(item->>'planned_currency', 'RUB'),
+               (item->>'planned_date')::DATE,
+               item->>'description',
+               (item->>'created_by')::UUID
+          FROM input
+         ORDER BY ord
+        RETURNING *
+    )
+    SELECT * FROM inserted;
+END;
+$$;
+
+COMMENT ON FUNCTION kvota.insert_plan_fact_items(UUID, JSONB, BOOLEAN) IS
+    'Atomically (optionally replace and) insert a deal''s plan-fact items. '
+    'Caller: services/plan_fact_service.py.';
+
+
+CREATE OR REPLACE FUNCTION kvota.register_plan_fact_payments(p_payments JSONB)
+RETURNS SETOF kvota.plan_fact_items
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_ids   UUID[];
+    v_ready INT;
+BEGIN
+    SELECT array_agg(DISTINCT (p->>'id')::UUID) INTO v_ids
+      FROM jsonb_array_elements(COALESCE(p_payments, '[]'::jsonb)) AS p;
+
+    IF v_ids IS NULL THEN
+        RETURN;
+    END IF;
+    IF cardinality(v_ids) <> jsonb_array_length(p_payments) THEN
+        RAISE EXCEPTION 'Duplicate plan-fact item in payment batch';
+    END IF;
+
+    PERFORM 1 FROM kvota.plan_fact_items WHERE id = ANY(v_ids) FOR UPDATE;
+
+    SELECT count(*) INTO v_ready
+      FROM kvota.plan_fact_items
+     WHERE id = ANY(v_ids)
+       AND (actual_amount IS NULL OR actual_date IS NULL);  -- PlanFactItem.is_paid
+
+    IF v_ready <> cardinality(v_ids) THEN
+        RAISE EXCEPTION '% of % plan-fact items are missing or already paid',
+            cardinality(v_ids) - v_ready, cardinality(v_ids);
+    END IF;
+
+    RETURN QUERY
+    UPDATE kvota.plan_fact_items i
+       SET actual_amount        = p.actual_amount,
+           actual_date          = p.actual_date,
+           actual_currency      = COALESCE(p.actual_currency, 'RUB'),
+           actual_exchange_rate = COALESCE(p.actual_exchange_rate, i.actual_exchange_rate),
+           payment_document     = COALESCE(p.payment_document, i.payment_document),
+           notes                = COALESCE(p.notes, i.notes)
+      FROM jsonb_to_recordset(p_payments) AS p(
+               id                   UUID,
+               actual_amount        NUMERIC,
+               actual_date          DATE,
+               actual_currency      VARCHAR(3),
+               actual_exchange_rate NUMERIC,
+               payment_document     VARCHAR(100),
+               notes                TEXT
+           )
+     WHERE i.id = p.id
+    RETURNING i.*;
+END;
+$$;
+
+COMMENT ON FUNCTION kvota.register_plan_fact_payments(JSONB) IS
+    'Atomically record actual payments for unpaid plan-fact items; raises '
+    '(nothing written) if any item is missing or already paid. '
+    'Caller: services/plan_fact_service.py.';
@@ -0,0 +1,149 @@
+-- Migration 344: per-quote content version for conditional GETs (ETag / 304).
+--
+-- The Next.js quote page polls cost-analysis, calc-step-info, composition and
+-- status-history; each poll recomputed and re-serialized the full payload.
+-- api/lib/conditional.py derives an ETag from a single cheap version number
+-- per quote and answers 304 Not Modified when the client already has it.
+--
+-- quotes.updated_at cannot serve as that version: edits to items, invoices,
+-- coverage, logistics segments, certificates, calculation results and status
+-- history never touch the quotes row. Instead every such write bumps
+-- kvota.quote_content_versions.version for the affected quote (row triggers
+-- below). The counter lives in its own table so the bump does not fire the
+-- triggers / policies on kvota.quotes or contend with quote-row updates.
+--
+-- A bump is taken at most once per quote per transaction (transaction-local
+-- GUC guard), so a 200-item bulk update costs one upsert, not 200.
+--
+-- Date: 2026-10-18
+
+CREATE TABLE IF NOT EXISTS kvota.quote_content_versions (
+    quote_id   UUID PRIMARY KEY REFERENCES kvota.quotes(id) ON DELETE CASCADE,
+    version    BIGINT      NOT NULL DEFAULT 1,
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+COMMENT ON TABLE kvota.quote_content_versions IS
+    'Monotonic per-quote content version, bumped by triggers on the quote and '
+    'its child tables. ETag source for api/lib/conditional.py. Missing row = 0.';
+
+ALTER TABLE kvota.quote_content_versions ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS quote_content_versions_select ON kvota.quote_content_versions;
+CREATE POLICY quote_content_versions_select ON kvota.quote_content_versions
+    FOR SELECT USING (
+        EXISTS (
+            SELECT 1
+              FROM kvota.quotes q
+              JOIN kvota.organization_members om
+                ON om.organization_id = q.organization_id
+             WHERE q.id = quote_content_versions.quote_id
+               AND om.user_id = auth.uid()
+        )
+    );
+
+
+CREATE OR REPLACE FUNCTION kvota.bump_quote_content_version(p_quote_id UUID)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = kvota, public
+AS $$
+DECLARE
+    v_guard TEXT;
+BEGIN
+    IF p_quote_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    v_guard := 'kvota_qcv.q' || replace(p_quote_id::TEXT, '-', '');
+    IF current_setting(v_guard, TRUE) = 'y' THEN
+        RETURN;  -- already bumped in this transaction
+    END IF;
+
+    INSERT INTO kvota.quote_content_versions AS v (quote_id)
+    SELECT p_quote_id
+     WHERE EXISTS (SELECT 1 FROM kvota.quotes WHERE id = p_quote_id)  -- cascade deletes
+    ON CONFLICT (quote_id) DO UPDATE
+       SET version = v.version + 1,
+           changed_at = now();
+
+    PERFORM set_config(v_guard, 'y', TRUE);
+END;
+$$;
+
+
+-- Row trigger. TG_ARGV[0] names the column that leads to the quote:
+--   'id'            — kvota.quotes itself
+--   'quote_id'      — direct child
+--   'invoice_id'    — via kvota.invoices.quote_id
+--   'quote_item_id' — via kvota.quote_items.quote_id
+CREATE OR REPLACE FUNCTION kvota.trg_bump_quote_content_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = kvota, public
+AS $$
+DECLARE
+    v_via  TEXT := TG_ARGV[0];
+    v_rows JSONB[];
+    v_row  JSONB;
+    v_ref  UUID;
+BEGIN
+    v_rows := CASE TG_OP
+        WHEN 'INSERT' THEN ARRAY[to_jsonb(NEW)]
+        WHEN 'DELETE' THEN ARRAY[to_jsonb(OLD)]
+        ELSE ARRAY[to_jsonb(OLD), to_jsonb(NEW)]  -- row may move between quotes
+    END;
+
+    FOREACH v_row IN ARRAY v_rows LOOP
+        v_ref := (v_row->>v_via)::UUID;
+        CONTINUE WHEN v_ref IS NULL;
+        PERFORM kvota.bump_quote_content_version(
+            CASE v_via
+                WHEN 'invoice_id' THEN (SELECT quote_id FROM kvota.invoices WHERE id = v_ref)
+                WHEN 'quote_item_id' THEN (SELECT quote_id FROM kvota.quote_items WHERE id = v_ref)
+                ELSE v_ref
+            END
+        );
+    END LOOP;
+    RETURN NULL;
+END;
+$$;
+
+
+DO $$
+DECLARE
+    t RECORD;
+BEGIN
+    FOR t IN
+        SELECT * FROM (VALUES
+            ('quotes',                      'id'),
+            ('quote_items',                 'quote_id'),
+            ('invoices',                    'quote_id'),
+            ('invoice_items',               'invoice_id'),
+            ('invoice_item_coverage',       'quote_item_id'),
+            ('logistics_route_segments',    'invoice_id'),
+            ('quote_certificates',          'quote_id'),
+            ('quote_calculation_results',   'quote_id'),
+            ('quote_calculation_variables', 'quote_id'),
+            ('quote_calculation_summaries', 'quote_id'),
+            ('status_history',              'quote_id')
+        ) AS x(tbl, via)
+    LOOP
+        EXECUTE format(
+            'DROP TRIGGER IF EXISTS trg_quote_content_version ON kvota.%I', t.tbl
+        );
+        EXECUTE format(
+            'CREATE TRIGGER trg_quote_content_version '
+            'AFTER INSERT OR UPDATE OR DELETE ON kvota.%I '
+            'FOR EACH ROW EXECUTE FUNCTION kvota.trg_bump_quote_content_version(%L)',
+            t.tbl, t.via
+        );
+    END LOOP;
+END;
+$$;
+
+COMMENT ON FUNCTION kvota.trg_bump_quote_content_version() IS
+    'Bumps kvota.quote_content_versions for the quote a written row belongs to. '
+    'Reader: api/lib/conditional.py (ETag / 304 for quote views).';
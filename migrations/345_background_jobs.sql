@@ -0,0 +1,110 @@
+-- Migration 345: durable background jobs.
+--
+-- Long side effects (customs freeze on APPROVED, XLS imports) ran inside the
+-- HTTP request and could hold a uvicorn worker for minutes. They can now be
+-- queued here and run by services/job_service.py — an in-process worker
+-- thread (api.app lifespan) and/or scripts/run_job_worker.py — with
+-- retries, and polled via GET /api/jobs/{id}.
+--
+-- Claiming uses FOR UPDATE SKIP LOCKED, so any number of workers can share
+-- the table. A claimed job holds a lease (locked_at); a job whose worker
+-- died is reclaimed once the lease has expired.
+--
+-- Date: 2026-10-18
+
+CREATE TABLE IF NOT EXISTS kvota.background_jobs (
+    id              UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    organization_id UUID REFERENCES kvota.organizations(id) ON DELETE CASCADE,
+    kind            TEXT        NOT NULL,
+    payload         JSONB       NOT NULL DEFAULT '{}'::jsonb,
+    status          TEXT        NOT NULL DEFAULT 'queued'
+                    CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled')),
+    attempts        INTEGER     NOT NULL DEFAULT 0,
+    max_attempts    INTEGER     NOT NULL DEFAULT 3 CHECK (max_attempts >= 1),
+    run_after       TIMESTAMPTZ NOT NULL DEFAULT now(),
+    locked_by       TEXT,
+    locked_at       TIMESTAMPTZ,
+    result          JSONB,
+    error           TEXT,
+    dedupe_key      TEXT,
+    created_by      UUID REFERENCES auth.users(id) ON DELETE SET NULL,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at     TIMESTAMPTZ
+);
+
+COMMENT ON TABLE kvota.background_jobs IS
+    'Durable job queue for long side effects (customs freeze, XLS import). '
+    'Producer/consumer: services/job_service.py. Status: GET /api/jobs/{id}.';
+
+-- Worker poll: due queued jobs, oldest first.
+CREATE INDEX IF NOT EXISTS idx_background_jobs_due
+    ON kvota.background_jobs (run_after, created_at)
+    WHERE status = 'queued';
+
+-- Lease expiry scan.
+CREATE INDEX IF NOT EXISTS idx_background_jobs_running
+    ON kvota.background_jobs (locked_at)
+    WHERE status = 'running';
+
+-- At most one live job per dedupe key (e.g. one pending transition per quote).
+CREATE UNIQUE INDEX IF NOT EXISTS uq_background_jobs_dedupe_active
+    ON kvota.background_jobs (dedupe_key)
+    WHERE dedupe_key IS NOT NULL AND status IN ('queued', 'running');
+
+ALTER TABLE kvota.background_jobs ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS background_jobs_select ON kvota.background_jobs;
+CREATE POLICY background_jobs_select ON kvota.background_jobs
+    FOR SELECT USING (
+        EXISTS (
+            SELECT 1
+              FROM kvota.organization_members om
+             WHERE om.organization_id = background_jobs.organization_id
+               AND om.user_id = auth.uid()
+        )
+    );
+
+
+-- Claim up to p_limit due jobs for p_worker: queued jobs whose run_after has
+-- passed, plus running jobs whose lease (p_lease_seconds) has expired.
+-- attempts is incremented on claim, so a job that keeps killing its worker
+-- still runs out of attempts.
+CREATE OR REPLACE FUNCTION kvota.claim_background_jobs(
+    p_worker        TEXT,
+    p_limit         INTEGER DEFAULT 1,
+    p_lease_seconds INTEGER DEFAULT 600,
+    p_kinds         TEXT[]  DEFAULT NULL
+)
+RETURNS SETOF kvota.background_jobs
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = kvota, public
+AS $$
+    UPDATE kvota.background_jobs j
+       SET status     = 'running',
+           attempts   = j.attempts + 1,
+           locked_by  = p_worker,
+           locked_at  = now(),
+           updated_at = now()
+     WHERE j.id IN (
+            SELECT c.id
+              FROM kvota.background_jobs c
+             WHERE (
+                    (c.status = 'queued' AND c.run_after <= now())
+                 OR (c.status = 'running'
+                     AND c.locked_at < now() - make_interval(secs => p_lease_seconds))
+                   )
+               AND (p_kinds IS NULL OR c.kind = ANY (p_kinds))
+             ORDER BY c.run_after, c.created_at
+             LIMIT p_limit
+               FOR UPDATE SKIP LOCKED
+           )
+    RETURNING j.*;
+$$;
+
+REVOKE ALL ON FUNCTION kvota.claim_background_jobs(TEXT, INTEGER, INTEGER, TEXT[]) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION kvota.claim_background_jobs(TEXT, INTEGER, INTEGER, TEXT[]) TO service_role;
+
+COMMENT ON FUNCTION kvota.claim_background_jobs(TEXT, INTEGER, INTEGER, TEXT[]) IS
+    'Atomically lease due background jobs (SKIP LOCKED). Caller: services/job_service.py.';
@@ -0,0 +1,160 @@
+-- Migration 346: indexed global search (quotes, customers, suppliers, locations).
+--
+-- Search-as-you-type used a separate unindexed ILIKE scan per entity — and
+-- customers / suppliers a second one for INN / code, locations an RPC
+-- followed by a full-row re-fetch. This migration:
+--
+--   1. adds pg_trgm GIN indexes so '%q%' ILIKE on the searched columns is an
+--      index scan (locations.search_text already has one, migration 024);
+--   2. kvota.global_search() — one ranked, bounded query over all four
+--      entities, served by GET /api/search (services/search_service.py);
+--   3. kvota.search_locations_full() — same filter / order as
+--      search_locations() but returning full rows, so
+--      location_service.search_locations needs one round trip, not two.
+--
+-- Date: 2026-10-18
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_quotes_idn_quote_trgm
+    ON kvota.quotes USING gin (idn_quote gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_customers_name_trgm
+    ON kvota.customers USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_customers_inn_trgm
+    ON kvota.customers USING gin (inn gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_suppliers_name_trgm
+    ON kvota.suppliers USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_suppliers_code_trgm
+    ON kvota.suppliers USING gin (supplier_code gin_trgm_ops);
+
+
+-- Ranked search over every entity kind. Each branch is bounded by p_limit
+-- before the union, so the cost does not grow with table size beyond the
+-- index scan. Rank: exact match (0) < prefix match (1) < substring (2),
+-- then trigram similarity, then title.
+CREATE OR REPLACE FUNCTION kvota.global_search(
+    p_organization_id UUID,
+    p_query           TEXT,
+    p_kinds           TEXT[]  DEFAULT NULL,  -- NULL = all of quote, customer, supplier, location
+    p_limit           INTEGER DEFAULT 8      -- per kind
+)
+RETURNS TABLE (
+    kind     TEXT,
+    id       UUID,
+    title    TEXT,
+    subtitle TEXT,
+    rank     INTEGER,
+    score    REAL
+)
+LANGUAGE sql
+STABLE
+SET search_path = kvota, public
+AS $$
+    WITH q AS (
+        SELECT lower(btrim(p_query)) AS term,
+               '%' || replace(replace(replace(lower(btrim(p_query)),
+                   '\', '\\'), '%', '\%'), '_', '\_') || '%' AS pattern
+    )
+    (
+        SELECT 'quote', x.id, x.idn_quote::TEXT, c.name::TEXT,
+               CASE WHEN lower(x.idn_quote) = q.term THEN 0
+                    WHEN lower(x.idn_quote) LIKE q.term || '%' THEN 1 ELSE 2 END,
+               similarity(x.idn_quote, q.term)
+          FROM kvota.quotes x
+          CROSS JOIN q
+          LEFT JOIN kvota.customers c ON c.id = x.customer_id
+         WHERE (p_kinds IS NULL OR 'quote' = ANY (p_kinds))
+           AND x.organization_id = p_organization_id
+           AND x.deleted_at IS NULL
+           AND x.idn_quote ILIKE q.pattern
+         ORDER BY 5, 6 DESC, 3
+         LIMIT p_limit
+    )
+    UNION ALL
+    (
+        SELECT 'customer', x.id, x.name::TEXT, x.inn::TEXT,
+               CASE WHEN lower(x.name) = q.term OR x.inn = q.term THEN 0
+                    WHEN lower(x.name) LIKE q.term || '%' OR x.inn LIKE q.term || '%' THEN 1 ELSE 2 END,
+               greatest(similarity(x.name, q.term), similarity(coalesce(x.inn, ''), q.term))
+          FROM kvota.customers x
+          CROSS JOIN q
+         WHERE (p_kinds IS NULL OR 'customer' = ANY (p_kinds))
+           AND x.organization_id = p_organization_id
+           AND (x.name ILIKE q.pattern OR x.inn ILIKE q.pattern)
+         ORDER BY 5, 6 DESC, 3
+         LIMIT p_limit
+    )
+    UNION ALL
+    (
+        SELECT 'supplier', x.id, x.name::TEXT, x.supplier_code::TEXT,
+               CASE WHEN lower(x.name) = q.term OR lower(x.supplier_code) = q.term THEN 0
+                    WHEN lower(x.name) LIKE q.term || '%' THEN 1 ELSE 2 END,
+               similarity(x.name, q.term)
+          FROM kvota.suppliers x
+          CROSS JOIN q
+         WHERE (p_kinds IS NULL OR 'supplier' = ANY (p_kinds))
+           AND x.organization_id = p_organization_id
+           AND x.is_active = true
+           AND (x.name ILIKE q.pattern OR x.supplier_code ILIKE q.pattern)
+         ORDER BY 5, 6 DESC, 3
+         LIMIT p_limit
+    )
+    UNION ALL
+    (
+        SELECT 'location', x.id, x.display_name::TEXT, x.location_type::TEXT,
+               CASE WHEN lower(x.code) = q.term THEN 0
+                    WHEN x.search_text LIKE q.term || '%' THEN 1 ELSE 2 END,
+               similarity(x.search_text, q.term)
+          FROM kvota.locations x
+          CROSS JOIN q
+         WHERE (p_kinds IS NULL OR 'location' = ANY (p_kinds))
+           AND x.organization_id = p_organization_id
+           AND x.is_active = true
+           AND x.search_text LIKE q.pattern
+         ORDER BY 5, 6 DESC, 3
+         LIMIT p_limit
+    );
+$$;
+
+COMMENT ON FUNCTION kvota.global_search(UUID, TEXT, TEXT[], INTEGER) IS
+    'Ranked trigram-indexed search over quotes, customers, suppliers and '
+    'locations of one organization. Caller: services/search_service.py.';
+
+
+-- search_locations() returns a column subset, so callers re-fetched the full
+-- rows by id. Same filter and order, full rows, one round trip.
+CREATE OR REPLACE FUNCTION kvota.search_locations_full(
+    p_organization_id UUID,
+    p_query           TEXT,
+    p_limit           INTEGER DEFAULT 20,
+    p_hub_only        BOOLEAN DEFAULT false,
+    p_customs_only    BOOLEAN DEFAULT false,
+    p_location_type   VARCHAR DEFAULT NULL
+)
+RETURNS SETOF kvota.locations
+LANGUAGE sql
+STABLE
+SET search_path = kvota, public
+AS $$
+    SELECT l.*
+      FROM kvota.locations l
+     WHERE l.organization_id = p_organization_id
+       AND l.is_active = true
+       AND (p_hub_only = false OR l.location_type = 'hub')
+       AND (p_customs_only = false OR l.location_type = 'customs')
+       AND (p_location_type IS NULL OR l.location_type = p_location_type)
+       AND (
+            p_query IS NULL
+            OR p_query = ''
+            OR l.search_text ILIKE '%' || LOWER(p_query) || '%'
+       )
+     ORDER BY
+        CASE WHEN l.code IS NOT NULL AND UPPER(l.code) = UPPER(p_query) THEN 0 ELSE 1 END,
+        CASE WHEN l.location_type IN ('hub', 'own_warehouse') THEN 0 ELSE 1 END,
+        l.display_name
+     LIMIT p_limit;
+$$;
+
+COMMENT ON FUNCTION kvota.search_locations_full IS
+    'search_locations() returning full kvota.locations rows. '
+    'Caller: services/location_service.search_locations.';
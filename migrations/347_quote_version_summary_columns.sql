@@ -0,0 +1,76 @@
+-- Migration 347: version summary columns on kvota.quote_versions.
+--
+-- list_quote_versions (version dropdown, calculate's "any versions yet?"
+-- check) needs only the total and change reason of each version, but both
+-- live inside input_variables — next to the products / results / customs
+-- snapshots — so listing a quote with dozens of versions and hundreds of
+-- items pulled megabytes of JSONB.
+--
+-- The summary now also lives in plain columns, kept in sync by a BEFORE
+-- trigger from input_variables. Every writer (quote_version_service,
+-- the customs freeze / re-freeze merge, approval margin edits) keeps
+-- working unchanged, and the listing selects only the columns.
+--
+-- The snapshot itself stays in input_variables: rate_resolver, the freeze
+-- merge, specification and approval flows read its keys in place. It is
+-- TOASTed (stored compressed, out of line) already; new values use lz4,
+-- which is faster to (de)compress than the pglz default.
+--
+-- Date: 2026-10-18
+
+ALTER TABLE kvota.quote_versions
+    ADD COLUMN IF NOT EXISTS change_reason        TEXT,
+    ADD COLUMN IF NOT EXISTS total_quote_currency NUMERIC,
+    ADD COLUMN IF NOT EXISTS totals               JSONB,
+    ADD COLUMN IF NOT EXISTS products_count       INTEGER;
+
+COMMENT ON COLUMN kvota.quote_versions.change_reason IS
+    'Mirror of input_variables->>change_reason (trigger trg_quote_versions_summary).';
+COMMENT ON COLUMN kvota.quote_versions.total_quote_currency IS
+    'Mirror of input_variables->totals->>total_with_vat (trigger trg_quote_versions_summary).';
+COMMENT ON COLUMN kvota.quote_versions.totals IS
+    'Mirror of input_variables->totals (trigger trg_quote_versions_summary).';
+COMMENT ON COLUMN kvota.quote_versions.products_count IS
+    'jsonb_array_length(input_variables->products) (trigger trg_quote_versions_summary).';
+
+
+CREATE OR REPLACE FUNCTION kvota.trg_quote_versions_summary()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_iv JSONB := NEW.input_variables;
+BEGIN
+    NEW.change_reason := v_iv->>'change_reason';
+    NEW.totals := CASE WHEN jsonb_typeof(v_iv->'totals') = 'object' THEN v_iv->'totals' END;
+    NEW.total_quote_currency := CASE
+        WHEN jsonb_typeof(v_iv->'totals'->'total_with_vat') = 'number'
+            THEN (v_iv->'totals'->>'total_with_vat')::NUMERIC
+    END;
+    NEW.products_count := CASE
+        WHEN jsonb_typeof(v_iv->'products') = 'array'
+            THEN jsonb_array_length(v_iv->'products')
+    END;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_quote_versions_summary ON kvota.quote_versions;
+CREATE TRIGGER trg_quote_versions_summary
+    BEFORE INSERT OR UPDATE OF input_variables ON kvota.quote_versions
+    FOR EACH ROW EXECUTE FUNCTION kvota.trg_quote_versions_summary();
+
+
+-- Backfill existing rows (touching input_variables fires the trigger).
+UPDATE kvota.quote_versions
+   SET input_variables = input_variables
+ WHERE input_variables IS NOT NULL
+   AND change_reason IS NULL
+   AND totals IS NULL;
+
+
+ALTER TABLE kvota.quote_versions
+    ALTER COLUMN input_variables SET COMPRESSION lz4;
+
+CREATE INDEX IF NOT EXISTS idx_quote_versions_quote_version
+    ON kvota.quote_versions (quote_id, version DESC);
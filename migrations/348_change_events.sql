@@ -0,0 +1,148 @@
+-- Migration 348: change_events — org-scoped change feed.
+--
+-- Open views (procurement kanban, quote page, comments panel) refetched
+-- their whole multi-table payload after every mutation and showed other
+-- users' changes only on reload. Row-level triggers now append a small
+-- event for each change those views care about, and GET /api/changes/stream
+-- (services/change_feed_service.py) pushes them to subscribed clients as
+-- server-sent events, so views patch themselves in place.
+--
+-- Triggers rather than application calls: quote status is written by
+-- workflow_service, RPCs and the frontend alike, and every writer is
+-- covered without changes. The API reaches Postgres only through PostgREST
+-- (no LISTEN), so one poller per process reads new rows by id.
+--
+-- Events are short-lived (resume after a dropped connection);
+-- POST /api/cron/purge-change-events drops old ones.
+--
+-- Date: 2026-10-18
+
+CREATE TABLE IF NOT EXISTS kvota.change_events (
+    id              BIGSERIAL PRIMARY KEY,
+    organization_id UUID        NOT NULL REFERENCES kvota.organizations(id) ON DELETE CASCADE,
+    kind            TEXT        NOT NULL
+                    CHECK (kind IN ('quote_status', 'brand_substatus', 'comment')),
+    quote_id        UUID,
+    actor_id        UUID,
+    payload         JSONB       NOT NULL DEFAULT '{}'::jsonb,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+COMMENT ON TABLE kvota.change_events IS
+    'Append-only change feed written by triggers (quotes.workflow_status, '
+    'quote_brand_substates, quote_comments). Reader: services/change_feed_service.py.';
+
+-- Poller: id > cursor. Resume: organization_id + id > Last-Event-ID.
+CREATE INDEX IF NOT EXISTS idx_change_events_org_id
+    ON kvota.change_events (organization_id, id);
+
+-- Retention purge.
+CREATE INDEX IF NOT EXISTS idx_change_events_created_at
+    ON kvota.change_events (created_at);
+
+ALTER TABLE kvota.change_events ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS change_events_select ON kvota.change_events;
+CREATE POLICY change_events_select ON kvota.change_events
+    FOR SELECT USING (
+        EXISTS (
+            SELECT 1
+              FROM kvota.organization_members om
+             WHERE om.organization_id = change_events.organization_id
+               AND om.user_id = auth.uid()
+        )
+    );
+
+
+-- =============================================================================
+-- Quote workflow status transitions
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION kvota.trg_change_events_quote_status()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = kvota, public
+AS $$
+BEGIN
+    INSERT INTO kvota.change_events (organization_id, kind, quote_id, actor_id, payload)
+    VALUES (
+        NEW.organization_id, 'quote_status', NEW.id, auth.uid(),
+        jsonb_build_object(
+            'from', OLD.workflow_status,
+            'to', NEW.workflow_status,
+            'idn_quote', NEW.idn_quote
+        )
+    );
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_change_events_quote_status ON kvota.quotes;
+CREATE TRIGGER trg_change_events_quote_status
+    AFTER UPDATE OF workflow_status ON kvota.quotes
+    FOR EACH ROW
+    WHEN (OLD.workflow_status IS DISTINCT FROM NEW.workflow_status)
+    EXECUTE FUNCTION kvota.trg_change_events_quote_status();
+
+
+-- =============================================================================
+-- Per-brand procurement sub-status moves (kanban cards)
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION kvota.trg_change_events_brand_substatus()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = kvota, public
+AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.substatus IS NOT DISTINCT FROM NEW.substatus THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO kvota.change_events (organization_id, kind, quote_id, actor_id, payload)
+    SELECT q.organization_id, 'brand_substatus', NEW.quote_id, NEW.updated_by,
+           jsonb_build_object(
+               'brand', NEW.brand,
+               'from', CASE WHEN TG_OP = 'UPDATE' THEN OLD.substatus END,
+               'to', NEW.substatus
+           )
+      FROM kvota.quotes q
+     WHERE q.id = NEW.quote_id;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_change_events_brand_substatus ON kvota.quote_brand_substates;
+CREATE TRIGGER trg_change_events_brand_substatus
+    AFTER INSERT OR UPDATE OF substatus ON kvota.quote_brand_substates
+    FOR EACH ROW
+    EXECUTE FUNCTION kvota.trg_change_events_brand_substatus();
+
+
+-- =============================================================================
+-- New quote comments (chat panel)
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION kvota.trg_change_events_comment()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = kvota, public
+AS $$
+BEGIN
+    INSERT INTO kvota.change_events (organization_id, kind, quote_id, actor_id, payload)
+    SELECT q.organization_id, 'comment', NEW.quote_id, NEW.user_id,
+           jsonb_build_object('comment_id', NEW.id, 'mentions', NEW.mentions)
+      FROM kvota.quotes q
+     WHERE q.id = NEW.quote_id;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_change_events_comment ON kvota.quote_comments;
+CREATE TRIGGER trg_change_events_comment
+    AFTER INSERT ON kvota.quote_comments
+    FOR EACH ROW
+    EXECUTE FUNCTION kvota.trg_change_events_comment();
@@ -0,0 +1,53 @@
+-- Migration 349: keyset scans + overdue ledger for the notification crons.
+--
+-- /api/cron/check-overdue and /api/cron/sla-check pulled every candidate row
+-- of every organization in one response and notified one quote at a time,
+-- so run time grew with the total number of quotes across tenants.
+-- Both now walk their candidates in id order (keyset pages, api/cron.py),
+-- organizations and notifications concurrently.
+--
+-- 1. Partial indexes matching the scan predicates: quotes still in a timed
+--    stage and not yet notified; invoices with an open logistics / customs
+--    side. Closed work (deals, completed invoices) never enters a scan.
+-- 2. quote_overdue_notifications_sent — idempotency ledger for stage
+--    overdue pings, the counterpart of invoice_sla_notifications_sent
+--    (migration 295). A run claims (quote, stage, stage entry) with an
+--    INSERT before sending; a concurrent or repeated run hits the UNIQUE
+--    key and skips. Keyed by the stage entry time, so a quote that
+--    re-enters a stage can be notified again — the same rule as
+--    quotes.overdue_notified_at, which transitions reset.
+--
+-- Date: 2026-10-18
+
+CREATE INDEX IF NOT EXISTS idx_quotes_overdue_scan
+    ON kvota.quotes (organization_id, id)
+    WHERE overdue_notified_at IS NULL
+      AND workflow_status NOT IN ('draft', 'deal', 'rejected', 'cancelled');
+
+CREATE INDEX IF NOT EXISTS idx_invoices_open_logistics_sla
+    ON kvota.invoices (id)
+    WHERE logistics_completed_at IS NULL AND logistics_deadline_at IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_invoices_open_customs_sla
+    ON kvota.invoices (id)
+    WHERE customs_completed_at IS NULL AND customs_deadline_at IS NOT NULL;
+
+
+CREATE TABLE IF NOT EXISTS kvota.quote_overdue_notifications_sent (
+    id               UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    quote_id         UUID NOT NULL REFERENCES kvota.quotes(id) ON DELETE CASCADE,
+    stage            TEXT NOT NULL,
+    stage_entered_at TIMESTAMPTZ NOT NULL,
+    sent_at          TIMESTAMPTZ NOT NULL DEFAULT now(),
+    UNIQUE (quote_id, stage, stage_entered_at)
+);
+
+ALTER TABLE kvota.quote_overdue_notifications_sent ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE kvota.quote_overdue_notifications_sent IS
+    'Dedupe ledger for /api/cron/check-overdue. UNIQUE(quote_id, stage, stage_entered_at) '
+    'guarantees one overdue ping per stage entry. Rows are never updated; to resend, delete the row.';
+
+INSERT INTO kvota.migrations (id, filename, applied_at)
+VALUES (349, '349_cron_scan_ledger', now())
+ON CONFLICT (id) DO NOTHING;
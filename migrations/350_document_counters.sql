@@ -0,0 +1,163 @@
+-- Migration 350: document_counters — atomic per-org, per-year document numbers.
+--
+-- Deal and specification numbers (DEAL-2026-0042, SPEC-2026-0007) were
+-- derived by counting this year's rows and adding one: a full count per
+-- creation, and two managers creating at the same moment got the same
+-- number. create_deal_from_specification even counted deals of ALL
+-- organizations.
+--
+-- kvota.next_document_number() now takes the next value from one counter
+-- row per (organization, kind, year) with INSERT ... ON CONFLICT DO UPDATE
+-- ... RETURNING: O(1), and concurrent callers serialize on that row only.
+-- A counter table rather than a SEQUENCE per org and year: no DDL at
+-- runtime, and a counter taken inside a transaction that rolls back is
+-- returned with it.
+--
+-- Gaps: a number drawn by its own call (services/document_numbering.py)
+-- is consumed even when the caller's insert then fails — numbers are
+-- unique and increasing, not dense. Inside create_deal_from_specification
+-- the draw and the insert share a transaction, so a failure leaves no gap.
+--
+-- Counters are seeded from the highest existing number of each format so
+-- numbering continues where the counting left off.
+--
+-- Date: 2026-10-18
+
+CREATE TABLE IF NOT EXISTS kvota.document_counters (
+    organization_id UUID        NOT NULL REFERENCES kvota.organizations(id) ON DELETE CASCADE,
+    kind            TEXT        NOT NULL,
+    year            INTEGER     NOT NULL,
+    last_value      BIGINT      NOT NULL DEFAULT 0 CHECK (last_value >= 0),
+    updated_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (organization_id, kind, year)
+);
+
+ALTER TABLE kvota.document_counters ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE kvota.document_counters IS
+    'Last issued document number per (organization, kind, year). '
+    'Advanced only by kvota.next_document_number(); see services/document_numbering.py.';
+
+
+-- Seed from existing numbers.
+INSERT INTO kvota.document_counters (organization_id, kind, year, last_value)
+SELECT organization_id,
+       'deal',
+       substring(deal_number FROM '^DEAL-(\d{4})-\d+$')::INTEGER,
+       MAX(substring(deal_number FROM '^DEAL-\d{4}-(\d+)$')::BIGINT)
+  FROM kvota.deals
+ WHERE deal_number ~ '^DEAL-\d{4}-\d+$'
+ GROUP BY 1, 3
+ON CONFLICT (organization_id, kind, year)
+    DO UPDATE SET last_value = GREATEST(kvota.document_counters.last_value, EXCLUDED.last_value);
+
+INSERT INTO kvota.document_counters (organization_id, kind, year, last_value)
+SELECT organization_id,
+       'specification',
+       substring(specification_number FROM '^SPEC-(\d{4})-\d+$')::INTEGER,
+       MAX(substring(specification_number FROM '^SPEC-\d{4}-(\d+)$')::BIGINT)
+  FROM kvota.specifications
+ WHERE specification_number ~ '^SPEC-\d{4}-\d+$'
+   AND organization_id IS NOT NULL
+ GROUP BY 1, 3
+ON CONFLICT (organization_id, kind, year)
+    DO UPDATE SET last_value = GREATEST(kvota.document_counters.last_value, EXCLUDED.last_value);
+
+
+-- Next number for (organization, kind, year); year defaults to the current one.
+CREATE OR REPLACE FUNCTION kvota.next_document_number(
+    p_organization_id UUID,
+    p_kind            TEXT,
+    p_year            INTEGER DEFAULT NULL
+)
+RETURNS BIGINT
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = kvota, public
+AS $$
+    INSERT INTO kvota.document_counters AS c (organization_id, kind, year, last_value)
+    VALUES (
+        p_organization_id,
+        p_kind,
+        COALESCE(p_year, EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER),
+        1
+    )
+    ON CONFLICT (organization_id, kind, year)
+        DO UPDATE SET last_value = c.last_value + 1,
+                      updated_at = now()
+    RETURNING c.last_value;
+$$;
+
+REVOKE ALL ON FUNCTION kvota.next_document_number(UUID, TEXT, INTEGER) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION kvota.next_document_number(UUID, TEXT, INTEGER) TO service_role;
+
+COMMENT ON FUNCTION kvota.next_document_number(UUID, TEXT, INTEGER) IS
+    'Atomically issue the next document number. Caller: services/document_numbering.py.';
+
+
+-- Legacy RPC (FastHTML control flow) — same counter instead of COUNT(*) + 1.
+CREATE OR REPLACE FUNCTION kvota.generate_deal_number(org_id UUID)
+RETURNS TEXT
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = kvota, public
+AS $$
+    SELECT 'DEAL-' || TO_CHAR(CURRENT_DATE, 'YYYY') || '-'
+           || LPAD(kvota.next_document_number(org_id, 'deal')::TEXT, 4, '0');
+$$;
+
+
+-- Migration 237's RPC, numbering from the org's counter.
+CREATE OR REPLACE FUNCTION kvota.create_deal_from_specification(
+  p_spec_id UUID,
+  p_quote_id UUID,
+  p_organization_id UUID
+) RETURNS TABLE(deal_id UUID, deal_number TEXT) AS $$
+DECLARE
+  v_deal_id UUID;
+  v_deal_number TEXT;
+  v_year INT;
+  v_seq BIGINT;
+  v_sign_date DATE;
+  v_total_amount NUMERIC;
+  v_currency VARCHAR;
+BEGIN
+  v_year := EXTRACT(YEAR FROM NOW());
+
+  -- Next deal number of this organization (rolled back with the deal on failure)
+  v_seq := kvota.next_document_number(p_organization_id, 'deal', v_year);
+
+  v_deal_number := 'DEAL-' || v_year || '-' || LPAD(v_seq::TEXT, 4, '0');
+
+  -- Get spec sign date
+  SELECT sign_date INTO v_sign_date
+  FROM kvota.specifications
+  WHERE id = p_spec_id;
+
+  -- Get quote financials
+  SELECT total_amount, currency INTO v_total_amount, v_currency
+  FROM kvota.quotes
+  WHERE id = p_quote_id;
+
+  -- Update specification status
+  UPDATE kvota.specifications
+  SET status = 'signed', updated_at = NOW()
+  WHERE id = p_spec_id;
+
+  -- Create deal
+  INSERT INTO kvota.deals (
+    specification_id, quote_id, organization_id,
+    deal_number, signed_at, total_amount, currency, status
+  ) VALUES (
+    p_spec_id, p_quote_id, p_organization_id,
+    v_deal_number, COALESCE(v_sign_date, CURRENT_DATE), COALESCE(v_total_amount, 0), COALESCE(v_currency, 'USD'), 'active'
+  ) RETURNING id INTO v_deal_id;
+
+  -- Update quote workflow
+  UPDATE kvota.quotes
+  SET workflow_status = 'spec_signed'
+  WHERE id = p_quote_id;
+
+  RETURN QUERY SELECT v_deal_id, v_deal_number;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
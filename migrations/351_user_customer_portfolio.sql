@@ -0,0 +1,90 @@
+-- Migration 351: get_user_customers — a user's customer portfolio, aggregated in the database.
+--
+-- services/user_profile_service.get_user_customers loaded every customer of
+-- the organization together with all of its quotes and their specifications,
+-- then kept the user's customers and summed their quotes in Python: the
+-- response grew with the whole organization, not with the user's portfolio.
+--
+-- kvota.get_user_customers() returns only the user's customers — created by
+-- the user, or with at least one of the user's quotes — with the sums over
+-- the user's quotes already computed, one page at a time:
+--   quotes_sum      SUM(total_amount) of the user's quotes
+--   specs_sum       SUM(total_usd) of those of them that have a specification
+--   last_quote_date MAX(quote_date)
+--   total_count     size of the whole portfolio (same value on every row)
+-- Soft-deleted quotes are excluded, as in get_user_statistics (migration 114).
+--
+-- Date: 2026-10-18
+
+-- The user's quotes per customer: the aggregation's only quote scan.
+CREATE INDEX IF NOT EXISTS idx_quotes_org_creator_customer
+    ON kvota.quotes (organization_id, created_by_user_id, customer_id)
+    WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_customers_org_created_by
+    ON kvota.customers (organization_id, created_by);
+
+
+CREATE OR REPLACE FUNCTION kvota.get_user_customers(
+    p_user_id         UUID,
+    p_organization_id UUID,
+    p_limit           INTEGER DEFAULT NULL,
+    p_offset          INTEGER DEFAULT 0
+)
+RETURNS TABLE (
+    customer_id     UUID,
+    customer_name   TEXT,
+    customer_inn    TEXT,
+    industry        TEXT,
+    quotes_sum      NUMERIC,
+    specs_sum       NUMERIC,
+    last_quote_date DATE,
+    updated_at      TIMESTAMPTZ,
+    total_count     BIGINT
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = kvota, public
+AS $$
+    WITH user_quotes AS (
+        SELECT q.customer_id,
+               SUM(COALESCE(q.total_amount, 0)) AS quotes_sum,
+               SUM(COALESCE(q.total_usd, 0)) FILTER (
+                   WHERE EXISTS (SELECT 1 FROM kvota.specifications s WHERE s.quote_id = q.id)
+               ) AS specs_sum,
+               MAX(q.quote_date) AS last_quote_date
+          FROM kvota.quotes q
+         WHERE q.organization_id = p_organization_id
+           AND q.created_by_user_id = p_user_id
+           AND q.deleted_at IS NULL
+           AND q.customer_id IS NOT NULL
+         GROUP BY q.customer_id
+    )
+    SELECT c.id,
+           c.name::TEXT,
+           c.inn::TEXT,
+           c.industry::TEXT,
+           COALESCE(uq.quotes_sum, 0),
+           COALESCE(uq.specs_sum, 0),
+           uq.last_quote_date::DATE,
+           c.updated_at,
+           COUNT(*) OVER ()
+      FROM kvota.customers c
+      LEFT JOIN user_quotes uq ON uq.customer_id = c.id
+     WHERE c.organization_id = p_organization_id
+       AND (uq.customer_id IS NOT NULL OR c.created_by = p_user_id)
+     ORDER BY c.updated_at DESC NULLS LAST, c.id
+     LIMIT p_limit
+    OFFSET COALESCE(p_offset, 0);
+$$;
+
+REVOKE ALL ON FUNCTION kvota.get_user_customers(UUID, UUID, INTEGER, INTEGER) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION kvota.get_user_customers(UUID, UUID, INTEGER, INTEGER) TO service_role;
+
+COMMENT ON FUNCTION kvota.get_user_customers(UUID, UUID, INTEGER, INTEGER) IS
+    'Paginated customer portfolio of a user with quote/spec sums. Caller: services/user_profile_service.py.';
+
+INSERT INTO kvota.migrations (id, filename, applied_at)
+VALUES (351, '351_user_customer_portfolio', now())
+ON CONFLICT (id) DO NOTHING;
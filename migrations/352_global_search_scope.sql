@@ -0,0 +1,119 @@
+-- Migration 352: scope kvota.global_search to the records the caller may see.
+--
+-- global_search (migration 346) filtered by organization only, so /api/search
+-- returned every customer, quote and supplier of the organization to any
+-- member — a sales manager could find customers they are not assigned to.
+--
+-- The caller's scope is resolved in services/search_service.resolve_scope
+-- (same rules as frontend/src/shared/lib/access.ts) and passed in as id
+-- lists; NULL keeps a kind unrestricted:
+--   p_customer_ids       customers the caller may see; also limits quotes to
+--                        those of these customers ...
+--   p_quote_creator_ids  ... or created by one of these users
+--   p_supplier_ids       suppliers the caller may see
+-- Kinds the caller has no access to at all are dropped from p_kinds.
+--
+-- Date: 2026-10-18
+
+DROP FUNCTION IF EXISTS kvota.global_search(UUID, TEXT, TEXT[], INTEGER);
+
+CREATE OR REPLACE FUNCTION kvota.global_search(
+    p_organization_id   UUID,
+    p_query             TEXT,
+    p_kinds             TEXT[]  DEFAULT NULL,  -- NULL = all of quote, customer, supplier, location
+    p_limit             INTEGER DEFAULT 8,     -- per kind
+    p_customer_ids      UUID[]  DEFAULT NULL,  -- NULL = every customer of the organization
+    p_quote_creator_ids UUID[]  DEFAULT NULL,
+    p_supplier_ids      UUID[]  DEFAULT NULL   -- NULL = every supplier of the organization
+)
+RETURNS TABLE (
+    kind     TEXT,
+    id       UUID,
+    title    TEXT,
+    subtitle TEXT,
+    rank     INTEGER,
+    score    REAL
+)
+LANGUAGE sql
+STABLE
+SET search_path = kvota, public
+AS $$
+    WITH q AS (
+        SELECT lower(btrim(p_query)) AS term,
+               '%' || replace(replace(replace(lower(btrim(p_query)),
+                   '\', '\\'), '%', '\%'), '_', '\_') || '%' AS pattern
+    )
+    (
+        SELECT 'quote', x.id, x.idn_quote::TEXT, c.name::TEXT,
+               CASE WHEN lower(x.idn_quote) = q.term THEN 0
+                    WHEN lower(x.idn_quote) LIKE q.term || '%' THEN 1 ELSE 2 END,
+               similarity(x.idn_quote, q.term)
+          FROM kvota.quotes x
+          CROSS JOIN q
+          LEFT JOIN kvota.customers c ON c.id = x.customer_id
+         WHERE (p_kinds IS NULL OR 'quote' = ANY (p_kinds))
+           AND x.organization_id = p_organization_id
+           AND x.deleted_at IS NULL
+           AND (p_customer_ids IS NULL
+                OR x.customer_id = ANY (p_customer_ids)
+                OR x.created_by = ANY (p_quote_creator_ids))
+           AND x.idn_quote ILIKE q.pattern
+         ORDER BY 5, 6 DESC, 3
+         LIMIT p_limit
+    )
+    UNION ALL
+    (
+        SELECT 'customer', x.id, x.name::TEXT, x.inn::TEXT,
+               CASE WHEN lower(x.name) = q.term OR x.inn = q.term THEN 0
+                    WHEN lower(x.name) LIKE q.term || '%' OR x.inn LIKE q.term || '%' THEN 1 ELSE 2 END,
+               greatest(similarity(x.name, q.term), similarity(coalesce(x.inn, ''), q.term))
+          FROM kvota.customers x
+          CROSS JOIN q
+         WHERE (p_kinds IS NULL OR 'customer' = ANY (p_kinds))
+           AND x.organization_id = p_organization_id
+           AND (p_customer_ids IS NULL OR x.id = ANY (p_customer_ids))
+           AND (x.name ILIKE q.pattern OR x.inn ILIKE q.pattern)
+         ORDER BY 5, 6 DESC, 3
+         LIMIT p_limit
+    )
+    UNION ALL
+    (
+        SELECT 'supplier', x.id, x.name::TEXT, x.supplier_code::TEXT,
+               CASE WHEN lower(x.name) = q.term OR lower(x.supplier_code) = q.term THEN 0
+                    WHEN lower(x.name) LIKE q.term || '%' THEN 1 ELSE 2 END,
+               similarity(x.name, q.term)
+          FROM kvota.suppliers x
+          CROSS JOIN q
+         WHERE (p_kinds IS NULL OR 'supplier' = ANY (p_kinds))
+           AND x.organization_id = p_organization_id
+           AND x.is_active = true
+           AND (p_supplier_ids IS NULL OR x.id = ANY (p_supplier_ids))
+           AND (x.name ILIKE q.pattern OR x.supplier_code ILIKE q.pattern)
+         ORDER BY 5, 6 DESC, 3
+         LIMIT p_limit
+    )
+    UNION ALL
+    (
+        SELECT 'location', x.id, x.display_name::TEXT, x.location_type::TEXT,
+               CASE WHEN lower(x.code) = q.term THEN 0
+                    WHEN x.search_text LIKE q.term || '%' THEN 1 ELSE 2 END,
+               similarity(x.search_text, q.term)
+          FROM kvota.locations x
+          CROSS JOIN q
+         WHERE (p_kinds IS NULL OR 'location' = ANY (p_kinds))
+           AND x.organization_id = p_organization_id
+           AND x.is_active = true
+           AND x.search_text LIKE q.pattern
+         ORDER BY 5, 6 DESC, 3
+         LIMIT p_limit
+    );
+$$;
+
+COMMENT ON FUNCTION kvota.global_search(UUID, TEXT, TEXT[], INTEGER, UUID[], UUID[], UUID[]) IS
+    'Ranked trigram-indexed search over quotes, customers, suppliers and '
+    'locations of one organization, limited to the caller''s visible ids. '
+    'Caller: services/search_service.py.';
+
+INSERT INTO kvota.migrations (id, filename, applied_at)
+VALUES (352, '352_global_search_scope', now())
+ON CONFLICT (id) DO NOTHING;
@@ -0,0 +1,53 @@
+-- Migration 353: real actor on quote_status change events.
+--
+-- trg_change_events_quote_status (migration 348) took actor_id from
+-- auth.uid(). Workflow transitions are written by the Python backend with
+-- the service_role client, where auth.uid() is NULL (see migration 279), so
+-- every quote_status event carried actor_id = NULL and a client could not
+-- tell its own echo from someone else's change.
+--
+-- The transition now names its actor in the same UPDATE: quotes gets
+-- stage_entered_by next to stage_entered_at, and workflow_service /
+-- the cancel endpoint set both. The trigger uses auth.uid() for
+-- user-session writers (the frontend updates quotes directly) and
+-- otherwise stage_entered_by — only when stage_entered_at moved in this
+-- UPDATE, so a writer that does not name an actor leaves actor_id NULL
+-- rather than repeating the previous transition's actor.
+--
+-- Date: 2026-10-18
+
+ALTER TABLE kvota.quotes
+    ADD COLUMN IF NOT EXISTS stage_entered_by UUID REFERENCES auth.users(id) ON DELETE SET NULL;
+
+COMMENT ON COLUMN kvota.quotes.stage_entered_by IS
+    'User whose transition set stage_entered_at (actor of quote_status change events).';
+
+
+CREATE OR REPLACE FUNCTION kvota.trg_change_events_quote_status()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = kvota, public
+AS $$
+BEGIN
+    INSERT INTO kvota.change_events (organization_id, kind, quote_id, actor_id, payload)
+    VALUES (
+        NEW.organization_id, 'quote_status', NEW.id,
+        COALESCE(
+            auth.uid(),
+            CASE WHEN NEW.stage_entered_at IS DISTINCT FROM OLD.stage_entered_at
+                 THEN NEW.stage_entered_by END
+        ),
+        jsonb_build_object(
+            'from', OLD.workflow_status,
+            'to', NEW.workflow_status,
+            'idn_quote', NEW.idn_quote
+        )
+    );
+    RETURN NULL;
+END;
+$$;
+
+INSERT INTO kvota.migrations (id, filename, applied_at)
+VALUES (353, '353_change_events_quote_status_actor', now())
+ON CONFLICT (id) DO NOTHING;
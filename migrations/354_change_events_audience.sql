@@ -0,0 +1,105 @@
+-- Migration 354: change_events carry what the stream needs to scope them.
+--
+-- GET /api/changes/stream sent every event of the organization to every
+-- member: sales-only users saw idn_quote and status moves of quotes they
+-- cannot open, and regular procurement (МОЗ) saw every kanban card move.
+-- The stream now applies the same visibility as search and the kanban
+-- (api/changes.py), which needs per event:
+--   customer_id       the quote's customer (sales: assigned customers)
+--   quote_created_by  the quote's creator (sales: own quotes)
+--   assignee_ids      brand_substatus only — assigned_procurement_user of
+--                     the slice's items (МОЗ: own brand slices)
+-- These columns are not part of the SSE payload.
+--
+-- Date: 2026-10-18
+
+ALTER TABLE kvota.change_events
+    ADD COLUMN IF NOT EXISTS customer_id      UUID,
+    ADD COLUMN IF NOT EXISTS quote_created_by UUID,
+    ADD COLUMN IF NOT EXISTS assignee_ids     UUID[] NOT NULL DEFAULT '{}';
+
+
+CREATE OR REPLACE FUNCTION kvota.trg_change_events_quote_status()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = kvota, public
+AS $$
+BEGIN
+    INSERT INTO kvota.change_events
+        (organization_id, kind, quote_id, actor_id, payload, customer_id, quote_created_by)
+    VALUES (
+        NEW.organization_id, 'quote_status', NEW.id,
+        COALESCE(
+            auth.uid(),
+            CASE WHEN NEW.stage_entered_at IS DISTINCT FROM OLD.stage_entered_at
+                 THEN NEW.stage_entered_by END
+        ),
+        jsonb_build_object(
+            'from', OLD.workflow_status,
+            'to', NEW.workflow_status,
+            'idn_quote', NEW.idn_quote
+        ),
+        NEW.customer_id, NEW.created_by
+    );
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE OR REPLACE FUNCTION kvota.trg_change_events_brand_substatus()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = kvota, public
+AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.substatus IS NOT DISTINCT FROM NEW.substatus THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO kvota.change_events
+        (organization_id, kind, quote_id, actor_id, payload,
+         customer_id, quote_created_by, assignee_ids)
+    SELECT q.organization_id, 'brand_substatus', NEW.quote_id, NEW.updated_by,
+           jsonb_build_object(
+               'brand', NEW.brand,
+               'from', CASE WHEN TG_OP = 'UPDATE' THEN OLD.substatus END,
+               'to', NEW.substatus
+           ),
+           q.customer_id, q.created_by,
+           ARRAY(
+               SELECT DISTINCT qi.assigned_procurement_user
+                 FROM kvota.quote_items qi
+                WHERE qi.quote_id = NEW.quote_id
+                  AND COALESCE(qi.brand, '') = COALESCE(NEW.brand, '')
+                  AND qi.assigned_procurement_user IS NOT NULL
+           )
+      FROM kvota.quotes q
+     WHERE q.id = NEW.quote_id;
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE OR REPLACE FUNCTION kvota.trg_change_events_comment()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = kvota, public
+AS $$
+BEGIN
+    INSERT INTO kvota.change_events
+        (organization_id, kind, quote_id, actor_id, payload, customer_id, quote_created_by)
+    SELECT q.organization_id, 'comment', NEW.quote_id, NEW.user_id,
+           jsonb_build_object('comment_id', NEW.id, 'mentions', NEW.mentions),
+           q.customer_id, q.created_by
+      FROM kvota.quotes q
+     WHERE q.id = NEW.quote_id;
+    RETURN NULL;
+END;
+$$;
+
+INSERT INTO kvota.migrations (id, filename, applied_at)
+VALUES (354, '354_change_events_audience', now())
+ON CONFLICT (id) DO NOTHING;
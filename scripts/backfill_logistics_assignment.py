@@ -5,8 +5,8 @@ After migration 260 populates invoices.pickup_country for quotes stuck in
 `pending_logistics_and_customs`, this script triggers the Python routing logic
 that SQL alone cannot perform: for each such quote it calls
 `services.workflow_service.assign_logistics_to_invoices(quote_id)`, which
-routes invoices to logistics users via the RPC
-`get_logistics_manager_for_locations` and updates
+routes invoices to logistics users via
+`get_logistics_manager_for_locations` (the org's compiled route matcher) and updates
 `quotes.assigned_logistics_user`.
 
 The script is idempotent — `assign_logistics_to_invoices` overwrites any prior
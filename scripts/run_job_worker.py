@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Standalone worker for kvota.background_jobs (services/job_service.py).
+
+The API process already runs one worker thread from its lifespan. Run this
+when jobs should not share the API container — e.g. long customs freezes
+during an approval wave — and set JOB_WORKER_IN_PROCESS=0 on the API if
+the API should not claim jobs at all. Any number of these can run side by
+side: claims are FOR UPDATE SKIP LOCKED.
+
+Usage
+-----
+    python scripts/run_job_worker.py              # run until SIGINT/SIGTERM
+    python scripts/run_job_worker.py --once       # drain due jobs and exit
+
+Exit codes: 0 on clean shutdown, 1 on unexpected error.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+
+# Ensure project root on sys.path so `services.job_service` resolves when run from anywhere.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import job_service  # noqa: E402
+
+logger = logging.getLogger("run_job_worker")
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run background jobs from kvota.background_jobs.")
+    parser.add_argument("--once", action="store_true", help="Drain due jobs, then exit.")
+    parser.add_argument(
+        "--poll",
+        type=float,
+        default=job_service.POLL_SECONDS,
+        help="Seconds to wait between polls when the queue is empty.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    if args.once:
+        ran = job_service.run_pending_once(limit=1_000_000)
+        logger.info("ran %d job(s)", ran)
+        return 0
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    worker_id = job_service._default_worker_id()
+    logger.info("worker %s started", worker_id)
+    try:
+        while not stop.is_set():
+            if job_service.run_pending_once(worker_id) == 0:
+                stop.wait(args.poll)
+    except Exception:
+        logger.exception("worker %s crashed", worker_id)
+        return 1
+    logger.info("worker %s stopped", worker_id)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -601,8 +601,13 @@ from .route_logistics_assignment_service import (
     assignment_exists,
     # Route matching functions
     match_route_to_logistics_manager,
+    match_routes_to_logistics_managers,
     get_logistics_manager_for_locations,
+    get_logistics_managers_for_locations,
     find_matching_routes,
+    RouteMatcher,
+    get_route_matcher,
+    invalidate_route_matcher,
     # Update operations
     update_route_logistics_assignment,
     reassign_route_to_user,
@@ -1356,8 +1361,13 @@ __all__ = [
     "get_unique_destinations",
     "assignment_exists",
     "match_route_to_logistics_manager",
+    "match_routes_to_logistics_managers",
     "get_logistics_manager_for_locations",
+    "get_logistics_managers_for_locations",
     "find_matching_routes",
+    "RouteMatcher",
+    "get_route_matcher",
+    "invalidate_route_matcher",
     "update_route_logistics_assignment",
     "reassign_route_to_user",
     "delete_route_logistics_assignment",
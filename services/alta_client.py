@@ -27,6 +27,8 @@ from typing import Any, Literal
 
 import httpx
 
+from services import metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -320,6 +322,10 @@ class AltaApiError(Exception):
 _client_singleton: AltaClient | None = None
 _last_alert_at: dict[str, datetime] = {}
 
+_PACKET_LEFT = metrics.gauge(
+    "alta_packet_left", "Requests left in the prepaid Alta packet (last response seen)",
+)
+
 
 # ---------------------------------------------------------------------------
 # Telegram alerting (Q2)
@@ -547,6 +553,7 @@ class AltaClient:
         if left_count is None:
             return
         self.last_packet_left = left_count
+        _PACKET_LEFT.set(left_count)
         logger.info("Alta packet remaining: %d", left_count)
         if left_count >= PACKET_LOW_THRESHOLD:
             return
@@ -0,0 +1,102 @@
+"""
+Asset Cache — in-process cache of files read from the deploy bundle.
+
+Changelog markdown, KP fonts, illustrations and icons ship with the code and
+change only on deploy, yet hot paths re-read (and re-parse / re-encode) them
+on every request: /api/changelog parsed every markdown file, every КП render
+base64-encoded ~2 MB of fonts and PNGs.
+
+Each file is now loaded once per process and served from memory. An entry is
+keyed by (namespace, path) and stamped with the file's mtime and size; a
+lookup ``stat()``s the file and reloads it when the stamp changed, so an edited
+file is picked up without a restart. A missing file raises the same
+``OSError`` a direct read would.
+
+Provides:
+- load(path, loader, namespace) — cache ``loader(path)``, e.g. a parsed entry
+- read_bytes(path), read_text(path), data_uri(path, mime)
+- stats(), invalidate_all()
+
+Cached values are shared between callers — treat them as read-only.
+"""
+
+import base64
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Union
+
+from services import metrics
+
+
+PathLike = Union[str, Path]
+
+_lock = threading.Lock()
+# (namespace, path) -> ((st_mtime_ns, st_size), value)
+_entries: dict[tuple[str, str], tuple[tuple[int, int], Any]] = {}
+_stats = {"hits": 0, "misses": 0}
+
+
+def load(path: PathLike, loader: Callable[[Path], Any], namespace: str = "file") -> Any:
+    """Return ``loader(path)``, cached until the file's mtime or size changes.
+
+    ``namespace`` separates different derivations of the same file (raw
+    bytes vs. a data URI vs. a parsed document).
+    """
+    path = Path(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = (namespace, str(path))
+
+    with _lock:
+        cached = _entries.get(key)
+        if cached is not None and cached[0] == stamp:
+            _stats["hits"] += 1
+            return cached[1]
+
+    # Load outside the lock: a concurrent duplicate load is harmless.
+    # A write landing after the stat() leaves a newer value under the older
+    # stamp — the next lookup sees the new stamp and reloads.
+    value = loader(path)
+    with _lock:
+        _stats["misses"] += 1
+        _entries[key] = (stamp, value)
+    return value
+
+
+def read_bytes(path: PathLike) -> bytes:
+    """Cached ``Path.read_bytes``."""
+    return load(path, Path.read_bytes, "bytes")
+
+
+def read_text(path: PathLike, encoding: str = "utf-8") -> str:
+    """Cached ``Path.read_text``."""
+    return load(path, lambda p: p.read_text(encoding=encoding), f"text:{encoding}")
+
+
+def data_uri(path: PathLike, mime: str) -> str:
+    """``data:<mime>;base64,...`` URI of a file, encoded once per version."""
+    def encode(p: Path) -> str:
+        return f"data:{mime};base64,{base64.b64encode(p.read_bytes()).decode('ascii')}"
+
+    return load(path, encode, f"data_uri:{mime}")
+
+
+def invalidate_all() -> None:
+    """Drop every entry (tests, manual refresh)."""
+    with _lock:
+        _entries.clear()
+
+
+def stats() -> dict:
+    """Hit/miss counters and entry count for diagnostics."""
+    with _lock:
+        return dict(_stats, entries=len(_entries))
+
+
+def _collect_metrics():
+    s = stats()
+    yield from metrics.cache_families("asset", s["hits"], s["misses"], s["entries"])
+
+
+metrics.register_collector(_collect_metrics)
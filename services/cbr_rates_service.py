@@ -1,67 +1,206 @@
-"""CBR (Central Bank of Russia) exchange rates from JSON API."""
-import httpx
-from datetime import date, timedelta
+"""CBR (Central Bank of Russia) exchange rates as of a date.
+
+Lookups are answered from the local rate history — the ``<code> -> RUB``
+rows of kvota.exchange_rates (written daily by POST
+/api/cron/refresh-exchange-rates, historically by ``backfill_range``) —
+held in memory as per-currency sorted date arrays. A lookup is a bisect
+for the latest rate published on or before the date: CBR publishes nothing
+on weekends and holidays, the previous rate stays in force.
+
+Only dates past the end of the history (today's rate before the cron ran)
+or inside a gap go to the network: one cached cbr-xml-daily.ru request per
+day, shared by all currencies.
+"""
+import bisect
+import threading
+import time
+import xml.etree.ElementTree as ET
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from functools import lru_cache
-from typing import Optional
+from typing import Iterable, Optional
 
+import httpx
 
-@lru_cache(maxsize=100)
-def get_usd_rub_rate(target_date: date) -> Optional[Decimal]:
-    """Fetch USD/RUB rate from CBR JSON API for given date.
+from services import metrics
+from services.currency_service import CBR_CURRENCY_CODES
+from services.database import get_supabase
+
+# Currencies kept in the history (every supported one except RUB itself).
+HISTORY_CURRENCIES = tuple(CBR_CURRENCY_CODES)
+
+HISTORY_TTL_SECONDS = 3600    # the cron adds one day's rates per day
+HISTORY_RETRY_SECONDS = 60    # after a failed load
+HISTORY_PAGE_SIZE = 1000
+
+# Longest run of days without a CBR publication (New Year holidays). A
+# larger distance to the previous known rate means a gap in the history,
+# not a holiday — fall back to the network.
+MAX_RATE_AGE_DAYS = 14
 
-    Uses the cbr-xml-daily.ru archive endpoint which provides
-    rates for specific dates in JSON format.
-    Falls back to None on any error (network, parsing, missing data).
+CBR_ARCHIVE_URL = "https://www.cbr-xml-daily.ru/archive/{y}/{m:02d}/{d:02d}/daily_json.js"
+CBR_DYNAMIC_URL = "https://www.cbr.ru/scripts/XML_dynamic.asp"
+BACKFILL_UPSERT_CHUNK = 500
+
+
+def _get_supabase():
+    """Get Supabase client. Wrapped for testability (tests mock this function)."""
+    return get_supabase()
+
+
+def _load_history() -> dict[str, list[tuple[date, Decimal]]]:
+    """Read every stored ``<code> -> RUB`` rate, one per currency and day.
+
+    Several rows can share a day (the cron re-run, on-demand fetches in
+    currency_service); the latest ``fetched_at`` wins.
     """
-    url = (
-        f"https://www.cbr-xml-daily.ru/archive/"
-        f"{target_date.year}/{target_date.month:02d}/{target_date.day:02d}/daily_json.js"
-    )
-    try:
-        response = httpx.get(url, timeout=5.0)
-        response.raise_for_status()
-        data = response.json()
-        usd_data = data.get("Valute", {}).get("USD")
-        if not usd_data:
+    sb = _get_supabase()
+    latest: dict[tuple[str, date], Decimal] = {}
+    offset = 0
+    while True:
+        rows = (
+            sb.table("exchange_rates")
+            .select("from_currency, rate, fetched_at")
+            .eq("to_currency", "RUB")
+            .in_("from_currency", list(HISTORY_CURRENCIES))
+            .order("fetched_at")
+            .order("from_currency")
+            .range(offset, offset + HISTORY_PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        for row in rows:
+            day = date.fromisoformat(str(row["fetched_at"])[:10])
+            latest[(row["from_currency"], day)] = Decimal(str(row["rate"]))
+        if len(rows) < HISTORY_PAGE_SIZE:
+            break
+        offset += HISTORY_PAGE_SIZE
+
+    history: dict[str, list[tuple[date, Decimal]]] = {}
+    for (currency, day), rate in sorted(latest.items()):
+        history.setdefault(currency, []).append((day, rate))
+    return history
+
+
+class _RateHistory:
+    """In-memory copy of the stored rates, reloaded every HISTORY_TTL_SECONDS."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dates: dict[str, list[date]] = {}
+        self._rates: dict[str, list[Decimal]] = {}
+        self._last: Optional[date] = None  # latest publication in the history
+        self._expires_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def _ensure_loaded(self) -> None:
+        if time.monotonic() < self._expires_at:
+            return
+        with self._lock:
+            if time.monotonic() < self._expires_at:
+                return
+            try:
+                history = _load_history()
+                ttl = HISTORY_TTL_SECONDS
+            except Exception as e:
+                print(f"[cbr_rates] Error loading rate history: {e}")
+                history, ttl = None, HISTORY_RETRY_SECONDS
+            if history is not None:
+                self._dates = {c: [d for d, _ in points] for c, points in history.items()}
+                self._rates = {c: [r for _, r in points] for c, points in history.items()}
+                self._last = max((d[-1] for d in self._dates.values() if d), default=None)
+            self._expires_at = time.monotonic() + ttl
+
+    def invalidate(self) -> None:
+        self._expires_at = 0.0
+
+    def known_dates(self, currency: str) -> set[date]:
+        self._ensure_loaded()
+        return set(self._dates.get(currency, ()))
+
+    def rate_on(self, currency: str, target_date: date) -> Optional[Decimal]:
+        """Rate in force on ``target_date``, or None outside the covered range."""
+        self._ensure_loaded()
+        dates = self._dates.get(currency)
+        if not dates or target_date > self._last:
+            self.misses += 1
             return None
-        value = usd_data.get("Value")
-        if value is None:
+        i = bisect.bisect_right(dates, target_date) - 1
+        if i < 0 or (target_date - dates[i]).days > MAX_RATE_AGE_DAYS:
+            self.misses += 1
             return None
-        return Decimal(str(value))
-    except Exception as e:
-        print(f"[cbr_rates] Error fetching rate for {target_date}: {e}")
-        return None
+        self.hits += 1
+        return self._rates[currency][i]
+
+    def __len__(self) -> int:
+        return sum(len(d) for d in self._dates.values())
+
+
+_history = _RateHistory()
+
+
+def invalidate_history() -> None:
+    """Reload the history on the next lookup (after new rates were stored)."""
+    _history.invalidate()
 
 
 @lru_cache(maxsize=100)
-def get_cny_rub_rate(target_date: date) -> Optional[Decimal]:
-    """Fetch CNY/RUB rate from CBR JSON API for given date.
+def _fetch_cbr_day(target_date: date) -> dict[str, Decimal]:
+    """Fetch all HISTORY_CURRENCIES rates (per unit) from the CBR JSON archive.
 
-    CBR returns CNY rate with Nominal=1, so Value is the rate per 1 CNY.
-    Falls back to None on any error (network, parsing, missing data).
+    Returns {} on any error (network, parsing, no publication that day).
     """
-    url = (
-        f"https://www.cbr-xml-daily.ru/archive/"
-        f"{target_date.year}/{target_date.month:02d}/{target_date.day:02d}/daily_json.js"
-    )
+    url = CBR_ARCHIVE_URL.format(y=target_date.year, m=target_date.month, d=target_date.day)
     try:
         response = httpx.get(url, timeout=5.0)
         response.raise_for_status()
-        data = response.json()
-        cny_data = data.get("Valute", {}).get("CNY")
-        if not cny_data:
-            return None
-        value = cny_data.get("Value")
-        if value is None:
-            return None
-        return Decimal(str(value))
+        valutes = response.json().get("Valute", {})
+        rates = {}
+        for currency in HISTORY_CURRENCIES:
+            entry = valutes.get(currency)
+            if entry and entry.get("Value") is not None:
+                rates[currency] = Decimal(str(entry["Value"])) / Decimal(str(entry.get("Nominal") or 1))
+        return rates
     except Exception as e:
-        print(f"[cbr_rates] Error fetching CNY rate for {target_date}: {e}")
-        return None
+        print(f"[cbr_rates] Error fetching rates for {target_date}: {e}")
+        return {}
+
+
+def get_rate_to_rub(currency: str, target_date: date) -> Optional[Decimal]:
+    """RUB per 1 unit of ``currency`` in force on ``target_date``.
+
+    Answered from the local history; the network is used only for dates it
+    does not cover. Returns None when the rate is unavailable.
+    """
+    currency = currency.upper()
+    if currency == "RUB":
+        return Decimal(1)
+    rate = _history.rate_on(currency, target_date)
+    if rate is not None:
+        return rate
+    return _fetch_cbr_day(target_date).get(currency)
+
+
+def get_historical_rates(target_date: date) -> dict[str, Decimal]:
+    """All rates to RUB in force on ``target_date`` known locally (no network)."""
+    rates = {}
+    for currency in HISTORY_CURRENCIES:
+        rate = _history.rate_on(currency, target_date)
+        if rate is not None:
+            rates[currency] = rate
+    return rates
+
+
+def get_usd_rub_rate(target_date: date) -> Optional[Decimal]:
+    """USD/RUB rate in force on given date (None if unavailable)."""
+    return get_rate_to_rub("USD", target_date)
+
+
+def get_cny_rub_rate(target_date: date) -> Optional[Decimal]:
+    """CNY/RUB rate in force on given date (None if unavailable)."""
+    return get_rate_to_rub("CNY", target_date)
 
 
-@lru_cache(maxsize=100)
 def get_cny_usd_rate(target_date: date) -> Optional[Decimal]:
     """Derive CNY/USD cross-rate for given date: how many CNY per 1 USD.
 
@@ -93,3 +232,102 @@ def get_today_cny_usd_rate() -> Optional[Decimal]:
         if rate is not None:
             return rate
     return None
+
+
+# ----------------------------------------------------------------------------
+# Backfill
+# ----------------------------------------------------------------------------
+
+def _fetch_cbr_range(currency: str, start: date, end: date) -> list[tuple[date, Decimal]]:
+    """All published ``currency`` rates (per unit) between two dates, one request.
+
+    CBR XML_dynamic.asp returns one <Record Date="DD.MM.YYYY"> per
+    publication day with a comma-decimal Value and its Nominal.
+    """
+    response = httpx.get(
+        CBR_DYNAMIC_URL,
+        params={
+            "date_req1": start.strftime("%d/%m/%Y"),
+            "date_req2": end.strftime("%d/%m/%Y"),
+            "VAL_NM_RQ": CBR_CURRENCY_CODES[currency],
+        },
+        timeout=30.0,
+    )
+    response.raise_for_status()
+    root = ET.fromstring(response.content)
+
+    points = []
+    for record in root.findall("Record"):
+        day = datetime.strptime(record.get("Date"), "%d.%m.%Y").date()
+        value = Decimal(record.find("Value").text.replace(",", "."))
+        nominal = Decimal(record.find("Nominal").text)
+        points.append((day, value / nominal))
+    return points
+
+
+def backfill_range(
+    start: date, end: date, currencies: Optional[Iterable[str]] = None
+) -> dict:
+    """Store every CBR rate between ``start`` and ``end`` in kvota.exchange_rates.
+
+    One request per currency for the whole range. Days already in the
+    history are skipped; new rows get ``fetched_at`` = the rate date at
+    midnight, so re-running the same range updates in place
+    (UNIQUE(from_currency, to_currency, fetched_at)).
+
+    Returns {"rows_written", "currencies", "failed": [codes not fetched]}.
+    Raises ValueError for an unknown currency or an inverted range; upsert
+    errors propagate.
+    """
+    if end < start:
+        raise ValueError(f"Empty range: {start} > {end}")
+    currencies = [c.upper() for c in (currencies or HISTORY_CURRENCIES)]
+    unknown = [c for c in currencies if c not in CBR_CURRENCY_CODES]
+    if unknown:
+        raise ValueError(f"Unsupported currencies: {', '.join(unknown)}")
+
+    rows = []
+    failed = []
+    for currency in currencies:
+        try:
+            points = _fetch_cbr_range(currency, start, end)
+        except Exception as e:
+            print(f"[cbr_rates] Error fetching {currency} rates {start}..{end}: {e}")
+            failed.append(currency)
+            continue
+        known = _history.known_dates(currency)
+        rows.extend(
+            {
+                "from_currency": currency,
+                "to_currency": "RUB",
+                "rate": float(rate),
+                "source": "cbr",
+                "fetched_at": datetime.combine(day, datetime.min.time()).isoformat(),
+            }
+            for day, rate in points
+            if day not in known
+        )
+
+    if rows:
+        sb = _get_supabase()
+        for i in range(0, len(rows), BACKFILL_UPSERT_CHUNK):
+            sb.table("exchange_rates").upsert(
+                rows[i:i + BACKFILL_UPSERT_CHUNK],
+                on_conflict="from_currency,to_currency,fetched_at",
+            ).execute()
+        _history.invalidate()
+
+    return {
+        "rows_written": len(rows),
+        "currencies": len(currencies) - len(failed),
+        "failed": failed,
+    }
+
+
+def _collect_metrics():
+    yield from metrics.cache_families("cbr_history", _history.hits, _history.misses, len(_history))
+    info = _fetch_cbr_day.cache_info()
+    yield from metrics.cache_families("cbr_daily", info.hits, info.misses, info.currsize)
+
+
+metrics.register_collector(_collect_metrics)
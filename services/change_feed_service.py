@@ -0,0 +1,350 @@
+"""Org-scoped change feed — kvota.change_events (migration 348).
+
+Triggers append an event for every quote workflow transition, per-brand
+procurement sub-status move and new quote comment. GET /api/changes/stream
+pushes them to open views as server-sent events, so the kanban and the
+quote page patch themselves instead of refetching after every mutation.
+
+One ``ChangeHub`` per process polls the table for ids past its cursor
+(``POLL_SECONDS``) and fans new events out to the subscriptions of the
+event's organization — the database sees one cheap indexed query per
+second however many tabs are open. The hub starts with the first
+subscriber and stops when the last one leaves.
+
+Ids come from a sequence and can commit out of order (a longer
+transaction takes id 10, a shorter one commits 11 first). Each poll
+re-reads the last ``REORDER_WINDOW`` ids and skips the ones already
+delivered, so a late commit is still picked up.
+
+Each subscription carries an ``Audience`` — the caller's visibility
+(api/changes.py): sales-only users get events of their visible quotes only,
+regular procurement only the kanban moves of their own brand slices.
+
+A client that reconnects sends ``Last-Event-ID`` and gets the events it
+missed (``RETENTION``) before the live ones. A subscriber that falls more
+than ``QUEUE_LIMIT`` events behind, or resumes more than ``BACKLOG_LIMIT``
+events back, is dropped with a ``reset`` event and should refetch its view.
+
+Env:
+    CHANGE_FEED_POLL_SECONDS — poll interval. Default 1.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from services.database import get_supabase
+
+logger = logging.getLogger(__name__)
+
+
+KINDS = ("quote_status", "brand_substatus", "comment")
+
+POLL_SECONDS = float(os.environ.get("CHANGE_FEED_POLL_SECONDS", "1"))
+ERROR_BACKOFF_SECONDS = 5.0
+BATCH_SIZE = 500
+REORDER_WINDOW = 100            # ids re-read every poll; must stay < BATCH_SIZE
+QUEUE_LIMIT = 1000              # per subscriber, before it is reset
+BACKLOG_LIMIT = 5000            # resume backlog, before the subscriber is reset
+RETENTION = timedelta(hours=24)
+
+_COLUMNS = (
+    "id, organization_id, kind, quote_id, actor_id, payload, created_at, "
+    "customer_id, quote_created_by, assignee_ids"
+)
+
+
+def _get_supabase():
+    """Get Supabase client. Wrapped for testability (tests mock this function)."""
+    return get_supabase()
+
+
+@dataclass
+class ChangeEvent:
+    """One kvota.change_events row."""
+    id: int
+    organization_id: str
+    kind: str
+    quote_id: Optional[str] = None
+    actor_id: Optional[str] = None
+    payload: dict = field(default_factory=dict)
+    created_at: Optional[str] = None
+    # Scoping only (migration 354) — not sent to clients
+    customer_id: Optional[str] = None
+    quote_created_by: Optional[str] = None
+    assignee_ids: frozenset = frozenset()
+
+    @classmethod
+    def from_row(cls, row: dict) -> "ChangeEvent":
+        return cls(
+            id=int(row["id"]),
+            organization_id=row["organization_id"],
+            kind=row["kind"],
+            quote_id=row.get("quote_id"),
+            actor_id=row.get("actor_id"),
+            payload=row.get("payload") or {},
+            created_at=row.get("created_at"),
+            customer_id=row.get("customer_id"),
+            quote_created_by=row.get("quote_created_by"),
+            assignee_ids=frozenset(row.get("assignee_ids") or ()),
+        )
+
+    def to_sse(self) -> str:
+        """The event as an SSE frame; ``id`` doubles as the resume cursor."""
+        data = {
+            "id": self.id,
+            "kind": self.kind,
+            "quote_id": self.quote_id,
+            "actor_id": self.actor_id,
+            "payload": self.payload,
+            "created_at": self.created_at,
+        }
+        return (
+            f"id: {self.id}\n"
+            f"event: {self.kind}\n"
+            f"data: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+        )
+
+
+# ============================================================================
+# Table access (sync — called through asyncio.to_thread)
+# ============================================================================
+
+
+def fetch_after(
+    after_id: int,
+    organization_id: Optional[str] = None,
+    limit: int = BATCH_SIZE,
+) -> list[ChangeEvent]:
+    """Events with id > ``after_id``, oldest first, optionally for one org."""
+    query = (
+        _get_supabase()
+        .table("change_events")
+        .select(_COLUMNS)
+        .gt("id", after_id)
+    )
+    if organization_id:
+        query = query.eq("organization_id", organization_id)
+    resp = query.order("id").limit(limit).execute()
+    return [ChangeEvent.from_row(row) for row in resp.data or []]
+
+
+def latest_id() -> int:
+    """Id of the newest event (0 when the table is empty)."""
+    resp = (
+        _get_supabase()
+        .table("change_events")
+        .select("id")
+        .order("id", desc=True)
+        .limit(1)
+        .execute()
+    )
+    return int(resp.data[0]["id"]) if resp.data else 0
+
+
+def purge_old(max_age: timedelta = RETENTION) -> int:
+    """Delete events older than ``max_age``; returns how many were removed."""
+    cutoff = (datetime.now(timezone.utc) - max_age).isoformat()
+    resp = (
+        _get_supabase()
+        .table("change_events")
+        .delete()
+        .lt("created_at", cutoff)
+        .execute()
+    )
+    return len(resp.data or [])
+
+
+# ============================================================================
+# Fan-out
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class Audience:
+    """Which events of the organization a subscriber may see.
+
+    ``customer_ids`` set: only quotes of these customers or created by one of
+    ``quote_creator_ids``. ``procurement_user_id`` set: brand_substatus
+    events only for slices this user is assigned to. None = unrestricted.
+    """
+    customer_ids: Optional[frozenset[str]] = None
+    quote_creator_ids: frozenset[str] = frozenset()
+    procurement_user_id: Optional[str] = None
+
+    def sees_quote(self, customer_id: Optional[str], created_by: Optional[str]) -> bool:
+        return (
+            self.customer_ids is None
+            or customer_id in self.customer_ids
+            or created_by in self.quote_creator_ids
+        )
+
+    def allows(self, event: ChangeEvent) -> bool:
+        if not self.sees_quote(event.customer_id, event.quote_created_by):
+            return False
+        if self.procurement_user_id is not None and event.kind == "brand_substatus":
+            return self.procurement_user_id in event.assignee_ids
+        return True
+
+
+class Subscription:
+    """One open stream: its filters and the queue the hub fills."""
+
+    def __init__(
+        self,
+        organization_id: str,
+        kinds: Optional[set[str]] = None,
+        quote_id: Optional[str] = None,
+        audience: Optional[Audience] = None,
+    ):
+        self.organization_id = organization_id
+        self.kinds = frozenset(kinds) if kinds else None
+        self.quote_id = quote_id
+        self.audience = audience
+        self.overflowed = False
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._skip: set[int] = set()    # ids already sent as backlog
+
+    def matches(self, event: ChangeEvent) -> bool:
+        if self.kinds is not None and event.kind not in self.kinds:
+            return False
+        if self.quote_id is not None and event.quote_id != self.quote_id:
+            return False
+        return self.audience is None or self.audience.allows(event)
+
+    def offer(self, event: ChangeEvent) -> None:
+        if self.overflowed or not self.matches(event):
+            return
+        if self._queue.qsize() >= QUEUE_LIMIT:
+            self.reset()
+            return
+        self._queue.put_nowait(event)
+
+    def reset(self) -> None:
+        """Drop queued events; the stream ends with a ``reset`` event."""
+        self.overflowed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def get(self, timeout: float) -> Optional[ChangeEvent]:
+        """Next event; None once the subscriber has been reset.
+
+        Raises asyncio.TimeoutError when nothing arrived within ``timeout``.
+        """
+        while True:
+            event = await asyncio.wait_for(self._queue.get(), timeout)
+            if event is None or event.id not in self._skip:
+                return event
+
+
+class ChangeHub:
+    """Polls kvota.change_events and fans events out to subscriptions."""
+
+    def __init__(self):
+        self._subs: dict[str, set[Subscription]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._cursor: Optional[int] = None
+        self._floor = 0                     # ids <= floor predate the hub
+        self._delivered: set[int] = set()   # ids within the reorder window
+
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self._subs.values())
+
+    async def subscribe(
+        self,
+        organization_id: str,
+        kinds: Optional[set[str]] = None,
+        quote_id: Optional[str] = None,
+        after: Optional[int] = None,
+        audience: Optional[Audience] = None,
+    ) -> tuple[Subscription, list[ChangeEvent]]:
+        """Register a subscription; returns it with the backlog past ``after``.
+
+        The subscription is live before the backlog is read, so nothing
+        falls between the two; events present in both are sent once. The
+        backlog is read in ``BATCH_SIZE`` pages until caught up; more than
+        ``BACKLOG_LIMIT`` matching events reset the subscription instead.
+        """
+        sub = Subscription(organization_id, kinds, quote_id, audience)
+        self._subs.setdefault(organization_id, set()).add(sub)
+        self._ensure_running()
+
+        backlog: list[ChangeEvent] = []
+        cursor = after
+        while cursor is not None:
+            try:
+                rows = await asyncio.to_thread(fetch_after, cursor, organization_id, BATCH_SIZE)
+            except Exception:
+                self.unsubscribe(sub)
+                raise
+            backlog.extend(e for e in rows if sub.matches(e))
+            if len(backlog) > BACKLOG_LIMIT:
+                sub.reset()
+                return sub, []
+            cursor = rows[-1].id if len(rows) >= BATCH_SIZE else None
+        sub._skip = {e.id for e in backlog}
+        return sub, backlog
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subs.get(sub.organization_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subs[sub.organization_id]
+        if not self._subs and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            # Next start reads from the head again, not from where we left.
+            self._cursor = None
+            self._delivered.clear()
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is not None and self._task.get_loop() is not loop:
+            self._task, self._cursor = None, None
+            self._delivered.clear()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    def _accept(self, events: list[ChangeEvent]) -> list[ChangeEvent]:
+        """Events not delivered yet; advances the cursor."""
+        fresh = [e for e in events if e.id > self._floor and e.id not in self._delivered]
+        for event in fresh:
+            self._delivered.add(event.id)
+            self._cursor = max(self._cursor or 0, event.id)
+        low = (self._cursor or 0) - REORDER_WINDOW
+        self._delivered = {i for i in self._delivered if i > low}
+        return fresh
+
+    def _dispatch(self, event: ChangeEvent) -> None:
+        for sub in list(self._subs.get(event.organization_id, ())):
+            sub.offer(event)
+
+    async def _run(self) -> None:
+        while self._subs:
+            try:
+                if self._cursor is None:
+                    self._cursor = self._floor = await asyncio.to_thread(latest_id)
+                start = max(self._floor, self._cursor - REORDER_WINDOW)
+                events = await asyncio.to_thread(fetch_after, start)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("change feed poll failed: %s", exc)
+                await asyncio.sleep(ERROR_BACKOFF_SECONDS)
+                continue
+
+            for event in self._accept(events):
+                self._dispatch(event)
+            if len(events) < BATCH_SIZE:
+                await asyncio.sleep(POLL_SECONDS)
+
+
+hub = ChangeHub()
@@ -7,18 +7,23 @@ This module provides functions for:
 - Tracking per-user read status via Supabase changelog_reads table
 - Counting unread entries for sidebar badge display
 
+Parsed entries and rendered HTML are cached per process; a file is
+re-parsed only when its mtime or size changes (services/asset_cache.py).
+
 Feature: [86afz31pe] Create changelog page with sidebar link
 """
 
 import os
 import logging
 from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
 import frontmatter
 import markdown as md_lib
 
+from services import asset_cache
 from services.database import get_supabase
 
 logger = logging.getLogger(__name__)
@@ -109,9 +114,14 @@ def get_all_entries(changelog_dir: Optional[str] = None) -> List[Dict[str, Any]]
 
     entries = []
     for md_file in dir_path.glob("*.md"):
-        entry = _parse_entry(md_file)
+        try:
+            entry = asset_cache.load(md_file, _parse_entry, "changelog_entry")
+        except OSError:
+            # Removed between glob() and stat()
+            continue
         if entry is not None:
-            entries.append(entry)
+            # Copy: the cached dict is shared across requests
+            entries.append(dict(entry))
 
     # Sort by date descending (newest first)
     entries.sort(key=lambda e: e["date"], reverse=True)
@@ -212,7 +222,13 @@ def render_entry_html(entry: Dict[str, Any]) -> str:
     Returns:
         HTML string of the rendered body.
     """
-    return md_lib.markdown(entry["body"], extensions=["extra"])
+    return _markdown_to_html(entry["body"])
+
+
+@lru_cache(maxsize=256)
+def _markdown_to_html(body: str) -> str:
+    """Markdown → HTML, memoized by body text (entries rarely change)."""
+    return md_lib.markdown(body, extensions=["extra"])
 
 
 # Russian month names for date formatting
@@ -14,6 +14,12 @@ Flow:
      ``kvota.tnved_classification_log`` with method='express' so we can
      see what was suggested and what was eventually picked.
 
+Before step 2, when the caller passes ``organization_id``, each input is
+looked up in ``services.tnved_suggestion_index`` (confirmed picks from
+past classifications). Hits are answered locally (audit method='history')
+and only the misses go to Alta — a batch that is fully answered from
+history skips the Express call and its packet entirely.
+
 Selection (``log_classification_choice``) is a separate function called by
 the API handler when the customs-specialist confirms a code from the
 candidates: writes a follow-up log row with ``chosen_code`` and updates
@@ -29,6 +35,7 @@ from dataclasses import dataclass
 from datetime import date
 from typing import Any
 
+from services import tnved_suggestion_index
 from services.alta_client import AltaApiError, AltaClient, ExpressItem
 from services.database import get_supabase
 
@@ -58,6 +65,7 @@ class ClassifyInput:
     brand: str | None = None
     description: str | None = None
     quote_item_id: str | None = None
+    product_code: str | None = None      # Артикул — exact history key with brand
 
 
 @dataclass(frozen=True)
@@ -79,6 +87,7 @@ class ClassifyResult:
     error: str | None = None             # populated when Alta returned
                                          # nothing for this row (low quality
                                          # input or out-of-domain)
+    source: str = "alta"                 # 'alta' | 'history' (suggestion index)
 
 
 @dataclass(frozen=True)
@@ -88,6 +97,7 @@ class ClassifyOutcome:
     packet_left: int | None              # Surface to UI for ops awareness
     packet_used: int | None
     request_id: str                      # Audit + idempotency key
+    index_hits: int = 0                  # Inputs answered from history
 
 
 class ClassifierError(Exception):
@@ -114,6 +124,7 @@ async def classify_items(
     alta_client: AltaClient,
     user_id: str | None = None,
     today: date | None = None,
+    organization_id: str | None = None,
 ) -> ClassifyOutcome:
     """Run Alta Express on a batch of product descriptions.
 
@@ -121,15 +132,20 @@ async def classify_items(
     cached batch (request_id = stable sha256). Retries don't burn
     additional packets within ~24h.
 
+    With ``organization_id`` set, inputs whose product was already
+    classified and confirmed in that org are answered from the history
+    index (``source='history'``) and never reach Alta.
+
     Raises:
         ClassifierError(BAD_REQUEST) — empty inputs.
         ClassifierError(PACKET_EXHAUSTED) — left_count below floor;
             blocks new calls so the cron revalidation budget is preserved.
+            Not raised when history answers every input.
         ClassifierError(ALTA_UNAVAILABLE) — AltaApiError or network error.
 
     Side effects:
         Writes one audit row per input to ``kvota.tnved_classification_log``
-        (method='express'). The row carries the suggested codes; the
+        (method='express', or 'history' for index hits). The row carries the suggested codes; the
         ``chosen_code`` column is filled later by ``log_classification_choice``
         when the customs-specialist confirms a pick.
     """
@@ -137,62 +153,81 @@ async def classify_items(
         raise ClassifierError("BAD_REQUEST", "items list must not be empty")
 
     today = today or date.today()
-    request_id = _build_request_id(inputs, today)
 
-    # Pre-flight packet check: refuse if Alta is running low. last_packet_left
-    # is populated by Alta Такса/xml_nodes calls earlier in the session;
-    # may be None on a fresh process — we let the call proceed in that case
-    # and rely on the post-call alerting (Phase 1 packet warning) for ops.
-    if (
-        alta_client.last_packet_left is not None
-        and alta_client.last_packet_left < _PACKET_FLOOR
-    ):
-        raise ClassifierError(
-            "PACKET_EXHAUSTED",
-            f"Alta packet running low ({alta_client.last_packet_left} remaining). "
-            "Classification deferred — top up the prepaid quota.",
-        )
-
-    express_items = [
-        ExpressItem(id=idx, name=_compose_query(inp))
-        for idx, inp in enumerate(inputs, start=1)
+    # History first — confirmed picks need no Alta packet.
+    history_hits: dict[int, tnved_suggestion_index.Suggestion] = {}
+    if organization_id:
+        sb = get_supabase()
+        for idx, inp in enumerate(inputs, start=1):
+            hit = tnved_suggestion_index.lookup(
+                organization_id,
+                name=inp.name,
+                brand=inp.brand,
+                product_code=inp.product_code,
+                sb=sb,
+            )
+            if hit is not None:
+                history_hits[idx] = hit
+    misses = [
+        (idx, inp) for idx, inp in enumerate(inputs, start=1)
+        if idx not in history_hits
     ]
+    request_id = _build_request_id([inp for _, inp in misses] or inputs, today)
 
-    try:
-        response = await alta_client.classify_batch(
-            express_items, request_id=request_id,
-        )
-    except AltaApiError as e:
-        logger.error(
-            "classifier: Alta error %s for request_id=%s: %s",
-            e.code, request_id, e.message,
-        )
-        raise ClassifierError("ALTA_UNAVAILABLE", e.message) from e
-    except Exception as e:
-        logger.error(
-            "classifier: Alta call crashed for request_id=%s: %s",
-            request_id, e,
-        )
-        raise ClassifierError("ALTA_UNAVAILABLE", str(e)) from e
-
-    # Group predictions by the 1-based id we set on each ExpressItem.
-    # Alta returns the top candidates flat — UI wants top-K per input.
     by_id: dict[int, list[Any]] = {}
-    for pred in response.predictions:
-        by_id.setdefault(pred.id, []).append(pred)
-    for preds in by_id.values():
-        preds.sort(
-            key=lambda p: (p.probability, p.code_weight),
-            reverse=True,
+    packet_left = alta_client.last_packet_left
+    packet_used: int | None = None
+    if misses:
+        response = await _classify_via_alta(
+            misses, alta_client=alta_client, request_id=request_id,
+        )
+        # Group predictions by the 1-based id we set on each ExpressItem.
+        # Alta returns the top candidates flat — UI wants top-K per input.
+        for pred in response.predictions:
+            by_id.setdefault(pred.id, []).append(pred)
+        for preds in by_id.values():
+            preds.sort(
+                key=lambda p: (p.probability, p.code_weight),
+                reverse=True,
+            )
+        packet_left = response.packet_left
+        packet_used = response.packet_used
+    else:
+        tnved_suggestion_index.record_packets_saved(1)
+        logger.info(
+            "classifier: %d inputs answered from history — Alta Express skipped",
+            len(inputs),
         )
 
     # Best-effort description enrichment from the local cache. One round-
     # trip total — we collect every code first.
-    all_codes = sorted({p.code for preds in by_id.values() for p in preds})
+    all_codes = sorted(
+        {p.code for preds in by_id.values() for p in preds}
+        | {hit.code for hit in history_hits.values()}
+    )
     description_by_code = _fetch_descriptions(all_codes)
 
     results: list[ClassifyResult] = []
     for idx, inp in enumerate(inputs, start=1):
+        hit = history_hits.get(idx)
+        if hit is not None:
+            results.append(
+                ClassifyResult(
+                    input_idx=idx,
+                    name=inp.name,
+                    quote_item_id=inp.quote_item_id,
+                    candidates=[
+                        Candidate(
+                            code=hit.code,
+                            probability=hit.score,
+                            code_weight=hit.confirmations,
+                            description=description_by_code.get(hit.code),
+                        )
+                    ],
+                    source="history",
+                )
+            )
+            continue
         preds = (by_id.get(idx) or [])[:_TOP_K]
         candidates = [
             Candidate(
@@ -216,19 +251,73 @@ async def classify_items(
 
     # Audit log — fire-and-forget, never block the response.
     _log_classifications(
-        results=results,
+        results=[r for r in results if r.source == "alta"],
         user_id=user_id,
         method="express",
     )
+    _log_classifications(
+        results=[r for r in results if r.source == "history"],
+        user_id=user_id,
+        method="history",
+    )
 
     return ClassifyOutcome(
         results=results,
-        packet_left=response.packet_left,
-        packet_used=response.packet_used,
+        packet_left=packet_left,
+        packet_used=packet_used,
         request_id=request_id,
+        index_hits=len(history_hits),
     )
 
 
+async def _classify_via_alta(
+    misses: list[tuple[int, ClassifyInput]],
+    *,
+    alta_client: AltaClient,
+    request_id: str,
+):
+    """Send the inputs the history index couldn't answer to Alta Express.
+
+    ExpressItem ids keep the caller's 1-based input index so predictions
+    map back to the full input list.
+    """
+    # Pre-flight packet check: refuse if Alta is running low. last_packet_left
+    # is populated by Alta Такса/xml_nodes calls earlier in the session;
+    # may be None on a fresh process — we let the call proceed in that case
+    # and rely on the post-call alerting (Phase 1 packet warning) for ops.
+    if (
+        alta_client.last_packet_left is not None
+        and alta_client.last_packet_left < _PACKET_FLOOR
+    ):
+        raise ClassifierError(
+            "PACKET_EXHAUSTED",
+            f"Alta packet running low ({alta_client.last_packet_left} remaining). "
+            "Classification deferred — top up the prepaid quota.",
+        )
+
+    express_items = [
+        ExpressItem(id=idx, name=_compose_query(inp))
+        for idx, inp in misses
+    ]
+
+    try:
+        return await alta_client.classify_batch(
+            express_items, request_id=request_id,
+        )
+    except AltaApiError as e:
+        logger.error(
+            "classifier: Alta error %s for request_id=%s: %s",
+            e.code, request_id, e.message,
+        )
+        raise ClassifierError("ALTA_UNAVAILABLE", e.message) from e
+    except Exception as e:
+        logger.error(
+            "classifier: Alta call crashed for request_id=%s: %s",
+            request_id, e,
+        )
+        raise ClassifierError("ALTA_UNAVAILABLE", str(e)) from e
+
+
 def log_classification_choice(
     *,
     quote_item_id: str,
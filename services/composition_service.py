@@ -22,6 +22,8 @@ Public API (signature-preserved from Phase 5b):
     get_composed_items(quote_id, supabase) -> list[dict]
         Adapter — feeds ``build_calculation_inputs()`` at 3 call sites in
         main.py.
+    compose_items(qi_rows, coverage_rows) -> list[dict]
+        Same result from pre-loaded rows (export loader).
     get_composition_view(quote_id, supabase, user_id=None) -> dict
         For the GET /api/quotes/{id}/composition endpoint. Alternatives
         are grouped per invoice (not per invoice_item). Each alternative
@@ -291,12 +293,7 @@ def get_composed_items(quote_id: str, supabase) -> list[dict]:
     )
     qi_rows: list[dict] = items_resp.data or []
 
-    selected_invoice_ids = {
-        qi.get("composition_selected_invoice_id")
-        for qi in qi_rows
-        if qi.get("composition_selected_invoice_id")
-    }
-    if not selected_invoice_ids:
+    if not any(qi.get("composition_selected_invoice_id") for qi in qi_rows):
         # Legacy fallback: no composition selected anywhere → emit each qi
         # with None pricing. Single query total.
         return [_legacy_shape(qi) for qi in qi_rows]
@@ -304,7 +301,17 @@ def get_composed_items(quote_id: str, supabase) -> list[dict]:
     coverage_rows = _load_coverage_with_items(
         [qi["id"] for qi in qi_rows], supabase
     )
+    return compose_items(qi_rows, coverage_rows)
+
 
+def compose_items(qi_rows: list[dict], coverage_rows: list[dict]) -> list[dict]:
+    """Pure core of :func:`get_composed_items` (no I/O).
+
+    ``qi_rows`` are full quote_items rows in display order; ``coverage_rows``
+    are coverage rows with an embedded ``invoice_items`` dict (the shape of
+    ``_load_coverage_with_items``). Used directly by callers that already
+    hold both, e.g. services/export_loader.py.
+    """
     # Group coverage by quote_item_id, filtered to rows whose invoice_item
     # belongs to the invoice THIS quote_item has selected.
     by_qi: dict[str, list[dict]] = defaultdict(list)
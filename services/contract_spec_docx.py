@@ -25,6 +25,7 @@ from services.contract_spec_export import (
     CALC_FIELDS,
     VAT_RATE,
 )
+from services import render_cache
 from services.export_data_mapper import (
     format_date_russian_long,
     format_number_russian,
@@ -196,6 +197,15 @@ def generate_contract_spec_docx(spec_id: str, org_id: str) -> bytes:
     # 1. Fetch data using existing function
     data = fetch_contract_spec_data(spec_id, org_id)
 
+    # Served from the render cache when neither the data nor the template
+    # changed since the last download.
+    return render_cache.get_or_render(
+        "contract_spec_docx", data, lambda: _render_contract_spec_docx(data)
+    )
+
+
+def _render_contract_spec_docx(data: Dict[str, Any]) -> bytes:
+    """Build the DOCX from fetch_contract_spec_data output."""
     spec = data["specification"]
     quote = data["quote"]
     items = data["items"]
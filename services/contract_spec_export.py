@@ -20,7 +20,8 @@ from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime
 
 from services.database import get_supabase
-from services.composition_service import get_effective_quantities
+from services.export_loader import load_export_bundle
+from services import render_cache
 from services.export_data_mapper import (
     enrich_with_legal_names,
     format_date_russian,
@@ -108,120 +109,39 @@ def fetch_contract_spec_data(spec_id: str, org_id: str) -> Dict[str, Any]:
     Returns dict with specification, quote, items, customer, seller_company,
     contract, signatory, calculation totals, calculation variables, and spec_count.
     """
-    supabase = get_supabase()
-
-    # 1. Fetch specification with contract
-    spec_result = supabase.table("specifications") \
-        .select("*, customer_contracts(id, contract_number, contract_date)") \
-        .eq("id", spec_id) \
-        .eq("organization_id", org_id) \
-        .execute()
-
-    if not spec_result.data:
-        raise ValueError(f"Specification not found: {spec_id}")
-
-    spec = spec_result.data[0]
-    contract = spec.get("customer_contracts") or {}
-    quote_id = spec.get("quote_id")
-    contract_id = contract.get("id")
-
-    # 1a. Count specifications for this contract (for "Приложение № X")
-    spec_count = 1
-    if contract_id:
-        count_result = supabase.table("specifications") \
-            .select("id, created_at") \
-            .eq("contract_id", contract_id) \
-            .order("created_at") \
-            .execute()
-
-        if count_result.data:
-            # Find position of current spec in the list
-            for i, s in enumerate(count_result.data, 1):
-                if s["id"] == spec_id:
-                    spec_count = i
-                    break
-
-    # 2. Fetch quote with related entities
-    quote_result = supabase.table("quotes") \
-        .select("*, customers(id, name, inn, address, postal_address), seller_companies(id, name, inn, general_director_last_name, general_director_first_name, general_director_patronymic, general_director_position, registration_address)") \
-        .eq("id", quote_id) \
-        .execute()
-
-    quote = quote_result.data[0] if quote_result.data else {}
-    customer = quote.get("customers") or {}
-    seller_company = quote.get("seller_companies") or {}
-
-    # 3. Fetch quote items with calculations
-    items_result = supabase.table("quote_items") \
-        .select("*") \
-        .eq("quote_id", quote_id) \
-        .order("position") \
-        .execute()
-
-    items = items_result.data or []
-
-    # 4. Fetch calculation results for all items in ONE batch query (N+1 fix)
-    if items:
-        item_ids = [item["id"] for item in items]
-        calc_results = supabase.table("quote_calculation_results") \
-            .select("quote_item_id, phase_results") \
-            .in_("quote_item_id", item_ids) \
-            .execute()
+    # Specification + contract, spec position, quote, customer, seller,
+    # items, calc results, coverage, summary, signatory, organization and
+    # calc variables in one round trip.
+    bundle = load_export_bundle(org_id, spec_id=spec_id, supabase=get_supabase())
+
+    spec = bundle.specification
+    contract = bundle.contract
+    # Position among the contract's specifications (for "Приложение № X")
+    spec_count = bundle.spec_position
 
-        # Create lookup dict for O(1) access
-        calc_lookup = {r["quote_item_id"]: r.get("phase_results", {}) for r in (calc_results.data or [])}
+    quote = bundle.quote
+    customer = bundle.customer
+    seller_company = bundle.seller_company or {}
 
-        # Merge calculation results into items
+    items = [dict(item) for item in bundle.quote_items]
+    if items:
         for item in items:
-            item["calc"] = calc_lookup.get(item["id"], {})
+            item["calc"] = bundle.calc_for(item["id"])
 
         # Supplier-quantity override: display the effective qty the engine used
         # (invoice_item.quantity base) so the contract per-unit price
         # (= line total / qty) and total qty stay correct.
-        effective_qtys = get_effective_quantities(quote_id, supabase)
+        effective_qtys = bundle.effective_quantities()
         for item in items:
             item["effective_quantity"] = effective_qtys.get(
                 item["id"], item.get("quantity")
             )
 
-    # 5. Fetch calculation summary
-    summary_result = supabase.table("quote_calculation_summaries") \
-        .select("*") \
-        .eq("quote_id", quote_id) \
-        .execute()
-
-    calculations = summary_result.data[0] if summary_result.data else {}
-
-    # 6. Fetch signatory from customer_contacts
-    signatory = {}
-    if customer.get("id"):
-        signatory_result = supabase.table("customer_contacts") \
-            .select("name, position") \
-            .eq("customer_id", customer.get("id")) \
-            .eq("is_signatory", True) \
-            .limit(1) \
-            .execute()
-
-        if signatory_result.data:
-            signatory = signatory_result.data[0]
-
-    # 7. Fetch organization for fallback
-    org_result = supabase.table("organizations") \
-        .select("*") \
-        .eq("id", org_id) \
-        .execute()
-
-    organization = org_result.data[0] if org_result.data else {}
-
-    # 8. Fetch calculation variables (for payment terms, incoterms, delivery time)
-    calc_vars_result = supabase.table("quote_calculation_variables") \
-        .select("variables") \
-        .eq("quote_id", quote_id) \
-        .execute()
-
-    calc_variables = {}
-    if calc_vars_result.data:
-        calc_variables = calc_vars_result.data[0].get("variables", {})
+    calculations = bundle.summary
+    signatory = bundle.signatory
+    organization = bundle.organization
+    # Payment terms, incoterms, delivery time
+    calc_variables = bundle.variables
 
     # Enrich company names with DaData legal names
     enrich_with_legal_names(seller_company, customer, organization)
@@ -245,7 +165,7 @@ def _effective_qty(item: Dict) -> int:
     """Effective (supplier-override) line quantity for display.
 
     Reads the ``effective_quantity`` enrichment (set by
-    ``fetch_contract_spec_data`` from ``get_effective_quantities``) when
+    ``fetch_contract_spec_data`` from the export bundle) when
     present, else the ordered quantity. Floored to >= 1 so the per-unit price
     (line total / qty) never divides by zero — preserves the prior
     ``max(... or 1, 1)`` behaviour.
@@ -731,10 +651,12 @@ def generate_contract_spec_pdf(spec_id: str, org_id: str) -> Tuple[bytes, str]:
         data = fetch_contract_spec_data(spec_id, org_id)
 
         # Generate HTML (no delivery_conditions parameter - uses fixed template)
-        html = generate_contract_spec_html(data)
-
-        # Generate PDF
-        pdf_bytes = HTML(string=html).write_pdf()
+        # → PDF, or serve the cached render of the same data
+        pdf_bytes = render_cache.get_or_render(
+            "contract_spec_pdf",
+            data,
+            lambda: HTML(string=generate_contract_spec_html(data)).write_pdf(),
+        )
 
         # Return spec_number along with PDF bytes
         spec_number = data["specification"].get("specification_number") or data["specification"].get("proposal_idn") or "spec"
@@ -21,6 +21,8 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT
 from docx.oxml.ns import qn
 
+from services import render_cache
+
 
 def generate_currency_invoice_docx(
     invoice: dict,
@@ -44,6 +46,22 @@ def generate_currency_invoice_docx(
     Returns:
         DOCX file as bytes.
     """
+    # Served from the render cache when neither the inputs nor the template
+    # changed since the last download.
+    return render_cache.get_or_render(
+        "currency_invoice_docx",
+        (invoice, seller, buyer, items),
+        lambda: _render_currency_invoice_docx(invoice, seller, buyer, items),
+    )
+
+
+def _render_currency_invoice_docx(
+    invoice: dict,
+    seller: dict,
+    buyer: dict,
+    items: list[dict],
+) -> bytes:
+    """Build the DOCX (see generate_currency_invoice_docx)."""
     doc = Document()
 
     # -- Page setup --
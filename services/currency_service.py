@@ -174,12 +174,22 @@ def get_rates_from_db(rate_date: date) -> dict[str, Decimal]:
 def ensure_rates_available(rate_date: Optional[date] = None) -> dict[str, Decimal]:
     """
     Ensure exchange rates are available for the given date.
-    Fetches from CBR and caches in DB if not already present.
+    Past dates are answered from the rate history when it covers them;
+    otherwise fetches from CBR and caches in DB if not already present.
     Returns the rates dict.
     """
     if rate_date is None:
         rate_date = date.today()
 
+    # Past dates: rates in force on that date from the local history
+    # (kvota.exchange_rates, see cbr_rates_service) — no network round trip.
+    if rate_date < date.today():
+        from services.cbr_rates_service import get_historical_rates
+
+        rates = get_historical_rates(rate_date)
+        if rates and len(rates) >= 4:
+            return rates
+
     # First try to get from database
     rates = get_rates_from_db(rate_date)
 
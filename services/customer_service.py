@@ -602,9 +602,6 @@ def search_customers(
     try:
         supabase = _get_supabase()
 
-        search_pattern = f"%{query}%"
-
-        # Search in name (primary)
         base_query = supabase.table("customers").select("*")\
             .eq("organization_id", organization_id)
 
@@ -616,35 +613,22 @@ def search_customers(
         if manager_id is not None:
             base_query = base_query.eq("manager_id", manager_id)
 
-        result = base_query.ilike("name", search_pattern)\
+        # Name, or name OR INN for digit queries — one trigram-indexed
+        # query (migration 346) instead of a second INN pass.
+        if query.isdigit():
+            from services.search_service import ilike_any
+
+            base_query = base_query.or_(ilike_any(("name", "inn"), query))
+        else:
+            base_query = base_query.ilike("name", f"%{query}%")
+
+        result = base_query\
             .order("name")\
             .limit(limit)\
             .execute()
 
         customers = [_parse_customer(row) for row in result.data] if result.data else []
 
-        # If not enough results and query is digits, also search by INN
-        if len(customers) < limit and query.isdigit():
-            inn_query = supabase.table("customers").select("*")\
-                .eq("organization_id", organization_id)\
-                .ilike("inn", search_pattern)
-
-            if is_active is True:
-                inn_query = inn_query.eq("status", "active")
-            elif is_active is False:
-                inn_query = inn_query.neq("status", "active")
-
-            if manager_id is not None:
-                inn_query = inn_query.eq("manager_id", manager_id)
-
-            inn_result = inn_query.limit(limit - len(customers)).execute()
-
-            if inn_result.data:
-                existing_ids = {c.id for c in customers}
-                for row in inn_result.data:
-                    if row["id"] not in existing_ids:
-                        customers.append(_parse_customer(row))
-
         return customers
 
     except Exception as e:
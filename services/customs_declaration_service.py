@@ -239,6 +239,12 @@ def parse_gtd_xml(file_path: str) -> GTDParseResult:
     """
     Parse an AltaGTD XML file and extract declaration data.
 
+    Streams the file with ``ET.iterparse``: each TOVG becomes a GTDItem as
+    soon as it closes and each BLOCK is distributed and detached from the
+    tree when it closes, so memory stays flat in the number of blocks and
+    items. Files expat can't stream (broken encoding prolog) fall back to
+    the in-memory path.
+
     Args:
         file_path: Path to the XML file (windows-1251 or utf-8 encoded).
 
@@ -247,9 +253,8 @@ def parse_gtd_xml(file_path: str) -> GTDParseResult:
     """
     result = GTDParseResult()
 
-    # Read and parse XML
     try:
-        raw_bytes = _read_file(file_path)
+        f = open(file_path, "rb")
     except FileNotFoundError:
         result.errors.append(f"File not found: {file_path}")
         return result
@@ -257,26 +262,38 @@ def parse_gtd_xml(file_path: str) -> GTDParseResult:
         result.errors.append(f"Error reading file: {str(e)}")
         return result
 
-    try:
-        root = _parse_xml_bytes(raw_bytes)
-    except ET.ParseError as e:
-        result.errors.append(f"Invalid XML: {str(e)}")
-        return result
-    except Exception as e:
-        result.errors.append(f"Error parsing XML: {str(e)}")
-        return result
+    with f:
+        try:
+            root = _stream_blocks(f, result)
+        except ET.ParseError:
+            root = None
+        except Exception as e:
+            result.errors.append(f"Error parsing XML: {str(e)}")
+            return result
 
-    # Validate root element
-    if root.tag != "AltaGTD":
+    if root is None:
+        # Streaming failed — retry with the tolerant in-memory parser.
+        result = GTDParseResult()
+        try:
+            raw_bytes = _read_file(file_path)
+            root = _parse_xml_bytes(raw_bytes)
+        except ET.ParseError as e:
+            result.errors.append(f"Invalid XML: {str(e)}")
+            return result
+        except Exception as e:
+            result.errors.append(f"Error parsing XML: {str(e)}")
+            return result
+        if root.tag != "AltaGTD":
+            result.errors.append(f"Not an AltaGTD XML file (root element: {root.tag})")
+            return result
+        _parse_blocks(root, result)
+    elif root.tag != "AltaGTD":
         result.errors.append(f"Not an AltaGTD XML file (root element: {root.tag})")
         return result
 
-    # Parse header fields
+    # Parse header fields (root keeps only the small non-BLOCK children)
     _parse_header(root, result)
 
-    # Parse BLOCK elements
-    _parse_blocks(root, result)
-
     # Parse B_1/B_2/B_3 totals
     result.total_fee_rub = _parse_b_total(root, "B_1")
     result.total_duty_rub = _parse_b_total(root, "B_2")
@@ -285,6 +302,41 @@ def parse_gtd_xml(file_path: str) -> GTDParseResult:
     return result
 
 
+def _stream_blocks(source, result: GTDParseResult):
+    """
+    Stream BLOCK/TOVG elements out of ``source`` into ``result.items``.
+
+    Returns the root element with every BLOCK already removed, or the
+    root as soon as it turns out not to be AltaGTD (nothing is parsed).
+    Raises ET.ParseError on malformed input.
+    """
+    root = None
+    block = None
+    block_items: List[GTDItem] = []
+    depth = 0
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if depth == 1:
+                root = elem
+                if root.tag != "AltaGTD":
+                    return root
+            elif depth == 2 and elem.tag == "BLOCK":
+                block = elem
+                block_items = []
+            continue
+
+        depth -= 1
+        if block is not None and depth == 2 and elem.tag == "TOVG":
+            block_items.append(_item_from_tovg(elem))
+            block.remove(elem)
+        elif elem is block:
+            result.items.extend(_apply_block(block, block_items))
+            root.remove(block)
+            block = None
+    return root
+
+
 def _read_file(file_path: str) -> bytes:
     """Read file as raw bytes."""
     with open(file_path, "rb") as f:
@@ -343,61 +395,60 @@ def _parse_header(root, result: GTDParseResult):
 
 
 def _parse_blocks(root, result: GTDParseResult):
-    """Parse all BLOCK elements and their TOVG children."""
+    """Parse all BLOCK elements and their TOVG children (in-memory path)."""
     for block in root.findall("BLOCK"):
-        # Block-level data
-        hs_code = _text(block, "G_33_1")
-        customs_value_rub = _decimal(block, "G_45_0")
+        items = [_item_from_tovg(tovg) for tovg in block.findall("TOVG")]
+        result.items.extend(_apply_block(block, items))
 
-        # Parse G_47 payments for this block
-        block_payments = _parse_block_payments(block)
 
-        # Find all TOVG elements in this block
-        tovgs = block.findall("TOVG")
-        if not tovgs:
-            # No items in this block, skip
-            continue
+def _item_from_tovg(tovg) -> GTDItem:
+    """Build a GTDItem from one TOVG element (payments filled by _apply_block)."""
+    item = GTDItem()
+    item.sku = _text(tovg, "G31_15") or None
+    item.description = _text(tovg, "G31_1") or None
+    item.manufacturer = _text(tovg, "G31_11") or None
+    item.brand = _text(tovg, "G31_14") or None
 
-        # Collect invoice costs for proportional distribution
-        tovg_costs = []
-        for tovg in tovgs:
-            cost = _decimal(tovg, "INVOICCOST")
-            tovg_costs.append(cost)
-
-        # Distribute payments and customs_value_rub proportionally
-        distributed = _distribute_payments(tovg_costs, block_payments, customs_value_rub)
-
-        # Parse each TOVG
-        for idx, tovg in enumerate(tovgs):
-            item = GTDItem()
-            item.sku = _text(tovg, "G31_15") or None
-            item.description = _text(tovg, "G31_1") or None
-            item.manufacturer = _text(tovg, "G31_11") or None
-            item.brand = _text(tovg, "G31_14") or None
-
-            # Quantity
-            kolvo_text = _text(tovg, "KOLVO", "0")
-            try:
-                item.quantity = int(Decimal(kolvo_text))
-            except (InvalidOperation, ValueError):
-                item.quantity = 0
+    # Quantity
+    kolvo_text = _text(tovg, "KOLVO", "0")
+    try:
+        item.quantity = int(Decimal(kolvo_text))
+    except (InvalidOperation, ValueError):
+        item.quantity = 0
 
-            item.unit = _text(tovg, "NAME_EDI") or None
-            item.gross_weight = _decimal(tovg, "G31_35")
-            item.net_weight = _decimal(tovg, "G31_38")
-            item.invoice_cost = _decimal(tovg, "INVOICCOST")
+    item.unit = _text(tovg, "NAME_EDI") or None
+    item.gross_weight = _decimal(tovg, "G31_35")
+    item.net_weight = _decimal(tovg, "G31_38")
+    item.invoice_cost = _decimal(tovg, "INVOICCOST")
+    return item
 
-            # Block-level data shared by all TOVGs
-            item.hs_code = hs_code
 
-            # Distributed payments and customs_value_rub
-            if idx < len(distributed):
-                item.fee_rub = distributed[idx]["fee_rub"]
-                item.duty_rub = distributed[idx]["duty_rub"]
-                item.vat_rub = distributed[idx]["vat_rub"]
-                item.customs_value_rub = distributed[idx]["customs_value_rub"]
+def _apply_block(block, items: List[GTDItem]) -> List[GTDItem]:
+    """Stamp block-level data on a block's items and distribute its payments."""
+    if not items:
+        # No items in this block, skip
+        return []
+
+    # Block-level data shared by all TOVGs
+    hs_code = _text(block, "G_33_1")
+    customs_value_rub = _decimal(block, "G_45_0")
 
-            result.items.append(item)
+    # Parse G_47 payments for this block
+    block_payments = _parse_block_payments(block)
+
+    # Distribute payments and customs_value_rub proportionally by INVOICCOST
+    distributed = _distribute_payments(
+        [item.invoice_cost for item in items], block_payments, customs_value_rub
+    )
+
+    for idx, item in enumerate(items):
+        item.hs_code = hs_code
+        if idx < len(distributed):
+            item.fee_rub = distributed[idx]["fee_rub"]
+            item.duty_rub = distributed[idx]["duty_rub"]
+            item.vat_rub = distributed[idx]["vat_rub"]
+            item.customs_value_rub = distributed[idx]["customs_value_rub"]
+    return items
 
 
 # =============================================================================
@@ -574,11 +625,77 @@ def get_declaration_items(declaration_id: str, org_id: str) -> List[Dict[str, An
 # Deal Matching (best-effort)
 # =============================================================================
 
+# SKUs per joined lookup. Bounds the PostgREST URL length; a typical
+# declaration fits in a single query.
+_MATCH_SKUS_PER_QUERY = 200
+
+# Item ids per ``UPDATE ... WHERE id IN (...)``.
+_MATCH_UPDATE_CHUNK = 500
+
+
+def _sku_key(sku: Optional[str]) -> str:
+    """Case-insensitive SKU match key (mirrors the old per-item ILIKE)."""
+    return (sku or "").strip().casefold()
+
+
+def _ilike_any_pattern(skus: List[str]) -> str:
+    """Quote SKUs as Postgres array elements for ``ilike(any).{...}``.
+
+    Quoting keeps commas, braces and spaces inside a SKU from splitting
+    the list.
+    """
+    quoted = []
+    for sku in skus:
+        escaped = sku.replace("\\", "\\\\").replace('"', '\\"')
+        quoted.append(f'"{escaped}"')
+    return ",".join(quoted)
+
+
+def _deal_by_sku(client, skus: List[str], org_id: str) -> Dict[str, str]:
+    """
+    Resolve SKU -> deal_id with one joined lookup per chunk of SKUs.
+
+    Walks quote_items -> quotes (org filter) -> specifications -> deals in a
+    single embedded select. The first row returned for a SKU wins, as the
+    per-item loop did.
+    """
+    deal_by_sku: Dict[str, str] = {}
+    for start in range(0, len(skus), _MATCH_SKUS_PER_QUERY):
+        chunk = skus[start:start + _MATCH_SKUS_PER_QUERY]
+        resp = client.table("quote_items").select(
+            "sku, quote_id, "
+            "quotes!inner(id, organization_id, "
+            "specifications!inner(id, deals!inner(id)))"
+        ).ilike_any_of("sku", _ilike_any_pattern(chunk)).eq(
+            "quotes.organization_id", org_id
+        ).execute()
+
+        for qi in resp.data or []:
+            key = _sku_key(qi.get("sku"))
+            if not key or key in deal_by_sku:
+                continue
+            specs = (qi.get("quotes") or {}).get("specifications") or []
+            if isinstance(specs, dict):
+                specs = [specs]
+            for spec in specs:
+                deals = spec.get("deals") or []
+                if isinstance(deals, dict):
+                    deals = [deals]
+                if deals and deals[0].get("id"):
+                    deal_by_sku[key] = deals[0]["id"]
+                    break
+    return deal_by_sku
+
+
 def match_items_to_deals(declaration_id: str, org_id: str) -> int:
     """
     Attempt to match declaration items to existing deals by SKU.
     Updates matched items with deal_id and matched_at timestamp.
 
+    Set-based: one joined quote_items -> quotes -> specifications -> deals
+    lookup for all SKUs of the declaration, then one UPDATE per distinct
+    deal (``id IN (...)``) instead of N x M per-item round-trips.
+
     This is a best-effort operation: failures are logged but do not raise.
 
     Args:
@@ -593,59 +710,37 @@ def match_items_to_deals(declaration_id: str, org_id: str) -> int:
         client = _get_supabase()
         items = get_declaration_items(declaration_id, org_id)
 
+        skus_by_key: Dict[str, str] = {}
         for item in items:
-            sku = item.get("sku")
-            if not sku:
-                continue
-
-            try:
-                # Search for matching SKU in quote_items, filtered by org_id
-                # through quotes table to prevent cross-org data leak
-                qi_resp = client.table("quote_items").select(
-                    "id, quote_id, quotes!inner(id, organization_id)"
-                ).ilike("sku", sku).eq(
-                    "quotes.organization_id", org_id
-                ).execute()
-
-                if not qi_resp.data:
-                    continue
-
-                # Try to find a deal through: quote -> specification -> deal
-                for qi in qi_resp.data:
-                    quote_id = qi.get("quote_id")
-                    if not quote_id:
-                        continue
-
-                    spec_resp = client.table("specifications").select(
-                        "id"
-                    ).eq("quote_id", quote_id).execute()
-
-                    if not spec_resp.data:
-                        continue
+            key = _sku_key(item.get("sku"))
+            if key:
+                skus_by_key.setdefault(key, item["sku"].strip())
+        if not skus_by_key:
+            return 0
 
-                    spec_id = spec_resp.data[0]["id"]
+        deal_by_sku = _deal_by_sku(client, list(skus_by_key.values()), org_id)
 
-                    deal_resp = client.table("deals").select(
-                        "id"
-                    ).eq("specification_id", spec_id).execute()
-
-                    if not deal_resp.data:
-                        continue
-
-                    deal_id = deal_resp.data[0]["id"]
-
-                    # Update the declaration item with deal match
+        item_ids_by_deal: Dict[str, List[str]] = {}
+        for item in items:
+            deal_id = deal_by_sku.get(_sku_key(item.get("sku")))
+            if deal_id:
+                item_ids_by_deal.setdefault(deal_id, []).append(item["id"])
+
+        matched_at = datetime.now(timezone.utc).isoformat()
+        for deal_id, item_ids in item_ids_by_deal.items():
+            for start in range(0, len(item_ids), _MATCH_UPDATE_CHUNK):
+                chunk = item_ids[start:start + _MATCH_UPDATE_CHUNK]
+                try:
                     client.table("customs_declaration_items").update({
                         "deal_id": deal_id,
-                        "matched_at": datetime.now(timezone.utc).isoformat(),
-                    }).eq("id", item["id"]).execute()
-
-                    matched += 1
-                    break  # First match wins for this item
-
-            except Exception as e:
-                logger.warning(f"Match failed for item {item.get('id')}: {e}")
-                continue
+                        "matched_at": matched_at,
+                    }).in_("id", chunk).execute()
+                    matched += len(chunk)
+                except Exception as e:
+                    logger.warning(
+                        f"Match update failed for deal {deal_id} "
+                        f"({len(chunk)} items): {e}"
+                    )
 
     except Exception as e:
         logger.error(f"Deal matching failed: {e}")
@@ -11,7 +11,8 @@ sent months ago re-render with the same numbers.
 Three-tier graceful degradation (Q4 = Option C + user notifications):
 
     Tier 1 (preferred) — live Alta call:
-        Each item's rates fetched fresh via rate_resolver. Returns
+        All items' rates fetched in one ``rate_resolver.resolve_rates_batch``
+        call (one Alta call per distinct code+country miss). Returns
         FreezeSnapshotResult(status='ok', source_at_freeze='alta-live').
         UI: silent.
 
@@ -40,7 +41,13 @@ from typing import TYPE_CHECKING, Any, Literal, Union
 
 from services.alta_client import notify_admin
 from services.database import get_supabase
-from services.rate_resolver import CACHE_TTL, ResolveOutcome, resolve_rate
+from services.rate_resolver import (
+    CACHE_TTL,
+    BatchResolveResult,
+    RateRequest,
+    ResolveOutcome,
+    resolve_rates_batch,
+)
 
 if TYPE_CHECKING:
     from services.alta_client import AltaClient
@@ -134,7 +141,8 @@ async def build_snapshot(
 ) -> FreezeSnapshotResult:
     """Capture a customs-rates snapshot for every quote_item under quote_id.
 
-    Iterates each item; per-item three-tier fallback. The aggregate
+    Resolves every eligible item in one ``resolve_rates_batch`` call, then
+    applies the per-item three-tier fallback. The aggregate
     status is the WORST tier hit across all items:
         any item Tier 3 (abort)        → result.status = 'abort'
         else any item Tier 2 (cache)   → result.status = 'cache-stale'
@@ -170,24 +178,41 @@ async def build_snapshot(
     warnings: list[str] = []
     abort_messages: list[str] = []
 
-    for item in items:
-        item_id = item["id"]
-        tnved_code = item.get("hs_code")
-        country_oksm = item.get("country_of_origin_oksm")
+    # Skip items without prerequisites — they don't block freeze
+    eligible = [
+        item for item in items
+        if item.get("hs_code") and item.get("country_of_origin_oksm") is not None
+    ]
+    requests = [
+        RateRequest(
+            tnved_code=item["hs_code"],
+            country_oksm=item["country_of_origin_oksm"],
+            target_date=today,
+            has_certificate=bool(item.get("has_origin_certificate")),
+            has_sp_certificate=bool(item.get("has_fta_certificate")),
+        )
+        for item in eligible
+    ]
+    # Tier 1 for the whole quote at once
+    resolved_batch = (
+        await resolve_rates_batch(
+            requests, _DEFAULT_PAYMENT_TYPES, alta_client=alta_client,
+        )
+        if requests else []
+    )
 
-        # Skip items without prerequisites — they don't block freeze
-        if not tnved_code or country_oksm is None:
-            continue
+    for item, req, resolved in zip(eligible, requests, resolved_batch):
+        item_id = item["id"]
 
         item_status, item_source, rates, item_warnings, item_abort_msg = (
-            await _capture_item(
+            _capture_item(
                 sb=sb,
-                alta_client=alta_client,
-                tnved_code=tnved_code,
-                country_oksm=country_oksm,
+                resolved=resolved,
+                tnved_code=req.tnved_code,
+                country_oksm=req.country_oksm,
                 target_date=today,
-                has_certificate=bool(item.get("has_origin_certificate")),
-                has_sp_certificate=bool(item.get("has_fta_certificate")),
+                has_certificate=req.has_certificate,
+                has_sp_certificate=req.has_sp_certificate,
             )
         )
 
@@ -238,10 +263,10 @@ async def build_snapshot(
     return OkSnapshot(items=snapshot_items)
 
 
-async def _capture_item(
+def _capture_item(
     *,
     sb: Any,
-    alta_client: AltaClient,
+    resolved: BatchResolveResult,
     tnved_code: str,
     country_oksm: int,
     target_date: date,
@@ -250,9 +275,10 @@ async def _capture_item(
 ) -> tuple[SnapshotStatus, SourceAtFreeze, list[dict[str, Any]], list[str], str | None]:
     """Three-tier capture for one item. Returns (status, source, rates, warnings, abort_msg).
 
-    Tier 1: ``rate_resolver.resolve_rate(...)`` — uses live Alta path
-            via the resolver's lazy-fetch. ``outcome == FOUND`` means
-            a rate was returned (snapshot, cache, or Alta-live).
+    Tier 1: ``resolved`` — this item's slice of the quote-wide
+            ``rate_resolver.resolve_rates_batch(...)`` call (live Alta
+            path via the resolver's lazy-fetch). ``outcome == FOUND``
+            means a rate was returned (cache or Alta-live).
     Tier 2: ONLY when ``outcome == ALTA_ERROR`` — Alta is genuinely
             unavailable and we fall back to ``kvota.tnved_rates`` with
             no TTL filter (stale rows up to 30 days old). When
@@ -279,16 +305,8 @@ async def _capture_item(
     saw_any = False
 
     for payment_type in _DEFAULT_PAYMENT_TYPES:
-        # Tier 1
-        result = await resolve_rate(
-            tnved_code=tnved_code,
-            payment_type=payment_type,
-            country_oksm=country_oksm,
-            target_date=target_date,
-            has_certificate=has_certificate,
-            has_sp_certificate=has_sp_certificate,
-            alta_client=alta_client,
-        )
+        # Tier 1 — default-winning variant from the batch
+        result = resolved.result_for(payment_type)
 
         if result.outcome == ResolveOutcome.FOUND:
             saw_any = True
@@ -3,7 +3,7 @@ DaData API service for company lookup by INN and city autocomplete.
 
 Provides:
 - validate_inn(inn) -> bool
-- lookup_company_by_inn(inn) -> dict | None  (async)
+- lookup_company_by_inn(inn) -> dict | None  (async, cached via services.inn_cache)
 - normalize_dadata_result(suggestion) -> dict
 - search_cities(query, count=10) -> list[dict]  (sync)
 
@@ -12,7 +12,9 @@ DaData APIs used:
 - City search: https://suggestions.dadata.ru/suggestions/api/4_1/rs/suggest/address
 """
 
+import asyncio
 import os
+
 import httpx
 
 DADATA_PARTY_URL = "https://suggestions.dadata.ru/suggestions/api/4_1/rs/findById/party"
@@ -119,6 +121,10 @@ def normalize_dadata_result(suggestion: dict) -> dict:
 async def lookup_company_by_inn(inn: str) -> dict | None:
     """Look up company info by INN via DaData API.
 
+    Served through services.inn_cache (memory + kvota.inn_lookup_cache),
+    the same cache export enrichment uses; the blocking DaData call runs
+    in a worker thread.
+
     Args:
         inn: Company INN (10 digits for legal entity, 12 for individual)
 
@@ -134,12 +140,10 @@ async def lookup_company_by_inn(inn: str) -> dict | None:
     if not validate_inn(inn):
         raise ValueError(f"Invalid INN format: {inn}")
 
+    from services import inn_cache
+
     try:
-        response_data = _call_dadata_api(inn)
-        suggestions = response_data.get("suggestions", [])
-        if not suggestions:
-            return None
-        return normalize_dadata_result(suggestions[0])
+        return await asyncio.to_thread(inn_cache.get_company, inn)
     except ValueError:
         raise
     except Exception:
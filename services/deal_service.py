@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from datetime import datetime, date
 from typing import Optional, List, Dict, Any
 from decimal import Decimal
+from . import document_numbering
 from .database import get_supabase
 from .logistics_service import initialize_logistics_stages
 
@@ -722,8 +723,9 @@ def generate_deal_number(organization_id: str, prefix: str = "DEAL") -> str:
 
     Format: PREFIX-YYYY-NNNN (e.g., DEAL-2025-0001)
 
-    Note: There's also a PostgreSQL function for this, but this Python
-    version is useful when you need the number before inserting.
+    The sequence comes from the organization's atomic yearly counter
+    (services/document_numbering.py, migration 350), so concurrent
+    creates never share a number. Numbers may have gaps.
 
     Args:
         organization_id: UUID of the organization
@@ -733,17 +735,11 @@ def generate_deal_number(organization_id: str, prefix: str = "DEAL") -> str:
         Generated deal number
     """
     supabase = get_supabase()
-    year = datetime.now().year
 
     try:
-        # Count existing deals this year
-        result = supabase.table('deals').select('id', count='exact') \
-            .eq('organization_id', organization_id) \
-            .gte('signed_at', f'{year}-01-01') \
-            .execute()
-
-        count = (result.count or 0) + 1
-        return f"{prefix}-{year}-{count:04d}"
+        return document_numbering.generate(
+            organization_id, document_numbering.KIND_DEAL, prefix, sb=supabase
+        )
     except Exception as e:
         print(f"Error generating deal number: {e}")
         # Fallback with timestamp
@@ -0,0 +1,88 @@
+"""Document numbering — kvota.document_counters (migration 350).
+
+Deal and specification numbers have the form ``PREFIX-YYYY-NNNN`` and
+restart every year per organization. The sequence part comes from
+``kvota.next_document_number``, one atomic ``INSERT ... ON CONFLICT DO
+UPDATE ... RETURNING`` on the (organization, kind, year) counter row:
+
+    number = document_numbering.generate(org_id, KIND_DEAL, "DEAL")
+    # → "DEAL-2026-0043"
+
+Semantics:
+    - Unique: concurrent callers serialize on the counter row, so two
+      managers creating deals at once get different numbers and nothing
+      has to retry on collision.
+    - Gaps: a drawn number is consumed. If the insert that uses it fails,
+      the number is skipped, not reissued (like a database sequence).
+    - Retries: a failed RPC call is retried up to ``RPC_ATTEMPTS`` times.
+      A call whose response was lost may have consumed a number — that
+      is one more gap, never a duplicate.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+from services.database import get_supabase
+
+logger = logging.getLogger(__name__)
+
+
+KIND_DEAL = "deal"
+KIND_SPECIFICATION = "specification"
+
+RPC_ATTEMPTS = 3
+
+
+def _get_supabase():
+    """Get Supabase client. Wrapped for testability (tests mock this function)."""
+    return get_supabase()
+
+
+def format_number(prefix: str, year: int, seq: int) -> str:
+    """``PREFIX-YYYY-NNNN`` (the sequence widens past 9999)."""
+    return f"{prefix}-{year}-{seq:04d}"
+
+
+def next_value(
+    organization_id: str,
+    kind: str,
+    year: Optional[int] = None,
+    sb: Any = None,
+) -> int:
+    """Issue the next counter value for (organization, kind, year).
+
+    Raises the last error when every attempt failed.
+    """
+    sb = sb or _get_supabase()
+    params = {
+        "p_organization_id": organization_id,
+        "p_kind": kind,
+        "p_year": year or datetime.now().year,
+    }
+    last_error: Exception | None = None
+    for attempt in range(1, RPC_ATTEMPTS + 1):
+        try:
+            result = sb.rpc("next_document_number", params).execute()
+            return int(result.data)
+        except Exception as e:
+            last_error = e
+            logger.warning(
+                "next_document_number(%s, %s) attempt %d/%d failed: %s",
+                organization_id, kind, attempt, RPC_ATTEMPTS, e,
+            )
+    raise last_error
+
+
+def generate(
+    organization_id: str,
+    kind: str,
+    prefix: str,
+    year: Optional[int] = None,
+    sb: Any = None,
+) -> str:
+    """Next formatted number, e.g. ``generate(org, KIND_DEAL, "DEAL")``."""
+    year = year or datetime.now().year
+    return format_number(prefix, year, next_value(organization_id, kind, year, sb=sb))
@@ -0,0 +1,199 @@
+"""
+Document ZIP — stream many stored documents as a single ZIP download.
+
+Collecting a quote's or deal's paperwork used to mean one signed-URL
+round trip plus one browser download per file. stream_documents_zip()
+reads the objects straight from the Supabase Storage REST API
+(``GET {SUPABASE_URL}/storage/v1/object/{bucket}/{path}``, service-role
+auth) and writes them into a ZIP as they arrive:
+
+- up to MAX_CONCURRENT_DOWNLOADS objects are fetched at once, each into a
+  bounded queue of CHUNK_SIZE chunks, while the ZIP is written in document
+  order;
+- the archive goes to a non-seekable sink (sizes in data descriptors) that
+  is drained after every chunk.
+
+Memory therefore stays around MAX_CONCURRENT_DOWNLOADS × QUEUE_CHUNKS ×
+CHUNK_SIZE regardless of how many documents there are or how big they are.
+Files that cannot be fetched are listed in MISSING_MANIFEST inside the
+archive instead of failing a download that has already started.
+
+Callers decide which documents the user may see (api/documents.py).
+"""
+
+import asyncio
+import logging
+import os
+import zipfile
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List, Optional
+from urllib.parse import quote
+
+import httpx
+
+from services.document_service import BUCKET_NAME, Document, get_document_type_label
+
+logger = logging.getLogger(__name__)
+
+
+MAX_CONCURRENT_DOWNLOADS = 4
+CHUNK_SIZE = 64 * 1024
+QUEUE_CHUNKS = 8
+DOWNLOAD_TIMEOUT_SECONDS = 60
+
+MISSING_MANIFEST = "НЕ_ЗАГРУЖЕНО.txt"
+
+
+class _Sink:
+    """Write-only, non-seekable buffer for ZipFile; drained by the generator."""
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+class _Failed:
+    def __init__(self, reason: str) -> None:
+        self.reason = reason
+
+
+_EOF = object()
+
+
+def _storage_client() -> httpx.AsyncClient:
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    if not url or not key:
+        raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
+    return httpx.AsyncClient(
+        base_url=f"{url.rstrip('/')}/storage/v1/object/{BUCKET_NAME}/",
+        headers={"apikey": key, "Authorization": f"Bearer {key}"},
+        timeout=DOWNLOAD_TIMEOUT_SECONDS,
+    )
+
+
+def _safe_name(name: str) -> str:
+    name = (name or "").replace("/", "_").replace("\\", "_").strip()
+    return name.lstrip(".") or "file"
+
+
+def archive_names(documents: List[Document]) -> List[str]:
+    """Unique in-archive paths: ``<document type label>/<original filename>``."""
+    seen: set = set()
+    names: List[str] = []
+    for doc in documents:
+        folder = _safe_name(get_document_type_label(doc.document_type))
+        filename = _safe_name(doc.original_filename)
+        stem, ext = os.path.splitext(filename)
+        candidate = f"{folder}/{filename}"
+        n = 2
+        while candidate.lower() in seen:
+            candidate = f"{folder}/{stem} ({n}){ext}"
+            n += 1
+        seen.add(candidate.lower())
+        names.append(candidate)
+    return names
+
+
+async def _fetch(client: httpx.AsyncClient, doc: Document, queue: asyncio.Queue) -> None:
+    """Stream one storage object into ``queue``; ends with _EOF or _Failed."""
+    try:
+        async with client.stream("GET", quote(doc.storage_path)) as response:
+            if response.status_code != 200:
+                await queue.put(_Failed(f"HTTP {response.status_code}"))
+                return
+            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                await queue.put(chunk)
+        await queue.put(_EOF)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning("Document %s download failed: %s", doc.id, e)
+        await queue.put(_Failed(str(e) or type(e).__name__))
+
+
+def _zip_info(arcname: str, doc: Document) -> zipfile.ZipInfo:
+    ts = doc.created_at or datetime.now()
+    info = zipfile.ZipInfo(arcname, date_time=ts.timetuple()[:6])
+    info.compress_type = zipfile.ZIP_STORED  # PDFs, scans, DOCX/XLSX are already compressed
+    info.file_size = doc.file_size_bytes or 0
+    return info
+
+
+async def stream_documents_zip(
+    documents: Iterable[Document],
+    *,
+    client: Optional[httpx.AsyncClient] = None,
+) -> AsyncIterator[bytes]:
+    """Yield a ZIP archive of ``documents`` chunk by chunk.
+
+    Args:
+        documents: Documents to pack, in archive order
+        client: Optional storage client (defaults to the service-role
+            Supabase Storage client); closed here only if created here
+
+    Yields:
+        ZIP bytes; the concatenation is a complete archive
+    """
+    documents = list(documents)
+    names = archive_names(documents)
+    queues = [asyncio.Queue(maxsize=QUEUE_CHUNKS) for _ in documents]
+    tasks: dict = {}
+    missing: List[str] = []
+
+    own_client = client is None
+    client = client or _storage_client()
+
+    def start(i: int) -> None:
+        if i < len(documents):
+            tasks[i] = asyncio.create_task(_fetch(client, documents[i], queues[i]))
+
+    sink = _Sink()
+    archive = zipfile.ZipFile(sink, mode="w")
+    try:
+        for i in range(min(MAX_CONCURRENT_DOWNLOADS, len(documents))):
+            start(i)
+
+        for i, (doc, arcname) in enumerate(zip(documents, names)):
+            item = await queues[i].get()
+            if isinstance(item, _Failed):
+                missing.append(f"{arcname}: {item.reason}")
+            else:
+                with archive.open(_zip_info(arcname, doc), "w") as entry:
+                    while item is not _EOF:
+                        if isinstance(item, _Failed):
+                            missing.append(f"{arcname} (файл неполный): {item.reason}")
+                            break
+                        entry.write(item)
+                        data = sink.drain()
+                        if data:
+                            yield data
+                        item = await queues[i].get()
+            tasks.pop(i, None)
+            start(i + MAX_CONCURRENT_DOWNLOADS)
+
+        if missing:
+            archive.writestr(
+                MISSING_MANIFEST,
+                "Не удалось загрузить:\n" + "\n".join(missing) + "\n",
+            )
+        archive.close()
+        data = sink.drain()
+        if data:
+            yield data
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        if own_client:
+            await client.aclose()
@@ -12,10 +12,10 @@ from datetime import datetime
 
 import logging
 
-from services import composition_service
+from services import composition_service, inn_cache
 from services.calculation_helpers import effective_calc_quantity
 from services.database import get_supabase
-from services.dadata_service import validate_inn, _call_dadata_api, normalize_dadata_result
+from services.export_loader import load_export_bundle
 
 logger = logging.getLogger(__name__)
 
@@ -34,36 +34,6 @@ class ExportData:
     selected_bank_account: Optional[Dict[str, Any]] = None  # Selected bank account for invoice
 
 
-def _lookup_legal_name(inn: str, cache: Dict[str, str]) -> Optional[str]:
-    """
-    Look up official legal name by INN via DaData (sync).
-
-    Returns full_with_opf name or None on any failure.
-    Results are cached by INN within the export session.
-    """
-    if not inn or not validate_inn(inn):
-        return None
-
-    inn = str(inn).strip()
-    if inn in cache:
-        return cache[inn]
-
-    try:
-        response_data = _call_dadata_api(inn)
-        suggestions = response_data.get("suggestions", [])
-        if not suggestions:
-            cache[inn] = None
-            return None
-        result = normalize_dadata_result(suggestions[0])
-        legal_name = result.get("full_name")
-        cache[inn] = legal_name
-        return legal_name
-    except Exception:
-        logger.warning("DaData lookup failed for INN %s", inn, exc_info=True)
-        cache[inn] = None
-        return None
-
-
 def enrich_with_legal_names(
     *entities: Optional[Dict[str, Any]],
     inn_key: str = "inn",
@@ -72,27 +42,30 @@ def enrich_with_legal_names(
     Enrich company dicts with DaData legal name (in-place).
 
     For each entity that has an INN, looks up the official legal name
-    and stores it as 'legal_name'. Uses a shared cache so the same INN
-    is never looked up twice.
+    (full_with_opf) and stores it as 'legal_name'. All INNs go through
+    services.inn_cache in one batch: cached answers come from memory or
+    kvota.inn_lookup_cache, the rest are fetched from DaData concurrently.
+    Lookup failures leave the entity untouched.
 
     Args:
         *entities: Company dicts to enrich (seller_company, customer, organization, etc.)
         inn_key: Key name for the INN field in the dict
     """
-    cache: Dict[str, str] = {}
-    for entity in entities:
-        if entity is None:
-            continue
-        inn = entity.get(inn_key)
-        if inn:
-            legal_name = _lookup_legal_name(inn, cache)
-            if legal_name:
-                entity["legal_name"] = legal_name
+    present = [e for e in entities if e is not None and e.get(inn_key)]
+    if not present:
+        return
+
+    companies = inn_cache.get_companies(e[inn_key] for e in present)
+    for entity in present:
+        company = companies.get(str(entity[inn_key]).strip())
+        legal_name = company.get("full_name") if company else None
+        if legal_name:
+            entity["legal_name"] = legal_name
 
 
 def fetch_export_data(quote_id: str, org_id: str) -> ExportData:
     """
-    Fetch all data needed for exports.
+    Fetch all data needed for exports (one DB round trip, see export_loader).
 
     Args:
         quote_id: Quote UUID
@@ -101,46 +74,24 @@ def fetch_export_data(quote_id: str, org_id: str) -> ExportData:
     Returns:
         ExportData with all necessary information
     """
-    supabase = get_supabase()
-
-    # 1. Fetch quote
-    quote_result = supabase.table("quotes") \
-        .select("*") \
-        .eq("id", quote_id) \
-        .eq("organization_id", org_id) \
-        .execute()
-
-    if not quote_result.data:
-        raise ValueError(f"Quote not found: {quote_id}")
-
-    quote = quote_result.data[0]
-
-    # 2. Fetch customer
-    customer_result = supabase.table("customers") \
-        .select("*") \
-        .eq("id", quote["customer_id"]) \
-        .execute()
-
-    customer = customer_result.data[0] if customer_result.data else {}
-
-    # 3. Fetch organization
-    org_result = supabase.table("organizations") \
-        .select("*") \
-        .eq("id", org_id) \
-        .execute()
-
-    organization = org_result.data[0] if org_result.data else {}
-
-    # 4. Fetch composed items (Phase 5d Pattern A).
+    # 1. Everything in one round trip: quote, customer, organization,
+    #    seller company + bank accounts, quote_items + coverage, calc
+    #    results, variables and summary (kvota.get_export_bundle).
+    bundle = load_export_bundle(org_id, quote_id=quote_id, supabase=get_supabase())
+    quote = bundle.quote
+    customer = bundle.customer
+    organization = bundle.organization
+
+    # 2. Composed items (Phase 5d Pattern A).
     # Source supplier-side fields (weight_in_kg, base_price_vat,
     # purchase_price_original, purchase_currency, customs_code,
     # supplier_country, ...) from the selected invoice_items row via
-    # composition_service.get_composed_items rather than reading the
-    # legacy quote_items columns directly. See
-    # .kiro/specs/phase-5d-legacy-refactor/design.md §2.1.7 and REQ-1.6.
-    items = composition_service.get_composed_items(quote_id, supabase)
+    # composition_service rather than reading the legacy quote_items
+    # columns directly. See .kiro/specs/phase-5d-legacy-refactor/design.md
+    # §2.1.7 and REQ-1.6.
+    items = composition_service.compose_items(bundle.quote_items, bundle.coverage)
 
-    # 4a. Supplier-quantity override: the composed item's `quantity` is the
+    # 2a. Supplier-quantity override: the composed item's `quantity` is the
     # selected invoice_item.quantity — the exact base the calc engine uses —
     # and it carries `minimum_order_quantity`. Compute the effective qty here
     # so every customer-facing export rendered from this ExportData shows the
@@ -150,90 +101,38 @@ def fetch_export_data(quote_id: str, org_id: str) -> ExportData:
             item.get("quantity", 1), item.get("minimum_order_quantity")
         )
 
-    # 4b. Enrich composed items with customer-facing display fields
+    # 2b. Enrich composed items with customer-facing display fields
     # (product_code, unit, description) that the composed shape does not
     # carry. Customer-facing exports (specification PDF, invoice PDF)
     # render these fields for the customer — they are NOT supplier-side
     # and therefore do not belong in the calc-ready composition shape.
-    # One extra read keyed by quote_item_id; soft-deleted rows excluded.
-    qi_ids = [item["quote_item_id"] for item in items if item.get("quote_item_id")]
-    if qi_ids:
-        qi_result = supabase.table("quote_items") \
-            .select("id, product_code, unit, description, position") \
-            .in_("id", qi_ids) \
-            .execute()
-        by_qi = {row["id"]: row for row in (qi_result.data or [])}
-        for item in items:
-            qi = by_qi.get(item.get("quote_item_id"))
-            if qi:
-                # Don't clobber composed fields — only add customer-side
-                # fields that are absent from the composed shape.
-                for key in ("product_code", "unit", "description", "position"):
-                    item.setdefault(key, qi.get(key))
-
-    # 5. Merge per-item calculation results, keyed by the composed item's
+    by_qi = {row["id"]: row for row in bundle.quote_items if row.get("id")}
+    for item in items:
+        qi = by_qi.get(item.get("quote_item_id"))
+        if qi:
+            # Don't clobber composed fields — only add customer-side
+            # fields that are absent from the composed shape.
+            for key in ("product_code", "unit", "description", "position"):
+                item.setdefault(key, qi.get(key))
+
+    # 3. Merge per-item calculation results, keyed by the composed item's
     #    quote_item_id traceability field.
     for item in items:
-        qi_id = item.get("quote_item_id")
-        if not qi_id:
-            item["calc"] = {}
-            continue
-        calc_result = supabase.table("quote_calculation_results") \
-            .select("phase_results") \
-            .eq("quote_item_id", qi_id) \
-            .execute()
-
-        if calc_result.data:
-            item["calc"] = calc_result.data[0].get("phase_results", {})
-        else:
-            item["calc"] = {}
-
-    # 6. Fetch calculation variables
-    vars_result = supabase.table("quote_calculation_variables") \
-        .select("variables") \
-        .eq("quote_id", quote_id) \
-        .execute()
-
-    variables = {}
-    if vars_result.data:
-        variables = vars_result.data[0].get("variables", {})
+        item["calc"] = bundle.calc_for(item.get("quote_item_id"))
 
-    # 7. Fetch calculation summary
-    summary_result = supabase.table("quote_calculation_summaries") \
-        .select("*") \
-        .eq("quote_id", quote_id) \
-        .execute()
-
-    calculations = {}
-    if summary_result.data:
-        calculations = summary_result.data[0]
+    variables = bundle.variables
+    calculations = bundle.summary
 
     # Calculate totals from items if not in summary
     if not calculations:
         calculations = calculate_totals_from_items(items, quote.get("currency", "USD"))
 
-    # 8. Fetch seller company (our legal entity) if quote has seller_company_id
-    seller_company = None
-    bank_accounts = []
-    if quote.get("seller_company_id"):
-        seller_result = supabase.table("seller_companies") \
-            .select("*") \
-            .eq("id", quote["seller_company_id"]) \
-            .execute()
-        if seller_result.data:
-            seller_company = seller_result.data[0]
-
-            # 9. Fetch bank accounts for seller company
-            bank_result = supabase.table("bank_accounts") \
-                .select("*") \
-                .eq("entity_type", "seller_company") \
-                .eq("entity_id", quote["seller_company_id"]) \
-                .eq("is_active", True) \
-                .order("is_default", desc=True) \
-                .execute()
-            bank_accounts = bank_result.data or []
-
-    # 10. Enrich company names with DaData legal names
+    # 4. Seller company (our legal entity) and its active bank accounts,
+    #    default first
+    seller_company = bundle.seller_company
+    bank_accounts = bundle.bank_accounts if seller_company else []
+
+    # 5. Enrich company names with DaData legal names
     enrich_with_legal_names(seller_company, customer, organization)
 
     return ExportData(
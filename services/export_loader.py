@@ -0,0 +1,125 @@
+"""
+Export Loader — one round trip for everything a customer document needs.
+
+Wraps the ``kvota.get_export_bundle`` RPC (Migration 341). Every exporter
+(export_data_mapper.fetch_export_data, specification_export.
+fetch_specification_data, contract_spec_export.fetch_contract_spec_data →
+PDF and DOCX) loads its data here instead of issuing its own chain of
+sequential selects, so the number of DB round trips per document is 1
+regardless of how many items the quote has.
+
+Composition (quote_items → selected invoice → invoice_items) and the
+effective-quantity rules are applied in Python from the bundled rows via
+composition_service, exactly as the per-table readers did.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from services import composition_service
+from services.database import get_supabase
+
+
+@dataclass
+class ExportBundle:
+    """Raw rows returned by get_export_bundle (missing rows → {} / [])."""
+
+    quote: Dict[str, Any]
+    customer: Dict[str, Any]
+    organization: Dict[str, Any]
+    seller_company: Optional[Dict[str, Any]] = None
+    specification: Optional[Dict[str, Any]] = None
+    spec_position: int = 1
+    signatory: Dict[str, Any] = field(default_factory=dict)
+    bank_accounts: List[Dict[str, Any]] = field(default_factory=list)
+    quote_items: List[Dict[str, Any]] = field(default_factory=list)
+    coverage: List[Dict[str, Any]] = field(default_factory=list)
+    calc_by_item: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    variables: Dict[str, Any] = field(default_factory=dict)
+    summary: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def contract(self) -> Dict[str, Any]:
+        """customer_contracts row embedded in the specification, or {}."""
+        return (self.specification or {}).get("customer_contracts") or {}
+
+    def composed_items(self) -> List[Dict[str, Any]]:
+        """Calc-ready items — same result as composition_service.get_composed_items."""
+        return composition_service.compose_items(self.quote_items, self.coverage)
+
+    def effective_quantities(self) -> Dict[str, int]:
+        """{quote_item_id: effective qty} — same as get_effective_quantities."""
+        return composition_service.compute_effective_quantities(
+            self.quote_items, self.coverage
+        )
+
+    def calc_for(self, quote_item_id: Optional[str]) -> Dict[str, Any]:
+        """phase_results for a quote item, {} when not calculated."""
+        if not quote_item_id:
+            return {}
+        return self.calc_by_item.get(quote_item_id, {})
+
+
+def _bundle_from_payload(payload: Dict[str, Any]) -> ExportBundle:
+    calc_by_item = {
+        row["quote_item_id"]: row.get("phase_results") or {}
+        for row in (payload.get("calc_results") or [])
+        if row.get("quote_item_id")
+    }
+    return ExportBundle(
+        quote=payload.get("quote") or {},
+        customer=payload.get("customer") or {},
+        organization=payload.get("organization") or {},
+        seller_company=payload.get("seller_company"),
+        specification=payload.get("specification"),
+        spec_position=payload.get("spec_position") or 1,
+        signatory=payload.get("signatory") or {},
+        bank_accounts=payload.get("bank_accounts") or [],
+        quote_items=payload.get("quote_items") or [],
+        coverage=payload.get("coverage") or [],
+        calc_by_item=calc_by_item,
+        variables=payload.get("variables") or {},
+        summary=payload.get("summary") or {},
+    )
+
+
+def load_export_bundle(
+    org_id: str,
+    *,
+    quote_id: Optional[str] = None,
+    spec_id: Optional[str] = None,
+    supabase=None,
+) -> ExportBundle:
+    """
+    Load all export data for a quote or a specification in one RPC call.
+
+    Args:
+        org_id: Organization UUID (both lookups are scoped to it)
+        quote_id: Quote UUID (quote exports)
+        spec_id: Specification UUID (specification exports); wins over quote_id
+        supabase: Optional client (defaults to get_supabase())
+
+    Returns:
+        ExportBundle
+
+    Raises:
+        ValueError: quote / specification not found in the organization
+    """
+    if not quote_id and not spec_id:
+        raise ValueError("quote_id or spec_id is required")
+
+    supabase = supabase or get_supabase()
+    result = supabase.rpc(
+        "get_export_bundle",
+        {"p_org_id": org_id, "p_quote_id": quote_id, "p_spec_id": spec_id},
+    ).execute()
+
+    payload = result.data if result is not None else None
+    if isinstance(payload, list):
+        payload = payload[0] if payload else None
+    if not payload:
+        if spec_id:
+            raise ValueError(f"Specification not found: {spec_id}")
+        raise ValueError(f"Quote not found: {quote_id}")
+
+    return _bundle_from_payload(payload)
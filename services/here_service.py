@@ -22,6 +22,8 @@ from typing import Optional
 
 import httpx
 
+from services import metrics
+
 
 HERE_API_KEY = os.getenv("HERE_API_KEY", "")
 HERE_GEOCODE_URL = "https://geocode.search.hereapi.com/v1/geocode"
@@ -156,11 +158,22 @@ def _normalize_item(item: dict) -> dict:
 
 _CACHE_MAX_SIZE = 256
 _CACHE: "OrderedDict[tuple[str, int], tuple[dict, ...]]" = OrderedDict()
+_CACHE_STATS = {"hits": 0, "misses": 0}
 
 
 def _clear_cache() -> None:
     """Test helper — reset the city-search cache between tests."""
     _CACHE.clear()
+    _CACHE_STATS.update(hits=0, misses=0)
+
+
+def _collect_metrics():
+    return metrics.cache_families(
+        "here_cities", _CACHE_STATS["hits"], _CACHE_STATS["misses"], len(_CACHE),
+    )
+
+
+metrics.register_collector(_collect_metrics)
 
 
 def search_cities(query: str, count: int = 10) -> list[dict]:
@@ -193,8 +206,10 @@ def search_cities(query: str, count: int = 10) -> list[dict]:
     # (tuples are immutable so the clone is cheap and safe for mutation).
     cached = _CACHE.get(key)
     if cached is not None:
+        _CACHE_STATS["hits"] += 1
         _CACHE.move_to_end(key)
         return list(cached)
+    _CACHE_STATS["misses"] += 1
 
     try:
         response_data = _call_here_api(raw, limit=count)
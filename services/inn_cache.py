@@ -0,0 +1,271 @@
+"""
+INN Cache — durable, shared cache of DaData company lookups.
+
+Two tiers in front of DaData findById/party:
+- in-process LRU (bounded, per worker)
+- kvota.inn_lookup_cache (Migration 340), shared by all workers
+
+Positive answers live for POSITIVE_TTL, "DaData has no such INN" answers
+for NEGATIVE_TTL. Transport/HTTP failures are never cached, so a DaData
+outage doesn't poison exports for days.
+
+Provides:
+- get_company(inn) -> dict | None           — single lookup (sync)
+- get_companies(inns) -> {inn: dict | None} — batch: one DB read for all
+  misses, remaining DaData calls issued concurrently
+- clear_memory()                             — drop the in-process tier
+
+Payloads are dadata_service.normalize_dadata_result dicts. DaData is
+reached through ``dadata_service._call_dadata_api`` (looked up at call
+time, so tests patching it keep working).
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
+
+from services import dadata_service
+from services.database import get_supabase
+
+logger = logging.getLogger(__name__)
+
+
+POSITIVE_TTL = timedelta(days=30)
+NEGATIVE_TTL = timedelta(days=1)
+
+# Per-worker LRU size; a few hundred counterparties cover the working set
+MEMORY_MAX_SIZE = 2048
+
+# Parallel DaData calls per batch (DaData allows ~30 rps per key)
+MAX_CONCURRENT_LOOKUPS = 8
+
+_DB_CHUNK = 200
+
+# inn -> (company or None, expires_at monotonic)
+_memory: "OrderedDict[str, tuple[Optional[dict], float]]" = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+class _NotFound:
+    """Marker: DaData answered, but has no company with this INN."""
+
+
+_NOT_FOUND = _NotFound()
+
+
+def _get_supabase():
+    """Get Supabase client. Wrapped for testability (tests mock this function)."""
+    return get_supabase()
+
+
+def _normalize_inn(inn: Any) -> Optional[str]:
+    if inn is None:
+        return None
+    inn = str(inn).strip()
+    return inn if dadata_service.validate_inn(inn) else None
+
+
+# ============================================================================
+# Memory tier
+# ============================================================================
+
+def clear_memory() -> None:
+    """Drop the in-process tier (tests, manual refresh)."""
+    with _memory_lock:
+        _memory.clear()
+
+
+def _memory_get(inn: str) -> Any:
+    """Return cached company, _NOT_FOUND, or None on miss."""
+    with _memory_lock:
+        entry = _memory.get(inn)
+        if entry is None:
+            return None
+        company, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del _memory[inn]
+            return None
+        _memory.move_to_end(inn)
+        return company if company is not None else _NOT_FOUND
+
+
+def _memory_put(inn: str, company: Optional[dict], ttl: timedelta) -> None:
+    with _memory_lock:
+        _memory[inn] = (company, time.monotonic() + ttl.total_seconds())
+        _memory.move_to_end(inn)
+        while len(_memory) > MEMORY_MAX_SIZE:
+            _memory.popitem(last=False)
+
+
+# ============================================================================
+# DB tier
+# ============================================================================
+
+def _parse_dt(val: Any) -> Optional[datetime]:
+    if not val:
+        return None
+    if isinstance(val, datetime):
+        return val
+    try:
+        return datetime.fromisoformat(str(val).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _db_get_many(inns: list[str]) -> dict[str, Any]:
+    """Read non-expired rows for ``inns``; {inn: company | _NOT_FOUND}.
+
+    Remembers hits in the memory tier with their remaining TTL.
+    DB failures degrade to "miss" — the cache is an optimisation.
+    """
+    if not inns:
+        return {}
+    try:
+        sb = _get_supabase()
+        rows: list[dict] = []
+        for i in range(0, len(inns), _DB_CHUNK):
+            resp = (
+                sb.table("inn_lookup_cache")
+                .select("inn, found, company, fetched_at")
+                .in_("inn", inns[i:i + _DB_CHUNK])
+                .execute()
+            )
+            rows.extend(resp.data or [])
+    except Exception as e:
+        logger.warning("[inn_cache] DB read failed: %s", e)
+        return {}
+
+    now = datetime.now(timezone.utc)
+    found: dict[str, Any] = {}
+    for row in rows:
+        fetched_at = _parse_dt(row.get("fetched_at"))
+        if fetched_at is None:
+            continue
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        is_found = bool(row.get("found")) and row.get("company") is not None
+        remaining = fetched_at + (POSITIVE_TTL if is_found else NEGATIVE_TTL) - now
+        if remaining <= timedelta(0):
+            continue
+        company = row["company"] if is_found else None
+        _memory_put(row["inn"], company, remaining)
+        found[row["inn"]] = company if is_found else _NOT_FOUND
+    return found
+
+
+def _db_put_many(results: dict[str, Optional[dict]]) -> None:
+    """Upsert fresh DaData answers (company or None for not-found)."""
+    if not results:
+        return
+    now = datetime.now(timezone.utc).isoformat()
+    rows = [
+        {"inn": inn, "found": company is not None, "company": company, "fetched_at": now}
+        for inn, company in results.items()
+    ]
+    try:
+        _get_supabase().table("inn_lookup_cache").upsert(
+            rows, on_conflict="inn"
+        ).execute()
+    except Exception as e:
+        logger.warning("[inn_cache] DB write failed: %s", e)
+
+
+# ============================================================================
+# DaData
+# ============================================================================
+
+def _fetch_from_dadata(inn: str) -> Optional[dict]:
+    """One findById/party call; None when DaData has no such INN.
+
+    Raises on transport / configuration errors (never cached).
+    """
+    response_data = dadata_service._call_dadata_api(inn)
+    suggestions = response_data.get("suggestions", [])
+    if not suggestions:
+        return None
+    return dadata_service.normalize_dadata_result(suggestions[0])
+
+
+def _remember(results: dict[str, Optional[dict]]) -> None:
+    for inn, company in results.items():
+        _memory_put(inn, company, POSITIVE_TTL if company is not None else NEGATIVE_TTL)
+    _db_put_many(results)
+
+
+# ============================================================================
+# Public API
+# ============================================================================
+
+def get_company(inn: Any) -> Optional[dict]:
+    """Return the normalized company for ``inn``, None if unknown or invalid.
+
+    Raises:
+        ValueError: DaData is not configured (DADATA_API_KEY missing) and
+            the INN is not cached.
+        Exception: other DaData transport errors propagate as-is; callers
+            decide whether that is fatal.
+    """
+    key = _normalize_inn(inn)
+    if key is None:
+        return None
+
+    cached = _memory_get(key)
+    if cached is None:
+        cached = _db_get_many([key]).get(key)
+    if cached is not None:
+        return None if cached is _NOT_FOUND else cached
+
+    company = _fetch_from_dadata(key)
+    _remember({key: company})
+    return company
+
+
+def get_companies(inns: Iterable[Any]) -> dict[str, Optional[dict]]:
+    """Batch lookup: {normalized_inn: company | None} for every valid INN.
+
+    Cache misses are read from the DB in one query; what is still missing
+    goes to DaData with up to MAX_CONCURRENT_LOOKUPS calls in flight.
+    Per-INN DaData failures are logged and reported as None (not cached).
+    """
+    keys = list(dict.fromkeys(k for k in map(_normalize_inn, inns) if k))
+    result: dict[str, Optional[dict]] = {}
+
+    misses: list[str] = []
+    for key in keys:
+        cached = _memory_get(key)
+        if cached is None:
+            misses.append(key)
+        else:
+            result[key] = None if cached is _NOT_FOUND else cached
+
+    if misses:
+        from_db = _db_get_many(misses)
+        for key, cached in from_db.items():
+            result[key] = None if cached is _NOT_FOUND else cached
+        misses = [k for k in misses if k not in from_db]
+
+    if misses:
+        fetched: dict[str, Optional[dict]] = {}
+
+        def fetch(key: str) -> None:
+            try:
+                fetched[key] = _fetch_from_dadata(key)
+            except Exception:
+                logger.warning("DaData lookup failed for INN %s", key, exc_info=True)
+
+        workers = min(MAX_CONCURRENT_LOOKUPS, len(misses))
+        if workers == 1:
+            fetch(misses[0])
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(fetch, misses))
+
+        _remember(fetched)
+        for key in misses:
+            result[key] = fetched.get(key)
+
+    return result
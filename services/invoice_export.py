@@ -17,6 +17,7 @@ from services.export_data_mapper import (
     format_number_russian,
     get_currency_symbol,
 )
+from services import render_cache
 
 
 # Note: get_currency_symbol and format_number_russian are now consolidated
@@ -574,8 +575,12 @@ def generate_invoice_pdf(data: ExportData, invoice_info: Dict[str, Any] = None)
     try:
         from weasyprint import HTML
 
-        html = generate_invoice_html(data, invoice_info)
-        pdf_bytes = HTML(string=html).write_pdf()
-        return pdf_bytes
+        # Served from the render cache when neither the data nor the
+        # template changed since the last download.
+        return render_cache.get_or_render(
+            "invoice_pdf",
+            (data, invoice_info),
+            lambda: HTML(string=generate_invoice_html(data, invoice_info)).write_pdf(),
+        )
     except ImportError:
         raise ImportError("weasyprint is required for PDF generation. Install with: pip install weasyprint")
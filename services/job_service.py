@@ -0,0 +1,429 @@
+"""Durable background jobs — kvota.background_jobs (migration 345).
+
+Work that used to run inside the HTTP request and could hold a worker for
+minutes (the customs freeze on an APPROVED transition, XLS imports) can be
+queued here instead:
+
+    job = job_service.enqueue("invoice_xls_import", {...}, organization_id=org)
+    # → 202 + GET /api/jobs/{job.id} until status is succeeded / failed
+
+Jobs are claimed with ``kvota.claim_background_jobs`` (FOR UPDATE SKIP
+LOCKED), so the in-process worker thread started from the ``api.app``
+lifespan and any number of ``scripts/run_job_worker.py`` processes can
+share the queue. A claim is a lease: if the worker dies mid-job, the job
+is picked up again once ``LEASE_SECONDS`` have passed.
+
+Handlers are plain sync functions ``(payload: dict) -> dict | None``
+registered with ``@job_handler("<kind>")``. Raising retries the job with
+exponential backoff until ``max_attempts`` is used up; raising
+``PermanentJobError`` fails it at once (bad input, business rule).
+
+Env:
+    JOB_WORKER_IN_PROCESS — "0" disables the lifespan worker thread (when a
+        dedicated worker process runs instead). Default "1".
+    JOB_WORKER_POLL_SECONDS — idle poll interval. Default 5.
+"""
+
+from __future__ import annotations
+
+import base64
+import logging
+import os
+import socket
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+from services.database import get_supabase
+
+logger = logging.getLogger(__name__)
+
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+FINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+DEFAULT_MAX_ATTEMPTS = 3
+LEASE_SECONDS = 600             # > the 2-minute freeze cap, with headroom
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 600
+POLL_SECONDS = float(os.environ.get("JOB_WORKER_POLL_SECONDS", "5"))
+CLAIM_BATCH = 1                 # one job at a time per worker thread
+
+_HANDLERS: dict[str, Callable[[dict], Optional[dict]]] = {}
+
+_wakeup = threading.Event()     # set by enqueue() so the local worker skips the poll wait
+_worker_stop = threading.Event()
+_worker_thread: threading.Thread | None = None
+_worker_lock = threading.Lock()
+
+
+class PermanentJobError(Exception):
+    """Handler failure that retrying cannot fix — the job fails at once.
+
+    ``result`` is stored on the job next to the message (e.g. the list of
+    duplicate articles), so pollers can show the same detail the
+    synchronous endpoint did.
+    """
+
+    def __init__(self, message: str, result: Optional[dict] = None):
+        super().__init__(message)
+        self.result = result
+
+
+@dataclass
+class Job:
+    """One kvota.background_jobs row."""
+    id: str
+    kind: str
+    status: str
+    payload: dict = field(default_factory=dict)
+    organization_id: Optional[str] = None
+    attempts: int = 0
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_by: Optional[str] = None
+    run_after: Optional[str] = None
+    locked_by: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Job":
+        return cls(
+            id=row["id"],
+            kind=row["kind"],
+            status=row.get("status") or "queued",
+            payload=row.get("payload") or {},
+            organization_id=row.get("organization_id"),
+            attempts=row.get("attempts") or 0,
+            max_attempts=row.get("max_attempts") or DEFAULT_MAX_ATTEMPTS,
+            result=row.get("result"),
+            error=row.get("error"),
+            created_by=row.get("created_by"),
+            run_after=row.get("run_after"),
+            locked_by=row.get("locked_by"),
+            created_at=row.get("created_at"),
+            updated_at=row.get("updated_at"),
+            finished_at=row.get("finished_at"),
+        )
+
+    def to_public_dict(self) -> dict:
+        """Shape served by GET /api/jobs/{id} — no payload (may hold file bytes)."""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def _get_supabase():
+    """Get Supabase client. Wrapped for testability (tests mock this function)."""
+    return get_supabase()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def job_handler(kind: str):
+    """Register ``fn(payload) -> dict | None`` as the handler for ``kind``."""
+    def decorator(fn: Callable[[dict], Optional[dict]]):
+        _HANDLERS[kind] = fn
+        return fn
+    return decorator
+
+
+def retry_delay_seconds(attempts: int) -> int:
+    """Backoff before attempt ``attempts + 1``: 10s, 20s, 40s, ... capped."""
+    return min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS)
+
+
+# ============================================================================
+# Producer side
+# ============================================================================
+
+def enqueue(
+    kind: str,
+    payload: dict,
+    *,
+    organization_id: Optional[str] = None,
+    created_by: Optional[str] = None,
+    dedupe_key: Optional[str] = None,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> Job:
+    """Queue a job and wake the local worker.
+
+    With ``dedupe_key``, a queued/running job with the same key is returned
+    instead of creating a second one (partial unique index in migration 345).
+    Raises ValueError for an unknown kind.
+    """
+    if kind not in _HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    sb = _get_supabase()
+    row = {
+        "kind": kind,
+        "payload": payload,
+        "organization_id": organization_id,
+        "created_by": created_by,
+        "dedupe_key": dedupe_key,
+        "max_attempts": max_attempts,
+    }
+    try:
+        resp = sb.table("background_jobs").insert(row).execute()
+    except Exception as e:
+        if dedupe_key and ("23505" in str(e) or "duplicate" in str(e).lower()):
+            existing = _get_active_by_dedupe_key(sb, dedupe_key)
+            if existing is not None:
+                return existing
+        raise
+
+    job = Job.from_row(resp.data[0])
+    _wakeup.set()
+    logger.info("job_enqueued", extra={"job_id": job.id, "kind": kind})
+    return job
+
+
+def _get_active_by_dedupe_key(sb: Any, dedupe_key: str) -> Optional[Job]:
+    resp = (
+        sb.table("background_jobs")
+        .select("*")
+        .eq("dedupe_key", dedupe_key)
+        .in_("status", ["queued", "running"])
+        .limit(1)
+        .execute()
+    )
+    return Job.from_row(resp.data[0]) if resp.data else None
+
+
+def get_job(job_id: str, organization_id: Optional[str] = None) -> Optional[Job]:
+    """Fetch a job; with ``organization_id``, only a job of that org."""
+    sb = _get_supabase()
+    query = sb.table("background_jobs").select("*").eq("id", job_id)
+    if organization_id is not None:
+        query = query.eq("organization_id", organization_id)
+    resp = query.limit(1).execute()
+    return Job.from_row(resp.data[0]) if resp.data else None
+
+
+# ============================================================================
+# Consumer side
+# ============================================================================
+
+def _default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def claim(worker_id: str, limit: int = CLAIM_BATCH, kinds: Optional[list[str]] = None) -> list[Job]:
+    """Lease up to ``limit`` due jobs for ``worker_id``."""
+    sb = _get_supabase()
+    resp = sb.rpc("claim_background_jobs", {
+        "p_worker": worker_id,
+        "p_limit": limit,
+        "p_lease_seconds": LEASE_SECONDS,
+        "p_kinds": kinds,
+    }).execute()
+    rows = resp.data if isinstance(resp.data, list) else []
+    return [Job.from_row(r) for r in rows]
+
+
+def _finish(sb: Any, job: Job, worker_id: str, fields: dict) -> None:
+    """Write the outcome — only while we still hold the lease."""
+    fields = {**fields, "updated_at": _now().isoformat()}
+    (
+        sb.table("background_jobs")
+        .update(fields)
+        .eq("id", job.id)
+        .eq("locked_by", worker_id)
+        .execute()
+    )
+
+
+def run_job(job: Job, worker_id: str) -> str:
+    """Run one claimed job and record the outcome. Returns the new status."""
+    sb = _get_supabase()
+    now = _now().isoformat()
+
+    if job.attempts > job.max_attempts:
+        # Lease expired on the last allowed attempt — the worker died.
+        _finish(sb, job, worker_id, {
+            "status": "failed",
+            "error": "Превышено число попыток (обработчик не завершился)",
+            "finished_at": now, "locked_by": None, "locked_at": None,
+        })
+        return "failed"
+
+    handler = _HANDLERS.get(job.kind)
+    if handler is None:
+        _finish(sb, job, worker_id, {
+            "status": "failed", "error": f"Unknown job kind: {job.kind}",
+            "finished_at": now, "locked_by": None, "locked_at": None,
+        })
+        return "failed"
+
+    try:
+        result = handler({**job.payload, "_attempt": job.attempts})
+    except PermanentJobError as e:
+        _finish(sb, job, worker_id, {
+            "status": "failed", "error": str(e), "result": e.result,
+            "finished_at": _now().isoformat(), "locked_by": None, "locked_at": None,
+        })
+        logger.info("job_failed", extra={"job_id": job.id, "kind": job.kind, "permanent": True})
+        return "failed"
+    except Exception as e:
+        if job.attempts < job.max_attempts:
+            run_after = _now() + timedelta(seconds=retry_delay_seconds(job.attempts))
+            _finish(sb, job, worker_id, {
+                "status": "queued", "error": str(e),
+                "run_after": run_after.isoformat(), "locked_by": None, "locked_at": None,
+            })
+            logger.warning(
+                "job_retry",
+                extra={"job_id": job.id, "kind": job.kind, "attempt": job.attempts, "error": str(e)},
+            )
+            return "queued"
+        _finish(sb, job, worker_id, {
+            "status": "failed", "error": str(e),
+            "finished_at": _now().isoformat(), "locked_by": None, "locked_at": None,
+        })
+        logger.error(
+            "job_failed",
+            extra={"job_id": job.id, "kind": job.kind, "attempt": job.attempts, "error": str(e)},
+        )
+        return "failed"
+
+    _finish(sb, job, worker_id, {
+        "status": "succeeded", "result": result, "error": None,
+        "finished_at": _now().isoformat(), "locked_by": None, "locked_at": None,
+    })
+    return "succeeded"
+
+
+def run_pending_once(worker_id: Optional[str] = None, limit: int = 10) -> int:
+    """Claim and run due jobs until none are left or ``limit`` ran. Returns count."""
+    worker_id = worker_id or _default_worker_id()
+    ran = 0
+    while ran < limit:
+        jobs = claim(worker_id, limit=1)
+        if not jobs:
+            break
+        run_job(jobs[0], worker_id)
+        ran += 1
+    return ran
+
+
+def start_worker(poll_seconds: float = POLL_SECONDS) -> None:
+    """Start the in-process worker thread. Idempotent; honours JOB_WORKER_IN_PROCESS.
+
+    Called from the ``api.app`` lifespan. Runs in a thread because handlers
+    and the supabase client are synchronous — the event loop stays free.
+    """
+    global _worker_thread
+    if os.environ.get("JOB_WORKER_IN_PROCESS", "1") == "0":
+        return
+    with _worker_lock:
+        if _worker_thread is not None and _worker_thread.is_alive():
+            return
+        _worker_stop.clear()
+        worker_id = _default_worker_id()
+
+        def _run() -> None:
+            while not _worker_stop.is_set():
+                try:
+                    ran = run_pending_once(worker_id)
+                except Exception as e:  # never let the thread die
+                    logger.warning("job_service: worker loop error: %s", e)
+                    ran = 0
+                if ran == 0:
+                    _wakeup.wait(poll_seconds)
+                    _wakeup.clear()
+
+        _worker_thread = threading.Thread(target=_run, name="job-worker", daemon=True)
+        _worker_thread.start()
+
+
+def stop_worker() -> None:
+    """Stop the worker thread. A job in flight keeps its lease and is
+    reclaimed by another worker if this one does not finish it."""
+    global _worker_thread
+    _worker_stop.set()
+    _wakeup.set()
+    if _worker_thread is not None:
+        _worker_thread.join(timeout=5)
+    _worker_thread = None
+
+
+# ============================================================================
+# Built-in handlers
+# ============================================================================
+
+@job_handler("quote_transition")
+def _run_quote_transition(payload: dict) -> dict:
+    """``workflow_service.transition_quote_status`` off the request path.
+
+    The customs freeze on → APPROVED still runs before the status update,
+    so a Tier 3 abort still blocks the transition — it just reports
+    through the job instead of holding the HTTP request.
+    """
+    from services.workflow_service import transition_quote_status
+
+    quote_id = payload["quote_id"]
+    to_status = payload["to_status"]
+
+    if payload.get("_attempt", 1) > 1:
+        # A previous attempt may have committed the status before failing.
+        sb = _get_supabase()
+        current = (
+            sb.table("quotes").select("workflow_status").eq("id", quote_id).limit(1).execute()
+        )
+        if current.data and current.data[0].get("workflow_status") == to_status:
+            return {"success": True, "to_status": to_status, "warnings": []}
+
+    result = transition_quote_status(
+        quote_id=quote_id,
+        to_status=to_status,
+        actor_id=payload["actor_id"],
+        actor_roles=payload.get("actor_roles") or [],
+        comment=payload.get("comment"),
+    )
+    outcome = {
+        "success": result.success,
+        "from_status": result.from_status,
+        "to_status": result.to_status,
+        "warnings": list(result.warnings),
+    }
+    if not result.success:
+        raise PermanentJobError(result.error_message or "Переход не выполнен", outcome)
+    return outcome
+
+
+@job_handler("invoice_xls_import")
+def _run_invoice_xls_import(payload: dict) -> dict:
+    """``xls_import_service.import_invoice_xls`` with the file from the payload."""
+    from zipfile import BadZipFile
+
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    from services.xls_import_service import DuplicateArticlesError, import_invoice_xls
+
+    file_bytes = base64.b64decode(payload["file_b64"])
+    try:
+        return import_invoice_xls(invoice_id=payload["invoice_id"], file_bytes=file_bytes)
+    except DuplicateArticlesError as e:
+        raise PermanentJobError(
+            f"Дубликаты артикулов: {', '.join(e.duplicates)}",
+            {"code": "DUPLICATES", "duplicates": e.duplicates},
+        )
+    except (BadZipFile, InvalidFileException, ValueError, KeyError) as e:
+        raise PermanentJobError("Не удалось разобрать XLS", {"code": "INVALID_FILE"}) from e
@@ -25,6 +25,8 @@ Design notes:
   chromium-headless-shell silently drops ``file://`` font URLs and falls
   back to DejaVu — which renders Cyrillic but loses the Inter typography
   (ADR-8). The inlined fonts add ~380 KB to the in-memory HTML payload.
+  Fonts, illustrations and icons are read and encoded once per process
+  (``services/asset_cache.py``), not on every render.
 - Chromium renders the layout instead of WeasyPrint (ADR-9). The HTML/CSS
   port is unchanged; only the rendering engine swapped after WeasyPrint
   output was found visually unacceptable (ghost headline text, mis-sized
@@ -39,8 +41,8 @@ Design notes:
 from __future__ import annotations
 
 import asyncio
-import base64
 import html
+import os
 from dataclasses import dataclass, field
 from decimal import Decimal, InvalidOperation
 from functools import lru_cache
@@ -51,6 +53,7 @@ from typing import Tuple
 # unit tests that exercise the HTML builder, dataclasses, or helpers can run
 # in environments without the chromium browser installed (CI workers without
 # the playwright apt deps, local dev environments missing the runtime).
+from services import asset_cache
 from services.kp_branding import KpBranding, MASTER_BEARING
 
 
@@ -307,11 +310,11 @@ def _png_data_uri(path: Path) -> str:
     placeholder instead — same regression class as the font drop noted in
     ADR-8. Inlining sidesteps the asset loader entirely.
 
-    Cost: ~1.4 MB extra in-memory HTML per render (hero PNG). Acceptable
-    since the render pass is bounded and the bytes are GC'd immediately.
+    Cost: ~1.4 MB extra in-memory HTML per render (hero PNG). The encoded
+    URI itself is built once and reused until the file changes
+    (``asset_cache``).
     """
-    b64 = base64.b64encode(path.read_bytes()).decode("ascii")
-    return f"data:image/png;base64,{b64}"
+    return asset_cache.data_uri(path, "image/png")
 
 
 # ---------------------------------------------------------------------------
@@ -319,9 +322,32 @@ def _png_data_uri(path: Path) -> str:
 # ---------------------------------------------------------------------------
 
 
-@lru_cache(maxsize=4)
+# Map weight → bundled filename. The font files were dropped in by Wave 1
+# with the names below; if a future weight is added, extend the tuple.
+_KP_FONT_FILES = (
+    (400, "Inter-regular.ttf"),
+    (500, "Inter-500.ttf"),
+    (600, "Inter-600.ttf"),
+    (700, "Inter-700.ttf"),
+)
+
+
 def _kp_styles(branding: KpBranding) -> str:
-    """Return the inlined CSS used by both pages.
+    """Return the inlined CSS used by both pages (see ``_build_kp_styles``).
+
+    Memoized per branding and font-file version: a render costs four
+    ``stat()`` calls, and a replaced TTF is picked up without a restart.
+    """
+    stamps = []
+    for _, fname in _KP_FONT_FILES:
+        st = os.stat(branding.font_dir / fname)
+        stamps.append((st.st_mtime_ns, st.st_size))
+    return _build_kp_styles(branding, tuple(stamps))
+
+
+@lru_cache(maxsize=4)
+def _build_kp_styles(branding: KpBranding, font_stamps: tuple) -> str:
+    """Build the inlined CSS used by both pages.
 
     Brand colors are interpolated from the ``KpBranding`` instance; the rest
     is a near-verbatim port of ``kp.css`` from the design prototype with:
@@ -332,39 +358,28 @@ def _kp_styles(branding: KpBranding) -> str:
     - ``font-family: 'Inter'`` everywhere the design said Plus Jakarta Sans
       (Cyrillic coverage, see ADR-8).
 
-    ``KpBranding`` is ``@dataclass(frozen=True)`` so it's hashable —
-    caching by the branding instance keeps the per-render cost at ~zero
-    once a brand has been seen for the first time. Iteration 1 ships a
-    single brand so the cache holds one entry; ``maxsize=4`` leaves
-    headroom for the multi-brand future without unbounded growth.
+    ``KpBranding`` is ``@dataclass(frozen=True)`` so it's hashable;
+    ``font_stamps`` (mtime, size per font file) only keys the cache, so an
+    edited font yields a new entry. Iteration 1 ships a single brand;
+    ``maxsize=4`` leaves headroom without unbounded growth.
     """
     blue = branding.primary_blue
     red = branding.primary_red
     cream = branding.accent_cream
 
-    # Map weight → bundled filename. The font files were dropped in by
-    # Wave 1 with the names below; if a future weight is added, extend the
-    # tuple and the @font-face block.
-    #
     # We base64-inline the font bytes directly into the @font-face src so
     # the rendering Chromium never has to touch the file system. This adds
     # ~380 KB to the HTML payload (4 weights × ~94 KB each), traded for
     # guaranteed font embedding regardless of how the browser was launched.
     font_face_blocks = []
-    for weight, fname in (
-        (400, "Inter-regular.ttf"),
-        (500, "Inter-500.ttf"),
-        (600, "Inter-600.ttf"),
-        (700, "Inter-700.ttf"),
-    ):
-        ttf_path = branding.font_dir / fname
-        b64 = base64.b64encode(ttf_path.read_bytes()).decode("ascii")
+    for weight, fname in _KP_FONT_FILES:
+        font_uri = asset_cache.data_uri(branding.font_dir / fname, "font/ttf")
         font_face_blocks.append(
             f"""@font-face {{
             font-family: 'Inter';
             font-style: normal;
             font-weight: {weight};
-            src: url('data:font/ttf;base64,{b64}') format('truetype');
+            src: url('{font_uri}') format('truetype');
         }}"""
         )
     font_face = "\n".join(font_face_blocks)
@@ -1071,11 +1086,6 @@ html, body {{
 # ---------------------------------------------------------------------------
 
 
-# Cache: load every SVG once per (branding, name). Keyed by branding so a
-# future second brand with its own icon dir doesn't poison the cache.
-_ICONS_CACHE: dict[tuple[int, str], str] = {}
-
-
 def _icon(branding: KpBranding, name: str) -> str:
     """Return an inline SVG fragment for a named icon.
 
@@ -1083,18 +1093,16 @@ def _icon(branding: KpBranding, name: str) -> str:
     condition to paper over — the SVGs are committed alongside the code.
     Raise so the failure surfaces during build, render, and tests instead
     of silently shipping a half-rendered PDF.
+
+    Read through ``asset_cache`` — keyed by path, so each brand's icon dir
+    gets its own entries.
     """
-    cache_key = (id(branding), name)
-    if cache_key in _ICONS_CACHE:
-        return _ICONS_CACHE[cache_key]
     path = branding.icon_dir / f"{name}.svg"
     if not path.is_file():
         raise FileNotFoundError(
             f"KP icon missing: {name} (expected at {path})"
         )
-    svg = path.read_text(encoding="utf-8")
-    _ICONS_CACHE[cache_key] = svg
-    return svg
+    return asset_cache.read_text(path)
 
 
 # ---------------------------------------------------------------------------
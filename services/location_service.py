@@ -549,7 +549,7 @@ def search_locations(
     """
     Search locations using trigram-based search.
 
-    This function uses the database search_locations() function
+    This function uses the database search_locations_full() function
     which leverages pg_trgm extension for fast partial matching.
 
     Used for HTMX dropdown autocomplete.
@@ -577,8 +577,9 @@ def search_locations(
     try:
         supabase = _get_supabase()
 
-        # Call the database function search_locations()
-        result = supabase.rpc("search_locations", {
+        # search_locations_full() (migration 346): same filter and order as
+        # search_locations(), but full rows — no second fetch by id.
+        result = supabase.rpc("search_locations_full", {
             "p_organization_id": organization_id,
             "p_query": query,
             "p_limit": limit,
@@ -586,26 +587,7 @@ def search_locations(
             "p_customs_only": is_customs_only,
         }).execute()
 
-        if not result.data:
-            return []
-
-        # The function returns a subset of columns, fetch full records
-        location_ids = [row["id"] for row in result.data]
-
-        if not location_ids:
-            return []
-
-        # Get full location records
-        full_result = supabase.table("locations").select("*")\
-            .in_("id", location_ids)\
-            .execute()
-
-        if not full_result.data:
-            return []
-
-        # Maintain the search order from the RPC result
-        id_to_location = {row["id"]: _parse_location(row) for row in full_result.data}
-        return [id_to_location[loc_id] for loc_id in location_ids if loc_id in id_to_location]
+        return [_parse_location(row) for row in result.data] if result.data else []
 
     except Exception as e:
         # Fallback to simple ILIKE search if RPC fails
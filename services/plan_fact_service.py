@@ -12,6 +12,7 @@ from datetime import datetime, date
 from typing import Optional, List, Dict, Any
 from decimal import Decimal
 from .database import get_supabase
+from . import reference_cache
 
 
 # ============================================================================
@@ -223,7 +224,7 @@ def get_category(category_id: str) -> Optional[PlanFactCategory]:
 
 def get_category_by_code(code: str) -> Optional[PlanFactCategory]:
     """
-    Get a category by code.
+    Get a category by code (served from the in-process reference cache).
 
     Args:
         code: Category code (e.g., 'client_payment', 'supplier_payment')
@@ -231,16 +232,9 @@ def get_category_by_code(code: str) -> Optional[PlanFactCategory]:
     Returns:
         PlanFactCategory object if found, None otherwise
     """
-    supabase = get_supabase()
-
     try:
-        result = supabase.table('plan_fact_categories').select('*') \
-            .eq('code', code) \
-            .execute()
-
-        if result.data:
-            return PlanFactCategory.from_dict(result.data[0])
-        return None
+        row = reference_cache.plan_fact_category_by_code(code, sb=get_supabase())
+        return PlanFactCategory.from_dict(row) if row else None
     except Exception as e:
         print(f"Error getting category by code: {e}")
         return None
@@ -382,29 +376,50 @@ def create_plan_fact_item_with_category_code(
     )
 
 
-def bulk_create_plan_fact_items(
+def _rpc_date(value: Any) -> Any:
+    """ISO string for date values sent as RPC JSON."""
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _rpc_number(value: Any) -> Any:
+    """JSON-safe number for RPC params (Decimal is not JSON-serializable).
+
+    Sent as a string, which the NUMERIC cast reads exactly — a float would
+    round money amounts past ~15 significant digits.
+    """
+    return str(value) if isinstance(value, Decimal) else value
+
+
+def _insert_plan_fact_items(
     deal_id: str,
-    items: List[Dict[str, Any]],
-    created_by: Optional[str] = None
+    rows: List[Dict[str, Any]],
+    replace: bool = False
 ) -> List[PlanFactItem]:
     """
-    Create multiple plan-fact items at once.
+    Insert prepared item rows for a deal in one transaction (Migration 343).
 
-    Args:
-        deal_id: ID of the deal
-        items: List of item dicts with keys: category_id/category_code, planned_amount, planned_date, etc.
-        created_by: ID of the user
+    With replace=True the deal's existing items are deleted in the same
+    transaction. Raises on any database error — nothing is written then.
+    """
+    if not rows and not replace:
+        return []
 
-    Returns:
-        List of created PlanFactItem objects
+    supabase = get_supabase()
+    result = supabase.rpc('insert_plan_fact_items', {
+        'p_deal_id': deal_id,
+        'p_items': rows,
+        'p_replace': replace,
+    }).execute()
 
-    Example:
-        items = bulk_create_plan_fact_items('deal-123', [
-            {'category_code': 'client_payment', 'planned_amount': 50000, 'planned_date': date(2025, 1, 15), 'description': 'First payment'},
-            {'category_code': 'supplier_payment', 'planned_amount': 30000, 'planned_date': date(2025, 1, 20)},
-        ])
-    """
-    created_items = []
+    return [PlanFactItem.from_dict(row) for row in (result.data or [])]
+
+
+def _prepare_plan_fact_rows(
+    items: List[Dict[str, Any]],
+    created_by: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Resolve categories and build insert_plan_fact_items rows; skips items without a category."""
+    rows = []
 
     for item in items:
         # Support both category_id and category_code
@@ -418,20 +433,52 @@ def bulk_create_plan_fact_items(
             print(f"Skipping item - no valid category: {item}")
             continue
 
-        created = create_plan_fact_item(
-            deal_id=deal_id,
-            category_id=category_id,
-            planned_amount=item['planned_amount'],
-            planned_date=item['planned_date'],
-            planned_currency=item.get('planned_currency', 'RUB'),
-            description=item.get('description'),
-            created_by=created_by
-        )
+        rows.append({
+            'category_id': category_id,
+            'planned_amount': _rpc_number(item['planned_amount']),
+            'planned_date': _rpc_date(item['planned_date']),
+            'planned_currency': item.get('planned_currency', 'RUB'),
+            'description': item.get('description') or None,
+            'created_by': created_by or None,
+        })
+
+    return rows
 
-        if created:
-            created_items.append(created)
 
-    return created_items
+def bulk_create_plan_fact_items(
+    deal_id: str,
+    items: List[Dict[str, Any]],
+    created_by: Optional[str] = None,
+    replace: bool = False
+) -> List[PlanFactItem]:
+    """
+    Create multiple plan-fact items at once.
+
+    All valid items are inserted with a single RPC call in one transaction:
+    either every item is created or none is. Items without a resolvable
+    category are skipped.
+
+    Args:
+        deal_id: ID of the deal
+        items: List of item dicts with keys: category_id/category_code, planned_amount, planned_date, etc.
+        created_by: ID of the user
+        replace: If True, delete the deal's existing items in the same transaction
+
+    Returns:
+        List of created PlanFactItem objects (empty on database error)
+
+    Example:
+        items = bulk_create_plan_fact_items('deal-123', [
+            {'category_code': 'client_payment', 'planned_amount': 50000, 'planned_date': date(2025, 1, 15), 'description': 'First payment'},
+            {'category_code': 'supplier_payment', 'planned_amount': 30000, 'planned_date': date(2025, 1, 20)},
+        ])
+    """
+    try:
+        rows = _prepare_plan_fact_rows(items, created_by)
+        return _insert_plan_fact_items(deal_id, rows, replace=replace)
+    except Exception as e:
+        print(f"Error bulk creating plan-fact items: {e}")
+        return []
 
 
 # ============================================================================
@@ -1164,7 +1211,7 @@ def generate_plan_fact_from_deal(
     Args:
         deal_id: UUID of the deal to generate plan-fact for
         created_by: ID of the user triggering generation
-        replace_existing: If True, delete existing items before creating new ones
+        replace_existing: If True, replace existing items (delete + insert in one transaction)
                          If False, skip generation if items already exist
 
     Returns:
@@ -1217,7 +1264,11 @@ def generate_plan_fact_from_deal(
         source_data['quote_id'] = quote_id
 
         # Step 2: Check for existing items
-        existing_count = count_items_for_deal(deal_id).get('total', 0)
+        existing_result = supabase.table('plan_fact_items').select('id', count='exact') \
+            .eq('deal_id', deal_id) \
+            .limit(1) \
+            .execute()
+        existing_count = existing_result.count or 0
 
         if existing_count > 0 and not replace_existing:
             return GeneratePlanFactResult(
@@ -1228,9 +1279,6 @@ def generate_plan_fact_from_deal(
                 source_data=source_data
             )
 
-        if replace_existing and existing_count > 0:
-            delete_all_items_for_deal(deal_id)
-
         # Step 3: Get calculation variables from quote
         if quote_id:
             vars_result = supabase.table('quote_calculation_variables') \
@@ -1408,11 +1456,12 @@ def generate_plan_fact_from_deal(
                 'description': f'Банковская комиссия ({bank_commission_pct:.1f}%)',
             })
 
-        # Step 7: Create all items
-        created_items = bulk_create_plan_fact_items(
-            deal_id=deal_id,
-            items=items_to_create,
-            created_by=created_by
+        # Step 7: Create all items (and drop the old ones) in one transaction,
+        # so a failure leaves the deal's existing plan-fact untouched
+        created_items = _insert_plan_fact_items(
+            deal_id,
+            _prepare_plan_fact_rows(items_to_create, created_by),
+            replace=replace_existing and existing_count > 0,
         )
 
         source_data['items_planned'] = len(items_to_create)
@@ -1915,7 +1964,33 @@ def validate_payment_data(
         result['errors'].append(f'Plan-fact item not found: {item_id}')
         return result
 
-    result['item'] = item
+    return _validate_payment_for_item(
+        item,
+        actual_amount=actual_amount,
+        actual_date=actual_date,
+        actual_currency=actual_currency,
+        actual_exchange_rate=actual_exchange_rate,
+        payment_document=payment_document,
+    )
+
+
+def _validate_payment_for_item(
+    item: PlanFactItem,
+    actual_amount: float,
+    actual_date: date,
+    actual_currency: str = 'RUB',
+    actual_exchange_rate: Optional[float] = None,
+    payment_document: Optional[str] = None
+) -> Dict[str, Any]:
+    """validate_payment_data() for an already loaded item (no DB access)."""
+    result = {
+        'valid': True,
+        'errors': [],
+        'warnings': [],
+        'item': item,
+        'is_late': False,
+        'needs_exchange_rate': False
+    }
 
     # Check if already paid
     if item.is_paid:
@@ -1954,6 +2029,22 @@ def validate_payment_data(
     return result
 
 
+def _expected_variance(item: PlanFactItem, actual_amount: float):
+    """(variance, variance %, is_overpayment, is_underpayment) of paying ``actual_amount``."""
+    actual_decimal = Decimal(str(actual_amount))
+    planned_decimal = item.planned_amount or Decimal('0')
+
+    expected_variance = actual_decimal - planned_decimal
+    if planned_decimal > 0:
+        expected_variance_percent = (expected_variance / planned_decimal) * 100
+    else:
+        expected_variance_percent = Decimal('0')
+
+    is_overpayment = actual_decimal > planned_decimal
+    is_underpayment = actual_decimal < planned_decimal and abs(expected_variance) > planned_decimal * SIGNIFICANT_VARIANCE_THRESHOLD
+    return expected_variance, expected_variance_percent, is_overpayment, is_underpayment
+
+
 def register_payment_for_item(
     item_id: str,
     actual_amount: float,
@@ -2042,17 +2133,8 @@ def register_payment_for_item(
         is_late = actual_date > item.planned_date if item.planned_date else False
 
     # Calculate expected variance
-    actual_decimal = Decimal(str(actual_amount))
-    planned_decimal = item.planned_amount or Decimal('0')
-
-    expected_variance = actual_decimal - planned_decimal
-    if planned_decimal > 0:
-        expected_variance_percent = (expected_variance / planned_decimal) * 100
-    else:
-        expected_variance_percent = Decimal('0')
-
-    is_overpayment = actual_decimal > planned_decimal
-    is_underpayment = actual_decimal < planned_decimal and abs(expected_variance) > planned_decimal * SIGNIFICANT_VARIANCE_THRESHOLD
+    expected_variance, expected_variance_percent, is_overpayment, is_underpayment = \
+        _expected_variance(item, actual_amount)
 
     # Record the payment using existing function
     updated_item = record_actual_payment(
@@ -2168,12 +2250,31 @@ def register_partial_payment(
     )
 
 
+def _failed_payment(error: str, item: Optional[PlanFactItem] = None, **kwargs) -> RegisterPaymentResult:
+    fields = {
+        'warnings': [],
+        'variance_amount': None,
+        'variance_percent': None,
+        'is_late': False,
+        'is_overpayment': False,
+        'is_underpayment': False,
+    }
+    fields.update(kwargs)
+    return RegisterPaymentResult(success=False, item=item, error=error, **fields)
+
+
 def bulk_register_payments(
     payments: List[Dict[str, Any]]
 ) -> Dict[str, Any]:
     """
     Register multiple payments at once.
 
+    The referenced items are read with one query and every payment is
+    validated like register_payment_for_item(). All valid payments are then
+    recorded with a single RPC call in one transaction (Migration 343): if
+    any of them cannot be written (e.g. an item was paid concurrently),
+    none is, and each is reported as failed.
+
     Args:
         payments: List of payment dicts with keys:
             - item_id (required)
@@ -2188,55 +2289,120 @@ def bulk_register_payments(
         Dict with:
             - success_count: Number of successful registrations
             - failure_count: Number of failed registrations
-            - results: List of RegisterPaymentResult objects
+            - results: List of RegisterPaymentResult objects (in input order)
             - total_amount: Total amount registered successfully
     """
-    results = []
-    success_count = 0
-    failure_count = 0
-    total_amount = Decimal('0')
+    results: List[Optional[RegisterPaymentResult]] = [None] * len(payments)
 
-    for payment in payments:
+    item_ids = list(dict.fromkeys(
+        p.get('item_id') for p in payments
+        if all([p.get('item_id'), p.get('actual_amount'), p.get('actual_date')])
+    ))
+    items: Dict[str, PlanFactItem] = {}
+    load_error = None
+    if item_ids:
+        try:
+            rows = get_supabase().table('plan_fact_items').select('*') \
+                .in_('id', item_ids) \
+                .execute()
+            items = {row['id']: PlanFactItem.from_dict(row) for row in (rows.data or [])}
+        except Exception as e:
+            print(f"Error loading plan-fact items for payments: {e}")
+            load_error = f'Failed to load plan-fact items - database error: {e}'
+
+    # Validate every payment; collect the valid ones for one write
+    pending = []  # (index, payment, validation)
+    seen_ids = set()
+    for index, payment in enumerate(payments):
         item_id = payment.get('item_id')
         actual_amount = payment.get('actual_amount')
         actual_date = payment.get('actual_date')
 
         if not all([item_id, actual_amount, actual_date]):
-            results.append(RegisterPaymentResult(
-                success=False,
-                item=None,
-                error='Missing required fields (item_id, actual_amount, actual_date)',
-                warnings=[],
-                variance_amount=None,
-                variance_percent=None,
-                is_late=False,
-                is_overpayment=False,
-                is_underpayment=False
-            ))
-            failure_count += 1
+            results[index] = _failed_payment('Missing required fields (item_id, actual_amount, actual_date)')
+            continue
+        if load_error:
+            results[index] = _failed_payment(load_error)
+            continue
+        if item_id in seen_ids:
+            results[index] = _failed_payment(f'Duplicate payment for plan-fact item in batch: {item_id}')
             continue
+        seen_ids.add(item_id)
 
-        result = register_payment_for_item(
-            item_id=item_id,
+        item = items.get(item_id)
+        if not item:
+            results[index] = _failed_payment(f'Plan-fact item not found: {item_id}')
+            continue
+
+        validation = _validate_payment_for_item(
+            item,
             actual_amount=actual_amount,
             actual_date=actual_date,
             actual_currency=payment.get('actual_currency', 'RUB'),
             actual_exchange_rate=payment.get('actual_exchange_rate'),
             payment_document=payment.get('payment_document'),
-            notes=payment.get('notes')
         )
+        if not validation['valid']:
+            results[index] = _failed_payment(
+                '; '.join(validation['errors']),
+                item=item,
+                warnings=validation['warnings'],
+                is_late=validation.get('is_late', False),
+            )
+            continue
 
-        results.append(result)
+        pending.append((index, payment, validation))
 
-        if result.success:
-            success_count += 1
-            total_amount += Decimal(str(actual_amount))
-        else:
-            failure_count += 1
+    if pending:
+        updated: Dict[str, PlanFactItem] = {}
+        write_error = None
+        try:
+            response = get_supabase().rpc('register_plan_fact_payments', {
+                'p_payments': [
+                    {
+                        'id': payment['item_id'],
+                        'actual_amount': _rpc_number(payment['actual_amount']),
+                        'actual_date': _rpc_date(payment['actual_date']),
+                        'actual_currency': payment.get('actual_currency', 'RUB'),
+                        'actual_exchange_rate': _rpc_number(payment.get('actual_exchange_rate')),
+                        'payment_document': payment.get('payment_document') or None,
+                        'notes': payment.get('notes'),
+                    }
+                    for _, payment, _ in pending
+                ],
+            }).execute()
+            updated = {row['id']: PlanFactItem.from_dict(row) for row in (response.data or [])}
+        except Exception as e:
+            print(f"Error registering payments: {e}")
+            write_error = f'Failed to record payment - database error: {e}'
+
+        for index, payment, validation in pending:
+            item = validation['item']
+            variance, variance_percent, is_overpayment, is_underpayment = \
+                _expected_variance(item, payment['actual_amount'])
+            updated_item = updated.get(item.id)
+            results[index] = RegisterPaymentResult(
+                success=updated_item is not None,
+                item=updated_item,
+                error=None if updated_item else (write_error or 'Failed to record payment - database error'),
+                warnings=validation['warnings'],
+                # Actual variance is calculated by the DB trigger
+                variance_amount=updated_item.variance_amount if updated_item else variance,
+                variance_percent=variance_percent,
+                is_late=validation.get('is_late', False),
+                is_overpayment=is_overpayment,
+                is_underpayment=is_underpayment
+            )
+
+    success_count = sum(1 for r in results if r.success)
+    total_amount = sum(
+        (Decimal(str(p['actual_amount'])) for p, r in zip(payments, results) if r.success),
+        Decimal('0')
+    )
 
     return {
         'success_count': success_count,
-        'failure_count': failure_count,
+        'failure_count': len(results) - success_count,
         'results': results,
         'total_amount': float(total_amount)
     }
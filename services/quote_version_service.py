@@ -23,6 +23,14 @@ from services import composition_service
 from services.calculation_helpers import effective_calc_quantity, safe_decimal
 
 
+# Columns list_quote_versions reads: the summary mirrored out of
+# input_variables by trigger (migration 347), never the snapshot itself.
+_VERSION_LIST_COLUMNS = (
+    "id, version, status, change_reason, total_quote_currency, "
+    "created_at, seller_company, offer_incoterms"
+)
+
+
 # ============================================================================
 # Internal helpers
 # ============================================================================
@@ -243,24 +251,34 @@ def list_quote_versions(quote_id: str, org_id: str) -> List[Dict]:
     if not quote.data:
         return []
 
-    # Get versions using actual DB columns
-    result = supabase.table("quote_versions") \
-        .select("id, version, status, input_variables, created_at, seller_company, offer_incoterms") \
-        .eq("quote_id", quote_id) \
-        .order("version", desc=True) \
-        .execute()
+    # Summary columns only (migration 347) — input_variables holds the full
+    # products / results / customs snapshots and can run to megabytes.
+    try:
+        result = supabase.table("quote_versions") \
+            .select(_VERSION_LIST_COLUMNS) \
+            .eq("quote_id", quote_id) \
+            .order("version", desc=True) \
+            .execute()
+    except Exception:
+        # Summary columns not there yet — read them out of the snapshot.
+        result = supabase.table("quote_versions") \
+            .select("id, version, status, input_variables, created_at, seller_company, offer_incoterms") \
+            .eq("quote_id", quote_id) \
+            .order("version", desc=True) \
+            .execute()
 
     # Transform for UI compatibility
     versions = []
     for v in (result.data or []):
         input_vars = v.get("input_variables") or {}
         totals = input_vars.get("totals", {})
+        total = v.get("total_quote_currency")
         versions.append({
             "id": v["id"],
             "version_number": v.get("version", 1),
             "status": v.get("status", "sent"),
-            "total_quote_currency": totals.get("total_with_vat", 0),
-            "change_reason": input_vars.get("change_reason", "Calculation"),
+            "total_quote_currency": total if total is not None else totals.get("total_with_vat", 0),
+            "change_reason": v.get("change_reason") or input_vars.get("change_reason", "Calculation"),
             "created_at": v.get("created_at"),
             "seller_company": v.get("seller_company"),
             "offer_incoterms": v.get("offer_incoterms")
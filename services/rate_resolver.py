@@ -6,6 +6,11 @@ an outcome discriminator (FOUND / NOT_FOUND / ALTA_ERROR) and an optional
 "Alta is genuinely down" (retry-worthy → 503) from "rate doesn't exist
 for this code+country" (terminal → 404 RATE_NOT_FOUND).
 
+Batch API: ``resolve_rates_batch([RateRequest, ...], payment_types)``
+resolves every item of a quote with a constant number of set-based
+queries plus one Alta call per distinct missing pair. Autofill, the
+customs freeze and ``resolve_all_payment_types`` all go through it.
+
 Priority (REQ-3 AC#1):
     1. Exact country  — kvota.tnved_rates.country_or_areal = 'C:{oksm}'
     2. Areal          — for each areal in country_areals: 'A:{areal_code}'
@@ -26,9 +31,11 @@ Concurrency: race-safe upsert via the UNIQUE constraint
 valid_from, certificate_required, sp_certificate_required) — see
 migration 298.
 
-Side effects: each successful resolve fires ``UPDATE tnved_rates SET
-last_used_at = now() WHERE id = $1`` (Q3 decision). Used by the weekly
-cron to revalidate the top-1000 most-used pairs.
+Side effects: each successful resolve records the rate id in an
+in-process write-behind buffer; ``flush_last_used_at`` persists it as
+``UPDATE tnved_rates SET last_used_at = now() WHERE id IN (...)`` (Q3
+decision) every minute, on shutdown and before the weekly cron ranks the
+top-1000 most-used pairs for revalidation.
 
 `is_unfriendly` flag is NOT consulted (REQ-3 AC#10) — Alta encodes
 elevated tariffs in the response itself.
@@ -37,11 +44,13 @@ elevated tariffs in the response itself.
 from __future__ import annotations
 
 import logging
+import threading
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
 from enum import Enum
 from typing import TYPE_CHECKING, Any
 
+from services import metrics, reference_cache
 from services.alta_client import AltaApiError, Rate
 from services.database import get_supabase
 
@@ -59,6 +68,32 @@ CACHE_TTL = timedelta(days=30)
 _touch_failure_count: int = 0
 _TOUCH_FAILURE_THRESHOLDS = (10, 100, 1000)
 
+# Write-behind buffer for last_used_at touches: rate id → None (an
+# insertion-ordered set). Drained by flush_last_used_at() from the
+# background flusher (every TOUCH_FLUSH_INTERVAL_SECONDS), on shutdown,
+# before the revalidation cron ranks pairs, or inline once the buffer
+# reaches _TOUCH_BUFFER_MAX ids.
+TOUCH_FLUSH_INTERVAL_SECONDS = 60.0
+_TOUCH_BUFFER_MAX = 5000
+_TOUCH_FLUSH_CHUNK = 200            # ids per UPDATE — keeps the URL short
+_touch_buffer: dict[str, None] = {}
+_touch_lock = threading.Lock()
+_flusher_stop = threading.Event()
+_flusher_thread: threading.Thread | None = None
+
+# Columns of uq_tnved_rates_v3 (migration 303) — the ON CONFLICT target
+# for every tnved_rates upsert.
+_UPSERT_CONFLICT_COLUMNS = (
+    "tnved_code",
+    "payment_type",
+    "country_or_areal",
+    "valid_from",
+    "certificate_required",
+    "sp_certificate_required",
+    "category_code",
+    "description",
+)
+
 # Workflow statuses where the customs snapshot must be honored over a
 # live resolve. Mirrors services/workflow_service.WorkflowStatus values
 # from the freeze boundary (REQ-8). Kept here as plain strings to avoid
@@ -320,7 +355,10 @@ async def resolve_all_payment_types(
     Strategy:
       1. Try cache-only first for every payment_type. If all hit, return.
       2. Otherwise fire ONE Alta call. The response covers all payment
-         types — bulk-upsert the lot, then re-query the cache per type.
+         types — bulk-upsert the lot, then re-query the cache.
+
+    Implemented as a one-request ``resolve_rates_batch`` so single-pair
+    and whole-quote callers share the same set-based cache sweep.
 
     Returns:
       ``(by_payment_type, outcomes)``
@@ -328,90 +366,17 @@ async def resolve_all_payment_types(
           NOT_FOUND or ALTA_ERROR for that pt).
         - ``outcomes[pt]`` — FOUND | NOT_FOUND | ALTA_ERROR.
     """
-    sb = get_supabase()
-
-    # Step 1 — cache-only sweep
-    by_pt: dict[str, list[ResolvedRate]] = {}
-    outcomes: dict[str, ResolveOutcome] = {}
-    cache_misses: list[str] = []
-    for pt in payment_types:
-        variants = _lookup_all_variants(
-            sb,
-            tnved_code=tnved_code,
-            payment_type=pt,
-            country_oksm=country_oksm,
-            target_date=target_date,
-            has_certificate=has_certificate,
-            has_sp_certificate=has_sp_certificate,
-        )
-        if variants:
-            by_pt[pt] = variants
-            outcomes[pt] = ResolveOutcome.FOUND
-            for v in variants:
-                if v.id is not None:
-                    _touch_last_used_at(sb, v.id)
-        else:
-            cache_misses.append(pt)
-
-    if not cache_misses:
-        return by_pt, outcomes
-
-    # Step 2 — single Alta call covers all missing payment types
-    try:
-        fetched = await alta_client.get_rates(
-            tncode=tnved_code,
-            country=country_oksm,
-            date_=target_date,
-            certificate=has_certificate,
-            sp_certificate=has_sp_certificate,
-        )
-    except AltaApiError as e:
-        logger.error(
-            "rate_resolver.resolve_all: Alta error %s for tnved_code=%s "
-            "country=%s — marking %s as ALTA_ERROR",
-            e.code, tnved_code, country_oksm, ",".join(cache_misses),
-        )
-        for pt in cache_misses:
-            by_pt.setdefault(pt, [])
-            outcomes[pt] = ResolveOutcome.ALTA_ERROR
-        return by_pt, outcomes
-    except Exception as e:
-        logger.error(
-            "rate_resolver.resolve_all: Alta call failed for tnved_code=%s "
-            "country=%s: %s",
-            tnved_code, country_oksm, e,
-        )
-        for pt in cache_misses:
-            by_pt.setdefault(pt, [])
-            outcomes[pt] = ResolveOutcome.ALTA_ERROR
-        return by_pt, outcomes
-
-    if fetched:
-        _bulk_upsert(sb, fetched, source="alta-live")
-
-    # Step 3 — re-query cache for each missing payment_type
-    for pt in cache_misses:
-        variants = _lookup_all_variants(
-            sb,
-            tnved_code=tnved_code,
-            payment_type=pt,
-            country_oksm=country_oksm,
-            target_date=target_date,
-            has_certificate=has_certificate,
-            has_sp_certificate=has_sp_certificate,
-        )
-        by_pt[pt] = variants
-        if variants:
-            outcomes[pt] = ResolveOutcome.FOUND
-            for v in variants:
-                if v.id is not None:
-                    _touch_last_used_at(sb, v.id)
-        else:
-            # Alta call succeeded but no rates of this payment_type came
-            # back — terminal NOT_FOUND, not retry-worthy.
-            outcomes[pt] = ResolveOutcome.NOT_FOUND
-
-    return by_pt, outcomes
+    request = RateRequest(
+        tnved_code=tnved_code,
+        country_oksm=country_oksm,
+        target_date=target_date,
+        has_certificate=has_certificate,
+        has_sp_certificate=has_sp_certificate,
+    )
+    (result,) = await resolve_rates_batch(
+        [request], payment_types, alta_client=alta_client,
+    )
+    return result.by_payment_type, result.outcomes
 
 
 async def resolve_rate_variants(
@@ -513,6 +478,161 @@ async def resolve_rate_variants(
     return ResolveOutcome.NOT_FOUND, []
 
 
+# ---------------------------------------------------------------------------
+# Batch resolution — many (tnved_code, country) pairs per call
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class RateRequest:
+    """One (tnved_code, country) pair for ``resolve_rates_batch``.
+
+    Frozen/hashable on purpose: two items with identical fields share one
+    cache sweep and — on a miss — one Alta call.
+    """
+    tnved_code: str
+    country_oksm: int
+    target_date: date
+    has_certificate: bool = False
+    has_sp_certificate: bool = False
+
+
+@dataclass(frozen=True)
+class BatchResolveResult:
+    """Per-request result of ``resolve_rates_batch``.
+
+    Same shape as the ``(by_payment_type, outcomes)`` tuple returned by
+    ``resolve_all_payment_types``: every requested payment_type has an
+    entry in ``outcomes``; ``by_payment_type[pt]`` is non-empty only
+    when ``outcomes[pt] == FOUND``.
+    """
+    by_payment_type: dict[str, list[ResolvedRate]]
+    outcomes: dict[str, ResolveOutcome]
+
+    def result_for(self, payment_type: str) -> ResolveResult:
+        """Collapse one payment_type to ``resolve_rate``'s single-rate shape.
+
+        The winning rate is the first variant — variants are ordered
+        is_default desc, valid_from desc, the same tie-break ``_lookup_db``
+        applies.
+        """
+        outcome = self.outcomes.get(payment_type, ResolveOutcome.ALTA_ERROR)
+        variants = self.by_payment_type.get(payment_type) or []
+        if outcome == ResolveOutcome.FOUND:
+            if variants:
+                return ResolveResult(ResolveOutcome.FOUND, variants[0])
+            return ResolveResult(ResolveOutcome.NOT_FOUND, None)
+        return ResolveResult(outcome, None)
+
+
+# tnved_codes per tnved_rates query — keeps the PostgREST URL short.
+_BATCH_CODES_PER_QUERY = 50
+# PostgREST caps responses at 1000 rows by default; page explicitly.
+_BATCH_PAGE_SIZE = 1000
+
+
+async def resolve_rates_batch(
+    requests: list[RateRequest],
+    payment_types: tuple[str, ...] | list[str],
+    *,
+    alta_client: AltaClient,
+) -> list[BatchResolveResult]:
+    """Resolve every payment_type for many (tnved_code, country) pairs at once.
+
+    Set-based counterpart of ``resolve_all_payment_types`` for callers that
+    hold a whole quote (autofill, customs freeze). Round trips per call:
+
+      1. ``country_areals`` from the reference cache (at most ONE query).
+      2. ONE (paginated) ``tnved_rates`` query per 50 codes covering every
+         tier key (exact country, areals, base) and payment_type; tier
+         priority and date validity are applied in memory.
+      3. ONE Alta call per distinct ``RateRequest`` that missed any
+         payment_type — duplicates across items are fetched once.
+      4. ONE bulk upsert of everything Alta returned, then one re-query
+         for the requests that went to Alta.
+      5. ONE ``last_used_at`` UPDATE for every rate handed back.
+
+    The snapshot branch is NOT consulted — batch callers work on live
+    quotes only. Results are returned in input order (one per request,
+    duplicates included).
+    """
+    if not requests:
+        return []
+
+    sb = get_supabase()
+    unique = list(dict.fromkeys(requests))
+    areals_by_country = _areals_for_countries(
+        sb, {r.country_oksm for r in unique}
+    )
+
+    # Step 1 — cache sweep for every request at once
+    variants = _lookup_variants_batch(sb, unique, payment_types, areals_by_country)
+
+    # Step 2 — one Alta call per distinct request that missed anything
+    misses = [
+        r for r in unique
+        if any(not variants.get((r, pt)) for pt in payment_types)
+    ]
+    alta_errors: set[RateRequest] = set()
+    fetched_all: list[Rate] = []
+    for req in misses:
+        try:
+            fetched = await alta_client.get_rates(
+                tncode=req.tnved_code,
+                country=req.country_oksm,
+                date_=req.target_date,
+                certificate=req.has_certificate,
+                sp_certificate=req.has_sp_certificate,
+            )
+        except AltaApiError as e:
+            logger.error(
+                "rate_resolver.resolve_batch: Alta error %s for tnved_code=%s "
+                "country=%s — marking misses as ALTA_ERROR",
+                e.code, req.tnved_code, req.country_oksm,
+            )
+            alta_errors.add(req)
+            continue
+        except Exception as e:
+            logger.error(
+                "rate_resolver.resolve_batch: Alta call failed for tnved_code=%s "
+                "country=%s: %s",
+                req.tnved_code, req.country_oksm, e,
+            )
+            alta_errors.add(req)
+            continue
+        fetched_all.extend(fetched)
+
+    # Step 3 — one upsert for all Alta payloads, one re-query for the misses
+    if fetched_all:
+        _bulk_upsert(sb, fetched_all, source="alta-live")
+        refetch = [r for r in misses if r not in alta_errors]
+        variants.update(
+            _lookup_variants_batch(sb, refetch, payment_types, areals_by_country)
+        )
+
+    results: dict[RateRequest, BatchResolveResult] = {}
+    touched: list[str] = []
+    for req in unique:
+        by_pt: dict[str, list[ResolvedRate]] = {}
+        outcomes: dict[str, ResolveOutcome] = {}
+        for pt in payment_types:
+            found = variants.get((req, pt)) or []
+            by_pt[pt] = found
+            if found:
+                outcomes[pt] = ResolveOutcome.FOUND
+                touched.extend(v.id for v in found if v.id is not None)
+            elif req in alta_errors:
+                outcomes[pt] = ResolveOutcome.ALTA_ERROR
+            else:
+                # Alta succeeded (or was not needed) but has no rate of
+                # this payment_type — terminal, not retry-worthy.
+                outcomes[pt] = ResolveOutcome.NOT_FOUND
+        results[req] = BatchResolveResult(by_payment_type=by_pt, outcomes=outcomes)
+
+    _touch_last_used_at_many(sb, touched)
+    return [results[r] for r in requests]
+
+
 # ---------------------------------------------------------------------------
 # Internal helpers
 # ---------------------------------------------------------------------------
@@ -713,15 +833,102 @@ def _lookup_all_variants(
 
 
 def _areals_for_country(sb: Any, country_oksm: int) -> list[str]:
-    """Return all areal codes the country is mapped into via country_areals."""
-    resp = (
-        sb.table("country_areals")
-          .select("areal_code")
-          .eq("country_oksm", country_oksm)
-          .execute()
-    )
-    rows = getattr(resp, "data", []) or []
-    return [r["areal_code"] for r in rows if r.get("areal_code")]
+    """Return all areal codes the country is mapped into via country_areals.
+
+    Read from the in-process reference cache (whole-table snapshot).
+    """
+    return reference_cache.areals_for_country(country_oksm, sb=sb)
+
+
+def _areals_for_countries(sb: Any, countries: set[int]) -> dict[int, list[str]]:
+    """Batch variant of ``_areals_for_country`` — one snapshot for all countries."""
+    return {c: reference_cache.areals_for_country(c, sb=sb) for c in countries}
+
+
+def _lookup_variants_batch(
+    sb: Any,
+    requests: list[RateRequest],
+    payment_types: tuple[str, ...] | list[str],
+    areals_by_country: dict[int, list[str]],
+) -> dict[tuple[RateRequest, str], list[ResolvedRate]]:
+    """Set-based ``_lookup_all_variants`` for many requests.
+
+    Pulls every fresh row that could match ANY request (all tier keys,
+    all payment_types, valid_from up to the latest target_date) and then
+    replays the per-request tier walk in memory. Keys with no match are
+    absent from the returned dict.
+    """
+    if not requests:
+        return {}
+
+    cutoff = (datetime.now(timezone.utc) - CACHE_TTL).isoformat()
+    max_date = max(r.target_date for r in requests).isoformat()
+    tier_keys: set[str] = {"__base__"}
+    for r in requests:
+        tier_keys.add(f"C:{r.country_oksm}")
+        tier_keys.update(f"A:{a}" for a in areals_by_country.get(r.country_oksm, []))
+
+    codes = sorted({r.tnved_code for r in requests})
+    # (tnved_code, payment_type, country_or_areal, cert, sp_cert) → rows,
+    # kept in the is_default desc / valid_from desc order of the query.
+    index: dict[tuple, list[dict[str, Any]]] = {}
+    for i in range(0, len(codes), _BATCH_CODES_PER_QUERY):
+        chunk = codes[i:i + _BATCH_CODES_PER_QUERY]
+        offset = 0
+        while True:
+            resp = (
+                sb.table("tnved_rates")
+                  .select("*")
+                  .in_("tnved_code", chunk)
+                  .in_("payment_type", list(payment_types))
+                  .in_("country_or_areal", sorted(tier_keys))
+                  .lte("valid_from", max_date)
+                  .gte("source_fetched_at", cutoff)
+                  .order("is_default", desc=True)
+                  .order("valid_from", desc=True)
+                  .order("id")
+                  .range(offset, offset + _BATCH_PAGE_SIZE - 1)
+                  .execute()
+            )
+            rows = getattr(resp, "data", []) or []
+            for row in rows:
+                key = (
+                    row["tnved_code"],
+                    row["payment_type"],
+                    row.get("country_or_areal") or "__base__",
+                    bool(row.get("certificate_required", False)),
+                    bool(row.get("sp_certificate_required", False)),
+                )
+                index.setdefault(key, []).append(row)
+            if len(rows) < _BATCH_PAGE_SIZE:
+                break
+            offset += _BATCH_PAGE_SIZE
+
+    found: dict[tuple[RateRequest, str], list[ResolvedRate]] = {}
+    for req in requests:
+        tiers = [
+            f"C:{req.country_oksm}",
+            *(f"A:{a}" for a in areals_by_country.get(req.country_oksm, [])),
+            "__base__",
+        ]
+        for pt in payment_types:
+            for tier in tiers:
+                rows = index.get((
+                    req.tnved_code, pt, tier,
+                    req.has_certificate, req.has_sp_certificate,
+                ), [])
+                kept = [
+                    _row_to_resolved(row) for row in rows
+                    if date.fromisoformat(row["valid_from"]) <= req.target_date
+                    and not (
+                        row.get("valid_to")
+                        and date.fromisoformat(row["valid_to"]) <= req.target_date
+                    )
+                ]
+                if kept:
+                    found[(req, pt)] = kept
+                    break
+    return found
 
 
 def _bulk_upsert(sb: Any, rates: list[Rate], source: str) -> None:
@@ -764,51 +971,161 @@ def _bulk_upsert(sb: Any, rates: list[Rate], source: str) -> None:
     # variants WITHIN a category (e.g., nds_inv "- 29..." vs "- 31...")
     # coexist instead of colliding on ON CONFLICT.
     now = datetime.now(timezone.utc).isoformat()
-    payload = [_rate_to_row(r, source=source, now_iso=now) for r in rates]
+    # Batch callers merge several Alta responses; the same row can appear
+    # twice and Postgres rejects an ON CONFLICT batch that touches one row
+    # more than once. Last occurrence wins.
+    deduped: dict[tuple, dict[str, Any]] = {}
+    for r in rates:
+        row = _rate_to_row(r, source=source, now_iso=now)
+        deduped[tuple(row[c] for c in _UPSERT_CONFLICT_COLUMNS)] = row
     sb.table("tnved_rates").upsert(
-        payload,
-        on_conflict="tnved_code,payment_type,country_or_areal,valid_from,"
-                    "certificate_required,sp_certificate_required,"
-                    "category_code,description",
+        list(deduped.values()),
+        on_conflict=",".join(_UPSERT_CONFLICT_COLUMNS),
     ).execute()
 
 
-def _touch_last_used_at(sb: Any, rate_id: str) -> None:
-    """Fire-and-forget update; suppresses errors so a flaky write doesn't
-    break the resolve. The cron uses last_used_at to pick the top-1000;
-    losing a stray write here just defers a row's revalidation by a week.
+def _touch_last_used_at(sb: Any, rate_id: str | None) -> None:
+    """Record a cache hit for the weekly top-1000 ranking (write-behind).
 
-    Snapshot rates carry no DB id (id=None) — the early return prevents
-    a wasteful UPDATE and a potential RLS error against a synthesized id.
+    The id goes into ``_touch_buffer`` and is persisted by
+    ``flush_last_used_at`` — periodically from the background flusher,
+    on app shutdown and at the start of ``cron_revalidate_rates``. The
+    ranking only needs coarse recency, so hot resolves no longer pay an
+    UPDATE round trip.
 
-    Failures accumulate in ``_touch_failure_count``; crossing an alert
-    threshold (10/100/1000) escalates to logger.error so a systematic
-    regression (e.g. RLS policy break) becomes visible.
+    Snapshot rates carry no DB id (id=None) — they are never buffered.
     """
     if rate_id is None:
         return
-    global _touch_failure_count
+    _touch_last_used_at_many(sb, [rate_id])
+
+
+def _touch_last_used_at_many(sb: Any, rate_ids: list[str]) -> None:
+    """Buffer many rate ids at once — see ``_touch_last_used_at``."""
+    ids = [rid for rid in rate_ids if rid is not None]
+    if not ids:
+        return
+    with _touch_lock:
+        _touch_buffer.update(dict.fromkeys(ids))
+        overflow = len(_touch_buffer) >= _TOUCH_BUFFER_MAX
+    if overflow:
+        # Safety valve when the flusher isn't running (scripts, tests) or
+        # falls behind — bounds memory at the cost of one inline write.
+        flush_last_used_at(sb)
+
+
+def flush_last_used_at(sb: Any | None = None) -> int:
+    """Persist buffered ``last_used_at`` touches; returns the ids written.
+
+    One ``UPDATE tnved_rates SET last_used_at = now() WHERE id IN (...)``
+    per ``_TOUCH_FLUSH_CHUNK`` ids. Fire-and-forget like the old per-hit
+    UPDATE: a failed statement bumps ``_touch_failure_count`` (once per
+    statement) and its ids are dropped — losing a touch just defers a
+    row's revalidation by a week.
+    """
+    with _touch_lock:
+        if not _touch_buffer:
+            return 0
+        ids = list(_touch_buffer)
+        _touch_buffer.clear()
+
     try:
-        (
-            sb.table("tnved_rates")
-              .update({"last_used_at": datetime.now(timezone.utc).isoformat()})
-              .eq("id", rate_id)
-              .execute()
-        )
+        sb = sb if sb is not None else get_supabase()
     except Exception as e:
-        _touch_failure_count += 1
-        if _touch_failure_count in _TOUCH_FAILURE_THRESHOLDS:
-            logger.error(
-                "rate_resolver: last_used_at update failure threshold reached "
-                "(%d failures since process start). Latest rate_id=%s err=%s",
-                _touch_failure_count, rate_id, e,
-            )
-        else:
-            logger.warning(
-                "rate_resolver: failed to update last_used_at for %s: %s "
-                "(rolling failure count=%d)",
-                rate_id, e, _touch_failure_count,
+        _record_touch_failure(f"{len(ids)} ids (first={ids[0]})", e)
+        return 0
+
+    now_iso = datetime.now(timezone.utc).isoformat()
+    flushed = 0
+    for i in range(0, len(ids), _TOUCH_FLUSH_CHUNK):
+        chunk = ids[i:i + _TOUCH_FLUSH_CHUNK]
+        try:
+            (
+                sb.table("tnved_rates")
+                  .update({"last_used_at": now_iso})
+                  .in_("id", chunk)
+                  .execute()
             )
+            flushed += len(chunk)
+        except Exception as e:
+            _record_touch_failure(f"{len(chunk)} ids (first={chunk[0]})", e)
+    return flushed
+
+
+def start_last_used_flusher(
+    interval: float = TOUCH_FLUSH_INTERVAL_SECONDS,
+) -> None:
+    """Start the daemon thread that calls ``flush_last_used_at`` every
+    ``interval`` seconds. Idempotent.
+
+    Called from the ``api.app`` lifespan. The supabase client is
+    synchronous, so a thread keeps the flush off the event loop.
+    """
+    global _flusher_thread
+    with _touch_lock:
+        if _flusher_thread is not None and _flusher_thread.is_alive():
+            return
+        _flusher_stop.clear()
+
+        def _run() -> None:
+            while not _flusher_stop.wait(interval):
+                try:
+                    flush_last_used_at()
+                except Exception as e:  # never let the thread die
+                    logger.warning(
+                        "rate_resolver: last_used_at flusher error: %s", e
+                    )
+
+        _flusher_thread = threading.Thread(
+            target=_run, name="tnved-last-used-flusher", daemon=True,
+        )
+        _flusher_thread.start()
+
+
+def stop_last_used_flusher() -> None:
+    """Stop the flusher thread and flush whatever is still buffered."""
+    global _flusher_thread
+    _flusher_stop.set()
+    if _flusher_thread is not None:
+        _flusher_thread.join(timeout=5)
+    _flusher_thread = None
+    flush_last_used_at()
+
+
+def _record_touch_failure(target: str, exc: Exception) -> None:
+    """Bump ``_touch_failure_count`` and log, escalating at thresholds."""
+    global _touch_failure_count
+    _touch_failure_count += 1
+    if _touch_failure_count in _TOUCH_FAILURE_THRESHOLDS:
+        logger.error(
+            "rate_resolver: last_used_at update failure threshold reached "
+            "(%d failures since process start). Latest rate_id=%s err=%s",
+            _touch_failure_count, target, exc,
+        )
+    else:
+        logger.warning(
+            "rate_resolver: failed to update last_used_at for %s: %s "
+            "(rolling failure count=%d)",
+            target, exc, _touch_failure_count,
+        )
+
+
+def _collect_metrics():
+    with _touch_lock:
+        buffered = len(_touch_buffer)
+    yield metrics.family(
+        "rate_resolver_touch_failures_total", "counter",
+        "Failed tnved_rates.last_used_at updates since process start",
+        [({}, _touch_failure_count)],
+    )
+    yield metrics.family(
+        "rate_resolver_touch_buffer_size", "gauge",
+        "Rate ids waiting for the last_used_at write-behind flush",
+        [({}, buffered)],
+    )
+
+
+metrics.register_collector(_collect_metrics)
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,264 @@
+"""
+Reference Cache — in-process snapshots of small, rarely-changing tables.
+
+Hot paths used to re-read the same lookup rows on every call
+(plan_fact_categories per plan-fact item, stage_deadlines per timer batch,
+vat_rates_by_country per invoice line, country_areals per rate resolve,
+countries per customs request). These tables are tiny and change only via
+migrations or admin screens, so each one is loaded whole into memory and
+served from there.
+
+A snapshot is reloaded when either:
+- its TTL expires (bounds staleness across workers — an admin write in one
+  process is not visible to the others until then), or
+- ``bump_version(table)`` was called in this process since it was loaded
+  (admin write paths call it so the writer sees its own change at once).
+
+If a reload fails, the previous snapshot keeps serving and the failure is
+logged; a cold load failure propagates to the caller so existing
+error handling (503 on DB errors etc.) still applies.
+
+Typed accessors at the bottom are the intended API; ``get_rows`` is the
+generic escape hatch.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Callable, Optional
+
+from services import metrics
+from services.database import get_supabase
+
+logger = logging.getLogger(__name__)
+
+
+# PostgREST caps a single response at max-rows (1000 on Supabase);
+# snapshots page through the table in chunks of this size.
+PAGE_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """How to snapshot one reference table."""
+
+    columns: str
+    order_by: tuple[str, ...]
+    ttl_seconds: float
+
+
+TABLES: dict[str, TableSpec] = {
+    "plan_fact_categories": TableSpec(
+        "id, code, name, is_income, sort_order, created_at", ("id",), 600.0,
+    ),
+    "stage_deadlines": TableSpec(
+        "id, organization_id, stage, deadline_hours", ("id",), 120.0,
+    ),
+    "vat_rates_by_country": TableSpec(
+        "country_code, rate", ("country_code",), 600.0,
+    ),
+    "countries": TableSpec(
+        "oksm_digital, iso_alpha2, name_ru, is_unfriendly",
+        ("oksm_digital",),
+        3600.0,
+    ),
+    "country_areals": TableSpec(
+        "country_oksm, areal_code", ("country_oksm", "areal_code"), 3600.0,
+    ),
+}
+
+
+@dataclass
+class _Snapshot:
+    rows: list[dict]
+    version: int
+    loaded_at: float
+    # Derived lookups built lazily from ``rows`` (name -> structure)
+    indexes: dict[str, Any] = field(default_factory=dict)
+
+
+_lock = threading.Lock()
+_snapshots: dict[str, _Snapshot] = {}
+_versions: dict[str, int] = {}
+_stats = {"hits": 0, "loads": 0, "load_errors": 0}
+
+
+def _load_rows(sb: Any, table: str, spec: TableSpec) -> list[dict]:
+    """Read the whole table page by page."""
+    rows: list[dict] = []
+    start = 0
+    while True:
+        query = sb.table(table).select(spec.columns)
+        for col in spec.order_by:
+            query = query.order(col)
+        resp = query.range(start, start + PAGE_SIZE - 1).execute()
+        if resp is None:
+            # Never expected from supabase-py; don't cache it as "empty".
+            raise RuntimeError(f"{table} snapshot query returned no response")
+        page = getattr(resp, "data", None) or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+def _snapshot(table: str, sb: Any = None) -> _Snapshot:
+    """Return a fresh snapshot for ``table``, (re)loading when needed."""
+    spec = TABLES[table]
+    now = time.monotonic()
+    with _lock:
+        snap = _snapshots.get(table)
+        version = _versions.get(table, 0)
+        if (
+            snap is not None
+            and snap.version == version
+            and now - snap.loaded_at < spec.ttl_seconds
+        ):
+            _stats["hits"] += 1
+            return snap
+
+    # Load outside the lock: a concurrent duplicate load is harmless and
+    # cheaper than serialising every reader behind one DB round-trip.
+    try:
+        rows = _load_rows(sb if sb is not None else get_supabase(), table, spec)
+    except Exception as e:
+        with _lock:
+            _stats["load_errors"] += 1
+        if snap is None:
+            raise
+        logger.warning(
+            "[reference_cache] Reload of %s failed, serving stale snapshot: %s",
+            table, e,
+        )
+        return snap
+
+    fresh = _Snapshot(rows=rows, version=version, loaded_at=time.monotonic())
+    with _lock:
+        _stats["loads"] += 1
+        # Don't clobber a snapshot taken after a newer bump_version()
+        current = _snapshots.get(table)
+        if current is None or current.version <= version:
+            _snapshots[table] = fresh
+    return fresh
+
+
+def _index(table: str, name: str, build: Callable[[list[dict]], Any], sb: Any = None) -> Any:
+    """Return a derived lookup for the current snapshot, building it once."""
+    snap = _snapshot(table, sb)
+    idx = snap.indexes.get(name)
+    if idx is None:
+        idx = build(snap.rows)
+        snap.indexes[name] = idx
+    return idx
+
+
+# ============================================================================
+# Cache control
+# ============================================================================
+
+def get_rows(table: str, sb: Any = None) -> list[dict]:
+    """Return all cached rows of a registered reference table."""
+    return _snapshot(table, sb).rows
+
+
+def bump_version(table: str) -> None:
+    """Mark ``table`` as changed; the next read reloads it.
+
+    Call after any write to a registered table made from this process.
+    """
+    with _lock:
+        _versions[table] = _versions.get(table, 0) + 1
+        _snapshots.pop(table, None)
+
+
+def invalidate_all() -> None:
+    """Drop every snapshot (tests, manual refresh)."""
+    with _lock:
+        for table in list(_snapshots):
+            _versions[table] = _versions.get(table, 0) + 1
+        _snapshots.clear()
+
+
+def stats() -> dict:
+    """Hit/load counters for diagnostics."""
+    with _lock:
+        return dict(_stats, tables=sorted(_snapshots))
+
+
+def _collect_metrics():
+    s = stats()
+    yield from metrics.cache_families("reference", s["hits"], s["loads"], len(s["tables"]))
+    yield metrics.family(
+        "cache_errors_total", "counter", "Cache load/store failures",
+        [({"cache": "reference"}, s["load_errors"])],
+    )
+
+
+metrics.register_collector(_collect_metrics)
+
+
+# ============================================================================
+# Typed accessors
+# ============================================================================
+
+def plan_fact_category_by_code(code: str, sb: Any = None) -> Optional[dict]:
+    """Return the plan_fact_categories row for ``code`` or None."""
+    by_code = _index(
+        "plan_fact_categories", "by_code",
+        lambda rows: {r["code"]: r for r in rows if r.get("code")},
+        sb,
+    )
+    return by_code.get(code)
+
+
+def stage_deadlines_for_org(org_id: str, sb: Any = None) -> dict[str, int]:
+    """Return {stage: deadline_hours} configured for an organization."""
+    def build(rows: list[dict]) -> dict[str, dict[str, int]]:
+        by_org: dict[str, dict[str, int]] = {}
+        for r in rows:
+            by_org.setdefault(str(r.get("organization_id")), {})[r["stage"]] = r["deadline_hours"]
+        return by_org
+
+    by_org = _index("stage_deadlines", "by_org", build, sb)
+    return dict(by_org.get(str(org_id), {}))
+
+
+def vat_rate_for_country(country_code: str, sb: Any = None) -> Optional[Decimal]:
+    """Return the domestic VAT rate for an ISO alpha-2 code, None if unknown."""
+    by_code = _index(
+        "vat_rates_by_country", "by_code",
+        lambda rows: {
+            str(r["country_code"]).strip().upper(): Decimal(str(r["rate"]))
+            for r in rows
+            if r.get("country_code") and r.get("rate") is not None
+        },
+        sb,
+    )
+    return by_code.get(country_code.upper())
+
+
+def country_exists(country_oksm: int, sb: Any = None) -> bool:
+    """True if ``country_oksm`` is a known kvota.countries.oksm_digital."""
+    known = _index(
+        "countries", "oksm",
+        lambda rows: frozenset(
+            int(r["oksm_digital"]) for r in rows if r.get("oksm_digital") is not None
+        ),
+        sb,
+    )
+    return int(country_oksm) in known
+
+
+def areals_for_country(country_oksm: int, sb: Any = None) -> list[str]:
+    """Return all areal codes the country is mapped into via country_areals."""
+    def build(rows: list[dict]) -> dict[int, list[str]]:
+        by_country: dict[int, list[str]] = {}
+        for r in rows:
+            if r.get("areal_code") and r.get("country_oksm") is not None:
+                by_country.setdefault(int(r["country_oksm"]), []).append(r["areal_code"])
+        return by_country
+
+    by_country = _index("country_areals", "by_country", build, sb)
+    return list(by_country.get(int(country_oksm), []))
@@ -0,0 +1,405 @@
+"""
+Render Cache — content-addressed cache for generated customer documents.
+
+Spec / invoice / contract PDFs (WeasyPrint), contract and currency-invoice
+DOCX (python-docx) and KP PDFs (headless Chromium) cost up to seconds per
+render and used to be re-rendered on every download click. Renders are now
+keyed by
+
+    sha256(kind, template version, render date*, normalized input)
+
+and the bytes are kept in the ``kvota-render-cache`` storage bucket, indexed
+by kvota.render_cache (Migration 342). An unchanged document is served from
+storage; anything that changes the output changes the key:
+
+- the input: ExportData / SpecificationData / contract-spec dict / KpProposal
+  (+ branding), normalized to canonical JSON (dataclasses, Decimal, dates);
+- the template: ``template_version(kind)`` hashes the renderer's sources and
+  static assets, so a deploy that touches a template invalidates its entries
+  automatically;
+- * the date, for kinds whose templates fall back to today's date when a
+  document date is blank (everything except KP).
+
+Provides:
+- get_or_render(kind, payload, render) -> bytes
+- get_or_render_async(kind, payload, render_async) -> bytes
+- cache_key(kind, payload), template_version(kind)
+- stats() — per-kind hit / miss / error counters for this process
+- purge_stale(max_age) — drop entries of old template versions / unused ones
+
+Storage and DB failures never fail a download: they degrade to a render.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from services import metrics
+from services.database import get_supabase
+
+logger = logging.getLogger(__name__)
+
+
+BUCKET_NAME = "kvota-render-cache"
+
+# Bump to invalidate every entry (e.g. after changing the key derivation)
+KEY_FORMAT_VERSION = 1
+
+# Entries not served for this long are dropped by purge_stale()
+RETENTION = timedelta(days=30)
+
+_PURGE_CHUNK = 100
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+_SERVICES = Path(__file__).parent
+
+
+class RenderKind(NamedTuple):
+    """Cacheable document type."""
+    content_type: str
+    extension: str
+    templates: Tuple[Path, ...]  # files / directories hashed into the template version
+    dated: bool = True           # output may embed today's date
+
+
+KINDS: Dict[str, RenderKind] = {
+    "specification_pdf": RenderKind(PDF, "pdf", (
+        _SERVICES / "specification_export.py",
+        _SERVICES / "export_data_mapper.py",
+    )),
+    "specification_record_pdf": RenderKind(PDF, "pdf", (
+        _SERVICES / "specification_export.py",
+        _SERVICES / "export_data_mapper.py",
+    )),
+    "invoice_pdf": RenderKind(PDF, "pdf", (
+        _SERVICES / "invoice_export.py",
+        _SERVICES / "export_data_mapper.py",
+    )),
+    "contract_spec_pdf": RenderKind(PDF, "pdf", (
+        _SERVICES / "contract_spec_export.py",
+        _SERVICES / "export_data_mapper.py",
+    )),
+    "contract_spec_docx": RenderKind(DOCX, "docx", (
+        _SERVICES / "contract_spec_docx.py",
+        _SERVICES / "contract_spec_export.py",
+        _SERVICES / "export_data_mapper.py",
+    )),
+    "currency_invoice_docx": RenderKind(DOCX, "docx", (
+        _SERVICES / "currency_invoice_export.py",
+    )),
+    "kp_pdf": RenderKind(PDF, "pdf", (
+        _SERVICES / "kp_export.py",
+        _SERVICES / "kp_branding.py",
+        _SERVICES / "static" / "kp",
+        _SERVICES / "fonts" / "Inter",
+    ), dated=False),
+}
+
+
+def _get_supabase():
+    """Get Supabase client. Wrapped for testability (tests mock this function)."""
+    return get_supabase()
+
+
+# ============================================================================
+# Metrics
+# ============================================================================
+
+_stats: Dict[str, Dict[str, float]] = defaultdict(
+    lambda: {"hits": 0, "misses": 0, "errors": 0, "render_ms": 0.0}
+)
+_stats_lock = threading.Lock()
+_RENDER_SECONDS = metrics.histogram(
+    "render_duration_seconds", "PDF/DOCX render time on cache miss", ("kind",),
+)
+
+
+def _count(kind: str, counter: str, amount: float = 1) -> None:
+    with _stats_lock:
+        _stats[kind][counter] += amount
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    """Per-kind counters since process start: hits, misses, errors, render_ms."""
+    with _stats_lock:
+        return {kind: dict(counters) for kind, counters in _stats.items()}
+
+
+def reset_stats() -> None:
+    """Zero the counters (tests)."""
+    with _stats_lock:
+        _stats.clear()
+
+
+def _collect_metrics():
+    for kind, counters in sorted(stats().items()):
+        cache = f"render_{kind}"
+        yield from metrics.cache_families(cache, counters["hits"], counters["misses"])
+        yield metrics.family(
+            "cache_errors_total", "counter", "Cache load/store failures",
+            [({"cache": cache}, counters["errors"])],
+        )
+
+
+metrics.register_collector(_collect_metrics)
+
+
+# ============================================================================
+# Keys
+# ============================================================================
+
+@lru_cache(maxsize=None)
+def template_version(kind: str) -> str:
+    """Hash of everything the ``kind`` renderer reads besides its input.
+
+    Computed once per process — templates only change with a deploy.
+    """
+    digest = hashlib.sha256()
+    for root in KINDS[kind].templates:
+        files = sorted(p for p in root.rglob("*") if p.is_file()) if root.is_dir() else [root]
+        for path in files:
+            if path.suffix == ".pyc":
+                continue
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _normalize(value: Any) -> Any:
+    """Canonical JSON-able form: equal documents → equal structures."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: _normalize(getattr(value, f.name)) for f in dataclasses.fields(value)}
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(_normalize(v) for v in value)
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return _normalize(value.value)
+    if isinstance(value, Path):
+        return str(value)
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+def cache_key(kind: str, payload: Any) -> str:
+    """sha256 hex digest identifying the rendered bytes of ``payload``."""
+    spec = KINDS[kind]
+    document = {
+        "v": KEY_FORMAT_VERSION,
+        "kind": kind,
+        "template": template_version(kind),
+        "date": date.today().isoformat() if spec.dated else None,
+        "input": _normalize(payload),
+    }
+    canonical = json.dumps(document, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _storage_path(kind: str, key: str) -> str:
+    return f"{kind}/{key[:2]}/{key}.{KINDS[kind].extension}"
+
+
+# ============================================================================
+# Storage
+# ============================================================================
+
+def _load(kind: str, key: str) -> Optional[bytes]:
+    """Cached bytes for ``key`` or None (miss or storage failure)."""
+    try:
+        sb = _get_supabase()
+        resp = (
+            sb.table("render_cache")
+            .select("storage_path")
+            .eq("cache_key", key)
+            .limit(1)
+            .execute()
+        )
+        if not resp.data:
+            return None
+        content = sb.storage.from_(BUCKET_NAME).download(resp.data[0]["storage_path"])
+        if not content:
+            return None
+        sb.table("render_cache").update(
+            {"last_hit_at": datetime.now(timezone.utc).isoformat()}
+        ).eq("cache_key", key).execute()
+        return content
+    except Exception as e:
+        _count(kind, "errors")
+        logger.warning("[render_cache] read failed for %s %s: %s", kind, key, e)
+        return None
+
+
+def _store(kind: str, key: str, content: bytes, render_ms: int) -> None:
+    spec = KINDS[kind]
+    path = _storage_path(kind, key)
+    try:
+        sb = _get_supabase()
+        sb.storage.from_(BUCKET_NAME).upload(
+            path=path,
+            file=content,
+            file_options={"content-type": spec.content_type, "upsert": "true"},
+        )
+        now = datetime.now(timezone.utc).isoformat()
+        sb.table("render_cache").upsert({
+            "cache_key": key,
+            "kind": kind,
+            "template_version": template_version(kind),
+            "storage_path": path,
+            "content_type": spec.content_type,
+            "size_bytes": len(content),
+            "render_ms": render_ms,
+            "created_at": now,
+            "last_hit_at": now,
+        }, on_conflict="cache_key").execute()
+    except Exception as e:
+        _count(kind, "errors")
+        logger.warning("[render_cache] write failed for %s %s: %s", kind, key, e)
+
+
+def _key_or_none(kind: str, payload: Any) -> Optional[str]:
+    try:
+        return cache_key(kind, payload)
+    except Exception as e:
+        _count(kind, "errors")
+        logger.warning("[render_cache] cannot key %s: %s", kind, e)
+        return None
+
+
+# ============================================================================
+# Public API
+# ============================================================================
+
+def get_or_render(kind: str, payload: Any, render: Callable[[], bytes]) -> bytes:
+    """Return the cached render of ``payload`` or call ``render()`` and cache it.
+
+    ``payload`` must hold everything the output depends on besides the
+    template itself. Render errors propagate and are not cached.
+    """
+    key = _key_or_none(kind, payload)
+    if key is not None:
+        cached = _load(kind, key)
+        if cached is not None:
+            _count(kind, "hits")
+            return cached
+    _count(kind, "misses")
+
+    started = time.perf_counter()
+    content = render()
+    elapsed = time.perf_counter() - started
+    render_ms = int(elapsed * 1000)
+    _count(kind, "render_ms", render_ms)
+    _RENDER_SECONDS.observe(elapsed, kind=kind)
+
+    if key is not None:
+        _store(kind, key, content, render_ms)
+    return content
+
+
+async def get_or_render_async(
+    kind: str, payload: Any, render: Callable[[], Awaitable[bytes]]
+) -> bytes:
+    """Async variant of :func:`get_or_render` (KP / Chromium renders).
+
+    Storage round trips run in a worker thread so the event loop stays free.
+    """
+    key = _key_or_none(kind, payload)
+    if key is not None:
+        cached = await asyncio.to_thread(_load, kind, key)
+        if cached is not None:
+            _count(kind, "hits")
+            return cached
+    _count(kind, "misses")
+
+    started = time.perf_counter()
+    content = await render()
+    elapsed = time.perf_counter() - started
+    render_ms = int(elapsed * 1000)
+    _count(kind, "render_ms", render_ms)
+    _RENDER_SECONDS.observe(elapsed, kind=kind)
+
+    if key is not None:
+        await asyncio.to_thread(_store, kind, key, content, render_ms)
+    return content
+
+
+def _purge_matching(sb: Any, build_query: Callable[[], Any], seen: set) -> int:
+    """Delete every entry ``build_query()`` selects, ``_PURGE_CHUNK`` at a time.
+
+    Each round re-runs the select: deleted rows drop out of it, so no
+    offset is needed and no single read hits the PostgREST row cap. A
+    round that only returns already-deleted keys (a delete that did not
+    take) ends the loop instead of spinning.
+    """
+    removed = 0
+    while True:
+        rows = build_query().limit(_PURGE_CHUNK).execute().data or []
+        by_key = {
+            row["cache_key"]: row["storage_path"]
+            for row in rows if row["cache_key"] not in seen
+        }
+        if not by_key:
+            return removed
+        seen.update(by_key)
+        chunk = list(by_key)
+        sb.storage.from_(BUCKET_NAME).remove([by_key[k] for k in chunk])
+        sb.table("render_cache").delete().in_("cache_key", chunk).execute()
+        removed += len(chunk)
+        if len(rows) < _PURGE_CHUNK:
+            return removed
+
+
+def purge_stale(max_age: timedelta = RETENTION) -> int:
+    """Delete entries rendered with an old template or not served for ``max_age``.
+
+    Returns the number of entries removed. Storage objects go first so a
+    failure leaves index rows that simply miss on the next lookup.
+    """
+    sb = _get_supabase()
+    cutoff = (datetime.now(timezone.utc) - max_age).isoformat()
+
+    seen: set = set()
+    removed = 0
+    for kind in KINDS:
+        version = template_version(kind)
+        removed += _purge_matching(
+            sb,
+            lambda kind=kind, version=version: (
+                sb.table("render_cache")
+                .select("cache_key, storage_path")
+                .eq("kind", kind)
+                .neq("template_version", version)
+            ),
+            seen,
+        )
+    removed += _purge_matching(
+        sb,
+        lambda: (
+            sb.table("render_cache")
+            .select("cache_key, storage_path")
+            .lt("last_hit_at", cutoff)
+        ),
+        seen,
+    )
+
+    logger.info("[render_cache] purged %d entries", removed)
+    return removed
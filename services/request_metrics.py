@@ -0,0 +1,356 @@
+"""
+Request metrics — count database and external HTTP round trips per request.
+
+N+1 patterns (a PostgREST call per item in calculate_quote, autofill,
+kanban, ...) used to be found only by reading code. This module counts every
+outbound call made while handling one API request:
+
+- the counter lives in a ContextVar set by api.lib.request_metrics
+  (RequestMetricsMiddleware), so concurrent requests never mix and code
+  running outside a request is not counted;
+- install() hooks httpx at the transport level. supabase-py (PostgREST,
+  Storage, Auth) and the Alta / CBR / DaData / HERE clients all go through
+  httpx, so no call site has to change. Each call is attributed to a target
+  by URL (classify());
+- time runs from sending the request until the response body is closed,
+  bytes are request Content-Length + response body bytes read;
+- every call, in a request or not, also feeds the process-wide
+  ``external_request_*`` metrics (services/metrics.py).
+
+Work handed to a thread without copying the context (a bare
+``loop.run_in_executor``) is not attributed to the request. Starlette's
+threadpool for sync endpoints does copy it.
+
+Tests can pin a query budget:
+
+    with assert_max_queries(3):
+        client.get("/api/quotes/...")
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from services import metrics as _metrics
+
+logger = logging.getLogger(__name__)
+
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+SLOW_REQUEST_DB_CALLS = int(os.getenv("SLOW_REQUEST_DB_CALLS", "50"))
+
+# Host suffix → target name for external services
+_EXTERNAL_HOSTS = (
+    ("alta.ru", "alta"),
+    ("cbr.ru", "cbr"),
+    ("cbr-xml-daily.ru", "cbr"),
+    ("dadata.ru", "dadata"),
+    ("hereapi.com", "here"),
+    ("telegram.org", "telegram"),
+)
+
+# Supabase URL path prefix → target name
+_SUPABASE_PATHS = (
+    ("/rest/v1", "db"),
+    ("/storage/v1", "storage"),
+    ("/auth/v1", "auth"),
+)
+
+# Process-wide counterparts of the per-request numbers (GET /api/metrics)
+_EXTERNAL_SECONDS = _metrics.histogram(
+    "external_request_duration_seconds",
+    "Outbound HTTP call time by target (db, storage, alta, cbr, dadata, here, telegram, ...)",
+    ("target",),
+)
+_EXTERNAL_ERRORS = _metrics.counter(
+    "external_request_errors_total",
+    "Outbound HTTP calls that failed: transport error, HTTP 429 or 5xx",
+    ("target",),
+)
+
+
+@dataclass
+class CallStats:
+    calls: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+
+class RequestMetrics:
+    """Per-request call counters, keyed by target ("db", "alta", ...)."""
+
+    def __init__(self, name: str = "", parent: Optional["RequestMetrics"] = None) -> None:
+        self.name = name
+        self.parent = parent
+        self.started = time.perf_counter()
+        self.targets: Dict[str, CallStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, target: str, seconds: float, nbytes: int = 0) -> None:
+        """Count one call here and in every enclosing tracker."""
+        with self._lock:
+            stats = self.targets.setdefault(target, CallStats())
+            stats.calls += 1
+            stats.bytes += nbytes
+            stats.seconds += seconds
+        if self.parent is not None:
+            self.parent.record(target, seconds, nbytes)
+
+    def calls(self, target: Optional[str] = None) -> int:
+        """Number of calls to ``target`` (all targets if None)."""
+        if target is not None:
+            stats = self.targets.get(target)
+            return stats.calls if stats else 0
+        return sum(s.calls for s in self.targets.values())
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` header value: one metric per target + ``app``."""
+        parts = [
+            f'{target};dur={stats.seconds * 1000:.1f};'
+            f'desc="{stats.calls} calls, {stats.bytes} B"'
+            for target, stats in sorted(self.targets.items())
+        ]
+        parts.append(f"app;dur={self.elapsed_ms():.1f}")
+        return ", ".join(parts)
+
+    def summary(self) -> Dict[str, dict]:
+        """Plain dict for structured logs."""
+        return {
+            target: {
+                "calls": stats.calls,
+                "bytes": stats.bytes,
+                "ms": round(stats.seconds * 1000, 1),
+            }
+            for target, stats in sorted(self.targets.items())
+        }
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+# Process-wide trackers (assert_max_queries): see every call regardless of
+# context, because TestClient runs the app in its own thread and context.
+_global_trackers: List[RequestMetrics] = []
+
+
+def current() -> Optional[RequestMetrics]:
+    """Metrics of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+@contextmanager
+def track(name: str = "") -> Iterator[RequestMetrics]:
+    """Count calls made inside the block (and tasks/threads it spawns with
+    the context copied). Nested trackers also count into the outer one."""
+    metrics = RequestMetrics(name, parent=_current.get())
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def _record_to(metrics: Optional[RequestMetrics], target: str, seconds: float, nbytes: int) -> None:
+    if metrics is not None:
+        metrics.record(target, seconds, nbytes)
+    for tracker in list(_global_trackers):
+        if not _is_ancestor(tracker, metrics):
+            tracker.record(target, seconds, nbytes)
+
+
+def _is_ancestor(tracker: RequestMetrics, metrics: Optional[RequestMetrics]) -> bool:
+    while metrics is not None:
+        if metrics is tracker:
+            return True
+        metrics = metrics.parent
+    return False
+
+
+def record(target: str, seconds: float, nbytes: int = 0) -> None:
+    """Attribute one call to the current request (and global trackers).
+
+    No-op when nothing is tracking. For clients that do not go through
+    httpx, and for test fakes.
+    """
+    _record_to(_current.get(), target, seconds, nbytes)
+
+
+def classify(url) -> str:
+    """Map a request URL to a target name."""
+    parts = urlsplit(str(url))
+    host = (parts.hostname or "").lower()
+
+    supabase_url = os.getenv("SUPABASE_URL")
+    if supabase_url and host == (urlsplit(supabase_url).hostname or "").lower():
+        for prefix, target in _SUPABASE_PATHS:
+            if parts.path.startswith(prefix):
+                return target
+        return "supabase"
+
+    for suffix, target in _EXTERNAL_HOSTS:
+        if host == suffix or host.endswith("." + suffix):
+            return target
+    return "http"
+
+
+# ============================================================================
+# httpx hooks
+# ============================================================================
+
+class _Call:
+    """One outbound request; recorded once, when its response body closes."""
+
+    def __init__(self, metrics: Optional[RequestMetrics], request: httpx.Request) -> None:
+        self.metrics = metrics
+        self.target = classify(request.url)
+        self.started = time.perf_counter()
+        try:
+            self.bytes = int(request.headers.get("content-length") or 0)
+        except ValueError:
+            self.bytes = 0
+        self.failed = False
+        self._done = False
+
+    def finish(self) -> None:
+        if self._done:
+            return
+        self._done = True
+        seconds = time.perf_counter() - self.started
+        _EXTERNAL_SECONDS.observe(seconds, target=self.target)
+        if self.failed:
+            _EXTERNAL_ERRORS.inc(target=self.target)
+        _record_to(self.metrics, self.target, seconds, self.bytes)
+
+
+class _CountingStream(httpx.SyncByteStream):
+    def __init__(self, stream, call: _Call) -> None:
+        self._stream = stream
+        self._call = call
+
+    def __iter__(self):
+        for chunk in self._stream:
+            self._call.bytes += len(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._call.finish()
+
+
+class _AsyncCountingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, call: _Call) -> None:
+        self._stream = stream
+        self._call = call
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._call.bytes += len(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._call.finish()
+
+
+def _is_failure(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+_install_lock = threading.Lock()
+_installed = False
+
+
+def install() -> None:
+    """Hook httpx transports (idempotent). Called once from api/app.py."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        sync_handle = httpx.HTTPTransport.handle_request
+        async_handle = httpx.AsyncHTTPTransport.handle_async_request
+
+        def handle_request(self, request):
+            call = _Call(_current.get(), request)
+            try:
+                response = sync_handle(self, request)
+            except Exception:
+                call.failed = True
+                call.finish()
+                raise
+            call.failed = _is_failure(response.status_code)
+            response.stream = _CountingStream(response.stream, call)
+            return response
+
+        async def handle_async_request(self, request):
+            call = _Call(_current.get(), request)
+            try:
+                response = await async_handle(self, request)
+            except Exception:
+                call.failed = True
+                call.finish()
+                raise
+            call.failed = _is_failure(response.status_code)
+            response.stream = _AsyncCountingStream(response.stream, call)
+            return response
+
+        httpx.HTTPTransport.handle_request = handle_request
+        httpx.AsyncHTTPTransport.handle_async_request = handle_async_request
+        _installed = True
+
+
+# ============================================================================
+# Slow-request log + test helper
+# ============================================================================
+
+def log_if_slow(metrics: RequestMetrics, method: str, path: str, status: int) -> None:
+    """Structured warning for requests over SLOW_REQUEST_MS or SLOW_REQUEST_DB_CALLS."""
+    duration_ms = metrics.elapsed_ms()
+    db_calls = metrics.calls("db")
+    if duration_ms < SLOW_REQUEST_MS and db_calls < SLOW_REQUEST_DB_CALLS:
+        return
+    logger.warning(
+        "slow_request",
+        extra={
+            "method": method,
+            "path": path,
+            "status": status,
+            "duration_ms": round(duration_ms, 1),
+            "db_calls": db_calls,
+            "calls": metrics.summary(),
+        },
+    )
+
+
+@contextmanager
+def assert_max_queries(limit: int, target: str = "db") -> Iterator[RequestMetrics]:
+    """Fail if the block makes more than ``limit`` calls to ``target``.
+
+    Test helper. Counts every call in the process while active — including
+    requests served by TestClient in its own thread — so do not use it
+    with tests running in parallel threads.
+    """
+    install()
+    metrics = RequestMetrics("assert_max_queries")
+    _global_trackers.append(metrics)
+    try:
+        yield metrics
+    finally:
+        _global_trackers.remove(metrics)
+    made = metrics.calls(target)
+    assert made <= limit, (
+        f"expected at most {limit} {target} calls, got {made}: {metrics.summary()}"
+    )
@@ -14,13 +14,20 @@ Examples:
 - "Китай-*" - All routes from China
 - "Турция-Москва" - Specific route Turkey to Moscow
 - "*-Санкт-Петербург" - All routes to St. Petersburg
+
+Route lookups are answered in memory by a per-organization RouteMatcher
+(see get_route_matcher) that mirrors the DB function
+match_route_to_logistics_manager(); the DB function is only used when the
+assignments cannot be loaded.
 """
 
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Tuple
 from datetime import datetime
 import os
 import re
+import threading
+import time
 from supabase import create_client, ClientOptions
 
 
@@ -245,6 +252,7 @@ def create_route_logistics_assignment(
             "user_id": user_id,
             "created_by": created_by,
         }).execute()
+        invalidate_route_matcher(organization_id)
 
         if result.data and len(result.data) > 0:
             return _parse_assignment(result.data[0])
@@ -547,6 +555,202 @@ def assignment_exists(organization_id: str, route_pattern: str) -> bool:
     return get_route_logistics_assignment_by_pattern(organization_id, route_pattern) is not None
 
 
+# =============================================================================
+# COMPILED ROUTE MATCHER
+# =============================================================================
+
+# Matchers are rebuilt after this many seconds (bounds staleness across
+# workers) or at once after a write from this process (invalidate_route_matcher).
+MATCHER_TTL_SECONDS = 120.0
+
+# PostgREST max-rows; assignments are loaded page by page
+_MATCHER_PAGE_SIZE = 1000
+
+# Wildcards of the DB matcher: '*' -> LIKE '%', '?' -> LIKE '_' (and the raw
+# LIKE wildcards themselves, which the DB function passes through)
+_MULTI_WILDCARDS = "*%"
+_SINGLE_WILDCARDS = "?_"
+
+
+@dataclass(frozen=True)
+class _CompiledPattern:
+    """One wildcard pattern, ready to test."""
+    sort_key: Tuple[int, int, str]   # (wildcards, -length, pattern): lower wins
+    regex: "re.Pattern[str]"
+    user_id: str
+
+
+def _compile_pattern(pattern: str) -> Tuple[str, str, "re.Pattern[str]"]:
+    """(literal prefix, literal suffix, full-match regex) of a route pattern."""
+    parts = []
+    for ch in pattern:
+        if ch in _MULTI_WILDCARDS:
+            parts.append(".*")
+        elif ch in _SINGLE_WILDCARDS:
+            parts.append(".")
+        else:
+            parts.append(re.escape(ch))
+    wildcards = _MULTI_WILDCARDS + _SINGLE_WILDCARDS
+    first = next((i for i, ch in enumerate(pattern) if ch in wildcards), len(pattern))
+    last = max((i for i, ch in enumerate(pattern) if ch in wildcards), default=-1)
+    return pattern[:first], pattern[last + 1:], re.compile("".join(parts), re.DOTALL)
+
+
+class RouteMatcher:
+    """
+    In-memory equivalent of the DB function match_route_to_logistics_manager().
+
+    Built once per organization from its assignments:
+    - exact patterns go into a dict;
+    - wildcard patterns are compiled once, sorted by specificity (fewer '*',
+      then longer pattern) and indexed by their literal prefix (e.g. "Китай-"
+      of "Китай-*"), or by their literal suffix when they start with a
+      wildcard ("-Москва" of "*-Москва").
+
+    A lookup only tests the buckets whose key is a prefix / suffix of the
+    route and stops at the first hit in each bucket. Matching is
+    case-sensitive, like SQL LIKE.
+    """
+
+    _MEMO_SIZE = 4096
+
+    def __init__(self, assignments: Iterable[Dict[str, Any]]) -> None:
+        self._exact: Dict[str, str] = {}
+        by_prefix: Dict[str, List[_CompiledPattern]] = {}
+        by_suffix: Dict[str, List[_CompiledPattern]] = {}
+        rest: List[_CompiledPattern] = []
+        self.size = 0
+
+        for row in assignments:
+            pattern, user_id = row.get("route_pattern"), row.get("user_id")
+            if not pattern or not user_id:
+                continue
+            self.size += 1
+            self._exact.setdefault(pattern, user_id)
+            prefix, suffix, regex = _compile_pattern(pattern)
+            if prefix == pattern:
+                continue  # no wildcards: exact match only
+            compiled = _CompiledPattern((pattern.count("*"), -len(pattern), pattern), regex, user_id)
+            if prefix:
+                by_prefix.setdefault(prefix, []).append(compiled)
+            elif suffix:
+                by_suffix.setdefault(suffix, []).append(compiled)
+            else:
+                rest.append(compiled)
+
+        for bucket in (*by_prefix.values(), *by_suffix.values(), rest):
+            bucket.sort(key=lambda c: c.sort_key)
+        self._by_prefix = by_prefix
+        self._by_suffix = by_suffix
+        self._rest = rest
+        self._prefix_lengths = sorted({len(k) for k in by_prefix})
+        self._suffix_lengths = sorted({len(k) for k in by_suffix})
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def _candidates(self, route: str) -> Iterable[List[_CompiledPattern]]:
+        for n in self._prefix_lengths:
+            if n > len(route):
+                break
+            bucket = self._by_prefix.get(route[:n])
+            if bucket:
+                yield bucket
+        for n in self._suffix_lengths:
+            if n > len(route):
+                break
+            bucket = self._by_suffix.get(route[-n:])
+            if bucket:
+                yield bucket
+        if self._rest:
+            yield self._rest
+
+    def match(self, route: str) -> Optional[str]:
+        """User ID responsible for ``route``, or None."""
+        if route in self._exact:
+            return self._exact[route]
+        if route in self._memo:
+            return self._memo[route]
+
+        best: Optional[_CompiledPattern] = None
+        for bucket in self._candidates(route):
+            for compiled in bucket:
+                if best is not None and compiled.sort_key >= best.sort_key:
+                    break
+                if compiled.regex.fullmatch(route):
+                    best = compiled
+                    break
+
+        user_id = best.user_id if best else None
+        if len(self._memo) >= self._MEMO_SIZE:
+            self._memo.clear()
+        self._memo[route] = user_id
+        return user_id
+
+    def match_many(self, routes: Iterable[str]) -> Dict[str, Optional[str]]:
+        """``match`` for many routes at once: {route: user_id or None}."""
+        return {route: self.match(route) for route in routes}
+
+
+_matchers: Dict[str, Tuple[RouteMatcher, float]] = {}
+_matchers_lock = threading.Lock()
+
+
+def _load_matcher(organization_id: str) -> RouteMatcher:
+    supabase = _get_supabase()
+    rows: List[Dict[str, Any]] = []
+    start = 0
+    while True:
+        result = supabase.table("route_logistics_assignments")\
+            .select("route_pattern, user_id")\
+            .eq("organization_id", organization_id)\
+            .order("id")\
+            .range(start, start + _MATCHER_PAGE_SIZE - 1)\
+            .execute()
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < _MATCHER_PAGE_SIZE:
+            return RouteMatcher(rows)
+        start += _MATCHER_PAGE_SIZE
+
+
+def get_route_matcher(organization_id: str) -> RouteMatcher:
+    """
+    Return the organization's compiled RouteMatcher, (re)building it when
+    it is older than MATCHER_TTL_SECONDS or was invalidated.
+
+    A failed rebuild keeps serving the previous matcher; a failed first
+    load raises.
+    """
+    now = time.monotonic()
+    with _matchers_lock:
+        cached = _matchers.get(organization_id)
+    if cached and now - cached[1] < MATCHER_TTL_SECONDS:
+        return cached[0]
+
+    try:
+        matcher = _load_matcher(organization_id)
+    except Exception as e:
+        if cached is None:
+            raise
+        print(f"Error reloading route matcher, serving previous one: {e}")
+        return cached[0]
+
+    with _matchers_lock:
+        _matchers[organization_id] = (matcher, time.monotonic())
+    return matcher
+
+
+def invalidate_route_matcher(organization_id: Optional[str] = None) -> None:
+    """Drop the cached matcher of one organization (or of all of them).
+
+    Called by every write in this module.
+    """
+    with _matchers_lock:
+        if organization_id is None:
+            _matchers.clear()
+        else:
+            _matchers.pop(organization_id, None)
+
+
 # =============================================================================
 # ROUTE MATCHING Functions
 # =============================================================================
@@ -558,7 +762,9 @@ def match_route_to_logistics_manager(
     """
     Match a route against patterns to find the responsible logistics manager.
 
-    Uses the database function match_route_to_logistics_manager() for accurate matching.
+    Answered in memory by the organization's RouteMatcher (same rules as the
+    database function match_route_to_logistics_manager(), which is used when
+    the assignments cannot be loaded).
 
     Args:
         organization_id: Organization UUID
@@ -570,6 +776,16 @@ def match_route_to_logistics_manager(
     Example:
         user_id = match_route_to_logistics_manager("org-uuid", "Китай-Москва")
     """
+    try:
+        return get_route_matcher(organization_id).match(route)
+    except Exception as e:
+        print(f"Error loading route matcher: {e}")
+        # Fallback to the database function
+        return _match_route_rpc(organization_id, route)
+
+
+def _match_route_rpc(organization_id: str, route: str) -> Optional[str]:
+    """Database fallback: match_route_to_logistics_manager() RPC."""
     try:
         supabase = _get_supabase()
 
@@ -587,42 +803,46 @@ def match_route_to_logistics_manager(
 
     except Exception as e:
         print(f"Error matching route to logistics manager: {e}")
-        # Fallback to Python-based matching
-        return _match_route_python(organization_id, route)
+        return None
 
 
 def _match_route_python(organization_id: str, route: str) -> Optional[str]:
     """
-    Python fallback for route matching when DB function is unavailable.
+    In-memory route matching (RouteMatcher of the organization).
 
     Priority:
     1. Exact match
     2. Patterns with fewer wildcards (more specific)
     3. Longer patterns
     """
-    assignments = get_all_route_logistics_assignments(organization_id, limit=1000)
+    return get_route_matcher(organization_id).match(route)
 
-    # Try exact match first
-    for assignment in assignments:
-        if assignment.route_pattern == route:
-            return assignment.user_id
 
-    # Try wildcard matching
-    matches = []
-    for assignment in assignments:
-        pattern = assignment.route_pattern
-        # Convert pattern to regex
-        regex_pattern = "^" + re.escape(pattern).replace(r"\*", ".*") + "$"
-        if re.match(regex_pattern, route, re.IGNORECASE):
-            wildcard_count = pattern.count("*")
-            matches.append((wildcard_count, -len(pattern), assignment.user_id))
+def match_routes_to_logistics_managers(
+    organization_id: str,
+    routes: Iterable[str],
+) -> Dict[str, Optional[str]]:
+    """
+    Batch version of match_route_to_logistics_manager().
+
+    Args:
+        organization_id: Organization UUID
+        routes: Route strings (e.g., ["Китай-Москва", "Турция-*"])
+
+    Returns:
+        Dict mapping each route to the matched user ID (None if no match)
+    """
+    routes = list(routes)
+    try:
+        return get_route_matcher(organization_id).match_many(routes)
+    except Exception as e:
+        print(f"Error loading route matcher: {e}")
+        return {route: _match_route_rpc(organization_id, route) for route in routes}
 
-    if matches:
-        # Sort by: fewer wildcards, then longer patterns
-        matches.sort()
-        return matches[0][2]
 
-    return None
+def _locations_route(origin_country: Optional[str], destination_city: Optional[str]) -> str:
+    """Route string built the same way as get_logistics_manager_for_locations() in SQL."""
+    return f"{origin_country or '*'}-{destination_city or '*'}"
 
 
 def get_logistics_manager_for_locations(
@@ -633,7 +853,8 @@ def get_logistics_manager_for_locations(
     """
     Find logistics manager for a route given origin and destination.
 
-    Uses the database function get_logistics_manager_for_locations().
+    Missing locations become wildcards ("Китай-*"), as in the database
+    function get_logistics_manager_for_locations().
 
     Args:
         organization_id: Organization UUID
@@ -646,27 +867,34 @@ def get_logistics_manager_for_locations(
     Example:
         user_id = get_logistics_manager_for_locations("org-uuid", "Китай", "Москва")
     """
-    try:
-        supabase = _get_supabase()
+    return match_route_to_logistics_manager(
+        organization_id, _locations_route(origin_country, destination_city)
+    )
 
-        result = supabase.rpc(
-            "get_logistics_manager_for_locations",
-            {
-                "p_organization_id": organization_id,
-                "p_origin_country": origin_country or "*",
-                "p_destination_city": destination_city or "*",
-            }
-        ).execute()
 
-        if result.data is not None:
-            return result.data
-        return None
+def get_logistics_managers_for_locations(
+    organization_id: str,
+    locations: Iterable[Tuple[Optional[str], Optional[str]]],
+) -> Dict[Tuple[Optional[str], Optional[str]], Optional[str]]:
+    """
+    Batch version of get_logistics_manager_for_locations().
 
-    except Exception as e:
-        print(f"Error getting logistics manager for locations: {e}")
-        # Fallback to building route and matching
-        route = build_route_pattern(origin_country, destination_city)
-        return match_route_to_logistics_manager(organization_id, route)
+    Args:
+        organization_id: Organization UUID
+        locations: (origin_country, destination_city) pairs
+
+    Returns:
+        Dict mapping each pair to the matched user ID (None if no match)
+
+    Example:
+        users = get_logistics_managers_for_locations(
+            "org-uuid", [("Китай", "Москва"), ("Турция", "Москва")]
+        )
+    """
+    locations = list(dict.fromkeys(locations))
+    routes = {loc: _locations_route(*loc) for loc in locations}
+    matched = match_routes_to_logistics_managers(organization_id, routes.values())
+    return {loc: matched[route] for loc, route in routes.items()}
 
 
 def find_matching_routes(
@@ -747,8 +975,8 @@ def update_route_logistics_assignment(
             .update(update_data)\
             .eq("id", assignment_id)\
             .execute()
-
         if result.data and len(result.data) > 0:
+            invalidate_route_matcher(result.data[0]["organization_id"])
             return _parse_assignment(result.data[0])
         return None
 
@@ -807,6 +1035,7 @@ def delete_route_logistics_assignment(assignment_id: str) -> bool:
             .delete()\
             .eq("id", assignment_id)\
             .execute()
+        invalidate_route_matcher()  # organization unknown here
 
         return True
 
@@ -838,6 +1067,7 @@ def delete_route_logistics_assignment_by_pattern(
             .eq("organization_id", organization_id)\
             .eq("route_pattern", normalized)\
             .execute()
+        invalidate_route_matcher(organization_id)
 
         return True
 
@@ -870,6 +1100,7 @@ def delete_all_assignments_for_user(
             .eq("organization_id", organization_id)\
             .eq("user_id", user_id)\
             .execute()
+        invalidate_route_matcher(organization_id)
 
         return len(result.data) if result.data else 0
 
@@ -1128,11 +1359,7 @@ def check_route_coverage(
         coverage = check_route_coverage("org-uuid", ["Китай-Москва", "Турция-СПб"])
         uncovered = [r for r, u in coverage.items() if u is None]
     """
-    coverage = {}
-    for route in routes:
-        user_id = match_route_to_logistics_manager(organization_id, route)
-        coverage[route] = user_id
-    return coverage
+    return match_routes_to_logistics_managers(organization_id, routes)
 
 
 def get_uncovered_routes(
@@ -0,0 +1,215 @@
+"""Global search across quotes, customers, suppliers and locations.
+
+One call to ``kvota.global_search`` (migration 346) returns ranked hits for
+every entity kind, each kind bounded by ``limit`` — trigram GIN indexes
+make the '%q%' match an index scan, so search-as-you-type costs one
+indexed round trip per keystroke instead of one unindexed scan per entity.
+
+Ranking (per kind): exact match, then prefix match, then substring; ties
+broken by trigram similarity, then title.
+
+``resolve_scope`` limits the hits to what the caller may open, with the
+rules of frontend/src/shared/lib/access.ts (.kiro/steering/access-control.md):
+sales-only users find their assigned customers and those customers' quotes
+(plus quotes they created), only procurement roles find suppliers, and
+procurement-only users only their assigned suppliers (migration 352).
+
+``ilike_any`` builds the PostgREST ``or=(...)`` filter the per-entity
+search helpers (customer_service, supplier_service) use to match several
+columns in one query.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence
+
+from services.database import get_supabase
+
+logger = logging.getLogger(__name__)
+
+
+SEARCH_KINDS = ("quote", "customer", "supplier", "location")
+MIN_QUERY_LENGTH = 2
+DEFAULT_LIMIT_PER_KIND = 8
+MAX_LIMIT_PER_KIND = 25
+
+# Role groups of frontend/src/shared/lib/roles.ts
+SALES_ROLES = ("sales", "head_of_sales")
+PROCUREMENT_ROLES = ("procurement", "procurement_senior", "head_of_procurement")
+NON_SALES_ROLES = (
+    "admin", "top_manager", "procurement", "procurement_senior", "logistics",
+    "customs", "quote_controller", "spec_controller", "finance",
+    "head_of_procurement", "head_of_logistics",
+)
+NON_PROCUREMENT_ROLES = (
+    "admin", "top_manager", "sales", "head_of_sales", "logistics", "customs",
+    "quote_controller", "spec_controller", "finance", "head_of_logistics",
+)
+
+
+@dataclass
+class SearchHit:
+    """One ranked search result."""
+    kind: str
+    id: str
+    title: str
+    subtitle: Optional[str] = None
+    rank: int = 2
+    score: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "id": self.id,
+            "title": self.title,
+            "subtitle": self.subtitle,
+        }
+
+
+@dataclass
+class SearchScope:
+    """Records a caller may find. ``None`` id lists are unrestricted."""
+    kinds: Sequence[str] = SEARCH_KINDS
+    customer_ids: Optional[List[str]] = None
+    quote_creator_ids: Optional[List[str]] = None
+    supplier_ids: Optional[List[str]] = None
+
+
+def _get_supabase():
+    """Get Supabase client. Wrapped for testability (tests mock this function)."""
+    return get_supabase()
+
+
+def ilike_any(columns: Iterable[str], query: str) -> str:
+    """PostgREST ``or`` filter matching ``%query%`` case-insensitively on any column.
+
+    The value is double-quoted so commas / parentheses in user input cannot
+    break out of the filter; LIKE wildcards typed by the user match literally.
+    """
+    like = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    quoted = like.replace("\\", "\\\\").replace('"', '\\"')  # PostgREST unescapes once
+    return ",".join(f'{col}.ilike."%{quoted}%"' for col in columns)
+
+
+def _is_sales_only(roles: Sequence[str]) -> bool:
+    return any(r in SALES_ROLES for r in roles) and not any(r in NON_SALES_ROLES for r in roles)
+
+
+def _is_procurement_only(roles: Sequence[str]) -> bool:
+    if "head_of_procurement" in roles:
+        return False
+    return (
+        any(r in PROCUREMENT_ROLES for r in roles)
+        and not any(r in NON_PROCUREMENT_ROLES for r in roles)
+    )
+
+
+def _has_procurement_access(roles: Sequence[str]) -> bool:
+    return "admin" in roles or "top_manager" in roles or any(r in PROCUREMENT_ROLES for r in roles)
+
+
+def _scoped_sales_user_ids(sb, user_id: str, organization_id: str, roles: Sequence[str]) -> List[str]:
+    """The user, or every member of their sales group for a head of sales."""
+    if "head_of_sales" not in roles:
+        return [user_id]
+    profile = (
+        sb.table("user_profiles").select("sales_group_id")
+        .eq("user_id", user_id).eq("organization_id", organization_id)
+        .limit(1).execute()
+    )
+    group_id = profile.data[0].get("sales_group_id") if profile.data else None
+    if not group_id:
+        return [user_id]
+    members = (
+        sb.table("user_profiles").select("user_id")
+        .eq("sales_group_id", group_id).eq("organization_id", organization_id)
+        .execute()
+    )
+    return [r["user_id"] for r in (members.data or []) if r.get("user_id")] or [user_id]
+
+
+def _assigned_customer_ids(sb, user_ids: List[str], organization_id: str) -> List[str]:
+    """customer_assignees rows of ``user_ids`` plus customers they manage."""
+    assignees = sb.table("customer_assignees").select("customer_id").in_("user_id", user_ids).execute()
+    managed = (
+        sb.table("customers").select("id")
+        .in_("manager_id", user_ids).eq("organization_id", organization_id)
+        .execute()
+    )
+    ids = {r["customer_id"] for r in (assignees.data or []) if r.get("customer_id")}
+    ids.update(r["id"] for r in (managed.data or []) if r.get("id"))
+    return sorted(ids)
+
+
+def resolve_scope(user_id: str, organization_id: str, roles: Sequence[str]) -> SearchScope:
+    """What ``user_id`` with ``roles`` may find in the organization."""
+    sb = _get_supabase()
+    kinds = [k for k in SEARCH_KINDS if k != "supplier" or _has_procurement_access(roles)]
+    scope = SearchScope(kinds=tuple(kinds))
+
+    if _is_sales_only(roles):
+        user_ids = _scoped_sales_user_ids(sb, user_id, organization_id, roles)
+        scope.customer_ids = _assigned_customer_ids(sb, user_ids, organization_id)
+        scope.quote_creator_ids = [user_id]
+    if _is_procurement_only(roles):
+        assigned = sb.table("supplier_assignees").select("supplier_id").eq("user_id", user_id).execute()
+        scope.supplier_ids = [r["supplier_id"] for r in (assigned.data or []) if r.get("supplier_id")]
+    return scope
+
+
+def global_search(
+    organization_id: str,
+    query: str,
+    *,
+    kinds: Optional[Iterable[str]] = None,
+    limit: int = DEFAULT_LIMIT_PER_KIND,
+    scope: Optional[SearchScope] = None,
+) -> List[SearchHit]:
+    """Ranked hits for ``query`` across ``kinds`` (default: all).
+
+    ``scope`` (see resolve_scope) limits the hits to the caller's visible
+    records; without it the whole organization is searched.
+
+    Returns [] for queries shorter than MIN_QUERY_LENGTH or when the RPC
+    fails. Hits are grouped by kind in SEARCH_KINDS order, best first.
+    """
+    query = (query or "").strip()
+    if len(query) < MIN_QUERY_LENGTH:
+        return []
+
+    scope = scope or SearchScope()
+    kinds_list = [k for k in (kinds or SEARCH_KINDS) if k in scope.kinds]
+    if not kinds_list:
+        return []
+    limit = max(1, min(limit, MAX_LIMIT_PER_KIND))
+
+    try:
+        result = _get_supabase().rpc("global_search", {
+            "p_organization_id": organization_id,
+            "p_query": query,
+            "p_kinds": kinds_list,
+            "p_limit": limit,
+            "p_customer_ids": scope.customer_ids,
+            "p_quote_creator_ids": scope.quote_creator_ids,
+            "p_supplier_ids": scope.supplier_ids,
+        }).execute()
+    except Exception as e:
+        logger.warning("global_search failed for org %s: %s", organization_id, e)
+        return []
+
+    hits = [
+        SearchHit(
+            kind=row["kind"],
+            id=row["id"],
+            title=row.get("title") or "",
+            subtitle=row.get("subtitle"),
+            rank=row.get("rank") if row.get("rank") is not None else 2,
+            score=float(row.get("score") or 0.0),
+        )
+        for row in (result.data or [])
+    ]
+    order = {k: i for i, k in enumerate(SEARCH_KINDS)}
+    hits.sort(key=lambda h: (order.get(h.kind, len(order)), h.rank, -h.score, h.title))
+    return hits
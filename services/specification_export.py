@@ -13,7 +13,8 @@ from datetime import datetime
 from dataclasses import dataclass
 
 from services.export_data_mapper import ExportData, enrich_with_legal_names, format_date_russian, amount_in_words_russian
-from services.composition_service import get_effective_quantities
+from services.export_loader import load_export_bundle
+from services import render_cache
 
 
 @dataclass
@@ -263,9 +264,13 @@ def generate_specification_pdf(data: ExportData, contract_info: Dict[str, Any] =
     try:
         from weasyprint import HTML
 
-        html = generate_specification_html(data, contract_info)
-        pdf_bytes = HTML(string=html).write_pdf()
-        return pdf_bytes
+        # Served from the render cache when neither the data nor the
+        # template changed since the last download.
+        return render_cache.get_or_render(
+            "specification_pdf",
+            (data, contract_info),
+            lambda: HTML(string=generate_specification_html(data, contract_info)).write_pdf(),
+        )
     except ImportError:
         raise ImportError("weasyprint is required for PDF generation. Install with: pip install weasyprint")
 
@@ -287,85 +292,30 @@ def fetch_specification_data(spec_id: str, org_id: str) -> SpecificationData:
     """
     from services.database import get_supabase
 
-    supabase = get_supabase()
-
-    # 1. Fetch specification
-    spec_result = supabase.table("specifications") \
-        .select("*") \
-        .eq("id", spec_id) \
-        .eq("organization_id", org_id) \
-        .execute()
-
-    if not spec_result.data:
-        raise ValueError(f"Specification not found: {spec_id}")
-
-    specification = spec_result.data[0]
-    quote_id = specification.get("quote_id")
-
-    # 2. Fetch quote
-    quote_result = supabase.table("quotes") \
-        .select("*") \
-        .eq("id", quote_id) \
-        .execute()
-
-    quote = quote_result.data[0] if quote_result.data else {}
-
-    # 3. Fetch customer
-    customer_result = supabase.table("customers") \
-        .select("*") \
-        .eq("id", quote.get("customer_id")) \
-        .execute()
-
-    customer = customer_result.data[0] if customer_result.data else {}
+    # Specification, quote, customer, organization, quote items, calc
+    # results, coverage and summary in one round trip.
+    bundle = load_export_bundle(org_id, spec_id=spec_id, supabase=get_supabase())
 
-    # 4. Fetch organization
-    org_result = supabase.table("organizations") \
-        .select("*") \
-        .eq("id", org_id) \
-        .execute()
+    specification = bundle.specification
+    quote = bundle.quote
+    customer = bundle.customer
+    organization = bundle.organization
 
-    organization = org_result.data[0] if org_result.data else {}
-
-    # 5. Fetch quote items
-    items_result = supabase.table("quote_items") \
-        .select("*") \
-        .eq("quote_id", quote_id) \
-        .order("position") \
-        .execute()
-
-    items = items_result.data or []
-
-    # 6. Fetch calculation results for each item
+    items = [dict(item) for item in bundle.quote_items]
     for item in items:
-        calc_result = supabase.table("quote_calculation_results") \
-            .select("phase_results") \
-            .eq("quote_item_id", item["id"]) \
-            .execute()
-
-        if calc_result.data:
-            item["calc"] = calc_result.data[0].get("phase_results", {})
-        else:
-            item["calc"] = {}
+        item["calc"] = bundle.calc_for(item["id"])
 
     # Supplier-quantity override: the «Кол-во» shown to the customer is the
     # effective qty the calc engine used (supplier minimum / short stock),
     # not the ordered qty. Falls back to ordered when no supplier is chosen.
-    effective_qtys = get_effective_quantities(quote_id, supabase)
+    effective_qtys = bundle.effective_quantities()
     for item in items:
         item["effective_quantity"] = effective_qtys.get(
             item["id"], item.get("quantity")
         )
 
-    # 7. Fetch calculation summary
-    summary_result = supabase.table("quote_calculation_summaries") \
-        .select("*") \
-        .eq("quote_id", quote_id) \
-        .execute()
-
-    calculations = {}
-    if summary_result.data:
-        calculations = summary_result.data[0]
-    else:
+    calculations = bundle.summary
+    if not calculations:
         # Calculate from items if no summary
         calculations = _calculate_totals_from_items(items, specification.get("specification_currency", quote.get("currency", "RUB")))
 
@@ -734,12 +684,12 @@ def generate_spec_pdf_from_spec_id(spec_id: str, org_id: str) -> bytes:
         # Fetch all data
         data = fetch_specification_data(spec_id, org_id)
 
-        # Generate HTML
-        html = generate_spec_pdf_html(data)
-
-        # Generate PDF
-        pdf_bytes = HTML(string=html).write_pdf()
-        return pdf_bytes
+        # Generate HTML → PDF (or serve the cached render of the same data)
+        return render_cache.get_or_render(
+            "specification_record_pdf",
+            data,
+            lambda: HTML(string=generate_spec_pdf_html(data)).write_pdf(),
+        )
 
     except ImportError:
         raise ImportError("weasyprint is required for PDF generation. Install with: pip install weasyprint")
@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from datetime import datetime, date
 from typing import Optional, List, Dict, Any
 from decimal import Decimal
+from . import document_numbering
 from .database import get_supabase
 
 
@@ -695,6 +696,9 @@ def generate_specification_number(organization_id: str, prefix: str = "SPEC") ->
 
     Format: PREFIX-YYYY-NNNN (e.g., SPEC-2025-0001)
 
+    The sequence comes from the organization's atomic yearly counter
+    (services/document_numbering.py, migration 350). Numbers may have gaps.
+
     Args:
         organization_id: UUID of the organization
         prefix: Prefix for the spec number (default: "SPEC")
@@ -703,17 +707,11 @@ def generate_specification_number(organization_id: str, prefix: str = "SPEC") ->
         Generated specification number
     """
     supabase = get_supabase()
-    year = datetime.now().year
 
     try:
-        # Count existing specs this year
-        result = supabase.table('specifications').select('id', count='exact') \
-            .eq('organization_id', organization_id) \
-            .gte('created_at', f'{year}-01-01') \
-            .execute()
-
-        count = (result.count or 0) + 1
-        return f"{prefix}-{year}-{count:04d}"
+        return document_numbering.generate(
+            organization_id, document_numbering.KIND_SPECIFICATION, prefix, sb=supabase
+        )
     except Exception as e:
         print(f"Error generating specification number: {e}")
         # Fallback with timestamp
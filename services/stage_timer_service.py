@@ -2,12 +2,15 @@
 Stage Timer Service — elapsed time computation, deadline status, and overdue detection.
 
 Functions: get_quote_timer, get_bulk_timers, get_overdue_quotes,
+           iter_overdue_quotes, claim_overdue_notification,
            format_elapsed, mark_overdue_notified
 """
 
 import logging
 from datetime import datetime, timezone
+from typing import Iterator
 
+from services import reference_cache
 from services.database import get_supabase
 
 logger = logging.getLogger(__name__)
@@ -15,6 +18,9 @@ logger = logging.getLogger(__name__)
 TERMINAL_STATUSES = {"draft", "deal", "rejected", "cancelled"}
 WARNING_THRESHOLD = 0.8
 
+# Keyset page size of the overdue scan (rows per PostgREST request).
+OVERDUE_PAGE_SIZE = 500
+
 _NO_TIMER_RESULT = {
     "elapsed_hours": 0.0,
     "deadline_hours": None,
@@ -78,15 +84,8 @@ def _build_timer(quote: dict, deadlines_map: dict[str, int]) -> dict:
 
 
 def _fetch_deadlines_map(org_id: str) -> dict[str, int]:
-    """Fetch {stage: deadline_hours} for an org from stage_deadlines table."""
-    client = _get_supabase()
-    resp = (
-        client.table("stage_deadlines")
-        .select("stage, deadline_hours")
-        .eq("organization_id", org_id)
-        .execute()
-    )
-    return {row["stage"]: row["deadline_hours"] for row in (resp.data or [])}
+    """Return {stage: deadline_hours} for an org (cached stage_deadlines snapshot)."""
+    return reference_cache.stage_deadlines_for_org(org_id, sb=_get_supabase())
 
 
 def get_quote_timer(quote_id: str, org_id: str) -> dict:
@@ -126,24 +125,53 @@ def get_bulk_timers(quote_ids: list[str], org_id: str) -> dict[str, dict]:
 def get_overdue_quotes(org_id: str) -> list[dict]:
     """Find quotes past deadline with overdue_notified_at IS NULL.
 
-    Returns [{quote_id, idn, stage, elapsed_hours, deadline_hours,
-              assigned_user_id, manager_id}].
+    Returns [{quote_id, idn, stage, stage_entered_at, elapsed_hours,
+              deadline_hours, assigned_user_id, manager_id}].
     """
-    client = _get_supabase()
-    resp = (
-        client.table("quotes")
-        .select("id, idn, workflow_status, stage_entered_at, "
-                "stage_deadline_override_hours, overdue_notified_at, "
-                "assigned_logistics_user, "
-                "assigned_customs_user, created_by_user_id")
-        .eq("organization_id", org_id)
-        .is_("overdue_notified_at", "null")
-        .execute()
-    )
-    deadlines_map = _fetch_deadlines_map(org_id)
+    return [q for page in iter_overdue_quotes(org_id) for q in page]
+
 
-    quotes_data = resp.data or []
+def iter_overdue_quotes(
+    org_id: str, page_size: int = OVERDUE_PAGE_SIZE
+) -> Iterator[list[dict]]:
+    """Yield the org's overdue quotes page by page (see get_overdue_quotes).
 
+    Keyset scan on id over quotes in a timed stage and not yet notified
+    (partial index idx_quotes_overdue_scan, migration 349), so memory and
+    response size stay bounded however many quotes the org has. Pages
+    without overdue quotes are skipped, not yielded empty.
+    """
+    client = _get_supabase()
+    deadlines_map = _fetch_deadlines_map(org_id)
+    last_id = None
+
+    while True:
+        query = (
+            client.table("quotes")
+            .select("id, idn, workflow_status, stage_entered_at, "
+                    "stage_deadline_override_hours, overdue_notified_at, "
+                    "assigned_logistics_user, "
+                    "assigned_customs_user, created_by_user_id")
+            .eq("organization_id", org_id)
+            .is_("overdue_notified_at", "null")
+            .not_.in_("workflow_status", sorted(TERMINAL_STATUSES))
+        )
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows = query.order("id").limit(page_size).execute().data or []
+        if not rows:
+            return
+
+        overdue = _collect_overdue(client, rows, deadlines_map)
+        if overdue:
+            yield overdue
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]["id"]
+
+
+def _collect_overdue(client, quotes_data: list[dict], deadlines_map: dict[str, int]) -> list[dict]:
+    """Overdue entries for one page of quote rows."""
     # Batch-resolve procurement assignments from quote_items (single source of truth)
     # for quotes currently in procurement stage — avoids N+1 queries.
     procurement_quote_ids = [
@@ -162,6 +190,7 @@ def get_overdue_quotes(org_id: str) -> list[dict]:
                 "quote_id": q["id"],
                 "idn": q.get("idn", ""),
                 "stage": timer["stage"],
+                "stage_entered_at": q.get("stage_entered_at"),
                 "elapsed_hours": timer["elapsed_hours"],
                 "deadline_hours": timer["deadline_hours"],
                 "assigned_user_id": assigned,
@@ -237,3 +266,26 @@ def mark_overdue_notified(quote_id: str) -> None:
     client.table("quotes").update(
         {"overdue_notified_at": datetime.now(timezone.utc).isoformat()}
     ).eq("id", quote_id).execute()
+
+
+def claim_overdue_notification(quote_id: str, stage: str, stage_entered_at: str) -> bool:
+    """Claim the overdue ping for (quote, stage entry). False if already claimed.
+
+    Inserts into kvota.quote_overdue_notifications_sent (migration 349);
+    the UNIQUE key makes the claim atomic across concurrent and repeated
+    cron runs — there is no read-then-write.
+    """
+    client = _get_supabase()
+    try:
+        client.table("quote_overdue_notifications_sent").insert({
+            "quote_id": quote_id,
+            "stage": stage,
+            "stage_entered_at": stage_entered_at,
+        }).execute()
+        return True
+    except Exception as exc:  # supabase-py wraps PostgREST errors
+        msg = str(exc).lower()
+        if "duplicate" in msg or "unique" in msg or "23505" in msg:
+            return False
+        logger.error(f"Overdue ledger insert failed for quote={quote_id} stage={stage}: {exc}")
+        raise
@@ -451,41 +451,22 @@ def search_suppliers(
     try:
         supabase = _get_supabase()
 
-        # Use ilike for case-insensitive search
-        search_pattern = f"%{query}%"
+        # One query over name OR code — both trigram-indexed (migration 346)
+        from services.search_service import ilike_any
 
-        # Build query with OR conditions for multiple fields
         base_query = supabase.table("suppliers").select("*")\
             .eq("organization_id", organization_id)
 
         if is_active is not None:
             base_query = base_query.eq("is_active", is_active)
 
-        # Search in name (primary)
-        result = base_query.ilike("name", search_pattern)\
+        result = base_query.or_(ilike_any(("name", "supplier_code"), query))\
             .order("name")\
             .limit(limit)\
             .execute()
 
         suppliers = [_parse_supplier(row) for row in result.data] if result.data else []
 
-        # If not enough results, also search by code
-        if len(suppliers) < limit:
-            code_query = supabase.table("suppliers").select("*")\
-                .eq("organization_id", organization_id)\
-                .ilike("supplier_code", search_pattern)
-
-            if is_active is not None:
-                code_query = code_query.eq("is_active", is_active)
-
-            code_result = code_query.limit(limit - len(suppliers)).execute()
-
-            if code_result.data:
-                existing_ids = {s.id for s in suppliers}
-                for row in code_result.data:
-                    if row["id"] not in existing_ids:
-                        suppliers.append(_parse_supplier(row))
-
         return suppliers
 
     except Exception as e:
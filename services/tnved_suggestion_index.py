@@ -0,0 +1,474 @@
+"""Offline TN ВЭД suggestion index built from confirmed classification history.
+
+Every Alta Express call burns a packet, yet most products a team quotes
+were already classified (and the pick confirmed) many times before.
+``kvota.tnved_classification_log`` rows with a non-null ``chosen_code``
+are exactly those confirmed picks; ``kvota.tnved_user_choices`` records
+which codes the org's customs specialists actually work with.
+
+This module keeps one in-process index per organization:
+
+  * exact ``(brand, product_code)`` → code (joined via ``quote_item_id``)
+  * exact normalised name (+ brand) → code
+  * trigram inverted index over names for near-duplicate spellings
+    ("Шайба М6 DIN 125" vs "шайба m6 din125")
+
+``classify_items`` and ``autofill_handler`` consult the index first and
+only send true unknowns to Alta. An entry whose history is split between
+codes (no code holds ``_MIN_AGREEMENT`` of the votes) is treated as an
+unknown — the index never guesses between conflicting confirmations.
+
+Refresh is incremental: each org index remembers the newest
+``created_at`` it has ingested from both tables and only pulls newer rows,
+at most once per ``REFRESH_INTERVAL_SECONDS``. ``record_choice`` adds a
+confirmation in-process right away (called from /classify/select) so the
+next classify on this worker benefits without waiting for a refresh.
+
+Hit rate and Alta packets saved are tracked in-process — see ``stats()``.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from services.database import get_supabase
+
+logger = logging.getLogger(__name__)
+
+
+# Minimum seconds between incremental refreshes of one org's index.
+REFRESH_INTERVAL_SECONDS = 300.0
+
+# Trigram Jaccard similarity required for a fuzzy name hit. High on
+# purpose: a wrong code costs more than one Alta packet.
+_MIN_SIMILARITY = 0.8
+
+# Share of an entry's confirmations the top code must hold to be served.
+_MIN_AGREEMENT = 0.6
+
+# Page size for the incremental history pulls.
+_PAGE_SIZE = 1000
+
+_WS_RE = re.compile(r"\s+")
+_PUNCT_RE = re.compile(r"[^\w\s]", re.UNICODE)
+
+
+# ---------------------------------------------------------------------------
+# Public dataclasses
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    """One index hit."""
+    code: str                 # 10-digit ТН ВЭД
+    score: float              # 1.0 for exact matches, Jaccard for fuzzy
+    confirmations: int        # how many confirmed picks back this code
+    matched_by: str           # 'product_code' | 'name' | 'trigram'
+    source_quote_item_id: str | None = None
+    source_quote_id: str | None = None
+    source_created_at: str | None = None
+
+
+# ---------------------------------------------------------------------------
+# Index internals
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class _Entry:
+    name_key: str
+    trigrams: frozenset[str]
+    votes: Counter = field(default_factory=Counter)
+    last_quote_item_id: str | None = None
+    last_quote_id: str | None = None
+    last_created_at: str | None = None
+
+    def add(
+        self,
+        code: str,
+        *,
+        quote_item_id: str | None,
+        quote_id: str | None,
+        created_at: str | None,
+    ) -> None:
+        self.votes[code] += 1
+        if created_at is None or (self.last_created_at or "") <= created_at:
+            self.last_quote_item_id = quote_item_id
+            self.last_quote_id = quote_id
+            self.last_created_at = created_at
+
+    def winner(self, code_prior: Counter) -> tuple[str, int] | None:
+        """Top code if it holds _MIN_AGREEMENT of the votes, else None.
+
+        Ties are broken by the org-wide confirmation prior from
+        tnved_user_choices.
+        """
+        total = sum(self.votes.values())
+        if not total:
+            return None
+        code, count = max(
+            self.votes.items(),
+            key=lambda kv: (kv[1], code_prior.get(kv[0], 0)),
+        )
+        if count / total < _MIN_AGREEMENT:
+            return None
+        return code, count
+
+
+class _OrgIndex:
+    """Inverted index for one organization. Guarded by ``lock``."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.entries: list[_Entry] = []
+        self.by_name: dict[str, int] = {}
+        self.by_product: dict[tuple[str, str], int] = {}
+        self.postings: dict[str, set[int]] = {}
+        self.code_prior: Counter = Counter()
+        # (quote_item_id, code) picks added by record_choice that the next
+        # refresh will see again as DB rows — skipped once so they don't
+        # count twice on this worker.
+        self.pending: set[tuple[str, str]] = set()
+        # (created_at, id) of the last row ingested — keyset cursors
+        self.log_watermark: tuple[str, str] | None = None
+        self.choices_watermark: tuple[str, str] | None = None
+        self.refreshed_at: float | None = None
+
+    def add(
+        self,
+        *,
+        name: str,
+        brand: str | None,
+        product_code: str | None,
+        code: str,
+        quote_item_id: str | None = None,
+        quote_id: str | None = None,
+        created_at: str | None = None,
+    ) -> None:
+        name_key = _name_key(name, brand)
+        if not name_key:
+            return
+        idx = self.by_name.get(name_key)
+        if idx is None:
+            idx = len(self.entries)
+            grams = _trigrams(name_key)
+            self.entries.append(_Entry(name_key=name_key, trigrams=grams))
+            self.by_name[name_key] = idx
+            for gram in grams:
+                self.postings.setdefault(gram, set()).add(idx)
+        self.entries[idx].add(
+            code,
+            quote_item_id=quote_item_id,
+            quote_id=quote_id,
+            created_at=created_at,
+        )
+        product_key = _product_key(brand, product_code)
+        if product_key is not None:
+            self.by_product[product_key] = idx
+
+    def lookup(
+        self, *, name: str, brand: str | None, product_code: str | None
+    ) -> Suggestion | None:
+        product_key = _product_key(brand, product_code)
+        if product_key is not None and product_key in self.by_product:
+            hit = self._suggest(self.by_product[product_key], 1.0, "product_code")
+            if hit is not None:
+                return hit
+
+        name_key = _name_key(name, brand)
+        if not name_key:
+            return None
+        if name_key in self.by_name:
+            return self._suggest(self.by_name[name_key], 1.0, "name")
+
+        grams = _trigrams(name_key)
+        if not grams:
+            return None
+        shared: Counter = Counter()
+        for gram in grams:
+            for idx in self.postings.get(gram, ()):
+                shared[idx] += 1
+        best_idx, best_score = None, 0.0
+        for idx, overlap in shared.items():
+            other = self.entries[idx].trigrams
+            score = overlap / (len(grams) + len(other) - overlap)
+            if score > best_score:
+                best_idx, best_score = idx, score
+        if best_idx is None or best_score < _MIN_SIMILARITY:
+            return None
+        return self._suggest(best_idx, best_score, "trigram")
+
+    def _suggest(self, idx: int, score: float, matched_by: str) -> Suggestion | None:
+        entry = self.entries[idx]
+        winner = entry.winner(self.code_prior)
+        if winner is None:
+            return None
+        code, count = winner
+        return Suggestion(
+            code=code,
+            score=round(score, 4),
+            confirmations=count,
+            matched_by=matched_by,
+            source_quote_item_id=entry.last_quote_item_id,
+            source_quote_id=entry.last_quote_id,
+            source_created_at=entry.last_created_at,
+        )
+
+
+_indexes: dict[str, _OrgIndex] = {}
+_indexes_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats: dict[str, int] = {"lookups": 0, "hits": 0, "packets_saved": 0}
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def lookup(
+    organization_id: str,
+    *,
+    name: str = "",
+    brand: str | None = None,
+    product_code: str | None = None,
+    sb: Any = None,
+) -> Suggestion | None:
+    """Return the confirmed code for a product, or None for an unknown.
+
+    Refreshes the org index first when it is older than
+    REFRESH_INTERVAL_SECONDS, using ``sb`` (default: ``get_supabase()``).
+    Never raises — a failed refresh leaves the previous (possibly empty)
+    index in place.
+    """
+    index = _ensure_fresh(organization_id, sb)
+    with index.lock:
+        hit = index.lookup(name=name, brand=brand, product_code=product_code)
+    with _stats_lock:
+        _stats["lookups"] += 1
+        if hit is not None:
+            _stats["hits"] += 1
+    return hit
+
+
+def record_choice(
+    organization_id: str,
+    *,
+    name: str,
+    code: str,
+    brand: str | None = None,
+    product_code: str | None = None,
+    quote_item_id: str | None = None,
+    quote_id: str | None = None,
+) -> None:
+    """Add a just-confirmed pick to this worker's index immediately.
+
+    The DB row written by ``log_classification_choice`` is picked up by
+    other workers on their next incremental refresh; on this worker that
+    row is skipped once so the pick doesn't count twice.
+    """
+    index = _get_index(organization_id)
+    with index.lock:
+        if quote_item_id:
+            index.pending.add((quote_item_id, code))
+        index.add(
+            name=name,
+            brand=brand,
+            product_code=product_code,
+            code=code,
+            quote_item_id=quote_item_id,
+            quote_id=quote_id,
+        )
+
+
+def record_packets_saved(count: int = 1) -> None:
+    """Count Alta calls that were skipped because the index answered."""
+    if count <= 0:
+        return
+    with _stats_lock:
+        _stats["packets_saved"] += count
+
+
+def stats() -> dict[str, Any]:
+    """Process-wide counters: lookups, hits, hit_rate, packets_saved."""
+    with _stats_lock:
+        snapshot: dict[str, Any] = dict(_stats)
+    lookups = snapshot["lookups"]
+    snapshot["hit_rate"] = round(snapshot["hits"] / lookups, 4) if lookups else 0.0
+    return snapshot
+
+
+def reset() -> None:
+    """Drop every org index and zero the counters (tests, admin reload)."""
+    with _indexes_lock:
+        _indexes.clear()
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+# ---------------------------------------------------------------------------
+# Refresh
+# ---------------------------------------------------------------------------
+
+
+def _get_index(organization_id: str) -> _OrgIndex:
+    with _indexes_lock:
+        index = _indexes.get(organization_id)
+        if index is None:
+            index = _indexes[organization_id] = _OrgIndex()
+        return index
+
+
+def _ensure_fresh(organization_id: str, sb: Any = None) -> _OrgIndex:
+    index = _get_index(organization_id)
+    now = time.monotonic()
+    if (
+        index.refreshed_at is not None
+        and now - index.refreshed_at < REFRESH_INTERVAL_SECONDS
+    ):
+        return index
+    # Stamp first so concurrent callers don't all refresh at once.
+    index.refreshed_at = now
+    try:
+        sb = sb if sb is not None else get_supabase()
+        _ingest_classification_log(sb, organization_id, index)
+        _ingest_user_choices(sb, organization_id, index)
+    except Exception as e:
+        logger.warning(
+            "tnved_suggestion_index: refresh failed for org=%s: %s",
+            organization_id, e,
+        )
+    return index
+
+
+def _after(query: Any, watermark: tuple[str, str] | None) -> Any:
+    """Restrict ``query`` to rows strictly after ``(created_at, id)``.
+
+    Compares on both columns so rows sharing the boundary timestamp are
+    neither skipped nor read twice.
+    """
+    if watermark is None:
+        return query
+    created_at, row_id = watermark
+    return query.or_(
+        f'created_at.gt."{created_at}",'
+        f'and(created_at.eq."{created_at}",id.gt.{row_id})'
+    )
+
+
+def _keyset_pages(build_query: Callable[[], Any], watermark: tuple[str, str] | None):
+    """Yield pages in (created_at, id) order after ``watermark``.
+
+    Pure keyset paging: each page starts after the last row of the
+    previous one, so no offset can drift past unread rows.
+    """
+    while True:
+        resp = (
+            _after(build_query(), watermark)
+            .order("created_at")
+            .order("id")
+            .limit(_PAGE_SIZE)
+            .execute()
+        )
+        rows = getattr(resp, "data", None) or []
+        if rows:
+            yield rows
+        if len(rows) < _PAGE_SIZE:
+            return
+        last = rows[-1]
+        watermark = (last["created_at"], last["id"])
+
+
+def _ingest_classification_log(sb: Any, organization_id: str, index: _OrgIndex) -> None:
+    """Pull confirmed picks newer than the watermark, oldest first."""
+    def build_query() -> Any:
+        return (
+            sb.table("tnved_classification_log")
+              .select(
+                  "id, input_text, chosen_code, quote_item_id, created_at, "
+                  "quote_items!inner(brand, product_code, quote_id, "
+                  "quotes!inner(organization_id))"
+              )
+              .not_.is_("chosen_code", None)
+              .eq("quote_items.quotes.organization_id", organization_id)
+        )
+
+    for rows in _keyset_pages(build_query, index.log_watermark):
+        with index.lock:
+            for row in rows:
+                pick = (row.get("quote_item_id"), row["chosen_code"])
+                if pick in index.pending:
+                    index.pending.discard(pick)
+                    continue
+                qi = row.get("quote_items") or {}
+                index.add(
+                    name=row.get("input_text") or "",
+                    brand=qi.get("brand"),
+                    product_code=qi.get("product_code"),
+                    code=row["chosen_code"],
+                    quote_item_id=row.get("quote_item_id"),
+                    quote_id=qi.get("quote_id"),
+                    created_at=row.get("created_at"),
+                )
+            index.log_watermark = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+def _ingest_user_choices(sb: Any, organization_id: str, index: _OrgIndex) -> None:
+    """Fold new tnved_user_choices rows into the org's code prior."""
+    def build_query() -> Any:
+        return (
+            sb.table("tnved_user_choices")
+              .select("id, tnved_code, created_at")
+              .eq("organization_id", organization_id)
+        )
+
+    for rows in _keyset_pages(build_query, index.choices_watermark):
+        with index.lock:
+            for row in rows:
+                if row.get("tnved_code"):
+                    index.code_prior[row["tnved_code"]] += 1
+            index.choices_watermark = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+# ---------------------------------------------------------------------------
+# Normalisation
+# ---------------------------------------------------------------------------
+
+
+def _normalise(value: str | None) -> str:
+    if not value:
+        return ""
+    value = _PUNCT_RE.sub(" ", value.casefold().replace("ё", "е"))
+    return _WS_RE.sub(" ", value).strip()
+
+
+def _name_key(name: str | None, brand: str | None) -> str:
+    """Normalised ``name brand`` — brand is part of the key because the
+    same generic name ("Подшипник") maps to different codes by maker."""
+    parts = [_normalise(name)]
+    brand_norm = _normalise(brand)
+    if brand_norm and brand_norm not in parts[0]:
+        parts.append(brand_norm)
+    return " ".join(p for p in parts if p)
+
+
+def _product_key(brand: str | None, product_code: str | None) -> tuple[str, str] | None:
+    brand_norm, code_norm = _normalise(brand), _normalise(product_code).replace(" ", "")
+    if not brand_norm or not code_norm:
+        return None
+    return brand_norm, code_norm
+
+
+def _trigrams(key: str) -> frozenset[str]:
+    compact = key.replace(" ", "")
+    if len(compact) < 3:
+        return frozenset({compact}) if compact else frozenset()
+    return frozenset(compact[i:i + 3] for i in range(len(compact) - 2))
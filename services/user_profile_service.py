@@ -6,7 +6,7 @@ Handles user profile operations:
 - Getting user's clients and quotes/specifications
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from services.database import get_supabase
 
 
@@ -159,7 +159,70 @@ def get_user_specifications(user_id: str, organization_id: str) -> List[Dict[str
     return specifications
 
 
-def get_user_customers(user_id: str, organization_id: str) -> List[Dict[str, Any]]:
+USER_CUSTOMERS_PAGE_SIZE = 50
+
+
+def get_user_customers_page(
+    user_id: str,
+    organization_id: str,
+    limit: Optional[int] = USER_CUSTOMERS_PAGE_SIZE,
+    offset: int = 0,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Get one page of a user's customers and the size of the whole list.
+
+    Aggregated in the database by kvota.get_user_customers (migration 351):
+    only the user's customers are returned, with the sums over the user's
+    quotes already computed. Ordered by customers.updated_at, newest first.
+    limit=None returns every customer from offset on. An offset past the
+    end returns no customers but still the real total (one extra call).
+
+    Returns:
+        (customers, total_count)
+    """
+    supabase = get_supabase()
+
+    def fetch(limit: Optional[int], offset: int) -> List[Dict[str, Any]]:
+        result = supabase.rpc(
+            "get_user_customers",
+            {
+                "p_user_id": user_id,
+                "p_organization_id": organization_id,
+                "p_limit": limit,
+                "p_offset": offset,
+            }
+        ).execute()
+        return result.data or []
+
+    rows = fetch(limit, offset)
+    customers = [
+        {
+            "customer_id": row.get("customer_id"),
+            "customer_name": row.get("customer_name", "—"),
+            "customer_inn": row.get("customer_inn", "—"),
+            "customer_category": row.get("industry", "—"),
+            "quotes_sum": float(row.get("quotes_sum") or 0),
+            "specs_sum": float(row.get("specs_sum") or 0),
+            "last_quote_date": row.get("last_quote_date"),
+            "updated_at": row.get("updated_at"),
+        }
+        for row in rows
+    ]
+    if not rows and offset > 0:
+        # The count rides on the rows: a page past the end has none, so
+        # read it from the first row instead of reporting an empty portfolio.
+        rows = fetch(1, 0)
+    total_count = int(rows[0].get("total_count") or 0) if rows else 0
+
+    return customers, total_count
+
+
+def get_user_customers(
+    user_id: str,
+    organization_id: str,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> List[Dict[str, Any]]:
     """
     Get list of customers for a user.
 
@@ -175,67 +238,12 @@ def get_user_customers(user_id: str, organization_id: str) -> List[Dict[str, Any
     - specs_sum
     - last_quote_date
     - updated_at
-    """
-    supabase = get_supabase()
 
-    # Get all customers in organization with their quotes
-    # We'll filter in Python to avoid complex OR conditions
-    result = supabase.table("customers") \
-        .select("""
-            id,
-            name,
-            inn,
-            industry,
-            updated_at,
-            created_by,
-            quotes:quotes(
-                id,
-                total_amount,
-                total_usd,
-                quote_date,
-                created_by_user_id,
-                specifications:specifications(id)
-            )
-        """) \
-        .eq("organization_id", organization_id) \
-        .order("updated_at", desc=True) \
-        .execute()
-
-    customers_map = {}
-
-    for customer in result.data:
-        customer_id = customer.get("id")
-        quotes = customer.get("quotes", [])
-
-        # Filter quotes created by this user
-        user_quotes = [q for q in quotes if q.get("created_by_user_id") == user_id]
-
-        # Include customer if: user created it OR user has quotes for it
-        if not user_quotes and customer.get("created_by") != user_id:
-            # Skip if user didn't create customer and has no quotes
-            continue
-
-        # Calculate sums
-        quotes_sum = sum(float(q.get("total_amount", 0)) for q in user_quotes)
-        specs_sum = sum(float(q.get("total_usd", 0)) for q in user_quotes if q.get("specifications"))
-
-        # Get last quote date
-        last_quote_date = None
-        if user_quotes:
-            last_quote_date = max(q.get("quote_date") for q in user_quotes if q.get("quote_date"))
-
-        customers_map[customer_id] = {
-            "customer_id": customer_id,
-            "customer_name": customer.get("name", "—"),
-            "customer_inn": customer.get("inn", "—"),
-            "customer_category": customer.get("industry", "—"),
-            "quotes_sum": quotes_sum,
-            "specs_sum": specs_sum,
-            "last_quote_date": last_quote_date,
-            "updated_at": customer.get("updated_at"),
-        }
-
-    return list(customers_map.values())
+    All customers by default; pass limit/offset for one page
+    (see get_user_customers_page for the total count).
+    """
+    customers, _ = get_user_customers_page(user_id, organization_id, limit=limit, offset=offset)
+    return customers
 
 
 def update_user_profile(user_id: str, organization_id: str, **update_data) -> bool:
@@ -18,6 +18,7 @@ from decimal import Decimal
 from datetime import datetime, timezone
 from typing import Any
 
+from services import reference_cache
 from services.database import get_supabase
 
 logger = logging.getLogger(__name__)
@@ -39,29 +40,24 @@ def _get_supabase():
 def get_vat_rate(country_code: str) -> Decimal:
     """Lookup VAT rate for a country. Returns 20.00 default for unknown countries.
 
+    Served from the in-process reference cache; ``upsert_rate`` bumps it.
+
     Args:
         country_code: ISO 3166-1 alpha-2 country code (e.g., 'CN', 'KZ')
 
     Returns:
         VAT rate as Decimal (e.g., Decimal('0.00') for EAEU, Decimal('20.00') for imports)
     """
-    supabase = _get_supabase()
     code = country_code.upper()
 
     try:
-        result = (
-            supabase.table("vat_rates_by_country")
-            .select("rate")
-            .eq("country_code", code)
-            .single()
-            .execute()
-        )
-        return Decimal(str(result.data["rate"]))
+        rate = reference_cache.vat_rate_for_country(code, sb=_get_supabase())
     except Exception as e:
         logger.warning(
             "[vat_service] Failed to fetch VAT rate for %s: %s", code, e
         )
         return DEFAULT_VAT_RATE
+    return rate if rate is not None else DEFAULT_VAT_RATE
 
 
 def resolve_vat_for_invoice(
@@ -182,4 +178,5 @@ def upsert_rate(
         .upsert(row)
         .execute()
     )
+    reference_cache.bump_version("vat_rates_by_country")
     return result.data[0]
@@ -1468,6 +1468,7 @@ def transition_quote_status(
             .update({
                 "workflow_status": to_status_enum.value,
                 "stage_entered_at": datetime.now(timezone.utc).isoformat(),
+                "stage_entered_by": actor_id,
                 "overdue_notified_at": None,
             }) \
             .eq("id", quote_id) \
@@ -2497,7 +2498,7 @@ def assign_logistics_to_invoices(quote_id: str) -> Dict:
     2. Fetches all invoices for the quote (id, pickup_country)
     3. For each unique pickup_country, calls
        get_logistics_manager_for_locations(org_id, pickup_country, delivery_city)
-       (results are cached per country to avoid redundant RPC calls)
+       (answered from the org's in-memory route matcher; memoised per country)
     4. Batch-updates invoices grouped by assigned user_id
     5. Uses Counter for majority vote across assigned invoices to set
        quotes.assigned_logistics_user
@@ -2565,7 +2566,7 @@ def assign_logistics_to_invoices(quote_id: str) -> Dict:
         assigned_invoices = []
         unmatched_invoice_ids = []
 
-        # Cache route lookups by pickup_country to avoid redundant RPC calls
+        # Memoise route lookups by pickup_country
         country_to_user: Dict[str, Optional[str]] = {}
 
         for invoice in invoices:
@@ -2913,6 +2914,7 @@ def transition_to_pending_procurement(
                 "workflow_status": WorkflowStatus.PENDING_PROCUREMENT.value,
                 "procurement_completed_at": None,  # Reset in case of re-evaluation
                 "stage_entered_at": datetime.now(timezone.utc).isoformat(),
+                "stage_entered_by": actor_id,
                 "overdue_notified_at": None,
             }) \
             .eq("id", quote_id) \
@@ -3214,6 +3216,7 @@ def complete_procurement(
                 "procurement_completed_at": completed_at_iso,
                 "workflow_status": WorkflowStatus.PENDING_LOGISTICS_AND_CUSTOMS.value,
                 "stage_entered_at": completed_at_iso,
+                "stage_entered_by": actor_id,
                 "overdue_notified_at": None,
             }) \
             .eq("id", quote_id) \
@@ -3400,6 +3403,7 @@ def _atomic_advance_to_logistics_and_customs(
                 "procurement_completed_at": now_iso,
                 "workflow_status": WorkflowStatus.PENDING_LOGISTICS_AND_CUSTOMS.value,
                 "stage_entered_at": now_iso,
+                "stage_entered_by": actor_id,
                 "overdue_notified_at": None,
             }) \
             .eq("id", quote_id) \
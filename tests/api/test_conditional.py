@@ -0,0 +1,157 @@
+"""Tests for api/lib/conditional.py — ETag / 304 for quote views.
+
+Exercised through GET /api/quotes/{id}/cost-analysis with a mocked
+Supabase client that counts table reads.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import Counter
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from api.cost_analysis import get_cost_analysis
+from api.lib import conditional
+
+
+def _request(if_none_match: str | None = None):
+    headers = {"if-none-match": if_none_match} if if_none_match else {}
+    return SimpleNamespace(
+        state=SimpleNamespace(api_user=SimpleNamespace(id="user-1")),
+        headers=headers,
+    )
+
+
+_UNKNOWN = object()
+
+
+def _mock_supabase(version, reads: Counter, member_org: str = "org-1"):
+    """``version``: embedded quote_content_versions value — a dict, None
+    (never bumped) or _UNKNOWN (embedding unavailable)."""
+    sb = MagicMock()
+    version_row = {"id": "q-1"}
+    if version is not _UNKNOWN:
+        version_row["quote_content_versions"] = version
+
+    def version_lookup(_col, org_id):
+        chain = MagicMock()
+        chain.is_.return_value.limit.return_value.execute.return_value.data = (
+            [version_row] if org_id == "org-1" else []
+        )
+        return chain
+
+    def table(name: str):
+        reads[name] += 1
+        tbl = MagicMock()
+        if name == "organization_members":
+            tbl.select.return_value.eq.return_value.eq.return_value.limit.return_value.execute.return_value.data = [
+                {"organization_id": member_org}
+            ]
+        elif name == "user_roles":
+            tbl.select.return_value.eq.return_value.eq.return_value.execute.return_value.data = [
+                {"roles": {"slug": "finance"}}
+            ]
+        elif name == "quotes":
+            # Version lookup: .eq(id).eq(organization_id).is_().limit()
+            tbl.select.return_value.eq.return_value.eq.side_effect = version_lookup
+            # Handler's own read: .eq(id).is_().limit()
+            tbl.select.return_value.eq.return_value.is_.return_value.limit.return_value.execute.return_value.data = [
+                {"id": "q-1", "organization_id": "org-1", "idn_quote": "Q-1", "title": "T",
+                 "currency": "USD", "workflow_status": "approved", "customers": {"name": "ACME"}}
+            ]
+        elif name == "quote_calculation_results":
+            tbl.select.return_value.eq.return_value.execute.return_value.data = []
+        return tbl
+
+    sb.table.side_effect = table
+    return sb
+
+
+def _get(sb, if_none_match=None):
+    with patch("api.cost_analysis.get_supabase", return_value=sb):
+        return asyncio.run(get_cost_analysis(_request(if_none_match), "q-1"))
+
+
+def test_first_response_carries_etag_and_304_on_match():
+    reads: Counter = Counter()
+    sb = _mock_supabase({"version": 7}, reads)
+
+    first = _get(sb)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    reads.clear()
+    second = _get(sb, if_none_match=etag)
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+    assert second.body == b""
+    # Auth + the org-scoped version lookup only; the handler body is not run
+    assert reads["quotes"] == 1 and reads["quote_calculation_results"] == 0
+
+
+def test_version_bump_changes_etag():
+    first = _get(_mock_supabase({"version": 7}, Counter()))
+    bumped = _get(_mock_supabase({"version": 8}, Counter()), if_none_match=first.headers["etag"])
+    assert bumped.status_code == 200
+    assert bumped.headers["etag"] != first.headers["etag"]
+
+
+def test_unconditional_repeat_is_served_from_response_cache():
+    reads: Counter = Counter()
+    sb = _mock_supabase(None, reads)  # never bumped → version 0
+
+    first = _get(sb)
+    reads.clear()
+    again = _get(sb)
+
+    assert again.status_code == 200
+    assert json.loads(again.body) == json.loads(first.body)
+    assert again.headers["etag"] == first.headers["etag"]
+    assert reads["quote_calculation_results"] == 0
+
+
+def test_unknown_version_falls_back_to_plain_response():
+    reads: Counter = Counter()
+    sb = _mock_supabase(_UNKNOWN, reads)  # e.g. migration not applied
+
+    response = _get(sb, if_none_match="*")
+
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert reads["quote_calculation_results"] == 1
+
+
+def test_other_org_gets_no_304_and_no_etag():
+    etag = _get(_mock_supabase({"version": 7}, Counter())).headers["etag"]
+    outsider = _mock_supabase({"version": 7}, Counter(), member_org="org-2")
+
+    for header in ("*", etag):
+        response = _get(outsider, if_none_match=header)
+        assert response.status_code == 403
+        assert "etag" not in response.headers
+
+
+def test_etag_depends_on_route_audience_and_window(monkeypatch):
+    base = conditional.make_etag("cost-analysis", "q-1", 3, ["org-1"])
+    assert conditional.make_etag("composition", "q-1", 3, ["org-1"]) != base
+    assert conditional.make_etag("cost-analysis", "q-1", 3, ["org-2"]) != base
+    monkeypatch.setattr(conditional.time, "time", lambda: 10**9 + conditional.ETAG_WINDOW_SECONDS * 5)
+    assert conditional.make_etag("cost-analysis", "q-1", 3, ["org-1"]) != base
+
+
+@pytest.mark.parametrize("header, expected", [
+    ('W/"abc"', True),
+    ('"abc"', True),
+    ('"x", W/"abc"', True),
+    ('"abcd"', False),
+    ("*", True),
+])
+def test_if_none_match_parsing(header, expected):
+    request = SimpleNamespace(headers={"if-none-match": header})
+    assert conditional.etag_matches(request, 'W/"abc"') is expected
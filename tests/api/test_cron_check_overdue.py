@@ -0,0 +1,86 @@
+"""Tests for ``GET /api/cron/check-overdue``.
+
+Covers:
+
+- Organizations are scanned independently: one failing org is counted in
+  ``failed_orgs`` and the others still notify.
+- Every overdue quote is claimed in the ledger before sending; a quote
+  whose claim is lost (rerun / overlapping run) sends nothing but is
+  still marked notified.
+- Pages from the keyset scan are all consumed.
+
+The stage timer scan, ledger and Telegram send are patched at the
+``api.cron`` module boundary.
+"""
+from __future__ import annotations
+
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from starlette.testclient import TestClient
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from api import cron as cron_module  # noqa: E402
+from api.app import api_sub_app  # noqa: E402
+
+SECRET = "test-cron-secret-overdue"
+
+
+def _quote(qid: str) -> dict:
+    return {
+        "quote_id": qid, "idn": f"Q-{qid}", "stage": "pending_procurement",
+        "stage_entered_at": "2026-10-01T09:00:00+00:00", "elapsed_hours": 60.0,
+        "deadline_hours": 48, "assigned_user_id": f"buyer-{qid}", "manager_id": f"manager-{qid}",
+    }
+
+
+@pytest.fixture(autouse=True)
+def _cron_secret(monkeypatch):
+    monkeypatch.setenv("CRON_SECRET", SECRET)
+
+
+def test_check_overdue_streams_orgs_and_skips_claimed():
+    sb = MagicMock()
+    sb.table.return_value.select.return_value.execute.return_value = MagicMock(
+        data=[{"id": "org-a"}, {"id": "org-b"}, {"id": "org-broken"}]
+    )
+
+    def scan(org_id, page_size):
+        if org_id == "org-broken":
+            raise RuntimeError("PostgREST timeout")
+        if org_id == "org-a":
+            return iter([[_quote("a1"), _quote("a2")], [_quote("a3")]])
+        return iter([[_quote("b1")]])
+
+    claimed = {"a1", "a3", "b1"}       # a2 was claimed by an earlier run
+    send = AsyncMock(return_value=True)
+    marked = []
+
+    with patch.object(cron_module, "get_supabase", return_value=sb), \
+         patch.object(cron_module, "iter_overdue_quotes", side_effect=scan), \
+         patch.object(cron_module, "claim_overdue_notification",
+                      side_effect=lambda qid, stage, entered: qid in claimed), \
+         patch.object(cron_module, "mark_overdue_notified", side_effect=marked.append), \
+         patch("services.telegram_service.send_overdue_notification", send):
+        response = TestClient(api_sub_app).get(
+            "/cron/check-overdue", headers={"X-Cron-Secret": SECRET}
+        )
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {"success": True, "notified": 6, "failed_orgs": 1}
+    notified_quotes = {c.kwargs["quote_id"] for c in send.await_args_list}
+    assert notified_quotes == {"a1", "a3", "b1"}
+    assert sorted(marked) == ["a1", "a2", "a3", "b1"]
+
+
+def test_check_overdue_rejects_missing_secret():
+    with patch.object(cron_module, "get_supabase") as get_sb:
+        response = TestClient(api_sub_app).get("/cron/check-overdue")
+
+    assert response.status_code == 403
+    get_sb.assert_not_called()
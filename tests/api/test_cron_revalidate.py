@@ -9,6 +9,7 @@ Covers:
 - Areal-keyed rates (``A:EAEU``) are skipped — Alta is country-bound.
 - ``AltaApiError(140)`` aborts loop and emits Telegram admin alert.
 - ``packet_left < 50`` aborts loop and emits Telegram admin alert.
+- Bounded concurrency, one upsert per chunk, keyset-paginated stale scan.
 - Response envelope shape ``{success, data: {processed, hits, updates,
   failures, packet_left_at_end}}``.
 
@@ -17,6 +18,7 @@ real DB / API / Telegram.
 """
 from __future__ import annotations
 
+import asyncio
 import os
 import sys
 from datetime import date, datetime, timedelta, timezone
@@ -45,9 +47,10 @@ class _StubQuery:
     """Chainable query emulating supabase-py for the subset used here.
 
     Supports:
-      table(...).select(...).lt|gte|eq(col, val).execute()  → fetch rows
-      table(...).upsert([rows...], on_conflict=...).execute() → bulk write
-      table(...).update({...}).eq(col, val).execute()       → row update
+      table(...).select(...).lt|gt|gte|eq|in_(col, val).execute() → fetch rows
+      table(...).select(...).order(col).limit(n).execute()      → keyset page
+      table(...).upsert([rows...], on_conflict=...).execute()   → bulk write
+      table(...).update({...}).eq|in_(col, val).execute()       → row update
     """
 
     def __init__(self, client: "_StubSupabase", table_name: str) -> None:
@@ -56,6 +59,8 @@ class _StubQuery:
         self._filters: list[tuple[str, Any, Any]] = []
         self._upsert_payload: list[dict] | None = None
         self._update_payload: dict | None = None
+        self._order: str | None = None
+        self._limit: int | None = None
 
     def select(self, *_args: Any, **_kwargs: Any) -> "_StubQuery":
         return self
@@ -72,6 +77,22 @@ class _StubQuery:
         self._filters.append(("eq", col, val))
         return self
 
+    def gt(self, col: str, val: Any) -> "_StubQuery":
+        self._filters.append(("gt", col, val))
+        return self
+
+    def in_(self, col: str, vals: list) -> "_StubQuery":
+        self._filters.append(("in", col, list(vals)))
+        return self
+
+    def order(self, col: str, **_kwargs: Any) -> "_StubQuery":
+        self._order = col
+        return self
+
+    def limit(self, n: int) -> "_StubQuery":
+        self._limit = n
+        return self
+
     def upsert(
         self, payload: list[dict], *, on_conflict: str | None = None
     ) -> "_StubQuery":
@@ -97,8 +118,12 @@ class _StubQuery:
                 return cell >= val
             except TypeError:
                 return False
+        if op == "gt":
+            return cell is not None and cell > val
         if op == "eq":
             return cell == val
+        if op == "in":
+            return cell in val
         return True
 
     def _filtered_rows(self) -> list[dict]:
@@ -126,7 +151,15 @@ class _StubQuery:
             })
             return MagicMock(data=matched)
 
-        return MagicMock(data=self._filtered_rows())
+        rows = self._filtered_rows()
+        if self._order is not None:
+            rows.sort(key=lambda r: r.get(self._order))
+        if self._limit is not None:
+            rows = rows[: self._limit]
+        self._client.select_calls.append(
+            {"table": self._table, "filters": list(self._filters)}
+        )
+        return MagicMock(data=rows)
 
 
 class _StubSupabase:
@@ -134,6 +167,7 @@ class _StubSupabase:
         self.tables: dict[str, list[dict]] = {}
         self.upsert_calls: list[dict] = []
         self.update_calls: list[dict] = []
+        self.select_calls: list[dict] = []
 
     def table(self, name: str) -> _StubQuery:
         return _StubQuery(self, name)
@@ -1025,9 +1059,92 @@ class TestPoisonPillCounterUpdates:
         )
         # Filter must target the pair (tnved_code + country_or_areal)
         target = resets[0]
-        filter_cols = {f[1]: f[2] for f in target["filters"] if f[0] == "eq"}
-        assert filter_cols.get("tnved_code") == "1234567890"
+        filter_cols = {f[1]: f[2] for f in target["filters"]}
+        assert filter_cols.get("tnved_code") == ["1234567890"]
         assert filter_cols.get("country_or_areal") == "C:643"
+        # ...and it touched the seeded row
+        assert target["matched_count"] == 1
+
+
+    def test_resets_counter_on_fresh_row_of_succeeded_pair(
+        self,
+        subapp_client: TestClient,
+        cron_secret: str,
+        stub_sb: _StubSupabase,
+        alta_client_mock: MagicMock,
+        patched_cron,
+    ) -> None:
+        # Stale row is clean; the pair's newer (not stale) row carries the counter
+        _seed_rate_row(
+            stub_sb,
+            tnved_code="1234567890",
+            country_or_areal="C:643",
+            last_used_at=_stale_iso(8),
+            source_fetched_at=_stale_iso(10),
+        )
+        _seed_rate_row(
+            stub_sb,
+            tnved_code="1234567890",
+            country_or_areal="C:643",
+            last_used_at=_fresh_iso(1),
+            source_fetched_at=_fresh_iso(1),
+            revalidate_failure_count=2,
+            revalidate_failed_at=_yesterday_iso(),
+        )
+        alta_client_mock.get_rates.return_value = [
+            _make_rate(tnved_code="1234567890")
+        ]
+
+        r = subapp_client.post(
+            "/cron/revalidate-rates", headers={"X-Cron-Secret": cron_secret}
+        )
+        assert r.status_code == 200, r.text
+        fresh_row = stub_sb.tables["tnved_rates"][1]
+        assert fresh_row["revalidate_failure_count"] == 0
+        assert fresh_row["revalidate_failed_at"] is None
+
+    def test_failure_bump_scoped_to_country_and_paginated(
+        self,
+        subapp_client: TestClient,
+        cron_secret: str,
+        stub_sb: _StubSupabase,
+        alta_client_mock: MagicMock,
+        patched_cron,
+    ) -> None:
+        for _ in range(3):
+            _seed_rate_row(
+                stub_sb,
+                tnved_code="1234567890",
+                country_or_areal="C:643",
+                last_used_at=_stale_iso(8),
+                source_fetched_at=_stale_iso(10),
+            )
+        # Same code, other country — fetched fresh, must not be bumped
+        _seed_rate_row(
+            stub_sb,
+            tnved_code="1234567890",
+            country_or_areal="C:156",
+            last_used_at=_fresh_iso(1),
+            source_fetched_at=_fresh_iso(1),
+        )
+        alta_client_mock.get_rates.side_effect = AltaApiError(120, "bad code")
+
+        with patch.object(cron_module, "REVALIDATE_PAGE_SIZE", 2):
+            r = subapp_client.post(
+                "/cron/revalidate-rates", headers={"X-Cron-Secret": cron_secret}
+            )
+        assert r.status_code == 200, r.text
+        counts = [
+            (row["country_or_areal"], row["revalidate_failure_count"])
+            for row in stub_sb.tables["tnved_rates"]
+        ]
+        assert counts == [("C:643", 1)] * 3 + [("C:156", 0)]
+        pair_selects = [
+            c for c in stub_sb.select_calls
+            if ("eq", "country_or_areal", "C:643") in c["filters"]
+        ]
+        # 2 + 1 rows → two pages
+        assert len(pair_selects) == 2
 
 
 class TestPoisonPillTelegramAlert:
@@ -1121,3 +1238,149 @@ class TestPoisonPillTelegramAlert:
         assert len(poison_alerts) == 1, (
             f"Expected throttled to 1; got {len(poison_alerts)}: {alert_messages!r}"
         )
+
+
+# ===========================================================================
+# Concurrency, chunked writes and keyset pagination
+# ===========================================================================
+
+
+class TestConcurrentRevalidation:
+    """Pairs fan out under REVALIDATE_CONCURRENCY; writes batch per chunk."""
+
+    @pytest.fixture(autouse=True)
+    def _clean_throttle(self):
+        cron_module._cron_last_alert_at.clear()
+        yield
+        cron_module._cron_last_alert_at.clear()
+
+    @staticmethod
+    def _seed_pairs(sb: _StubSupabase, n: int) -> None:
+        for i in range(n):
+            _seed_rate_row(
+                sb,
+                tnved_code=f"12345678{i:02d}",
+                country_or_areal=f"C:{100 + i}",
+                last_used_at=_stale_iso(8),
+                source_fetched_at=_stale_iso(10),
+            )
+
+    def test_in_flight_calls_capped_by_concurrency(
+        self,
+        subapp_client: TestClient,
+        cron_secret: str,
+        stub_sb: _StubSupabase,
+        alta_client_mock: MagicMock,
+        patched_cron,
+    ) -> None:
+        self._seed_pairs(stub_sb, 12)
+        gauge = {"now": 0, "max": 0}
+
+        async def _slow_rates(*args, **kwargs):
+            gauge["now"] += 1
+            gauge["max"] = max(gauge["max"], gauge["now"])
+            await asyncio.sleep(0.01)
+            gauge["now"] -= 1
+            return [_make_rate(tnved_code=kwargs["tncode"])]
+
+        alta_client_mock.get_rates.side_effect = _slow_rates
+
+        with patch.object(cron_module, "REVALIDATE_CONCURRENCY", 3):
+            r = subapp_client.post(
+                "/cron/revalidate-rates", headers={"X-Cron-Secret": cron_secret}
+            )
+        assert r.status_code == 200, r.text
+        assert r.json()["data"]["processed"] == 12
+        assert alta_client_mock.get_rates.await_count == 12
+        assert gauge["max"] == 3
+
+    def test_one_rates_upsert_per_chunk(
+        self,
+        subapp_client: TestClient,
+        cron_secret: str,
+        stub_sb: _StubSupabase,
+        alta_client_mock: MagicMock,
+        patched_cron,
+    ) -> None:
+        self._seed_pairs(stub_sb, 5)
+
+        async def _rates(*args, **kwargs):
+            return [_make_rate(tnved_code=kwargs["tncode"])]
+
+        alta_client_mock.get_rates.side_effect = _rates
+
+        with patch.object(cron_module, "REVALIDATE_CHUNK_SIZE", 2):
+            r = subapp_client.post(
+                "/cron/revalidate-rates", headers={"X-Cron-Secret": cron_secret}
+            )
+        assert r.status_code == 200, r.text
+        assert r.json()["data"]["updates"] == 5
+        rates_upserts = [
+            c for c in stub_sb.upsert_calls if c["table"] == "tnved_rates"
+        ]
+        # 5 pairs in chunks of 2 → 3 upserts, not 5
+        assert len(rates_upserts) == 3
+        # Clean pairs (failure_count=0): the reset UPDATE matches no rows
+        assert stub_sb.update_calls
+        assert all(c["matched_count"] == 0 for c in stub_sb.update_calls)
+
+    def test_chunk_upsert_failure_falls_back_per_pair(
+        self,
+        subapp_client: TestClient,
+        cron_secret: str,
+        stub_sb: _StubSupabase,
+        alta_client_mock: MagicMock,
+        patched_cron,
+    ) -> None:
+        self._seed_pairs(stub_sb, 3)
+
+        async def _rates(*args, **kwargs):
+            return [_make_rate(tnved_code=kwargs["tncode"])]
+
+        alta_client_mock.get_rates.side_effect = _rates
+
+        def _flaky_upsert(sb, rates, *, source):
+            # Any payload containing the bad code fails
+            if any(rate.tnved_code == "1234567801" for rate in rates):
+                raise RuntimeError("bad row")
+
+        with patch.object(cron_module, "_bulk_upsert", side_effect=_flaky_upsert):
+            r = subapp_client.post(
+                "/cron/revalidate-rates", headers={"X-Cron-Secret": cron_secret}
+            )
+        assert r.status_code == 200, r.text
+        data = r.json()["data"]
+        assert data["processed"] == 2
+        assert data["failures"] == 1
+        bumped = [
+            c for c in stub_sb.update_calls
+            if c["payload"].get("revalidate_failure_count") == 1
+        ]
+        assert len(bumped) == 1
+        assert bumped[0]["matched_count"] == 1
+
+    def test_stale_rows_streamed_with_keyset_pages(
+        self,
+        subapp_client: TestClient,
+        cron_secret: str,
+        stub_sb: _StubSupabase,
+        alta_client_mock: MagicMock,
+        patched_cron,
+    ) -> None:
+        self._seed_pairs(stub_sb, 5)
+
+        with patch.object(cron_module, "REVALIDATE_PAGE_SIZE", 2):
+            r = subapp_client.post(
+                "/cron/revalidate-rates", headers={"X-Cron-Secret": cron_secret}
+            )
+        assert r.status_code == 200, r.text
+        assert alta_client_mock.get_rates.await_count == 5
+        stale_selects = [
+            c for c in stub_sb.select_calls
+            if any(f[0] == "lt" for f in c["filters"])
+        ]
+        # 2 + 2 + 1 rows → three pages, each after the first keyed on id
+        assert len(stale_selects) == 3
+        assert not any(f[0] == "gt" for f in stale_selects[0]["filters"])
+        assert ("gt", "id", "row-1") in stale_selects[1]["filters"]
+        assert ("gt", "id", "row-3") in stale_selects[2]["filters"]
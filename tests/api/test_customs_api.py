@@ -25,6 +25,8 @@ sys.path.insert(
 
 from services.alta_client import AltaApiError, Measure, Rate  # noqa: E402
 from services.rate_resolver import (  # noqa: E402
+    BatchResolveResult,
+    RateRequest,
     ResolvedRate,
     ResolveOutcome,
     ResolveResult,
@@ -217,7 +219,7 @@ def _patch_country_lookup_ok():
     countries_exec.data = [{"oksm_digital": 156}]
     countries_chain = MagicMock()
     (
-        countries_chain.select.return_value.eq.return_value.limit.return_value.execute.return_value
+        countries_chain.select.return_value.order.return_value.range.return_value.execute.return_value
     ) = countries_exec
 
     item_update_exec = MagicMock()
@@ -245,7 +247,7 @@ def _patch_country_lookup_missing():
     countries_exec.data = []
     countries_chain = MagicMock()
     (
-        countries_chain.select.return_value.eq.return_value.limit.return_value.execute.return_value
+        countries_chain.select.return_value.order.return_value.range.return_value.execute.return_value
     ) = countries_exec
 
     def table(name: str):
@@ -363,8 +365,8 @@ class TestResolveRatesHandler:
         countries_chain = MagicMock()
         (
             countries_chain.select.return_value
-                .eq.return_value
-                .limit.return_value
+                .order.return_value
+                .range.return_value
                 .execute.side_effect
         ) = ConnectionError("supabase unreachable")
         mock_sb.table.return_value = countries_chain
@@ -797,8 +799,8 @@ class TestNonTariffMeasuresHandler:
         countries_chain = MagicMock()
         (
             countries_chain.select.return_value
-                .eq.return_value
-                .limit.return_value
+                .order.return_value
+                .range.return_value
                 .execute.return_value
         ) = countries_exec
 
@@ -950,7 +952,15 @@ class TestAutofillForceLive:
 
         # Resolver yields a FOUND rate (M4: resolver now returns ResolveResult)
         mock_rate_resolver.ResolveOutcome = ResolveOutcome
-        mock_rate_resolver.resolve_rate = AsyncMock(return_value=_found())
+        mock_rate_resolver.RateRequest = RateRequest
+        mock_rate_resolver.resolve_rates_batch = AsyncMock(
+            return_value=[
+                BatchResolveResult(
+                    by_payment_type={"IMP": [_make_resolved_rate()]},
+                    outcomes={"IMP": ResolveOutcome.FOUND},
+                )
+            ]
+        )
 
         req = _make_request(
             body={
@@ -977,7 +987,7 @@ class TestAutofillForceLive:
         # At least one suggestion produced via the resolver fallback
         assert len(suggestions) >= 1
         # Verify resolver was invoked (since force_live=True triggers fallback)
-        assert mock_rate_resolver.resolve_rate.await_count >= 1
+        assert mock_rate_resolver.resolve_rates_batch.await_count == 1
         # Suggestion includes the new optional fields
         s = suggestions[0]
         assert "customs_rates_source" in s
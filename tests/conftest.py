@@ -295,6 +295,77 @@ def _reset_here_service_cache():
         pass
 
 
+@pytest.fixture(autouse=True)
+def _reset_reference_cache():
+    """Drop reference-table snapshots between tests.
+
+    services/reference_cache keeps whole-table snapshots (countries,
+    country_areals, vat_rates_by_country, ...) in process memory; each test
+    mocks Supabase differently, so snapshots must not leak across tests.
+    """
+    from services import reference_cache
+    reference_cache.invalidate_all()
+    yield
+    reference_cache.invalidate_all()
+
+
+@pytest.fixture(autouse=True)
+def _reset_inn_cache(monkeypatch):
+    """Isolate services/inn_cache between tests.
+
+    Tests patch `dadata_service._call_dadata_api` with different answers for
+    the same INN; a cached answer from an earlier test would mask the patch.
+    The kvota.inn_lookup_cache tier is switched off (it degrades to a miss)
+    unless a test patches `inn_cache._get_supabase` itself.
+    """
+    from services import inn_cache
+
+    def _no_db():
+        raise RuntimeError("inn_lookup_cache is not available in unit tests")
+
+    monkeypatch.setattr(inn_cache, "_get_supabase", _no_db)
+    inn_cache.clear_memory()
+    yield
+    inn_cache.clear_memory()
+
+
+@pytest.fixture(autouse=True)
+def _disable_render_cache(monkeypatch):
+    """Keep services/render_cache off storage in unit tests.
+
+    Every PDF/DOCX generator goes through the render cache; with no client
+    it degrades to a plain render, which is what generator tests expect.
+    Tests of the cache itself patch `render_cache._get_supabase`.
+    """
+    from services import render_cache
+
+    def _no_storage():
+        raise RuntimeError("render cache storage is not available in unit tests")
+
+    monkeypatch.setattr(render_cache, "_get_supabase", _no_storage)
+    render_cache.reset_stats()
+    yield
+    render_cache.reset_stats()
+
+
+@pytest.fixture(autouse=True)
+def _reset_route_matchers():
+    """Drop compiled per-org route matchers between tests (fake org ids repeat)."""
+    from services import route_logistics_assignment_service
+    route_logistics_assignment_service.invalidate_route_matcher()
+    yield
+    route_logistics_assignment_service.invalidate_route_matcher()
+
+
+@pytest.fixture(autouse=True)
+def _reset_conditional_cache():
+    """Drop cached quote-view responses (api/lib/conditional) between tests."""
+    from api.lib import conditional
+    conditional.clear_cache()
+    yield
+    conditional.clear_cache()
+
+
 # ============================================================================
 # CALCULATION ENGINE FIXTURES (Read-only reference)
 # ============================================================================
@@ -0,0 +1,98 @@
+"""Tests for services/asset_cache.py and the changelog / KP callers."""
+
+import os
+
+import pytest
+
+from services import asset_cache, changelog_service
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    asset_cache.invalidate_all()
+    yield
+    asset_cache.invalidate_all()
+
+
+def _touch(path, content, mtime_ns):
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_load_is_cached_until_mtime_changes(tmp_path):
+    path = tmp_path / "asset.txt"
+    _touch(path, "one", 1_000_000_000)
+    calls = []
+
+    def loader(p):
+        calls.append(p)
+        return p.read_text(encoding="utf-8").upper()
+
+    assert asset_cache.load(path, loader, "upper") == "ONE"
+    assert asset_cache.load(str(path), loader, "upper") == "ONE"
+    assert len(calls) == 1
+
+    _touch(path, "two", 2_000_000_000)
+    assert asset_cache.load(path, loader, "upper") == "TWO"
+    assert len(calls) == 2
+
+    # Other derivations of the same file are separate entries
+    assert asset_cache.read_text(path) == "two"
+    assert asset_cache.data_uri(path, "text/plain") == "data:text/plain;base64,dHdv"
+    assert asset_cache.stats()["entries"] == 3
+
+
+def test_missing_file_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        asset_cache.read_bytes(tmp_path / "nope.png")
+
+
+def test_changelog_entries_reparsed_only_on_change(tmp_path, monkeypatch):
+    entry = tmp_path / "2026-10-01-release.md"
+    _touch(entry, "---\ntitle: Релиз\ndate: 2026-10-01\n---\nТекст", 1_000_000_000)
+    parsed = []
+    original = changelog_service._parse_entry
+    monkeypatch.setattr(
+        changelog_service, "_parse_entry",
+        lambda p: parsed.append(p) or original(p),
+    )
+
+    first = changelog_service.get_all_entries(str(tmp_path))
+    first[0]["title"] = "mutated by caller"
+    second = changelog_service.get_all_entries(str(tmp_path))
+    assert len(parsed) == 1
+    assert second[0]["title"] == "Релиз"
+
+    _touch(entry, "---\ntitle: Релиз 2\ndate: 2026-10-01\n---\nТекст", 2_000_000_000)
+    assert changelog_service.get_all_entries(str(tmp_path))[0]["title"] == "Релиз 2"
+    assert len(parsed) == 2
+
+
+def test_kp_png_data_uri_is_shared(tmp_path):
+    from services.kp_export import _png_data_uri
+
+    png = tmp_path / "hero.png"
+    png.write_bytes(b"\x89PNG")
+
+    uri = _png_data_uri(png)
+    assert uri == "data:image/png;base64,iVBORw=="
+    assert _png_data_uri(png) is uri
+
+
+def test_kp_styles_memoized_until_a_font_changes(tmp_path):
+    import dataclasses
+
+    from services import kp_export
+    from services.kp_branding import MASTER_BEARING
+
+    for n, (_, fname) in enumerate(kp_export._KP_FONT_FILES):
+        _touch(tmp_path / fname, f"font-{n}", 1_000_000_000)
+    branding = dataclasses.replace(MASTER_BEARING, font_dir=tmp_path)
+
+    css = kp_export._kp_styles(branding)
+    assert kp_export._kp_styles(branding) is css
+
+    _touch(tmp_path / "Inter-700.ttf", "font-3b", 2_000_000_000)
+    rebuilt = kp_export._kp_styles(branding)
+    assert rebuilt is not css
+    assert asset_cache.data_uri(tmp_path / "Inter-700.ttf", "font/ttf") in rebuilt
@@ -0,0 +1,105 @@
+"""Tests for services/cbr_rates_service.py — as-of-date rate history + backfill."""
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import cbr_rates_service
+from services.cbr_rates_service import _RateHistory
+
+FRI, SAT, MON = date(2026, 10, 9), date(2026, 10, 10), date(2026, 10, 12)
+
+_DYNAMIC_XML = """<?xml version="1.0" encoding="windows-1251"?>
+<ValCurs ID="R01375" DateRange1="08.10.2026" DateRange2="10.10.2026" name="Foreign Currency Market Dynamic">
+<Record Date="08.10.2026" Id="R01375"><Nominal>1</Nominal><Value>11,2010</Value></Record>
+<Record Date="09.10.2026" Id="R01375"><Nominal>1</Nominal><Value>11,3050</Value></Record>
+<Record Date="10.10.2026" Id="R01375"><Nominal>10</Nominal><Value>113,4000</Value></Record>
+</ValCurs>""".encode("cp1251")
+
+
+@pytest.fixture
+def history():
+    """Fresh history loaded from the given rows instead of the DB."""
+    rows = {
+        "USD": [(FRI, Decimal("81.50")), (SAT, Decimal("81.90"))],
+        "CNY": [(FRI, Decimal("11.30"))],
+    }
+    fresh = _RateHistory()
+    with patch.object(cbr_rates_service, "_history", fresh), \
+         patch.object(cbr_rates_service, "_load_history", return_value=rows) as load:
+        fresh.load = load
+        yield fresh
+    cbr_rates_service._fetch_cbr_day.cache_clear()
+
+
+def test_weekend_and_holiday_use_last_published_rate(history):
+    assert cbr_rates_service.get_usd_rub_rate(SAT) == Decimal("81.90")
+    assert cbr_rates_service.get_cny_rub_rate(SAT) == Decimal("11.30")  # no CNY row on SAT
+    assert cbr_rates_service.get_cny_usd_rate(FRI) == Decimal("81.50") / Decimal("11.30")
+    history.load.assert_called_once()
+
+
+def test_dates_outside_the_history_go_to_the_network_once(history):
+    response = MagicMock()
+    response.json.return_value = {"Valute": {"USD": {"Value": 82.1, "Nominal": 1},
+                                             "JPY": {"Value": 54.0, "Nominal": 100}}}
+    with patch.object(cbr_rates_service.httpx, "get", return_value=response) as get:
+        assert cbr_rates_service.get_usd_rub_rate(MON) == Decimal("82.1")
+        assert cbr_rates_service.get_rate_to_rub("jpy", MON) == Decimal("0.54")
+        assert cbr_rates_service.get_usd_rub_rate(date(2026, 9, 1)) == Decimal("82.1")
+
+    assert get.call_count == 2  # MON (shared by both currencies) and 2026-09-01
+    assert "archive/2026/10/12/" in get.call_args_list[0].args[0]
+
+
+def test_gap_longer_than_holidays_is_not_bridged(history):
+    history._ensure_loaded()
+    history._dates["EUR"] = [date(2026, 1, 5), FRI]
+    history._rates["EUR"] = [Decimal("90"), Decimal("95")]
+
+    assert history.rate_on("EUR", date(2026, 1, 12)) == Decimal("90")
+    assert history.rate_on("EUR", date(2026, 6, 1)) is None
+
+
+def test_backfill_fetches_range_once_and_skips_known_days(history):
+    sb = MagicMock()
+    with patch.object(cbr_rates_service.httpx, "get",
+                      return_value=SimpleNamespace(content=_DYNAMIC_XML, raise_for_status=lambda: None)) as get, \
+         patch.object(cbr_rates_service, "_get_supabase", return_value=sb):
+        summary = cbr_rates_service.backfill_range(date(2026, 10, 8), date(2026, 10, 10), ["CNY"])
+
+    assert get.call_args.kwargs["params"] == {
+        "date_req1": "08/10/2026", "date_req2": "10/10/2026", "VAL_NM_RQ": "R01375",
+    }
+    rows = sb.table.return_value.upsert.call_args.args[0]
+    assert [(r["fetched_at"], r["rate"]) for r in rows] == [
+        ("2026-10-08T00:00:00", 11.201),
+        ("2026-10-10T00:00:00", 11.34),
+    ]
+    assert sb.table.return_value.upsert.call_args.kwargs["on_conflict"] == "from_currency,to_currency,fetched_at"
+    assert summary == {"rows_written": 2, "currencies": 1, "failed": []}
+
+
+def test_backfill_rejects_unsupported_currency(history):
+    with pytest.raises(ValueError):
+        cbr_rates_service.backfill_range(FRI, MON, ["XXX"])
+
+
+def test_past_conversions_use_the_history_without_network(history):
+    from services import currency_service
+
+    with patch.object(cbr_rates_service, "HISTORY_CURRENCIES", ("USD", "CNY", "EUR", "TRY")):
+        history._ensure_loaded()
+        history._dates.update(EUR=[FRI], TRY=[FRI])
+        history._rates.update(EUR=[Decimal("95")], TRY=[Decimal("2.4")])
+        with patch.object(currency_service, "get_rates_from_db") as db, \
+             patch.object(currency_service, "fetch_cbr_rates") as fetch:
+            usd = currency_service.convert_to_usd(Decimal("113"), "CNY", SAT)
+
+    assert usd == Decimal("113") * Decimal("11.30") / Decimal("81.90")
+    db.assert_not_called()
+    fetch.assert_not_called()
@@ -0,0 +1,243 @@
+"""Tests for services/change_feed_service.py and GET /api/changes/stream."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from api import changes as changes_api
+from services import change_feed_service as feed
+from services.change_feed_service import ChangeEvent, ChangeHub
+
+ORG = "org-1"
+OTHER_ORG = "org-2"
+
+
+def _event(id_, org=ORG, kind="quote_status", quote_id="q-1"):
+    return ChangeEvent(id=id_, organization_id=org, kind=kind, quote_id=quote_id,
+                       payload={"from": "draft", "to": "pending_procurement"})
+
+
+class FakeTable:
+    """In-memory kvota.change_events behind fetch_after / latest_id."""
+
+    def __init__(self, events=(), head=0):
+        self.events = list(events)
+        self.head = head
+
+    def fetch_after(self, after_id, organization_id=None, limit=feed.BATCH_SIZE):
+        rows = sorted((e for e in self.events if e.id > after_id), key=lambda e: e.id)
+        if organization_id:
+            rows = [e for e in rows if e.organization_id == organization_id]
+        return rows[:limit]
+
+    def latest_id(self):
+        return self.head
+
+
+def _install(monkeypatch, table):
+    monkeypatch.setattr(feed, "fetch_after", table.fetch_after)
+    monkeypatch.setattr(feed, "latest_id", table.latest_id)
+    monkeypatch.setattr(feed, "POLL_SECONDS", 0.01)
+
+
+async def _drain(sub, timeout=0.2):
+    out = []
+    while True:
+        try:
+            out.append(await sub.get(timeout))
+        except asyncio.TimeoutError:
+            return out
+
+
+def test_hub_fans_out_new_events_by_org_and_filter(monkeypatch):
+    table = FakeTable([_event(1)], head=1)
+    _install(monkeypatch, table)
+
+    async def scenario():
+        hub = ChangeHub()
+        everything, _ = await hub.subscribe(ORG)
+        comments, _ = await hub.subscribe(ORG, kinds={"comment"})
+        other, _ = await hub.subscribe(OTHER_ORG)
+        await asyncio.sleep(0.05)
+        table.events += [_event(2), _event(3, kind="comment"), _event(4, org=OTHER_ORG)]
+        got = await _drain(everything), await _drain(comments), await _drain(other)
+        for sub in (everything, comments, other):
+            hub.unsubscribe(sub)
+        return got, hub
+
+    (everything, comments, other), hub = asyncio.run(scenario())
+
+    assert [e.id for e in everything] == [2, 3]     # event 1 predates the subscription
+    assert [e.id for e in comments] == [3]
+    assert [e.id for e in other] == [4]
+    assert hub.subscriber_count() == 0 and hub._task is None
+
+
+def test_hub_picks_up_late_commits_once(monkeypatch):
+    table = FakeTable(head=10)
+    _install(monkeypatch, table)
+
+    async def scenario():
+        hub = ChangeHub()
+        sub, _ = await hub.subscribe(ORG)
+        await asyncio.sleep(0.05)
+        table.events.append(_event(12))
+        first = await _drain(sub)
+        table.events.append(_event(11))            # committed after 12
+        second = await _drain(sub)
+        hub.unsubscribe(sub)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert [e.id for e in first] == [12]
+    assert [e.id for e in second] == [11]
+
+
+def test_resume_sends_backlog_without_duplicates(monkeypatch):
+    table = FakeTable([_event(5), _event(6, org=OTHER_ORG), _event(7)], head=7)
+    _install(monkeypatch, table)
+
+    async def scenario():
+        hub = ChangeHub()
+        hub._cursor = hub._floor = 5                # 7 is still "new" to the poller
+        sub, backlog = await hub.subscribe(ORG, after=4)
+        live = await _drain(sub)
+        hub.unsubscribe(sub)
+        return backlog, live
+
+    backlog, live = asyncio.run(scenario())
+
+    assert [e.id for e in backlog] == [5, 7]
+    assert live == []
+
+
+def test_resume_pages_through_long_backlog(monkeypatch):
+    table = FakeTable([_event(i) for i in range(1, 8)], head=7)
+    _install(monkeypatch, table)
+    monkeypatch.setattr(feed, "BATCH_SIZE", 2)
+
+    async def scenario():
+        hub = ChangeHub()
+        hub._cursor = hub._floor = 7
+        sub, backlog = await hub.subscribe(ORG, after=0)
+        hub.unsubscribe(sub)
+        return backlog
+
+    assert [e.id for e in asyncio.run(scenario())] == [1, 2, 3, 4, 5, 6, 7]
+
+
+def test_backlog_past_limit_resets(monkeypatch):
+    table = FakeTable([_event(i) for i in range(1, 8)], head=7)
+    _install(monkeypatch, table)
+    monkeypatch.setattr(feed, "BATCH_SIZE", 2)
+    monkeypatch.setattr(feed, "BACKLOG_LIMIT", 4)
+
+    async def scenario():
+        hub = ChangeHub()
+        hub._cursor = hub._floor = 7
+        sub, backlog = await hub.subscribe(ORG, after=0)
+        first = await sub.get(0.1)
+        hub.unsubscribe(sub)
+        return backlog, first, sub.overflowed
+
+    assert asyncio.run(scenario()) == ([], None, True)
+
+
+def test_slow_subscriber_is_reset(monkeypatch):
+    _install(monkeypatch, FakeTable())
+    monkeypatch.setattr(feed, "QUEUE_LIMIT", 2)
+
+    async def scenario():
+        sub = feed.Subscription(ORG)
+        for i in range(1, 5):
+            sub.offer(_event(i))
+        return await sub.get(0.1), sub.overflowed
+
+    assert asyncio.run(scenario()) == (None, True)
+
+
+def test_stream_endpoint_frames_and_validation(monkeypatch):
+    table = FakeTable([_event(1), _event(2, kind="comment")], head=2)
+    _install(monkeypatch, table)
+    monkeypatch.setattr(feed, "QUEUE_LIMIT", 0)     # first live event resets the stream
+    monkeypatch.setattr(feed, "hub", ChangeHub())
+    monkeypatch.setattr(changes_api, "_resolve_org", lambda request: ("u-1", ORG))
+    monkeypatch.setattr(changes_api, "_resolve_audience", lambda user_id, org_id: None)
+
+    app = Starlette(routes=[Route("/changes/stream", changes_api.stream_changes)])
+    with TestClient(app) as client:
+        bad = client.get("/changes/stream?kinds=quote_status,bogus")
+        table.events.append(_event(3))
+        response = client.get("/changes/stream", headers={"Last-Event-ID": "0"})
+
+    assert bad.status_code == 400
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [f for f in response.text.split("\n\n") if f]
+    assert frames[0] == "retry: 3000"
+    assert frames[1].startswith("id: 1\nevent: quote_status\ndata: ")
+    assert json.loads(frames[2].split("data: ", 1)[1])["kind"] == "comment"
+    assert frames[-1] == "event: reset\ndata: {}"
+
+
+def test_audience_scopes_sales_and_procurement_events():
+    sales = feed.Subscription(ORG, audience=feed.Audience(
+        customer_ids=frozenset({"c-1"}), quote_creator_ids=frozenset({"u-1"}),
+    ))
+    moz = feed.Subscription(ORG, audience=feed.Audience(procurement_user_id="u-2"))
+
+    def event(id_, kind="quote_status", **scope):
+        return ChangeEvent(id=id_, organization_id=ORG, kind=kind, quote_id=f"q-{id_}", **scope)
+
+    assigned = event(1, customer_id="c-1", quote_created_by="u-9")
+    own = event(2, customer_id="c-2", quote_created_by="u-1")
+    foreign = event(3, customer_id="c-2", quote_created_by="u-9")
+    assert [sales.matches(e) for e in (assigned, own, foreign)] == [True, True, False]
+
+    mine = event(4, kind="brand_substatus", assignee_ids=frozenset({"u-2"}))
+    theirs = event(5, kind="brand_substatus", assignee_ids=frozenset({"u-3"}))
+    assert [moz.matches(e) for e in (mine, theirs, foreign)] == [True, False, True]
+
+
+def test_stream_rejects_quote_outside_callers_scope(monkeypatch):
+    _install(monkeypatch, FakeTable())
+    monkeypatch.setattr(feed, "hub", ChangeHub())
+    monkeypatch.setattr(changes_api, "_resolve_org", lambda request: ("u-1", ORG))
+    monkeypatch.setattr(changes_api, "get_user_role_codes", lambda user_id, org_id: ["sales"])
+    monkeypatch.setattr(
+        changes_api.search_service, "resolve_scope",
+        lambda user_id, org_id, roles: changes_api.search_service.SearchScope(
+            customer_ids=["c-1"], quote_creator_ids=["u-1"],
+        ),
+    )
+    quotes = {
+        "q-foreign": {"id": "q-foreign", "customer_id": "c-2", "created_by": "u-9"},
+    }
+    sb = MagicMock()
+    sb.table.return_value.select.return_value.eq.side_effect = (
+        lambda col, value: _quote_lookup(quotes.get(value))
+    )
+    monkeypatch.setattr(changes_api, "get_supabase", lambda: sb)
+
+    app = Starlette(routes=[Route("/changes/stream", changes_api.stream_changes)])
+    with TestClient(app) as client:
+        foreign = client.get("/changes/stream?quote_id=q-foreign")
+        missing = client.get("/changes/stream?quote_id=q-missing")
+
+    assert foreign.status_code == 404
+    assert missing.status_code == 404
+    assert feed.hub.subscriber_count() == 0
+
+
+def _quote_lookup(row):
+    chain = MagicMock()
+    chain.eq.return_value.is_.return_value.limit.return_value.execute.return_value = (
+        MagicMock(data=[row] if row else [])
+    )
+    return chain
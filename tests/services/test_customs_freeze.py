@@ -1,6 +1,6 @@
 """Unit tests for services.customs_freeze_service — REQ-8 + Q4 ACs.
 
-Mocks ``rate_resolver.resolve_rate`` and ``get_supabase`` so the suite
+Mocks ``rate_resolver.resolve_rates_batch`` and ``get_supabase`` so the suite
 covers the three-tier fallback logic without hitting a real DB or Alta.
 """
 
@@ -22,7 +22,12 @@ from services.customs_freeze_service import (
     OkSnapshot,
     build_snapshot,
 )
-from services.rate_resolver import ResolvedRate, ResolveOutcome, ResolveResult
+from services.rate_resolver import (
+    BatchResolveResult,
+    ResolvedRate,
+    ResolveOutcome,
+    ResolveResult,
+)
 from services.alta_client import Rate
 
 
@@ -57,6 +62,27 @@ def _make_resolved(
     )
 
 
+def _batch_from(resolve_fn):
+    """Build a ``resolve_rates_batch`` stand-in from a per-(request,
+    payment_type) ``ResolveResult`` factory."""
+    def _fake(requests, payment_types, *, alta_client):
+        out = []
+        for req in requests:
+            by_pt, outcomes = {}, {}
+            for pt in payment_types:
+                r = resolve_fn(req, pt)
+                outcomes[pt] = r.outcome
+                by_pt[pt] = [r.rate] if r.rate is not None else []
+            out.append(BatchResolveResult(by_payment_type=by_pt, outcomes=outcomes))
+        return out
+    return _fake
+
+
+def _uniform_batch(result: ResolveResult):
+    """Every request/payment_type resolves to the same ``result``."""
+    return _batch_from(lambda _req, _pt: result)
+
+
 @pytest.fixture
 def mock_alta_client() -> MagicMock:
     return MagicMock()
@@ -95,13 +121,13 @@ async def test_tier_1_live_alta_for_all_items(mock_alta_client):
     mock_sb = _mock_quote_items_response(items)
 
     with patch("services.customs_freeze_service.get_supabase", return_value=mock_sb), \
-         patch("services.customs_freeze_service.resolve_rate",
+         patch("services.customs_freeze_service.resolve_rates_batch",
                new_callable=AsyncMock) as mock_resolve:
         # 7 default payment_types — return FOUND for every call (M4: resolver
         # now returns ResolveResult, not ResolvedRate directly)
-        mock_resolve.return_value = ResolveResult(
+        mock_resolve.side_effect = _uniform_batch(ResolveResult(
             ResolveOutcome.FOUND, _make_resolved()
-        )
+        ))
 
         result = await build_snapshot("quote-1", alta_client=mock_alta_client)
 
@@ -140,11 +166,11 @@ async def test_skips_items_without_tnved_code(mock_alta_client):
     mock_sb = _mock_quote_items_response(items)
 
     with patch("services.customs_freeze_service.get_supabase", return_value=mock_sb), \
-         patch("services.customs_freeze_service.resolve_rate",
+         patch("services.customs_freeze_service.resolve_rates_batch",
                new_callable=AsyncMock) as mock_resolve:
-        mock_resolve.return_value = ResolveResult(
+        mock_resolve.side_effect = _uniform_batch(ResolveResult(
             ResolveOutcome.FOUND, _make_resolved()
-        )
+        ))
 
         result = await build_snapshot("quote-1", alta_client=mock_alta_client)
 
@@ -160,7 +186,7 @@ async def test_skips_items_without_tnved_code(mock_alta_client):
 
 @pytest.mark.asyncio
 async def test_tier_2_cache_stale_when_resolver_alta_error(mock_alta_client):
-    """REVIEW M4: When resolve_rate returns outcome=ALTA_ERROR for ALL
+    """REVIEW M4: When the resolver returns outcome=ALTA_ERROR for ALL
     payment_types AND the Tier-2 stale-cache lookup finds at least one row
     → cache-stale. Tier 2 fallback fires ONLY for ALTA_ERROR (Alta is
     genuinely down) — not NOT_FOUND (which means the rate doesn't exist
@@ -223,11 +249,13 @@ async def test_tier_2_cache_stale_when_resolver_alta_error(mock_alta_client):
     mock_sb.table.side_effect = lookup_chain_for_table
 
     with patch("services.customs_freeze_service.get_supabase", return_value=mock_sb), \
-         patch("services.customs_freeze_service.resolve_rate",
+         patch("services.customs_freeze_service.resolve_rates_batch",
                new_callable=AsyncMock) as mock_resolve:
         # Resolver always returns ALTA_ERROR — simulating Alta down. The
         # NOT_FOUND outcome would NOT trigger Tier 2 (M4 fix).
-        mock_resolve.return_value = ResolveResult(ResolveOutcome.ALTA_ERROR, None)
+        mock_resolve.side_effect = _uniform_batch(
+            ResolveResult(ResolveOutcome.ALTA_ERROR, None)
+        )
 
         result = await build_snapshot("quote-1", alta_client=mock_alta_client)
 
@@ -304,12 +332,14 @@ async def test_not_found_does_not_fall_through_to_stale_cache(mock_alta_client):
     mock_sb.table.side_effect = lookup_chain_for_table
 
     with patch("services.customs_freeze_service.get_supabase", return_value=mock_sb), \
-         patch("services.customs_freeze_service.resolve_rate",
+         patch("services.customs_freeze_service.resolve_rates_batch",
                new_callable=AsyncMock) as mock_resolve, \
          patch("services.customs_freeze_service.notify_admin",
                new_callable=AsyncMock):
         # NOT_FOUND for every payment_type — Tier 2 should be skipped
-        mock_resolve.return_value = ResolveResult(ResolveOutcome.NOT_FOUND, None)
+        mock_resolve.side_effect = _uniform_batch(
+            ResolveResult(ResolveOutcome.NOT_FOUND, None)
+        )
 
         result = await build_snapshot("quote-1", alta_client=mock_alta_client)
 
@@ -364,12 +394,14 @@ async def test_tier_3_abort_when_no_live_no_cache(mock_alta_client):
     mock_sb.table.side_effect = lookup_chain_for_table
 
     with patch("services.customs_freeze_service.get_supabase", return_value=mock_sb), \
-         patch("services.customs_freeze_service.resolve_rate",
+         patch("services.customs_freeze_service.resolve_rates_batch",
                new_callable=AsyncMock) as mock_resolve, \
          patch("services.customs_freeze_service.notify_admin",
                new_callable=AsyncMock) as mock_notify:
         # ALTA_ERROR → Tier 2 cache lookup → cache empty → abort
-        mock_resolve.return_value = ResolveResult(ResolveOutcome.ALTA_ERROR, None)
+        mock_resolve.side_effect = _uniform_batch(
+            ResolveResult(ResolveOutcome.ALTA_ERROR, None)
+        )
 
         result = await build_snapshot("quote-1", alta_client=mock_alta_client)
 
@@ -414,11 +446,13 @@ async def test_tier_3_abort_message_mentions_user_action(mock_alta_client):
     mock_sb.table.side_effect = lookup_chain_for_table
 
     with patch("services.customs_freeze_service.get_supabase", return_value=mock_sb), \
-         patch("services.customs_freeze_service.resolve_rate",
+         patch("services.customs_freeze_service.resolve_rates_batch",
                new_callable=AsyncMock) as mock_resolve, \
          patch("services.customs_freeze_service.notify_admin",
                new_callable=AsyncMock):
-        mock_resolve.return_value = ResolveResult(ResolveOutcome.ALTA_ERROR, None)
+        mock_resolve.side_effect = _uniform_batch(
+            ResolveResult(ResolveOutcome.ALTA_ERROR, None)
+        )
         result = await build_snapshot("quote-1", alta_client=mock_alta_client)
 
     assert "администратору" in (result.message or "")
@@ -461,11 +495,13 @@ async def test_telegram_failure_does_not_break_abort_response(mock_alta_client):
     mock_sb.table.side_effect = lookup_chain_for_table
 
     with patch("services.customs_freeze_service.get_supabase", return_value=mock_sb), \
-         patch("services.customs_freeze_service.resolve_rate",
+         patch("services.customs_freeze_service.resolve_rates_batch",
                new_callable=AsyncMock) as mock_resolve, \
          patch("services.customs_freeze_service.notify_admin",
                new_callable=AsyncMock) as mock_notify:
-        mock_resolve.return_value = ResolveResult(ResolveOutcome.ALTA_ERROR, None)
+        mock_resolve.side_effect = _uniform_batch(
+            ResolveResult(ResolveOutcome.ALTA_ERROR, None)
+        )
         mock_notify.side_effect = RuntimeError("telegram bot down")
 
         # Should NOT raise — the abort result must still be returned
@@ -514,15 +550,15 @@ async def test_aggregate_worst_tier_one_abort_makes_all_abort(mock_alta_client):
     mock_sb = MagicMock()
     mock_sb.table.side_effect = lookup_chain_for_table
 
-    async def resolve_side_effect(**kwargs):
-        if kwargs["tnved_code"] == "8409910008":
+    def resolve_per_item(req, _pt):
+        if req.tnved_code == "8409910008":
             return ResolveResult(ResolveOutcome.FOUND, _make_resolved())
         # Bad item: Alta is genuinely down for this code → abort path
         return ResolveResult(ResolveOutcome.ALTA_ERROR, None)
 
     with patch("services.customs_freeze_service.get_supabase", return_value=mock_sb), \
-         patch("services.customs_freeze_service.resolve_rate",
-               new=resolve_side_effect), \
+         patch("services.customs_freeze_service.resolve_rates_batch",
+               new=AsyncMock(side_effect=_batch_from(resolve_per_item))), \
          patch("services.customs_freeze_service.notify_admin",
                new_callable=AsyncMock):
         result = await build_snapshot("quote-mixed", alta_client=mock_alta_client)
@@ -0,0 +1,43 @@
+"""Tests for services/document_numbering.py."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from services import document_numbering
+
+
+def _client(*outcomes):
+    """Supabase mock whose rpc().execute() yields ``outcomes`` in order."""
+    sb = MagicMock()
+    sb.rpc.return_value.execute.side_effect = [
+        o if isinstance(o, Exception) else MagicMock(data=o) for o in outcomes
+    ]
+    return sb
+
+
+def test_generate_formats_counter_value():
+    sb = _client(42, 10000)
+
+    assert document_numbering.generate("org-1", document_numbering.KIND_DEAL, "DEAL", year=2026, sb=sb) == "DEAL-2026-0042"
+    assert document_numbering.generate("org-1", document_numbering.KIND_DEAL, "DEAL", year=2026, sb=sb) == "DEAL-2026-10000"
+    sb.rpc.assert_called_with(
+        "next_document_number",
+        {"p_organization_id": "org-1", "p_kind": "deal", "p_year": 2026},
+    )
+
+
+def test_next_value_retries_failed_calls():
+    sb = _client(RuntimeError("connection reset"), 7)
+
+    assert document_numbering.next_value("org-1", document_numbering.KIND_SPECIFICATION, 2026, sb=sb) == 7
+    assert sb.rpc.return_value.execute.call_count == 2
+
+
+def test_next_value_raises_after_all_attempts():
+    sb = _client(*[RuntimeError(f"down {i}") for i in range(document_numbering.RPC_ATTEMPTS)])
+
+    with pytest.raises(RuntimeError, match="down 2"):
+        document_numbering.next_value("org-1", document_numbering.KIND_DEAL, 2026, sb=sb)
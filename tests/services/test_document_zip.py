@@ -0,0 +1,173 @@
+"""Tests for services/document_zip.py — streaming ZIP of stored documents.
+
+Supabase Storage is replaced by a local stub HTTP server speaking the
+``GET /storage/v1/object/{bucket}/{path}`` protocol, so the real httpx
+streaming path is exercised.
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import threading
+import time
+import zipfile
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import unquote
+
+import pytest
+
+from services import document_zip
+from services.document_service import BUCKET_NAME, Document
+
+
+class _StubStorage:
+    """Threaded storage stand-in; records max concurrent downloads."""
+
+    def __init__(self, objects: dict[str, bytes], delay: float = 0.0) -> None:
+        self.objects = objects
+        self.delay = delay
+        self.auth: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+        prefix = f"/storage/v1/object/{BUCKET_NAME}/"
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                with stub._lock:
+                    stub.auth.append(self.headers.get("Authorization", ""))
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    time.sleep(stub.delay)
+                    path = unquote(self.path[len(prefix):]) if self.path.startswith(prefix) else None
+                    body = stub.objects.get(path)
+                    if body is None:
+                        self.send_response(404)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client went away (abandoned download)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def log_message(self, *_a: Any) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True,
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    stubs: list[_StubStorage] = []
+
+    def make(objects: dict[str, bytes], delay: float = 0.0) -> _StubStorage:
+        stub = _StubStorage(objects, delay)
+        stubs.append(stub)
+        monkeypatch.setenv("SUPABASE_URL", stub.url)
+        monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "service-key")
+        return stub
+
+    yield make
+    for stub in stubs:
+        stub.close()
+
+
+def _doc(i: int, path: str, name: str, document_type: str | None = "invoice_scan") -> Document:
+    return Document(
+        id=f"doc-{i}", organization_id="org-1", entity_type="quote", entity_id="q-1",
+        storage_path=path, original_filename=name, document_type=document_type,
+        created_at=datetime(2026, 10, 1, 12, 0),
+    )
+
+
+async def _collect(documents: list[Document]) -> tuple[zipfile.ZipFile, list[bytes]]:
+    chunks = [chunk async for chunk in document_zip.stream_documents_zip(documents)]
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks))), chunks
+
+
+async def test_archive_contains_every_document(storage):
+    big = bytes(range(256)) * 2048  # 512 KB → many chunks
+    stub = storage({
+        "org-1/quote/q-1/a.pdf": b"%PDF a",
+        "org-1/quote/q-1/b.pdf": b"%PDF b",
+        "org-1/quote/q-1/scan.jpg": big,
+    })
+    docs = [
+        _doc(1, "org-1/quote/q-1/a.pdf", "Инвойс.pdf"),
+        _doc(2, "org-1/quote/q-1/b.pdf", "Инвойс.pdf"),
+        _doc(3, "org-1/quote/q-1/scan.jpg", "scan.jpg", "certificate"),
+    ]
+
+    archive, chunks = await _collect(docs)
+
+    assert archive.namelist() == [
+        "Скан инвойса/Инвойс.pdf",
+        "Скан инвойса/Инвойс (2).pdf",
+        "Сертификат/scan.jpg",
+    ]
+    assert archive.read("Скан инвойса/Инвойс (2).pdf") == b"%PDF b"
+    assert archive.read("Сертификат/scan.jpg") == big
+    assert archive.testzip() is None
+    # Streamed in pieces, never one archive-sized buffer
+    assert len(chunks) > 3 and max(map(len, chunks)) <= document_zip.CHUNK_SIZE + 1024
+    assert set(stub.auth) == {"Bearer service-key"}
+
+
+async def test_downloads_run_concurrently_and_bounded(storage, monkeypatch):
+    monkeypatch.setattr(document_zip, "MAX_CONCURRENT_DOWNLOADS", 3)
+    objects = {f"p/{i}.pdf": b"x" * 10 for i in range(9)}
+    stub = storage(objects, delay=0.2)
+    docs = [_doc(i, f"p/{i}.pdf", f"{i}.pdf") for i in range(9)]
+
+    started = time.monotonic()
+    archive, _ = await _collect(docs)
+    elapsed = time.monotonic() - started
+
+    assert len(archive.namelist()) == 9
+    assert stub.max_in_flight == 3
+    assert elapsed < 1.2  # serial would be ≥ 1.8 s
+
+
+async def test_missing_objects_are_listed_not_fatal(storage):
+    storage({"p/ok.pdf": b"ok"})
+    docs = [_doc(1, "p/gone.pdf", "gone.pdf"), _doc(2, "p/ok.pdf", "ok.pdf", None)]
+
+    archive, _ = await _collect(docs)
+
+    assert archive.read("Документ/ok.pdf") == b"ok"
+    manifest = archive.read(document_zip.MISSING_MANIFEST).decode()
+    assert "Скан инвойса/gone.pdf: HTTP 404" in manifest
+
+
+async def test_abandoned_stream_cancels_downloads(storage):
+    storage({f"p/{i}.pdf": b"y" * 10 for i in range(6)}, delay=0.1)
+    docs = [_doc(i, f"p/{i}.pdf", f"{i}.pdf") for i in range(6)]
+
+    stream = document_zip.stream_documents_zip(docs)
+    await stream.__anext__()
+    await stream.aclose()
+    await asyncio.sleep(0.05)
+    fetches = [
+        t for t in asyncio.all_tasks()
+        if getattr(t.get_coro(), "__qualname__", "") == "_fetch"
+    ]
+    assert all(t.done() for t in fetches)
@@ -0,0 +1,175 @@
+"""Tests for services/export_loader.py — single-round-trip export loading.
+
+Every exporter must load its data through ONE ``get_export_bundle`` RPC,
+so the number of DB round trips per document is constant regardless of
+how many items the quote has.
+"""
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.contract_spec_export import fetch_contract_spec_data
+from services.export_data_mapper import fetch_export_data
+from services.export_loader import load_export_bundle
+from services.specification_export import fetch_specification_data
+
+
+ORG_ID = "org-1"
+QUOTE_ID = "q-1"
+SPEC_ID = "spec-1"
+INVOICE_ID = "inv-1"
+
+
+def _bundle_payload(n_items: int) -> dict:
+    quote_items, coverage, calc_results = [], [], []
+    for i in range(n_items):
+        qi_id = f"qi-{i}"
+        quote_items.append({
+            "id": qi_id, "quote_id": QUOTE_ID, "position": i + 1,
+            "product_name": f"Товар {i}", "product_code": f"P-{i}",
+            "unit": "шт", "quantity": 5,
+            "composition_selected_invoice_id": INVOICE_ID,
+        })
+        coverage.append({
+            "invoice_item_id": f"ii-{i}", "quote_item_id": qi_id, "ratio": 1,
+            "invoice_items": {
+                "id": f"ii-{i}", "invoice_id": INVOICE_ID,
+                "product_name": f"Товар {i}", "quantity": 5,
+                "minimum_order_quantity": 10, "purchase_price_original": 1.5,
+                "purchase_currency": "USD",
+            },
+        })
+        calc_results.append({
+            "quote_item_id": qi_id,
+            "phase_results": {"AJ16": 10.0, "AK16": 100.0, "AL16": 120.0},
+        })
+    return {
+        "quote": {
+            "id": QUOTE_ID, "organization_id": ORG_ID, "customer_id": "c-1",
+            "seller_company_id": "s-1", "currency": "USD", "idn_quote": "Q-1",
+        },
+        "specification": {
+            "id": SPEC_ID, "quote_id": QUOTE_ID, "organization_id": ORG_ID,
+            "specification_currency": "USD",
+            "customer_contracts": {
+                "id": "cc-1", "contract_number": "Д-1", "contract_date": "2026-01-01",
+            },
+        },
+        "spec_position": 3,
+        "customer": {"id": "c-1", "name": "Покупатель"},
+        "organization": {"id": ORG_ID, "name": "Орг"},
+        "seller_company": {"id": "s-1", "name": "Продавец"},
+        "signatory": {"name": "Иванов Иван Иванович", "position": "Директор"},
+        "bank_accounts": [{"id": "b-1", "is_default": True}],
+        "quote_items": quote_items,
+        "coverage": coverage,
+        "calc_results": calc_results,
+        "variables": {"delivery_time": 30},
+        "summary": None,
+    }
+
+
+class _CountingSupabase:
+    """Counts every executed request, table reads and RPCs alike."""
+
+    def __init__(self, payload: dict | None) -> None:
+        self.payload = payload
+        self.round_trips = 0
+        self.rpc_params: list[dict] = []
+
+    def _request(self, data: Any) -> MagicMock:
+        def execute() -> MagicMock:
+            self.round_trips += 1
+            return MagicMock(data=data)
+
+        request = MagicMock()
+        request.execute = execute
+        return request
+
+    def rpc(self, name: str, params: dict) -> MagicMock:
+        assert name == "get_export_bundle"
+        self.rpc_params.append(params)
+        return self._request(self.payload)
+
+    def table(self, _name: str) -> MagicMock:
+        builder = MagicMock()
+        for method in ("select", "eq", "in_", "is_", "order", "limit"):
+            getattr(builder, method).return_value = builder
+        builder.execute = self._request([]).execute
+        return builder
+
+
+def _run(fetch: str, sb: _CountingSupabase) -> Any:
+    with patch("services.export_data_mapper.get_supabase", return_value=sb), \
+         patch("services.contract_spec_export.get_supabase", return_value=sb), \
+         patch("services.database.get_supabase", return_value=sb):
+        if fetch == "export":
+            return fetch_export_data(QUOTE_ID, ORG_ID)
+        if fetch == "specification":
+            return fetch_specification_data(SPEC_ID, ORG_ID)
+        return fetch_contract_spec_data(SPEC_ID, ORG_ID)
+
+
+@pytest.mark.parametrize("fetch", ["export", "specification", "contract_spec"])
+def test_round_trips_do_not_grow_with_item_count(fetch):
+    counts = {}
+    for n_items in (1, 50):
+        sb = _CountingSupabase(_bundle_payload(n_items))
+        result = _run(fetch, sb)
+        items = result["items"] if isinstance(result, dict) else result.items
+        assert len(items) == n_items
+        counts[n_items] = sb.round_trips
+    assert counts == {1: 1, 50: 1}
+
+
+def test_export_data_composes_and_merges_from_bundle():
+    data = _run("export", _CountingSupabase(_bundle_payload(2)))
+
+    first = data.items[0]
+    assert first["quote_item_id"] == "qi-0"
+    assert first["invoice_item_id"] == "ii-0"
+    assert first["product_code"] == "P-0"
+    assert first["effective_quantity"] == 10  # supplier MOQ
+    assert first["calc"]["AL16"] == 120.0
+    assert data.bank_accounts == [{"id": "b-1", "is_default": True}]
+    assert data.variables == {"delivery_time": 30}
+    # No stored summary → totals computed from items
+    assert data.calculations["currency"] == "USD"
+
+
+def test_contract_spec_data_keeps_its_shape():
+    data = _run("contract_spec", _CountingSupabase(_bundle_payload(1)))
+
+    assert data["spec_count"] == 3
+    assert data["contract"]["contract_number"] == "Д-1"
+    assert data["signatory"]["position"] == "Директор"
+    assert data["calc_variables"] == {"delivery_time": 30}
+    assert data["items"][0]["effective_quantity"] == 10
+    assert data["items"][0]["calc"]["AK16"] == 100.0
+
+
+def test_spec_lookup_wins_and_missing_rows_raise():
+    sb = _CountingSupabase(None)
+    with pytest.raises(ValueError, match="Specification not found"):
+        load_export_bundle(ORG_ID, quote_id=QUOTE_ID, spec_id=SPEC_ID, supabase=sb)
+    assert sb.rpc_params == [
+        {"p_org_id": ORG_ID, "p_quote_id": QUOTE_ID, "p_spec_id": SPEC_ID}
+    ]
+
+    with pytest.raises(ValueError, match="Quote not found"):
+        load_export_bundle(ORG_ID, quote_id=QUOTE_ID, supabase=_CountingSupabase([]))
+
+
+def test_missing_rows_default_to_empty():
+    payload = {key: None for key in _bundle_payload(0)}
+    payload["quote"] = {"id": QUOTE_ID}
+    bundle = load_export_bundle(
+        ORG_ID, quote_id=QUOTE_ID, supabase=_CountingSupabase([payload])
+    )
+    assert (bundle.customer, bundle.quote_items, bundle.summary) == ({}, [], {})
+    assert bundle.contract == {}
+    assert bundle.spec_position == 1
+    assert bundle.calc_for("qi-0") == {}
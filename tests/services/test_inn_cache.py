@@ -0,0 +1,228 @@
+"""Tests for services/inn_cache.py — shared DaData INN lookup cache.
+
+DaData is replaced by a local stub HTTP server speaking the findById/party
+protocol, so the real httpx call path in dadata_service is exercised.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from services import dadata_service, inn_cache
+from services.export_data_mapper import enrich_with_legal_names
+
+
+KNOWN = {
+    "7707083893": 'ООО "РОМАШКА"',
+    "7701234567": 'ООО "АЛЬФА"',
+    "7702345678": 'АО "БЕТА"',
+    "7703456789": 'ПАО "ГАММА"',
+}
+UNKNOWN_INN = "9999999999"
+
+
+class _StubDaData:
+    """Threaded findById/party stand-in counting hits per INN."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.hits: dict[str, int] = {}
+        self.fail = False
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                inn = body["query"]
+                with stub._lock:
+                    stub.hits[inn] = stub.hits.get(inn, 0) + 1
+                time.sleep(stub.delay)
+                if stub.fail:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                suggestions = []
+                if inn in KNOWN:
+                    suggestions = [{
+                        "value": KNOWN[inn],
+                        "data": {
+                            "inn": inn, "type": "LEGAL",
+                            "name": {
+                                "short_with_opf": KNOWN[inn],
+                                "full_with_opf": f"ПОЛНОЕ {KNOWN[inn]}",
+                            },
+                        },
+                    }]
+                payload = json.dumps({"suggestions": suggestions}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *_a: Any) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/findById/party"
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True,
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def dadata(monkeypatch):
+    stub = _StubDaData()
+    monkeypatch.setattr(dadata_service, "DADATA_PARTY_URL", stub.url)
+    monkeypatch.setenv("DADATA_API_KEY", "test-token")
+    yield stub
+    stub.close()
+
+
+class _CacheTable:
+    """kvota.inn_lookup_cache stand-in (select/in_/upsert)."""
+
+    def __init__(self) -> None:
+        self.rows: dict[str, dict] = {}
+        self.reads = 0
+        self._in: list[str] = []
+        self._upsert: list[dict] | None = None
+
+    def table(self, _name: str) -> "_CacheTable":
+        return self
+
+    def select(self, *_a: Any) -> "_CacheTable":
+        return self
+
+    def in_(self, _col: str, vals: list[str]) -> "_CacheTable":
+        self._in = list(vals)
+        return self
+
+    def upsert(self, rows: list[dict], **_k: Any) -> "_CacheTable":
+        self._upsert = rows
+        return self
+
+    def execute(self) -> Any:
+        if self._upsert is not None:
+            for row in self._upsert:
+                self.rows[row["inn"]] = dict(row)
+            self._upsert = None
+            return MagicMock(data=[])
+        self.reads += 1
+        return MagicMock(data=[self.rows[i] for i in self._in if i in self.rows])
+
+
+@pytest.fixture
+def db(monkeypatch) -> _CacheTable:
+    table = _CacheTable()
+    monkeypatch.setattr(inn_cache, "_get_supabase", lambda: table)
+    return table
+
+
+def test_get_company_caches_in_memory(dadata):
+    first = inn_cache.get_company("7707083893")
+    second = inn_cache.get_company(" 7707083893 ")
+    assert first["full_name"] == 'ПОЛНОЕ ООО "РОМАШКА"'
+    assert second == first
+    assert dadata.hits == {"7707083893": 1}
+
+
+def test_not_found_is_cached_negatively(dadata):
+    assert inn_cache.get_company(UNKNOWN_INN) is None
+    assert inn_cache.get_company(UNKNOWN_INN) is None
+    assert dadata.hits == {UNKNOWN_INN: 1}
+
+
+def test_transport_errors_are_not_cached(dadata):
+    dadata.fail = True
+    with pytest.raises(Exception):
+        inn_cache.get_company("7707083893")
+    dadata.fail = False
+    assert inn_cache.get_company("7707083893") is not None
+    assert dadata.hits == {"7707083893": 2}
+
+
+def test_negative_entries_expire_independently(dadata, monkeypatch):
+    monkeypatch.setattr(inn_cache, "NEGATIVE_TTL", timedelta(0))
+    for _ in range(2):
+        inn_cache.get_company(UNKNOWN_INN)
+        inn_cache.get_company("7707083893")
+    assert dadata.hits == {UNKNOWN_INN: 2, "7707083893": 1}
+
+
+def test_batch_lookups_run_concurrently(dadata):
+    dadata.delay = 0.3
+    started = time.monotonic()
+    result = inn_cache.get_companies(list(KNOWN) + [UNKNOWN_INN, "123", None])
+    elapsed = time.monotonic() - started
+
+    assert set(result) == set(KNOWN) | {UNKNOWN_INN}
+    assert result[UNKNOWN_INN] is None
+    assert all(result[inn]["name"] == name for inn, name in KNOWN.items())
+    # 5 calls of 0.3 s each: serial would take ≥ 1.5 s
+    assert elapsed < 1.0
+    assert all(n == 1 for n in dadata.hits.values())
+
+
+def test_db_tier_is_shared_between_workers(dadata, db):
+    inn_cache.get_companies(["7707083893", UNKNOWN_INN])
+    assert db.rows["7707083893"]["found"] is True
+    assert (db.rows[UNKNOWN_INN]["found"], db.rows[UNKNOWN_INN]["company"]) == (False, None)
+
+    inn_cache.clear_memory()  # another worker: cold memory, warm DB
+    result = inn_cache.get_companies(["7707083893", UNKNOWN_INN])
+    assert result["7707083893"]["inn"] == "7707083893"
+    assert result[UNKNOWN_INN] is None
+    assert dadata.hits == {"7707083893": 1, UNKNOWN_INN: 1}
+
+
+def test_expired_db_rows_are_refetched(dadata, db):
+    stale = (datetime.now(timezone.utc) - timedelta(days=31)).isoformat()
+    db.rows["7707083893"] = {
+        "inn": "7707083893", "found": True,
+        "company": {"full_name": "СТАРОЕ"}, "fetched_at": stale,
+    }
+    assert inn_cache.get_company("7707083893")["full_name"] == 'ПОЛНОЕ ООО "РОМАШКА"'
+    assert dadata.hits == {"7707083893": 1}
+
+
+@pytest.mark.asyncio
+async def test_lookup_company_by_inn_shares_the_cache(dadata):
+    enrich_with_legal_names({"inn": "7707083893"})
+    result = await dadata_service.lookup_company_by_inn("7707083893")
+    assert result["name"] == 'ООО "РОМАШКА"'
+    assert dadata.hits == {"7707083893": 1}
+
+
+def test_enrich_with_legal_names_batches_entities(dadata):
+    seller = {"inn": "7707083893"}
+    customer = {"inn": "7701234567"}
+    organization = {"inn": "7707083893"}
+    unknown = {"inn": UNKNOWN_INN}
+    enrich_with_legal_names(seller, customer, None, organization, unknown, {})
+
+    assert seller["legal_name"] == 'ПОЛНОЕ ООО "РОМАШКА"'
+    assert organization["legal_name"] == 'ПОЛНОЕ ООО "РОМАШКА"'
+    assert customer["legal_name"] == 'ПОЛНОЕ ООО "АЛЬФА"'
+    assert "legal_name" not in unknown
+    assert dadata.hits == {"7707083893": 1, "7701234567": 1, UNKNOWN_INN: 1}
+
+
+def test_enrich_survives_dadata_outage(dadata):
+    dadata.fail = True
+    customer = {"inn": "7707083893"}
+    enrich_with_legal_names(customer)
+    assert "legal_name" not in customer
@@ -0,0 +1,193 @@
+"""Tests for services/job_service.py — durable background jobs."""
+from __future__ import annotations
+
+import base64
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import job_service
+from services.job_service import Job, PermanentJobError
+
+
+@pytest.fixture
+def sb():
+    client = MagicMock()
+    with patch.object(job_service, "_get_supabase", return_value=client):
+        yield client
+
+
+@pytest.fixture
+def handlers():
+    saved = dict(job_service._HANDLERS)
+    yield job_service._HANDLERS
+    job_service._HANDLERS.clear()
+    job_service._HANDLERS.update(saved)
+
+
+def _job(kind="test_kind", attempts=1, max_attempts=3, payload=None):
+    return Job(id="job-1", kind=kind, status="running", payload=payload or {},
+               attempts=attempts, max_attempts=max_attempts)
+
+
+def _update(sb) -> dict:
+    """Fields written by the single outcome UPDATE."""
+    sb.table.return_value.update.assert_called_once()
+    return sb.table.return_value.update.call_args.args[0]
+
+
+def test_success_stores_result_under_the_lease(sb, handlers):
+    handlers["test_kind"] = lambda payload: {"echo": payload["x"]}
+
+    assert job_service.run_job(_job(payload={"x": 1}), "w-1") == "succeeded"
+
+    fields = _update(sb)
+    assert fields["status"] == "succeeded"
+    assert fields["result"] == {"echo": 1}
+    assert fields["locked_by"] is None
+    sb.table.return_value.update.return_value.eq.return_value.eq.assert_called_once_with("locked_by", "w-1")
+
+
+def test_failure_is_retried_with_backoff(sb, handlers):
+    def boom(payload):
+        raise RuntimeError("alta timeout")
+
+    handlers["test_kind"] = boom
+
+    assert job_service.run_job(_job(attempts=2), "w-1") == "queued"
+
+    fields = _update(sb)
+    assert fields["status"] == "queued"
+    assert fields["error"] == "alta timeout"
+    assert "run_after" in fields
+
+
+def test_last_attempt_failure_is_final(sb, handlers):
+    handlers["test_kind"] = lambda payload: 1 / 0
+
+    assert job_service.run_job(_job(attempts=3, max_attempts=3), "w-1") == "failed"
+    assert _update(sb)["status"] == "failed"
+
+
+def test_permanent_error_fails_at_once_with_detail(sb, handlers):
+    def reject(payload):
+        raise PermanentJobError("Дубликаты артикулов: A1", {"duplicates": ["A1"]})
+
+    handlers["test_kind"] = reject
+
+    assert job_service.run_job(_job(attempts=1), "w-1") == "failed"
+    fields = _update(sb)
+    assert fields["error"] == "Дубликаты артикулов: A1"
+    assert fields["result"] == {"duplicates": ["A1"]}
+
+
+def test_reclaimed_job_past_max_attempts_is_not_run_again(sb, handlers):
+    handler = MagicMock()
+    handlers["test_kind"] = handler
+
+    assert job_service.run_job(_job(attempts=4, max_attempts=3), "w-1") == "failed"
+    handler.assert_not_called()
+
+
+def test_retry_delay_doubles_and_caps():
+    assert [job_service.retry_delay_seconds(n) for n in (1, 2, 3)] == [10, 20, 40]
+    assert job_service.retry_delay_seconds(20) == job_service.RETRY_MAX_SECONDS
+
+
+def test_enqueue_rejects_unknown_kind(sb):
+    with pytest.raises(ValueError):
+        job_service.enqueue("nope", {})
+    sb.table.assert_not_called()
+
+
+def test_enqueue_returns_live_job_on_dedupe_conflict(sb):
+    table = sb.table.return_value
+    table.insert.return_value.execute.side_effect = Exception(
+        "duplicate key value violates unique constraint (23505)"
+    )
+    table.select.return_value.eq.return_value.in_.return_value.limit.return_value.execute.return_value.data = [
+        {"id": "job-0", "kind": "quote_transition", "status": "running"}
+    ]
+
+    job = job_service.enqueue("quote_transition", {"quote_id": "q-1"}, dedupe_key="quote_transition:q-1")
+
+    assert job.id == "job-0" and job.status == "running"
+
+
+def test_run_pending_once_claims_until_empty(sb, handlers):
+    handlers["test_kind"] = lambda payload: None
+    rows = [[{"id": "a", "kind": "test_kind", "attempts": 1}],
+            [{"id": "b", "kind": "test_kind", "attempts": 1}],
+            []]
+    sb.rpc.return_value.execute.side_effect = [SimpleNamespace(data=r) for r in rows]
+
+    assert job_service.run_pending_once("w-1") == 2
+    assert sb.rpc.call_args.args[0] == "claim_background_jobs"
+
+
+def test_quote_transition_abort_fails_the_job():
+    result = SimpleNamespace(success=False, error_message="Не удалось зафиксировать таможенные ставки",
+                             from_status="pending_approval", to_status=None, warnings=["tier 3"])
+    with patch("services.workflow_service.transition_quote_status", return_value=result) as mock_tr:
+        with pytest.raises(PermanentJobError) as exc:
+            job_service._HANDLERS["quote_transition"](
+                {"quote_id": "q-1", "to_status": "approved", "actor_id": "u-1", "_attempt": 1}
+            )
+
+    assert str(exc.value) == "Не удалось зафиксировать таможенные ставки"
+    assert exc.value.result["warnings"] == ["tier 3"]
+    mock_tr.assert_called_once()
+
+
+def test_quote_transition_retry_after_commit_is_idempotent(sb):
+    sb.table.return_value.select.return_value.eq.return_value.limit.return_value.execute.return_value.data = [
+        {"workflow_status": "approved"}
+    ]
+    with patch("services.workflow_service.transition_quote_status") as mock_tr:
+        out = job_service._HANDLERS["quote_transition"](
+            {"quote_id": "q-1", "to_status": "approved", "actor_id": "u-1", "_attempt": 2}
+        )
+
+    assert out["success"] is True
+    mock_tr.assert_not_called()
+
+
+def test_xls_import_duplicates_are_permanent():
+    from services.xls_import_service import DuplicateArticlesError
+
+    payload = {"invoice_id": "inv-1", "file_b64": base64.b64encode(b"xlsx").decode()}
+    with patch("services.xls_import_service.import_invoice_xls",
+               side_effect=DuplicateArticlesError(["A1"])) as mock_import:
+        with pytest.raises(PermanentJobError) as exc:
+            job_service._HANDLERS["invoice_xls_import"](payload)
+
+    assert mock_import.call_args.kwargs["file_bytes"] == b"xlsx"
+    assert exc.value.result == {"code": "DUPLICATES", "duplicates": ["A1"]}
+
+
+def test_status_endpoint_is_scoped_to_the_callers_org(sb):
+    import asyncio
+    import json
+
+    from api.jobs import get_job_status
+
+    auth_sb = MagicMock()
+    auth_sb.table.return_value.select.return_value.eq.return_value.limit.return_value.execute.return_value.data = [
+        {"organization_id": "org-1"}
+    ]
+    jobs = sb.table.return_value.select.return_value.eq.return_value.eq.return_value.limit.return_value.execute
+    request = SimpleNamespace(state=SimpleNamespace(api_user=SimpleNamespace(id="u-1")), headers={})
+
+    with patch("api.jobs.get_supabase", return_value=auth_sb):
+        jobs.return_value.data = []
+        assert asyncio.run(get_job_status(request, "job-1")).status_code == 404
+
+        jobs.return_value.data = [{"id": "job-1", "kind": "quote_transition", "status": "succeeded",
+                                   "payload": {"secret": 1}, "result": {"success": True}}]
+        response = asyncio.run(get_job_status(request, "job-1"))
+
+    assert response.status_code == 200
+    data = json.loads(response.body)["data"]
+    assert data["status"] == "succeeded" and "payload" not in data
+    sb.table.return_value.select.return_value.eq.return_value.eq.assert_called_with("organization_id", "org-1")
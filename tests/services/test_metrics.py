@@ -0,0 +1,128 @@
+"""Tests for services/metrics.py and GET /api/metrics."""
+from __future__ import annotations
+
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pytest
+from starlette.testclient import TestClient
+
+from services import metrics
+
+
+@pytest.fixture
+def registry():
+    return metrics.Registry()
+
+
+def test_counter_and_gauge_render(registry):
+    sent = registry.counter("sends_total", "Sends", ("outcome",))
+    balance = registry.gauge("balance", "Balance")
+    sent.inc(outcome="ok")
+    sent.inc(2, outcome="ok")
+    sent.inc(outcome="fail")
+    balance.set(42)
+    balance.set(7)
+
+    text = registry.render()
+
+    assert "# TYPE sends_total counter" in text
+    assert 'sends_total{outcome="ok"} 3' in text
+    assert 'sends_total{outcome="fail"} 1' in text
+    assert "# TYPE balance gauge\nbalance 7\n" in text
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    h = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        h.observe(value, route="/a")
+
+    text = registry.render()
+
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/a"} 4' in text
+    assert 'latency_seconds_sum{route="/a"} 4.25' in text
+    assert h.count(route="/a") == 4
+
+
+def test_wrong_labels_and_conflicting_shapes_raise(registry):
+    c = registry.counter("x_total", "X", ("a",))
+    with pytest.raises(ValueError):
+        c.inc(b="1")
+    assert registry.counter("x_total", "X", ("a",)) is c
+    with pytest.raises(ValueError):
+        registry.gauge("x_total", "X", ("a",))
+
+
+def test_collectors_merge_families_and_skip_failures(registry):
+    registry.register_collector(lambda: metrics.cache_families("a", 3, 1, 10))
+    registry.register_collector(lambda: metrics.cache_families("b", 0, 2))
+
+    def broken():
+        raise RuntimeError("boom")
+
+    registry.register_collector(broken)
+
+    text = registry.render()
+
+    assert text.count("# TYPE cache_requests_total counter") == 1
+    assert 'cache_requests_total{cache="a",result="hit"} 3' in text
+    assert 'cache_requests_total{cache="b",result="miss"} 2' in text
+    assert 'cache_entries{cache="a"} 10' in text
+    assert 'cache_entries{cache="b"}' not in text
+
+
+def test_label_values_are_escaped(registry):
+    registry.counter("e_total", "E", ("path",)).inc(path='a"b\\c')
+    assert 'e_total{path="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_service_collectors_report_cache_state():
+    from services import cbr_rates_service, here_service
+
+    here_service._CACHE[("moscow", 10)] = ()
+    here_service.search_cities("Moscow")
+    with patch.object(cbr_rates_service, "_history", cbr_rates_service._RateHistory()), \
+         patch.object(cbr_rates_service, "_load_history", return_value={}), \
+         patch.object(cbr_rates_service.httpx, "get", side_effect=RuntimeError("offline")):
+        cbr_rates_service._fetch_cbr_day.cache_clear()
+        cbr_rates_service.get_usd_rub_rate(date(2026, 10, 1))
+        cbr_rates_service.get_usd_rub_rate(date(2026, 10, 1))
+
+        text = metrics.render()
+
+    assert 'cache_requests_total{cache="here_cities",result="hit"} 1' in text
+    assert 'cache_requests_total{cache="cbr_history",result="miss"} 2' in text
+    assert 'cache_requests_total{cache="cbr_daily",result="hit"} 1' in text
+    assert 'cache_requests_total{cache="cbr_daily",result="miss"} 1' in text
+    assert "rate_resolver_touch_buffer_size" in text
+    cbr_rates_service._fetch_cbr_day.cache_clear()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("CRON_SECRET", "s3cret")
+    with patch("services.database.get_supabase") as mock_get_sb:
+        mock_get_sb.return_value = MagicMock()
+        from api.app import api_app
+    return TestClient(api_app)
+
+
+def test_endpoint_requires_cron_secret(client):
+    assert client.get("/api/metrics").status_code == 403
+    assert client.get("/api/metrics", headers={"X-Cron-Secret": "nope"}).status_code == 403
+
+
+def test_endpoint_serves_prometheus_text(client):
+    client.get("/api/health")
+
+    response = client.get("/api/metrics", headers={"X-Cron-Secret": "s3cret"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/api/health",status="200"}'
+        in response.text
+    )
@@ -0,0 +1,386 @@
+"""Tests for set-based plan-fact writes (services/plan_fact_service.py, Migration 343).
+
+The fake Supabase client implements the two RPCs with the same all-or-nothing
+semantics as the SQL functions and charges a fixed latency per round trip, so
+the benchmark below measures what the change is about: round trips per batch.
+"""
+from __future__ import annotations
+
+import copy
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from services import plan_fact_service
+from services.plan_fact_service import (
+    bulk_create_plan_fact_items,
+    bulk_register_payments,
+    create_plan_fact_item,
+    generate_plan_fact_from_deal,
+    regenerate_plan_fact_for_deal,
+    register_payment_for_item,
+)
+
+DEAL_ID = "11111111-1111-1111-1111-111111111111"
+CATEGORY_ID = "22222222-2222-2222-2222-222222222222"
+ROUND_TRIP_SECONDS = 0.002  # simulated PostgREST latency per request
+
+
+def _numeric(value: Any) -> Any:
+    """JSON value → NUMERIC as Postgres casts it (strings are read exactly)."""
+    return None if value is None else Decimal(str(value))
+
+
+class _FakeDB:
+    """plan_fact_items + deals + the Migration 343 RPCs, counting round trips."""
+
+    def __init__(self) -> None:
+        self.round_trips = 0
+        self.deals = {DEAL_ID: {
+            "id": DEAL_ID, "deal_number": "DEAL-2026-0001", "total_amount": 1000,
+            "currency": "USD", "signed_at": "2026-10-01", "specifications": None,
+        }}
+        self.items: dict[str, dict] = {}
+        self.fail_next_rpc = False
+
+    def _trip(self) -> None:
+        self.round_trips += 1
+        time.sleep(ROUND_TRIP_SECONDS)
+
+    def _new_row(self, deal_id: str, data: dict) -> dict:
+        return {
+            "id": str(uuid.uuid4()), "deal_id": deal_id,
+            "category_id": data["category_id"], "description": data.get("description"),
+            "planned_amount": _numeric(data["planned_amount"]),
+            "planned_currency": data.get("planned_currency") or "RUB",
+            "planned_date": data["planned_date"],
+            "actual_amount": None, "actual_currency": None, "actual_date": None,
+            "actual_exchange_rate": None, "variance_amount": None,
+            "payment_document": None, "notes": None,
+            "created_by": data.get("created_by"), "created_at": "2026-10-18T10:00:00+00:00",
+            "updated_at": None,
+        }
+
+    # -- PostgREST surface -------------------------------------------------
+    def table(self, name: str) -> "_Query":
+        return _Query(self, name)
+
+    def rpc(self, name: str, params: dict) -> SimpleNamespace:
+        return SimpleNamespace(execute=lambda: self._run_rpc(name, params))
+
+    def _run_rpc(self, name: str, params: dict) -> SimpleNamespace:
+        self._trip()
+        if self.fail_next_rpc:
+            self.fail_next_rpc = False
+            raise RuntimeError("connection reset")
+        snapshot = copy.deepcopy(self.items)
+        try:
+            return SimpleNamespace(data=getattr(self, f"_rpc_{name}")(**params))
+        except Exception:
+            self.items = snapshot  # transaction rolled back
+            raise
+
+    def _rpc_insert_plan_fact_items(self, p_deal_id, p_items, p_replace=False):
+        if p_deal_id not in self.deals:
+            raise RuntimeError(f"Deal not found: {p_deal_id}")
+        if p_replace:
+            self.items = {k: v for k, v in self.items.items() if v["deal_id"] != p_deal_id}
+        created = []
+        for data in p_items:
+            if data["planned_amount"] is not None and _numeric(data["planned_amount"]) < 0:
+                raise RuntimeError("check constraint violated")
+            row = self._new_row(p_deal_id, data)
+            self.items[row["id"]] = row
+            created.append(dict(row))
+        return created
+
+    def _rpc_register_plan_fact_payments(self, p_payments):
+        ids = [p["id"] for p in p_payments]
+        if len(set(ids)) != len(ids):
+            raise RuntimeError("Duplicate plan-fact item in payment batch")
+        ready = [i for i in ids if i in self.items and self.items[i]["actual_amount"] is None]
+        if len(ready) != len(ids):
+            raise RuntimeError("plan-fact items are missing or already paid")
+        updated = []
+        for p in p_payments:
+            row = self.items[p["id"]]
+            actual = _numeric(p["actual_amount"])
+            row.update(
+                actual_amount=actual, actual_date=p["actual_date"],
+                actual_currency=p["actual_currency"] or "RUB",
+                variance_amount=actual - row["planned_amount"],  # trigger
+            )
+            if p["actual_exchange_rate"] is not None:
+                row["actual_exchange_rate"] = _numeric(p["actual_exchange_rate"])
+            for key in ("payment_document", "notes"):
+                if p[key] is not None:
+                    row[key] = p[key]
+            updated.append(dict(row))
+        return updated
+
+
+class _Query:
+    def __init__(self, db: _FakeDB, table: str) -> None:
+        self.db, self.table = db, table
+        self.filters: list = []
+        self.op, self.payload, self.counting = "select", None, False
+
+    def select(self, *_a, count=None):
+        self.counting = count == "exact"
+        return self
+
+    def insert(self, payload):
+        self.op, self.payload = "insert", payload
+        return self
+
+    def update(self, payload):
+        self.op, self.payload = "update", payload
+        return self
+
+    def eq(self, col, val):
+        self.filters.append(lambda r: r.get(col) == val)
+        return self
+
+    def in_(self, col, vals):
+        self.filters.append(lambda r: r.get(col) in vals)
+        return self
+
+    def limit(self, _n):
+        return self
+
+    def execute(self):
+        self.db._trip()
+        if self.table == "deals":
+            rows = [d for d in self.db.deals.values() if all(f(d) for f in self.filters)]
+            return SimpleNamespace(data=rows, count=len(rows))
+        if self.table == "quote_calculation_variables":
+            return SimpleNamespace(data=[], count=0)
+        assert self.table == "plan_fact_items", self.table
+        if self.op == "insert":
+            row = self.db._new_row(self.payload["deal_id"], self.payload)
+            self.db.items[row["id"]] = row
+            return SimpleNamespace(data=[dict(row)])
+        rows = [r for r in self.db.items.values() if all(f(r) for f in self.filters)]
+        if self.op == "update":
+            for r in rows:
+                r.update(self.payload)
+                if self.payload.get("actual_amount") is not None:
+                    r["variance_amount"] = self.payload["actual_amount"] - r["planned_amount"]
+        return SimpleNamespace(data=[dict(r) for r in rows], count=len(rows))
+
+
+@pytest.fixture
+def db(monkeypatch) -> _FakeDB:
+    fake = _FakeDB()
+    monkeypatch.setattr(plan_fact_service, "get_supabase", lambda: fake)
+    monkeypatch.setattr(
+        plan_fact_service, "get_category_by_code",
+        lambda code: SimpleNamespace(id=CATEGORY_ID) if code == "client_payment" else None,
+    )
+    return fake
+
+
+def _planned(n: int) -> list[dict[str, Any]]:
+    start = date(2026, 11, 1)
+    return [
+        {"category_id": CATEGORY_ID, "planned_amount": 100 + i,
+         "planned_date": start + timedelta(days=i), "description": f"Платёж {i + 1}"}
+        for i in range(n)
+    ]
+
+
+def _payments(items) -> list[dict[str, Any]]:
+    return [
+        {"item_id": item.id, "actual_amount": float(item.planned_amount),
+         "actual_date": date(2026, 10, 15), "payment_document": f"PP-{n}"}
+        for n, item in enumerate(items)
+    ]
+
+
+# ============================================================================
+# Bulk creation / generation
+# ============================================================================
+
+def test_bulk_create_is_one_round_trip(db):
+    created = bulk_create_plan_fact_items(
+        DEAL_ID,
+        _planned(3) + [
+            {"category_code": "client_payment", "planned_amount": Decimal("5.50"),
+             "planned_date": date(2026, 12, 1)},
+            {"category_code": "unknown", "planned_amount": 1, "planned_date": date(2026, 12, 1)},
+        ],
+        created_by="33333333-3333-3333-3333-333333333333",
+    )
+
+    assert db.round_trips == 1
+    assert len(created) == 4  # the unknown category is skipped
+    assert created[3].planned_amount == Decimal("5.5")
+    assert {item.created_by for item in created} == {"33333333-3333-3333-3333-333333333333"}
+
+
+def test_decimal_amounts_reach_the_rpc_exactly(db):
+    amount = Decimal("12345678901234567.89")  # 19 significant digits
+    sent = []
+    original_rpc = db._rpc_insert_plan_fact_items
+
+    def spy(p_deal_id, p_items, p_replace=False):
+        sent.extend(p_items)
+        return original_rpc(p_deal_id, p_items, p_replace)
+
+    db._rpc_insert_plan_fact_items = spy
+    (created,) = bulk_create_plan_fact_items(DEAL_ID, [
+        {"category_code": "client_payment", "planned_amount": amount, "planned_date": date(2026, 12, 1)},
+    ])
+
+    assert sent[0]["planned_amount"] == "12345678901234567.89"
+    assert created.planned_amount == amount
+
+
+def test_bulk_create_failure_writes_nothing(db):
+    items = _planned(5)
+    items[3]["planned_amount"] = -1  # rejected by the database mid-batch
+
+    assert bulk_create_plan_fact_items(DEAL_ID, items) == []
+    assert db.items == {}
+
+
+def test_failed_regeneration_keeps_existing_items(db):
+    bulk_create_plan_fact_items(DEAL_ID, _planned(4))
+    before = copy.deepcopy(db.items)
+
+    db.fail_next_rpc = True
+    result = regenerate_plan_fact_for_deal(DEAL_ID)
+
+    assert result.success is False
+    assert db.items == before
+
+
+def test_regeneration_replaces_items(db):
+    bulk_create_plan_fact_items(DEAL_ID, _planned(4))
+
+    result = regenerate_plan_fact_for_deal(DEAL_ID)
+
+    assert result.success is True
+    assert result.items_count == 1  # 100 % advance from the deal total
+    assert [row["description"] for row in db.items.values()] == ["Аванс от клиента (100%)"]
+
+
+def test_generation_refuses_existing_items_without_replace(db):
+    bulk_create_plan_fact_items(DEAL_ID, _planned(2))
+    result = generate_plan_fact_from_deal(DEAL_ID)
+    assert result.success is False
+    assert len(db.items) == 2
+
+
+# ============================================================================
+# Bulk payment registration
+# ============================================================================
+
+def test_bulk_payments_validate_then_write_once(db):
+    items = bulk_create_plan_fact_items(DEAL_ID, _planned(3))
+    db.round_trips = 0
+    payments = _payments(items)
+    payments[1]["actual_amount"] = -5  # invalid
+    payments.append({"item_id": "missing-item", "actual_amount": 1, "actual_date": date(2026, 10, 1)})
+    payments.append({"item_id": items[0].id})  # missing fields
+
+    result = bulk_register_payments(payments)
+
+    assert db.round_trips == 2  # one read, one write
+    assert [r.success for r in result["results"]] == [True, False, True, False, False]
+    assert result["success_count"] == 2 and result["failure_count"] == 3
+    assert result["total_amount"] == 202.0
+    assert "greater than 0" in result["results"][1].error
+    assert "not found" in result["results"][3].error
+    assert result["results"][0].item.payment_document == "PP-0"
+    assert result["results"][0].variance_amount == Decimal("0")
+
+
+def test_bulk_payments_are_all_or_nothing(db):
+    items = bulk_create_plan_fact_items(DEAL_ID, _planned(3))
+    payments = _payments(items)
+    # Another user pays item 2 between our read and our write
+    original_rpc = db._rpc_register_plan_fact_payments
+
+    def paid_concurrently(p_payments):
+        db.items[items[2].id]["actual_amount"] = 1
+        return original_rpc(p_payments)
+
+    db._rpc_register_plan_fact_payments = paid_concurrently
+
+    result = bulk_register_payments(payments)
+
+    assert result["success_count"] == 0
+    assert all("database error" in r.error for r in result["results"])
+    assert db.items[items[0].id]["actual_amount"] is None
+
+
+def test_duplicate_payment_in_batch_is_rejected(db):
+    (item,) = bulk_create_plan_fact_items(DEAL_ID, _planned(1))
+    payments = _payments([item]) * 2
+
+    result = bulk_register_payments(payments)
+
+    assert [r.success for r in result["results"]] == [True, False]
+    assert "Duplicate" in result["results"][1].error
+
+
+# ============================================================================
+# Benchmark: a deal with 200 plan-fact rows
+# ============================================================================
+
+def test_benchmark_200_rows(db):
+    """Set-based writes vs the per-row path on 200 rows.
+
+    Per-row numbers come from the single-row functions the bulk calls used to
+    loop over (create_plan_fact_item / register_payment_for_item).
+    """
+    rows = 200
+    timings = {}
+
+    started = time.perf_counter()
+    for item in _planned(rows):
+        create_plan_fact_item(DEAL_ID, item["category_id"], item["planned_amount"],
+                              item["planned_date"], description=item["description"])
+    timings["create_per_row"] = (time.perf_counter() - started, db.round_trips)
+
+    db.round_trips = 0
+    started = time.perf_counter()
+    for payment in _payments(list(map(plan_fact_service.PlanFactItem.from_dict, db.items.values()))):
+        register_payment_for_item(payment.pop("item_id"), **payment)
+    timings["pay_per_row"] = (time.perf_counter() - started, db.round_trips)
+
+    db.items.clear()
+    db.round_trips = 0
+    started = time.perf_counter()
+    created = bulk_create_plan_fact_items(DEAL_ID, _planned(rows))
+    timings["create_bulk"] = (time.perf_counter() - started, db.round_trips)
+
+    db.round_trips = 0
+    started = time.perf_counter()
+    result = bulk_register_payments(_payments(created))
+    timings["pay_bulk"] = (time.perf_counter() - started, db.round_trips)
+
+    db.round_trips = 0
+    started = time.perf_counter()
+    regenerated = regenerate_plan_fact_for_deal(DEAL_ID)
+    timings["regenerate_over_200"] = (time.perf_counter() - started, db.round_trips)
+
+    print("\nplan-fact, 200 rows, %.0f ms per round trip" % (ROUND_TRIP_SECONDS * 1000))
+    for name, (seconds, trips) in timings.items():
+        print(f"  {name:<22} {trips:>4} round trips  {seconds * 1000:8.1f} ms")
+
+    assert len(created) == rows and result["success_count"] == rows
+    assert regenerated.success
+    assert timings["create_per_row"][1] == rows
+    assert timings["pay_per_row"][1] == 2 * rows
+    assert timings["create_bulk"][1] == 1
+    assert timings["pay_bulk"][1] == 2
+    assert timings["regenerate_over_200"][1] == 3  # deal, existing count, RPC
+    assert timings["create_bulk"][0] * 20 < timings["create_per_row"][0]
+    assert timings["pay_bulk"][0] * 20 < timings["pay_per_row"][0]
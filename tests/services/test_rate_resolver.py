@@ -17,13 +17,17 @@ import pytest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from services.alta_client import AltaApiError, Rate
+from services import rate_resolver
 from services.rate_resolver import (
     CACHE_TTL,
     FROZEN_STATUSES,
+    RateRequest,
     ResolvedRate,
     ResolveOutcome,
     ResolveResult,
+    flush_last_used_at,
     resolve_rate,
+    resolve_rates_batch,
 )
 
 
@@ -118,6 +122,7 @@ class _MockTable:
         self._update_payloads: list[dict] = []
         self._is_filters: list[tuple[str, str]] = []
         self._eq_filters: list[tuple[str, object]] = []
+        self._in_filters: list[tuple[str, list]] = []
         self._single_pending = False  # set by .single(), cleared by .execute()
 
     def set_select(self, rows: list[dict]) -> None:
@@ -135,6 +140,9 @@ class _MockTable:
     @property
     def eq_filters(self) -> list[tuple[str, object]]: return self._eq_filters
 
+    @property
+    def in_filters(self) -> list[tuple[str, list]]: return self._in_filters
+
     def select(self, *_a, **_kw) -> "_MockTable":
         self._recorder.append(("select", self._name))
         return self
@@ -143,6 +151,10 @@ class _MockTable:
         self._eq_filters.append((col, val))
         return self
 
+    def in_(self, col: str, vals: list) -> "_MockTable":
+        self._in_filters.append((col, list(vals)))
+        return self
+
     def lte(self, *_a, **_kw) -> "_MockTable": return self
     def gte(self, *_a, **_kw) -> "_MockTable": return self
 
@@ -152,6 +164,7 @@ class _MockTable:
 
     def order(self, *_a, **_kw) -> "_MockTable": return self
     def limit(self, *_a, **_kw) -> "_MockTable": return self
+    def range(self, *_a, **_kw) -> "_MockTable": return self
 
     def single(self) -> "_MockTable":
         self._single_pending = True
@@ -197,6 +210,15 @@ def mock_sb() -> _MockSupabase:
     return _MockSupabase()
 
 
+@pytest.fixture(autouse=True)
+def _empty_touch_buffer():
+    """The last_used_at write-behind buffer is process-global — keep
+    tests from leaking ids into each other (or into the cron tests)."""
+    rate_resolver._touch_buffer.clear()
+    yield
+    rate_resolver._touch_buffer.clear()
+
+
 @pytest.fixture
 def alta_client_mock() -> MagicMock:
     client = MagicMock()
@@ -268,13 +290,19 @@ async def test_tier_2_areal_match_when_no_country_row(mock_sb, alta_client_mock)
     mock_sb.tables["tnved_rates"] = rates_table
 
     countries_table = _MockTable("country_areals", mock_sb.recorder)
-    countries_table.set_select([{"areal_code": "EAEU"}, {"areal_code": "CIS"}])
+    countries_table.set_select([
+        {"country_oksm": 643, "areal_code": "EAEU"},
+        {"country_oksm": 643, "areal_code": "CIS"},
+    ])
     mock_sb.tables["country_areals"] = countries_table
 
     # Drive scripted answers per call to .execute()
     call_seq = iter([
         [],                                  # Tier 1 — C:643 miss
-        [{"areal_code": "EAEU"}, {"areal_code": "CIS"}],  # country_areals
+        [
+            {"country_oksm": 643, "areal_code": "EAEU"},
+            {"country_oksm": 643, "areal_code": "CIS"},
+        ],                                   # country_areals snapshot
         [_row(country_or_areal="A:EAEU")],  # Tier 2 — A:EAEU hit
     ])
 
@@ -541,7 +569,8 @@ async def test_resolve_rate_network_error_returns_alta_error(mock_sb, alta_clien
 
 
 @pytest.mark.asyncio
-async def test_last_used_at_updated_on_cache_hit(mock_sb, alta_client_mock):
+async def test_last_used_at_buffered_on_cache_hit(mock_sb, alta_client_mock):
+    """A hit enqueues the id; no UPDATE runs in the request path."""
     rates_table = _MockTable("tnved_rates", mock_sb.recorder)
     rates_table.set_select([_row(id="rate-uuid-42")])
     mock_sb.tables["tnved_rates"] = rates_table
@@ -555,22 +584,68 @@ async def test_last_used_at_updated_on_cache_hit(mock_sb, alta_client_mock):
             alta_client=alta_client_mock,
         )
 
+    assert rates_table.updates == []
+    assert "rate-uuid-42" in rate_resolver._touch_buffer
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_buffered_touches_in_one_update(mock_sb, alta_client_mock):
+    rates_table = _MockTable("tnved_rates", mock_sb.recorder)
+    mock_sb.tables["tnved_rates"] = rates_table
+
+    with _patch_get_supabase(mock_sb):
+        for rate_id in ("r-1", "r-2", "r-1", "r-3"):
+            rates_table.set_select([_row(id=rate_id)])
+            await resolve_rate(
+                tnved_code="8409910008",
+                payment_type="IMP",
+                country_oksm=156,
+                target_date=date(2026, 5, 1),
+                alta_client=alta_client_mock,
+            )
+
+    assert flush_last_used_at(mock_sb) == 3
     assert len(rates_table.updates) == 1
     assert "last_used_at" in rates_table.updates[0]
-    # eq("id", "rate-uuid-42") was issued for the update path
-    assert ("id", "rate-uuid-42") in rates_table.eq_filters
+    assert ("id", ["r-1", "r-2", "r-3"]) in rates_table.in_filters
+    # Buffer drained — a second flush is a no-op
+    assert flush_last_used_at(mock_sb) == 0
+    assert len(rates_table.updates) == 1
+
+
+def test_flush_chunks_large_buffers(mock_sb):
+    rates_table = _MockTable("tnved_rates", mock_sb.recorder)
+    mock_sb.tables["tnved_rates"] = rates_table
+    ids = [f"r-{i}" for i in range(rate_resolver._TOUCH_FLUSH_CHUNK + 1)]
+    rate_resolver._touch_last_used_at_many(mock_sb, ids)
+
+    assert flush_last_used_at(mock_sb) == len(ids)
+    assert len(rates_table.updates) == 2
+
+
+def test_buffer_overflow_flushes_inline(mock_sb, monkeypatch):
+    rates_table = _MockTable("tnved_rates", mock_sb.recorder)
+    mock_sb.tables["tnved_rates"] = rates_table
+    monkeypatch.setattr(rate_resolver, "_TOUCH_BUFFER_MAX", 3)
+
+    rate_resolver._touch_last_used_at_many(mock_sb, ["a", "b"])
+    assert rates_table.updates == []
+    rate_resolver._touch_last_used_at(mock_sb, "c")
+    assert len(rates_table.updates) == 1
+    assert rate_resolver._touch_buffer == {}
 
 
 @pytest.mark.asyncio
-async def test_last_used_at_failure_does_not_break_resolve(mock_sb, alta_client_mock, caplog):
-    """A failing UPDATE should be logged but not propagate — the cron
-    will eventually re-touch the row.
+async def test_last_used_at_flush_failure_does_not_break_resolve(
+    mock_sb, alta_client_mock, caplog, monkeypatch,
+):
+    """A failing flush is logged and counted but never reaches the
+    resolve — the cron will eventually re-touch the row.
     """
     rates_table = _MockTable("tnved_rates", mock_sb.recorder)
     rates_table.set_select([_row()])
     mock_sb.tables["tnved_rates"] = rates_table
-
-    original_update = rates_table.update
+    monkeypatch.setattr(rate_resolver, "_touch_failure_count", 0)
 
     def boom(payload):  # noqa: ARG001
         # Mimic a failure during the chained call
@@ -586,13 +661,28 @@ async def test_last_used_at_failure_does_not_break_resolve(mock_sb, alta_client_
             target_date=date(2026, 5, 1),
             alta_client=alta_client_mock,
         )
+        assert flush_last_used_at(mock_sb) == 0
 
-    rates_table.update = original_update  # restore
     assert result.outcome == ResolveOutcome.FOUND
     assert result.rate is not None
+    assert rate_resolver._touch_failure_count == 1
     assert any("failed to update last_used_at" in r.message for r in caplog.records)
 
 
+def test_flusher_thread_stop_drains_buffer(mock_sb):
+    rates_table = _MockTable("tnved_rates", mock_sb.recorder)
+    mock_sb.tables["tnved_rates"] = rates_table
+
+    with _patch_get_supabase(mock_sb):
+        rate_resolver.start_last_used_flusher(interval=3600)
+        rate_resolver.start_last_used_flusher(interval=3600)  # idempotent
+        rate_resolver._touch_last_used_at(mock_sb, "r-shutdown")
+        rate_resolver.stop_last_used_flusher()
+
+    assert rate_resolver._flusher_thread is None
+    assert ("id", ["r-shutdown"]) in rates_table.in_filters
+
+
 # ---------------------------------------------------------------------------
 # REQ-3 AC#5 — race-safe upsert via UNIQUE constraint
 # ---------------------------------------------------------------------------
@@ -958,3 +1048,151 @@ def test_resolve_result_not_found_with_rate_raises():
     )
     with pytest.raises(ValueError):
         ResolveResult(ResolveOutcome.NOT_FOUND, rate)
+
+
+# ---------------------------------------------------------------------------
+# resolve_rates_batch — set-based multi-item resolution
+# ---------------------------------------------------------------------------
+
+
+def _selects(mock_sb: _MockSupabase, table: str) -> int:
+    return sum(1 for ev in mock_sb.recorder if ev == ("select", table))
+
+
+@pytest.mark.asyncio
+async def test_batch_resolves_all_items_with_one_rates_query(mock_sb, alta_client_mock):
+    """Exact-country, areal and base hits for three items come from ONE
+    tnved_rates select + ONE country_areals select; touches are buffered."""
+    rates_table = _MockTable("tnved_rates", mock_sb.recorder)
+    rates_table.set_select([
+        _row(id="r-cn", tnved_code="8409910008", country_or_areal="C:156"),
+        _row(id="r-eu", tnved_code="7326909807", country_or_areal="A:EU"),
+        _row(id="r-base", tnved_code="8481808199", country_or_areal="__base__"),
+    ])
+    mock_sb.tables["tnved_rates"] = rates_table
+    areals_table = _MockTable("country_areals", mock_sb.recorder)
+    areals_table.set_select([{"country_oksm": 276, "areal_code": "EU"}])
+    mock_sb.tables["country_areals"] = areals_table
+
+    requests = [
+        RateRequest("8409910008", 156, date(2026, 5, 1)),
+        RateRequest("7326909807", 276, date(2026, 5, 1)),
+        RateRequest("8481808199", 392, date(2026, 5, 1)),
+        RateRequest("8409910008", 156, date(2026, 5, 1)),  # duplicate item
+    ]
+    with _patch_get_supabase(mock_sb):
+        results = await resolve_rates_batch(
+            requests, ("IMP",), alta_client=alta_client_mock,
+        )
+
+    assert [r.result_for("IMP").rate.id for r in results] == [
+        "r-cn", "r-eu", "r-base", "r-cn",
+    ]
+    assert _selects(mock_sb, "tnved_rates") == 1
+    assert _selects(mock_sb, "country_areals") == 1
+    alta_client_mock.get_rates.assert_not_called()
+    assert rates_table.updates == []
+    assert set(rate_resolver._touch_buffer) == {"r-cn", "r-eu", "r-base"}
+
+
+@pytest.mark.asyncio
+async def test_batch_exact_country_beats_base(mock_sb, alta_client_mock):
+    rates_table = _MockTable("tnved_rates", mock_sb.recorder)
+    rates_table.set_select([
+        _row(id="r-base", country_or_areal="__base__", value_1_number=5.0),
+        _row(id="r-cn", country_or_areal="C:156", value_1_number=15.0),
+    ])
+    mock_sb.tables["tnved_rates"] = rates_table
+
+    with _patch_get_supabase(mock_sb):
+        (result,) = await resolve_rates_batch(
+            [RateRequest("8409910008", 156, date(2026, 5, 1))],
+            ("IMP",), alta_client=alta_client_mock,
+        )
+
+    assert result.result_for("IMP").rate.id == "r-cn"
+
+
+@pytest.mark.asyncio
+async def test_batch_skips_rows_not_valid_on_target_date(mock_sb, alta_client_mock):
+    rates_table = _MockTable("tnved_rates", mock_sb.recorder)
+    rates_table.set_select([
+        _row(id="future", valid_from="2026-06-01"),
+        _row(id="expired", valid_from="2025-01-01", valid_to="2026-04-01"),
+    ])
+    mock_sb.tables["tnved_rates"] = rates_table
+
+    with _patch_get_supabase(mock_sb):
+        (result,) = await resolve_rates_batch(
+            [RateRequest("8409910008", 156, date(2026, 5, 1))],
+            ("IMP",), alta_client=alta_client_mock,
+        )
+
+    # Both rows filtered → miss → Alta (empty) → NOT_FOUND
+    assert result.outcomes["IMP"] == ResolveOutcome.NOT_FOUND
+    alta_client_mock.get_rates.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_batch_dedupes_alta_calls_and_upserts_once(mock_sb, alta_client_mock):
+    """Identical misses share one Alta call; distinct misses get one each;
+    all payloads go through a single upsert."""
+    rates_table = _MockTable("tnved_rates", mock_sb.recorder)
+    mock_sb.tables["tnved_rates"] = rates_table
+
+    async def fake_get_rates(*, tncode, country, **_kw):
+        # After Alta responds, the cache holds the row on re-query.
+        rates_table.set_select(rates_table._select_rows + [
+            _row(id=f"r-{tncode}", tnved_code=tncode, country_or_areal=f"C:{country}"),
+        ])
+        return [_make_rate(tnved_code=tncode, country_or_areal=f"C:{country}")]
+
+    alta_client_mock.get_rates = AsyncMock(side_effect=fake_get_rates)
+
+    requests = [
+        RateRequest("8409910008", 156, date(2026, 5, 1)),
+        RateRequest("8409910008", 156, date(2026, 5, 1)),
+        RateRequest("7326909807", 156, date(2026, 5, 1)),
+    ]
+    with _patch_get_supabase(mock_sb):
+        results = await resolve_rates_batch(
+            requests, ("IMP", "NDS"), alta_client=alta_client_mock,
+        )
+
+    assert alta_client_mock.get_rates.await_count == 2
+    assert len(rates_table.upserts) == 1
+    assert len(rates_table.upserts[0]) == 2
+    assert [r.outcomes["IMP"] for r in results] == [ResolveOutcome.FOUND] * 3
+    # Alta responded but carried no NDS row → terminal NOT_FOUND
+    assert [r.outcomes["NDS"] for r in results] == [ResolveOutcome.NOT_FOUND] * 3
+    # Initial sweep + one re-query for the Alta-fetched requests
+    assert _selects(mock_sb, "tnved_rates") == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_alta_error_is_isolated_per_request(mock_sb, alta_client_mock):
+    rates_table = _MockTable("tnved_rates", mock_sb.recorder)
+    rates_table.set_select([_row(id="r-hit", tnved_code="8409910008")])
+    mock_sb.tables["tnved_rates"] = rates_table
+    alta_client_mock.get_rates = AsyncMock(side_effect=AltaApiError(140, "Нет пакета"))
+
+    with _patch_get_supabase(mock_sb):
+        hit, miss = await resolve_rates_batch(
+            [
+                RateRequest("8409910008", 156, date(2026, 5, 1)),
+                RateRequest("7326909807", 156, date(2026, 5, 1)),
+            ],
+            ("IMP",), alta_client=alta_client_mock,
+        )
+
+    assert hit.outcomes["IMP"] == ResolveOutcome.FOUND
+    assert miss.outcomes["IMP"] == ResolveOutcome.ALTA_ERROR
+    assert miss.result_for("IMP") == ResolveResult(ResolveOutcome.ALTA_ERROR, None)
+    alta_client_mock.get_rates.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_batch_empty_input_makes_no_queries(mock_sb, alta_client_mock):
+    with _patch_get_supabase(mock_sb):
+        assert await resolve_rates_batch([], ("IMP",), alta_client=alta_client_mock) == []
+    assert mock_sb.recorder == []
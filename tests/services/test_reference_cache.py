@@ -0,0 +1,138 @@
+"""Tests for services/reference_cache.py — in-process reference-table snapshots."""
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from services import reference_cache
+
+
+class _Query:
+    def __init__(self, sb: "_FakeSupabase", table: str) -> None:
+        self._sb = sb
+        self._table = table
+        self._range: tuple[int, int] | None = None
+
+    def select(self, *_a: Any) -> "_Query":
+        return self
+
+    def order(self, *_a: Any, **_k: Any) -> "_Query":
+        return self
+
+    def range(self, start: int, end: int) -> "_Query":
+        self._range = (start, end)
+        return self
+
+    def execute(self) -> Any:
+        self._sb.reads.append((self._table, self._range))
+        if self._sb.fail:
+            raise ConnectionError("db down")
+        rows = self._sb.rows.get(self._table, [])
+        if self._range is not None:
+            rows = rows[self._range[0]:self._range[1] + 1]
+        return MagicMock(data=list(rows))
+
+
+class _FakeSupabase:
+    def __init__(self, rows: dict[str, list[dict]] | None = None) -> None:
+        self.rows = rows or {}
+        self.reads: list[tuple[str, Any]] = []
+        self.fail = False
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+
+@pytest.fixture
+def sb() -> _FakeSupabase:
+    return _FakeSupabase({
+        "country_areals": [
+            {"country_oksm": 276, "areal_code": "EU"},
+            {"country_oksm": 643, "areal_code": "EAEU"},
+            {"country_oksm": 643, "areal_code": "CIS"},
+        ],
+        "stage_deadlines": [
+            {"id": "d1", "organization_id": "org-a", "stage": "pending_procurement", "deadline_hours": 48},
+            {"id": "d2", "organization_id": "org-b", "stage": "pending_procurement", "deadline_hours": 24},
+        ],
+        "plan_fact_categories": [
+            {"id": "c1", "code": "client_payment", "name": "Оплата клиента"},
+        ],
+    })
+
+
+def test_typed_accessors_share_one_snapshot_per_table(sb):
+    assert reference_cache.areals_for_country(643, sb=sb) == ["EAEU", "CIS"]
+    assert reference_cache.areals_for_country(276, sb=sb) == ["EU"]
+    assert reference_cache.areals_for_country(392, sb=sb) == []
+    assert reference_cache.stage_deadlines_for_org("org-b", sb=sb) == {
+        "pending_procurement": 24,
+    }
+    assert reference_cache.stage_deadlines_for_org("org-a", sb=sb) == {
+        "pending_procurement": 48,
+    }
+    assert reference_cache.plan_fact_category_by_code("client_payment", sb=sb)["id"] == "c1"
+    assert reference_cache.plan_fact_category_by_code("nope", sb=sb) is None
+    assert [t for t, _ in sb.reads] == [
+        "country_areals", "stage_deadlines", "plan_fact_categories",
+    ]
+
+
+def test_accessor_results_are_copies(sb):
+    reference_cache.areals_for_country(643, sb=sb).append("XX")
+    assert reference_cache.areals_for_country(643, sb=sb) == ["EAEU", "CIS"]
+
+
+def test_bump_version_forces_reload(sb):
+    reference_cache.areals_for_country(643, sb=sb)
+    sb.rows["country_areals"].append({"country_oksm": 643, "areal_code": "UNF"})
+    assert reference_cache.areals_for_country(643, sb=sb) == ["EAEU", "CIS"]
+
+    reference_cache.bump_version("country_areals")
+    assert reference_cache.areals_for_country(643, sb=sb) == ["EAEU", "CIS", "UNF"]
+    assert len(sb.reads) == 2
+
+
+def test_ttl_expiry_reloads(sb, monkeypatch):
+    reference_cache.areals_for_country(643, sb=sb)
+    monkeypatch.setitem(
+        reference_cache.TABLES, "country_areals",
+        reference_cache.TableSpec("country_oksm, areal_code", ("country_oksm",), 0.0),
+    )
+    reference_cache.areals_for_country(643, sb=sb)
+    assert len(sb.reads) == 2
+
+
+def test_failed_reload_serves_stale_snapshot(sb):
+    reference_cache.areals_for_country(643, sb=sb)
+    reference_cache._snapshots["country_areals"].loaded_at = -1e9  # expired
+    sb.fail = True
+    errors_before = reference_cache.stats()["load_errors"]
+    assert reference_cache.areals_for_country(643, sb=sb) == ["EAEU", "CIS"]
+    assert reference_cache.stats()["load_errors"] == errors_before + 1
+
+
+def test_cold_load_failure_propagates(sb):
+    sb.fail = True
+    with pytest.raises(ConnectionError):
+        reference_cache.country_exists(156, sb=sb)
+
+
+def test_snapshot_pages_through_large_tables(monkeypatch):
+    monkeypatch.setattr(reference_cache, "PAGE_SIZE", 2)
+    sb = _FakeSupabase({
+        "vat_rates_by_country": [
+            {"country_code": c, "rate": r}
+            for c, r in [("CN", "20.00"), ("DE", "19.00"), ("KZ", "0.00"), ("RU", "22.00")]
+        ],
+    })
+    assert reference_cache.vat_rate_for_country("ru", sb=sb) == Decimal("22.00")
+    assert reference_cache.vat_rate_for_country("XX", sb=sb) is None
+    assert sb.reads == [
+        ("vat_rates_by_country", (0, 1)),
+        ("vat_rates_by_country", (2, 3)),
+        ("vat_rates_by_country", (4, 5)),
+    ]
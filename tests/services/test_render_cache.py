@@ -0,0 +1,254 @@
+"""Tests for services/render_cache.py — content-addressed render cache."""
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from services import render_cache
+from services.currency_invoice_export import generate_currency_invoice_docx
+from services.export_data_mapper import ExportData
+from services.kp_export import KpItem, KpProposal
+
+
+class _FakeStorage:
+    """kvota.render_cache table + kvota-render-cache bucket stand-in."""
+
+    def __init__(self) -> None:
+        self.rows: dict[str, dict] = {}
+        self.objects: dict[str, bytes] = {}
+        self.fail = False
+        self.storage = MagicMock()
+        bucket = self.storage.from_.return_value
+        bucket.download.side_effect = self._download
+        bucket.upload.side_effect = self._upload
+        bucket.remove.side_effect = lambda paths: [self.objects.pop(p, None) for p in paths]
+
+    def _download(self, path: str) -> bytes:
+        if self.fail:
+            raise RuntimeError("storage down")
+        return self.objects[path]
+
+    def _upload(self, path: str, file: bytes, file_options: dict) -> None:
+        if self.fail:
+            raise RuntimeError("storage down")
+        self.objects[path] = file
+
+    def table(self, _name: str) -> "_Query":
+        return _Query(self)
+
+
+class _Query:
+    def __init__(self, store: _FakeStorage) -> None:
+        self.store = store
+        self.filters: list = []
+        self.op = "select"
+        self.payload: Any = None
+        self.max_rows: int | None = None
+
+    def select(self, *_a):
+        return self
+
+    def limit(self, n):
+        self.max_rows = n
+        return self
+
+    def eq(self, col, val):
+        self.filters.append(lambda r: r[col] == val)
+        return self
+
+    def neq(self, col, val):
+        self.filters.append(lambda r: r[col] != val)
+        return self
+
+    def lt(self, col, val):
+        self.filters.append(lambda r: r[col] < val)
+        return self
+
+    def in_(self, col, vals):
+        self.filters.append(lambda r: r[col] in vals)
+        return self
+
+    def update(self, values):
+        self.op, self.payload = "update", values
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        self.op, self.payload = "upsert", row
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def execute(self):
+        rows = self.store.rows
+        if self.op == "upsert":
+            rows[self.payload["cache_key"]] = dict(self.payload)
+            return MagicMock(data=[self.payload])
+        matched = [r for r in rows.values() if all(f(r) for f in self.filters)]
+        if self.op == "update":
+            for r in matched:
+                r.update(self.payload)
+        if self.op == "delete":
+            for r in matched:
+                del rows[r["cache_key"]]
+        if self.op == "select" and self.max_rows is not None:
+            matched = matched[: self.max_rows]
+        return MagicMock(data=[dict(r) for r in matched])
+
+
+@pytest.fixture
+def store(monkeypatch) -> _FakeStorage:
+    fake = _FakeStorage()
+    monkeypatch.setattr(render_cache, "_get_supabase", lambda: fake)
+    return fake
+
+
+class _Renderer:
+    def __init__(self, content: bytes = b"%PDF-1.7 rendered") -> None:
+        self.content = content
+        self.calls = 0
+
+    def __call__(self) -> bytes:
+        self.calls += 1
+        return self.content
+
+
+def _export_data(**quote) -> ExportData:
+    return ExportData(
+        quote={"id": "q-1", "currency": "USD", **quote},
+        items=[{"product_name": "Подшипник", "quantity": 2, "calc": {"AK16": Decimal("10.50")}}],
+        customer={"name": "Покупатель"},
+        organization={"name": "Орг"},
+        variables={},
+        calculations={"total_with_vat": Decimal("21.00")},
+    )
+
+
+def test_unchanged_document_is_served_from_cache(store):
+    render = _Renderer()
+    first = render_cache.get_or_render("invoice_pdf", (_export_data(), None), render)
+    second = render_cache.get_or_render("invoice_pdf", (_export_data(), None), render)
+
+    assert first == second == b"%PDF-1.7 rendered"
+    assert render.calls == 1
+    (row,) = store.rows.values()
+    assert row["kind"] == "invoice_pdf"
+    assert row["size_bytes"] == len(first)
+    assert row["storage_path"].endswith(f"{row['cache_key']}.pdf")
+    assert render_cache.stats()["invoice_pdf"] == {
+        "hits": 1, "misses": 1, "errors": 0, "render_ms": pytest.approx(0, abs=50),
+    }
+
+
+def test_changed_input_is_rendered_again(store):
+    render = _Renderer()
+    render_cache.get_or_render("invoice_pdf", (_export_data(), None), render)
+    render_cache.get_or_render("invoice_pdf", (_export_data(idn_quote="Q-2"), None), render)
+    assert render.calls == 2
+
+
+def test_key_ignores_dict_order_but_not_values():
+    a = {"x": 1, "y": [Decimal("1.0"), date(2026, 1, 2)]}
+    b = {"y": [Decimal("1.0"), date(2026, 1, 2)], "x": 1}
+    assert render_cache.cache_key("kp_pdf", a) == render_cache.cache_key("kp_pdf", b)
+    assert render_cache.cache_key("kp_pdf", a) != render_cache.cache_key(
+        "kp_pdf", {**a, "x": 2}
+    )
+    assert render_cache.cache_key("kp_pdf", a) != render_cache.cache_key("invoice_pdf", a)
+
+
+def test_template_change_invalidates(store, monkeypatch, tmp_path, request):
+    request.addfinalizer(render_cache.template_version.cache_clear)
+    template = tmp_path / "template.html"
+    template.write_text("<p>v1</p>")
+    monkeypatch.setitem(
+        render_cache.KINDS, "kp_pdf",
+        render_cache.KINDS["kp_pdf"]._replace(templates=(template,)),
+    )
+    render_cache.template_version.cache_clear()
+    render = _Renderer()
+    proposal = KpProposal(items=(KpItem(name="Экскаватор", qty="1", price="100"),))
+
+    render_cache.get_or_render("kp_pdf", proposal, render)
+    template.write_text("<p>v2</p>")
+    render_cache.template_version.cache_clear()  # a deploy restarts workers
+    render_cache.get_or_render("kp_pdf", proposal, render)
+    render_cache.get_or_render("kp_pdf", proposal, render)
+
+    assert render.calls == 2
+    assert render_cache.purge_stale() == 1
+    assert len(store.rows) == len(store.objects) == 1
+
+
+def test_storage_outage_degrades_to_render(store):
+    render = _Renderer()
+    store.fail = True
+    assert render_cache.get_or_render("invoice_pdf", _export_data(), render) == render.content
+    assert render_cache.get_or_render("invoice_pdf", _export_data(), render) == render.content
+    assert render.calls == 2
+    assert render_cache.stats()["invoice_pdf"]["errors"] >= 2
+
+
+def test_render_errors_are_not_cached(store):
+    def broken() -> bytes:
+        raise RuntimeError("weasyprint crashed")
+
+    with pytest.raises(RuntimeError):
+        render_cache.get_or_render("invoice_pdf", _export_data(), broken)
+    assert store.rows == {}
+
+
+def test_purge_drops_unused_entries(store):
+    render_cache.get_or_render("invoice_pdf", _export_data(), _Renderer())
+    (row,) = store.rows.values()
+    row["last_hit_at"] = "2000-01-01T00:00:00+00:00"
+    assert render_cache.purge_stale() == 1
+    assert store.rows == {} and store.objects == {}
+
+
+def test_purge_pages_past_one_select(store, monkeypatch):
+    monkeypatch.setattr(render_cache, "_PURGE_CHUNK", 2)
+    for i in range(5):
+        store.rows[f"k-{i}"] = {
+            "cache_key": f"k-{i}", "storage_path": f"p-{i}", "kind": "invoice_pdf",
+            "template_version": render_cache.template_version("invoice_pdf"),
+            "last_hit_at": "2000-01-01T00:00:00+00:00",
+        }
+        store.objects[f"p-{i}"] = b"%PDF"
+    assert render_cache.purge_stale() == 5
+    assert store.rows == {} and store.objects == {}
+
+
+@pytest.mark.asyncio
+async def test_async_variant_shares_entries(store):
+    calls = 0
+
+    async def render() -> bytes:
+        nonlocal calls
+        calls += 1
+        return b"%PDF kp"
+
+    proposal = KpProposal(subtitle="тест")
+    assert await render_cache.get_or_render_async("kp_pdf", proposal, render) == b"%PDF kp"
+    assert await render_cache.get_or_render_async("kp_pdf", proposal, render) == b"%PDF kp"
+    assert calls == 1
+
+
+def test_currency_invoice_docx_goes_through_cache(store):
+    args = (
+        {"invoice_number": "CI-1", "generated_at": "2026-10-01", "currency": "EUR",
+         "total_amount": 10, "segment": "EURTR"},
+        {"name": "Seller", "address": "A", "tax_id": "1"},
+        {"name": "Buyer", "address": "B", "tax_id": "2"},
+        [{"product_name": "Bearing", "sku": "S", "manufacturer": "SKF", "quantity": 1,
+          "unit": "pcs", "hs_code": "8482", "price": 10, "total": 10}],
+    )
+    first = generate_currency_invoice_docx(*args)
+    second = generate_currency_invoice_docx(*args)
+    assert first == second
+    assert render_cache.stats()["currency_invoice_docx"]["hits"] == 1
@@ -0,0 +1,168 @@
+"""Tests for services/request_metrics.py and its ASGI middleware.
+
+Outbound calls go to a local stub HTTP server through real httpx
+transports, so the transport hook itself is exercised.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from api.lib.request_metrics import RequestMetricsMiddleware
+from services import request_metrics
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Stub server; SUPABASE_URL points at it so /rest/v1 counts as "db"."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            self.rfile.read(length)
+            body = b'[{"id": 1}]'
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = _reply  # noqa: N815
+
+        def log_message(self, *_a: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setenv("SUPABASE_URL", url)
+    request_metrics.install()
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("url, target", [
+    ("https://test.supabase.co/rest/v1/quotes?id=eq.1", "db"),
+    ("https://test.supabase.co/storage/v1/object/kvota-documents/a.pdf", "storage"),
+    ("https://test.supabase.co/auth/v1/user", "auth"),
+    ("https://www2.alta.ru/tnved/xml/", "alta"),
+    ("https://www.cbr.ru/scripts/XML_daily.asp", "cbr"),
+    ("https://www.cbr-xml-daily.ru/daily_json.js", "cbr"),
+    ("https://suggestions.dadata.ru/suggestions/api/4_1/rs/findById/party", "dadata"),
+    ("https://geocode.search.hereapi.com/v1/geocode", "here"),
+    ("https://example.com/", "http"),
+    ("https://notalta.ru/", "http"),
+])
+def test_classify(monkeypatch, url, target):
+    monkeypatch.setenv("SUPABASE_URL", "https://test.supabase.co")
+    assert request_metrics.classify(url) == target
+
+
+def test_counts_calls_and_bytes_per_target(stub):
+    with request_metrics.track() as metrics:
+        with httpx.Client(base_url=stub) as client:
+            client.get("/rest/v1/quotes")
+            client.post("/rest/v1/rpc/f", json={"a": 1})
+            client.get("/storage/v1/object/b/x")
+
+    assert metrics.calls("db") == 2
+    assert metrics.calls("storage") == 1
+    assert metrics.calls() == 3
+    # 3 × 11-byte responses + the 7-byte POST body
+    assert sum(s["bytes"] for s in metrics.summary().values()) == 3 * 11 + 7
+
+
+async def test_async_calls_are_counted(stub):
+    with request_metrics.track() as metrics:
+        async with httpx.AsyncClient(base_url=stub) as client:
+            async with client.stream("GET", "/rest/v1/quotes") as response:
+                async for _ in response.aiter_bytes():
+                    pass
+
+    assert metrics.summary()["db"]["calls"] == 1
+    assert metrics.summary()["db"]["bytes"] == 11
+
+
+def test_outside_a_request_only_process_metrics_count(stub):
+    before = request_metrics._EXTERNAL_SECONDS.count(target="db")
+    with request_metrics.track() as metrics:
+        pass
+    with httpx.Client(base_url=stub) as client:
+        client.get("/rest/v1/quotes")
+    assert request_metrics.current() is None
+    assert metrics.calls() == 0
+    assert request_metrics._EXTERNAL_SECONDS.count(target="db") == before + 1
+
+
+def test_nested_tracker_counts_into_outer(stub):
+    with request_metrics.track() as outer:
+        with request_metrics.track() as inner:
+            httpx.get(f"{stub}/rest/v1/a")
+        httpx.get(f"{stub}/rest/v1/b")
+    assert inner.calls("db") == 1
+    assert outer.calls("db") == 2
+
+
+def _app(stub: str, n_queries: int) -> Starlette:
+    def endpoint(request):
+        with httpx.Client(base_url=stub) as client:
+            for i in range(n_queries):
+                client.get(f"/rest/v1/items?id=eq.{i}")
+        return JSONResponse({"ok": True})
+
+    app = Starlette(routes=[Route("/items", endpoint)])
+    app.add_middleware(RequestMetricsMiddleware)
+    return app
+
+
+def test_middleware_emits_server_timing(stub):
+    client = TestClient(_app(stub, 3))
+
+    response = client.get("/items")
+
+    timing = response.headers["server-timing"]
+    assert timing.startswith('db;dur=')
+    assert 'desc="3 calls, 33 B"' in timing
+    assert ", app;dur=" in timing
+
+
+def test_slow_request_is_logged(stub, monkeypatch, caplog):
+    monkeypatch.setattr(request_metrics, "SLOW_REQUEST_DB_CALLS", 2)
+    client = TestClient(_app(stub, 3))
+
+    with caplog.at_level(logging.WARNING, logger="services.request_metrics"):
+        client.get("/items")
+
+    records = [r for r in caplog.records if r.getMessage() == "slow_request"]
+    assert len(records) == 1
+    assert records[0].db_calls == 3
+    assert records[0].path == "/items"
+    assert records[0].status == 200
+
+
+def test_assert_max_queries_sees_testclient_requests(stub):
+    client = TestClient(_app(stub, 4))
+
+    with request_metrics.assert_max_queries(4) as metrics:
+        client.get("/items")
+    assert metrics.calls("db") == 4
+
+    with pytest.raises(AssertionError, match="at most 3 db calls, got 4"):
+        with request_metrics.assert_max_queries(3):
+            client.get("/items")
+
+
+def test_record_for_non_httpx_clients():
+    with request_metrics.track() as metrics:
+        request_metrics.record("db", 0.002, 100)
+    request_metrics.record("db", 0.002, 100)  # no tracker → ignored
+    assert metrics.summary() == {"db": {"calls": 1, "bytes": 100, "ms": 2.0}}
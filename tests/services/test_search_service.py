@@ -0,0 +1,197 @@
+"""Tests for services/search_service.py and the search helpers built on it."""
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import search_service
+
+
+@pytest.fixture
+def sb():
+    client = MagicMock()
+    with patch.object(search_service, "_get_supabase", return_value=client):
+        yield client
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("abc", 'name.ilike."%abc%",inn.ilike."%abc%"'),
+    ("a,b(c)", 'name.ilike."%a,b(c)%",inn.ilike."%a,b(c)%"'),
+    ('5%_"', 'name.ilike."%5\\\\%\\\\_\\"%",inn.ilike."%5\\\\%\\\\_\\"%"'),
+])
+def test_ilike_any_quotes_and_escapes(query, expected):
+    assert search_service.ilike_any(("name", "inn"), query) == expected
+
+
+def test_short_query_skips_the_rpc(sb):
+    assert search_service.global_search("org-1", " a ") == []
+    sb.rpc.assert_not_called()
+
+
+def test_hits_grouped_by_kind_best_first(sb):
+    sb.rpc.return_value.execute.return_value.data = [
+        {"kind": "location", "id": "l1", "title": "Москва", "subtitle": "hub", "rank": 1, "score": 0.4},
+        {"kind": "customer", "id": "c2", "title": "Б-Моск", "subtitle": None, "rank": 2, "score": 0.3},
+        {"kind": "customer", "id": "c1", "title": "Моском", "subtitle": "7701", "rank": 1, "score": 0.2},
+    ]
+
+    hits = search_service.global_search("org-1", "моск", kinds=["customer", "location", "deal"], limit=100)
+
+    assert [h.id for h in hits] == ["c1", "c2", "l1"]
+    params = sb.rpc.call_args.args[1]
+    assert sb.rpc.call_args.args[0] == "global_search"
+    assert params["p_kinds"] == ["customer", "location"]
+    assert params["p_limit"] == search_service.MAX_LIMIT_PER_KIND
+
+
+def test_rpc_failure_returns_no_hits(sb):
+    sb.rpc.return_value.execute.side_effect = RuntimeError("function missing")
+    assert search_service.global_search("org-1", "моск") == []
+
+
+def test_supplier_search_is_one_query_over_name_and_code():
+    from services import supplier_service
+
+    client = MagicMock()
+    chain = client.table.return_value.select.return_value.eq.return_value.eq.return_value
+    chain.or_.return_value.order.return_value.limit.return_value.execute.return_value.data = []
+    with patch.object(supplier_service, "_get_supabase", return_value=client):
+        supplier_service.search_suppliers("org-1", "cmt")
+
+    chain.or_.assert_called_once_with('name.ilike."%cmt%",supplier_code.ilike."%cmt%"')
+    assert client.table.call_count == 1
+
+
+def test_location_search_is_one_round_trip():
+    from services import location_service
+
+    client = MagicMock()
+    client.rpc.return_value.execute.return_value.data = []
+    with patch.object(location_service, "_get_supabase", return_value=client):
+        assert location_service.search_locations("org-1", "моск") == []
+
+    assert client.rpc.call_args.args[0] == "search_locations_full"
+    client.table.assert_not_called()
+
+
+def test_endpoint_validates_query_and_scopes_to_org(sb):
+    from api.search import global_search
+
+    auth_sb = MagicMock()
+    auth_sb.table.return_value.select.return_value.eq.return_value.limit.return_value.execute.return_value.data = [
+        {"organization_id": "org-1"}
+    ]
+    sb.rpc.return_value.execute.return_value.data = [
+        {"kind": "quote", "id": "q1", "title": "Q-202610-0001", "subtitle": "ACME", "rank": 1, "score": 0.5},
+    ]
+
+    def request(**params):
+        return SimpleNamespace(
+            state=SimpleNamespace(api_user=SimpleNamespace(id="u-1")), query_params=params,
+        )
+
+    with patch("api.search.get_supabase", return_value=auth_sb), \
+            patch("api.search.get_user_role_codes", return_value=["admin"]):
+        assert asyncio.run(global_search(request(q="Q"))).status_code == 400
+        assert asyncio.run(global_search(request(q="Q-2026", kinds="deal"))).status_code == 400
+        response = asyncio.run(global_search(request(q="Q-2026", kinds="quote")))
+
+    assert response.status_code == 200
+    assert json.loads(response.body)["data"] == [
+        {"kind": "quote", "id": "q1", "title": "Q-202610-0001", "subtitle": "ACME"}
+    ]
+    assert sb.rpc.call_args.args[1]["p_organization_id"] == "org-1"
+
+
+class _ScopeQuery:
+    """Table query over in-memory rows: select / eq / in_ / limit / execute."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def select(self, *_):
+        return self
+
+    def eq(self, col, value):
+        return _ScopeQuery([r for r in self.rows if r.get(col) == value])
+
+    def in_(self, col, values):
+        return _ScopeQuery([r for r in self.rows if r.get(col) in values])
+
+    def limit(self, n):
+        return _ScopeQuery(self.rows[:n])
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+def _scoped_client(tables, customers):
+    """Client whose global_search RPC honours p_customer_ids / p_kinds like migration 352."""
+    client = MagicMock()
+    client.table.side_effect = lambda name: _ScopeQuery(tables.get(name, []))
+
+    def rpc(_name, params):
+        allowed = params["p_customer_ids"]
+        rows = [
+            {"kind": "customer", "id": c["id"], "title": c["name"], "rank": 1, "score": 0.5}
+            for c in customers
+            if "customer" in params["p_kinds"] and (allowed is None or c["id"] in allowed)
+        ]
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=rows))
+
+    client.rpc.side_effect = rpc
+    return client
+
+
+def test_sales_only_user_cannot_find_unassigned_customer():
+    customers = [
+        {"id": "c-assigned", "name": "Ромашка-1", "manager_id": None, "organization_id": "org-1"},
+        {"id": "c-managed", "name": "Ромашка-2", "manager_id": "u-1", "organization_id": "org-1"},
+        {"id": "c-other", "name": "Ромашка-3", "manager_id": "u-2", "organization_id": "org-1"},
+    ]
+    client = _scoped_client({
+        "customer_assignees": [
+            {"customer_id": "c-assigned", "user_id": "u-1"},
+            {"customer_id": "c-other", "user_id": "u-2"},
+        ],
+        "customers": customers,
+    }, customers)
+
+    with patch.object(search_service, "_get_supabase", return_value=client):
+        scope = search_service.resolve_scope("u-1", "org-1", ["sales"])
+        hits = search_service.global_search("org-1", "ромашка", scope=scope)
+        admin_hits = search_service.global_search(
+            "org-1", "ромашка", scope=search_service.resolve_scope("u-9", "org-1", ["admin"]),
+        )
+
+    assert [h.id for h in hits] == ["c-assigned", "c-managed"]
+    assert "supplier" not in scope.kinds
+    assert scope.quote_creator_ids == ["u-1"]
+    assert len(admin_hits) == 3
+
+
+def test_head_of_sales_scope_covers_sales_group():
+    client = _scoped_client({
+        "user_profiles": [
+            {"user_id": "u-head", "sales_group_id": "g-1", "organization_id": "org-1"},
+            {"user_id": "u-1", "sales_group_id": "g-1", "organization_id": "org-1"},
+            {"user_id": "u-2", "sales_group_id": "g-2", "organization_id": "org-1"},
+        ],
+        "customer_assignees": [
+            {"customer_id": "c-1", "user_id": "u-1"},
+            {"customer_id": "c-2", "user_id": "u-2"},
+        ],
+    }, [])
+
+    with patch.object(search_service, "_get_supabase", return_value=client):
+        scope = search_service.resolve_scope("u-head", "org-1", ["head_of_sales"])
+        procurement = search_service.resolve_scope("u-3", "org-1", ["procurement"])
+
+    assert scope.customer_ids == ["c-1"]
+    assert procurement.customer_ids is None
+    assert procurement.supplier_ids == []
+    assert "supplier" in procurement.kinds
@@ -0,0 +1,294 @@
+"""Tests for services/tnved_suggestion_index.py — offline TN ВЭД suggestions."""
+from __future__ import annotations
+
+import re
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services import tnved_suggestion_index as index
+from services.alta_client import ExpressBatchResponse, ExpressPrediction
+from services.classifier import ClassifyInput, classify_items
+
+
+ORG = "org-1"
+
+
+_KEYSET_RE = re.compile(
+    r'created_at\.gt\."(?P<ts>[^"]+)",and\(created_at\.eq\."[^"]+",id\.gt\.(?P<id>[^)]+)\)'
+)
+
+
+class _Query:
+    """Chainable stand-in for the history pulls (select/eq/or_/order/limit).
+
+    Honours the (created_at, id) keyset filter, ordering and the page
+    limit so paging bugs show up as missing rows.
+    """
+
+    def __init__(self, sb: "_HistorySupabase", table: str) -> None:
+        self._sb = sb
+        self._table = table
+        self._after: tuple[str, str] | None = None
+        self._order: list[str] = []
+        self._limit: int | None = None
+        self.not_ = self
+
+    def select(self, *_a: Any, **_k: Any) -> "_Query":
+        return self
+
+    def is_(self, *_a: Any) -> "_Query":
+        return self
+
+    def eq(self, *_a: Any) -> "_Query":
+        return self
+
+    def in_(self, *_a: Any) -> "_Query":
+        return self
+
+    def insert(self, *_a: Any) -> "_Query":
+        return self
+
+    def or_(self, filters: str) -> "_Query":
+        match = _KEYSET_RE.fullmatch(filters)
+        assert match, filters
+        self._after = (match["ts"], match["id"])
+        return self
+
+    def order(self, col: str, **_k: Any) -> "_Query":
+        self._order.append(col)
+        return self
+
+    def limit(self, n: int) -> "_Query":
+        self._limit = n
+        return self
+
+    def execute(self) -> Any:
+        self._sb.calls.append((self._table, self._after))
+        rows = list(self._sb.rows.get(self._table, []))
+        if self._after is not None:
+            rows = [r for r in rows if (r["created_at"], r["id"]) > self._after]
+        if self._order:
+            rows.sort(key=lambda r: tuple(r[c] for c in self._order))
+        if self._limit is not None:
+            rows = rows[: self._limit]
+        return MagicMock(data=rows)
+
+
+class _HistorySupabase:
+    def __init__(self) -> None:
+        self.rows: dict[str, list[dict]] = {}
+        self.calls: list[tuple[str, Any]] = []
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def add_pick(
+        self,
+        *,
+        name: str,
+        code: str,
+        brand: str | None = None,
+        product_code: str | None = None,
+        created_at: str = "2026-01-01T00:00:00+00:00",
+        quote_item_id: str = "qi-1",
+    ) -> None:
+        log = self.rows.setdefault("tnved_classification_log", [])
+        log.append({
+            "id": f"log-{len(log):04d}",
+            "input_text": name,
+            "chosen_code": code,
+            "quote_item_id": quote_item_id,
+            "created_at": created_at,
+            "quote_items": {
+                "brand": brand,
+                "product_code": product_code,
+                "quote_id": "q-1",
+            },
+        })
+
+
+@pytest.fixture(autouse=True)
+def _fresh_index():
+    index.reset()
+    yield
+    index.reset()
+
+
+@pytest.fixture
+def sb() -> _HistorySupabase:
+    return _HistorySupabase()
+
+
+def test_exact_product_code_hit(sb):
+    sb.add_pick(
+        name="Подшипник шариковый", code="8482101009",
+        brand="SKF", product_code="6205-2RS",
+    )
+    hit = index.lookup(ORG, brand="skf", product_code="6205 2RS", sb=sb)
+    assert hit is not None
+    assert hit.code == "8482101009"
+    assert hit.matched_by == "product_code"
+    assert hit.source_quote_id == "q-1"
+
+
+def test_fuzzy_name_hit_and_unrelated_miss(sb):
+    sb.add_pick(name="Шайба М6 DIN 125", code="7318220009")
+    hit = index.lookup(ORG, name="шайба м6 din125", sb=sb)
+    assert hit is not None and hit.code == "7318220009"
+    assert hit.matched_by in ("name", "trigram")
+    assert index.lookup(ORG, name="Насос центробежный", sb=sb) is None
+
+
+def test_conflicting_history_is_treated_as_unknown(sb):
+    sb.add_pick(name="Кольцо уплотнительное", code="4016930005")
+    sb.add_pick(name="Кольцо уплотнительное", code="7318220009")
+    assert index.lookup(ORG, name="Кольцо уплотнительное", sb=sb) is None
+
+
+def test_refresh_is_incremental(sb, monkeypatch):
+    sb.add_pick(name="Шайба М6", code="7318220009")
+    assert index.lookup(ORG, name="Шайба М6", sb=sb) is not None
+    first_log_call = sb.calls[0]
+    assert first_log_call == ("tnved_classification_log", None)
+
+    sb.add_pick(
+        name="Болт М8", code="7318158100",
+        created_at="2026-02-01T00:00:00+00:00",
+    )
+    # Within the refresh interval nothing is re-read
+    assert index.lookup(ORG, name="Болт М8", sb=sb) is None
+    calls_before = len(sb.calls)
+
+    monkeypatch.setattr(index, "REFRESH_INTERVAL_SECONDS", 0.0)
+    hit = index.lookup(ORG, name="Болт М8", sb=sb)
+    assert hit is not None and hit.code == "7318158100"
+    new_log_calls = [
+        c for c in sb.calls[calls_before:] if c[0] == "tnved_classification_log"
+    ]
+    assert new_log_calls == [
+        ("tnved_classification_log", ("2026-01-01T00:00:00+00:00", "log-0000"))
+    ]
+
+
+def test_refresh_pages_through_every_new_row(sb, monkeypatch):
+    monkeypatch.setattr(index, "_PAGE_SIZE", 3)
+    sb.add_pick(name="Шайба М6", code="7318220009")
+    index.lookup(ORG, name="x", sb=sb)  # initial load
+
+    # 10 new picks, several sharing a timestamp across page boundaries
+    for i in range(10):
+        sb.add_pick(
+            name=f"Деталь {i}", code="8482101009",
+            created_at=f"2026-02-01T00:00:0{i // 4}+00:00",
+            quote_item_id=f"qi-{i}",
+        )
+    sb.rows["tnved_user_choices"] = [
+        {"id": f"ch-{i:02d}", "tnved_code": "8482101009",
+         "created_at": "2026-02-01T00:00:00+00:00"}
+        for i in range(7)
+    ]
+    monkeypatch.setattr(index, "REFRESH_INTERVAL_SECONDS", 0.0)
+    index.lookup(ORG, name="x", sb=sb)
+
+    org_index = index._get_index(ORG)
+    assert all(f"деталь {i}" in org_index.by_name for i in range(10))
+    assert org_index.code_prior["8482101009"] == 7
+    assert org_index.log_watermark == ("2026-02-01T00:00:02+00:00", "log-0010")
+
+    # Nothing new → nothing re-read
+    index.lookup(ORG, name="x", sb=sb)
+    assert org_index.code_prior["8482101009"] == 7
+
+
+def test_record_choice_is_not_double_counted_on_refresh(sb, monkeypatch):
+    sb.add_pick(name="Клапан обратный", code="8481309908", quote_item_id="qi-a")
+    index.lookup(ORG, name="x", sb=sb)  # initial load
+
+    index.record_choice(
+        ORG, name="Клапан обратный", code="8481309100", quote_item_id="qi-b",
+    )
+    # The same pick now lands in the DB and is pulled by the next refresh
+    sb.add_pick(
+        name="Клапан обратный", code="8481309100", quote_item_id="qi-b",
+        created_at="2026-03-01T00:00:00+00:00",
+    )
+    monkeypatch.setattr(index, "REFRESH_INTERVAL_SECONDS", 0.0)
+    # 1 vote each → split history → unknown (a double count would give 2:1)
+    assert index.lookup(ORG, name="Клапан обратный", sb=sb) is None
+
+
+def test_stats_report_hit_rate(sb):
+    sb.add_pick(name="Шайба М6", code="7318220009")
+    index.lookup(ORG, name="Шайба М6", sb=sb)
+    index.lookup(ORG, name="Насос", sb=sb)
+    index.record_packets_saved(1)
+    assert index.stats() == {
+        "lookups": 2, "hits": 1, "packets_saved": 1, "hit_rate": 0.5,
+    }
+
+
+def test_refresh_failure_leaves_empty_index():
+    broken = MagicMock()
+    broken.table.side_effect = RuntimeError("db down")
+    assert index.lookup(ORG, name="Шайба", sb=broken) is None
+
+
+# ---------------------------------------------------------------------------
+# classify_items integration
+# ---------------------------------------------------------------------------
+
+
+def _alta(predictions):
+    alta = MagicMock()
+    alta.last_packet_left = 500
+    alta.classify_batch = AsyncMock(
+        return_value=ExpressBatchResponse(
+            handled=True, message="ok", predictions=predictions,
+            balance=1000.0, packet_left=499, packet_used=1,
+        )
+    )
+    return alta
+
+
+@pytest.mark.asyncio
+async def test_classify_skips_alta_when_history_answers_everything(sb):
+    sb.add_pick(name="Шайба М6", code="7318220009")
+    alta = _alta([])
+
+    with patch("services.classifier.get_supabase", return_value=sb):
+        outcome = await classify_items(
+            [ClassifyInput(name="Шайба М6", quote_item_id="qi-9")],
+            alta_client=alta,
+            organization_id=ORG,
+        )
+
+    alta.classify_batch.assert_not_called()
+    assert outcome.index_hits == 1
+    assert outcome.packet_used is None
+    (result,) = outcome.results
+    assert result.source == "history"
+    assert result.candidates[0].code == "7318220009"
+    assert index.stats()["packets_saved"] == 1
+
+
+@pytest.mark.asyncio
+async def test_classify_sends_only_unknowns_to_alta(sb):
+    sb.add_pick(name="Шайба М6", code="7318220009")
+    alta = _alta([
+        ExpressPrediction(id=2, code="8413702100", code_weight=9, probability=0.9),
+    ])
+
+    with patch("services.classifier.get_supabase", return_value=sb):
+        outcome = await classify_items(
+            [ClassifyInput(name="Шайба М6"), ClassifyInput(name="Насос")],
+            alta_client=alta,
+            organization_id=ORG,
+        )
+
+    sent = alta.classify_batch.await_args.args[0]
+    assert [item.id for item in sent] == [2]
+    assert [r.source for r in outcome.results] == ["history", "alta"]
+    assert outcome.results[1].candidates[0].code == "8413702100"
+    assert index.stats()["packets_saved"] == 0
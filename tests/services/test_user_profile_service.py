@@ -0,0 +1,75 @@
+"""Tests for services/user_profile_service.py customer portfolio (migration 351)."""
+
+from unittest.mock import MagicMock, patch
+
+from services import user_profile_service
+
+USER = "u-1"
+ORG = "org-1"
+
+
+def _supabase(rows):
+    sb = MagicMock()
+    sb.rpc.return_value.execute.return_value = MagicMock(data=rows)
+    return sb
+
+
+def _row(customer_id, total_count, **overrides):
+    row = {
+        "customer_id": customer_id,
+        "customer_name": "ООО Ромашка",
+        "customer_inn": "7701234567",
+        "industry": "Энергетика",
+        "quotes_sum": "1500.50",
+        "specs_sum": None,
+        "last_quote_date": "2026-09-30",
+        "updated_at": "2026-10-01T10:00:00+00:00",
+        "total_count": total_count,
+    }
+    row.update(overrides)
+    return row
+
+
+def test_page_is_aggregated_by_rpc():
+    sb = _supabase([_row("c-1", 3), _row("c-2", 3, quotes_sum=0, specs_sum="200")])
+
+    with patch.object(user_profile_service, "get_supabase", return_value=sb):
+        customers, total = user_profile_service.get_user_customers_page(USER, ORG, limit=2, offset=0)
+
+    sb.rpc.assert_called_once_with(
+        "get_user_customers",
+        {"p_user_id": USER, "p_organization_id": ORG, "p_limit": 2, "p_offset": 0},
+    )
+    sb.table.assert_not_called()
+    assert total == 3
+    assert [c["customer_id"] for c in customers] == ["c-1", "c-2"]
+    assert customers[0]["customer_category"] == "Энергетика"
+    assert customers[0]["quotes_sum"] == 1500.5
+    assert customers[0]["specs_sum"] == 0.0
+    assert customers[1]["specs_sum"] == 200.0
+
+
+def test_get_user_customers_returns_whole_list_by_default():
+    sb = _supabase([_row("c-1", 1)])
+
+    with patch.object(user_profile_service, "get_supabase", return_value=sb):
+        customers = user_profile_service.get_user_customers(USER, ORG)
+
+    assert sb.rpc.call_args.args[1]["p_limit"] is None
+    assert len(customers) == 1
+
+
+def test_empty_portfolio():
+    with patch.object(user_profile_service, "get_supabase", return_value=_supabase([])):
+        assert user_profile_service.get_user_customers_page(USER, ORG) == ([], 0)
+
+
+def test_page_past_the_end_keeps_total():
+    sb = MagicMock()
+    sb.rpc.return_value.execute.side_effect = [MagicMock(data=[]), MagicMock(data=[_row("c-1", 3)])]
+
+    with patch.object(user_profile_service, "get_supabase", return_value=sb):
+        customers, total = user_profile_service.get_user_customers_page(USER, ORG, limit=50, offset=50)
+
+    assert (customers, total) == ([], 3)
+    assert sb.rpc.call_args_list[1].args[1]["p_offset"] == 0
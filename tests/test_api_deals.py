@@ -114,9 +114,8 @@ async def test_create_deal_happy_path(mock_request, org_id, user_id, spec_id, qu
         "seller_companies": {"id": make_uuid(), "name": "Test Seller Co"},
     })
 
-    # deals.select().eq().gte().execute() — count for deal number
-    count_chain = _chain_mock()
-    count_chain.execute.return_value = MagicMock(count=3, data=[])
+    # rpc("next_document_number").execute() — deal number counter
+    mock_sb.rpc.return_value.execute.return_value = MagicMock(data=4)
 
     # specifications.update().eq().execute()
     spec_update_chain = _chain_mock()
@@ -133,7 +132,7 @@ async def test_create_deal_happy_path(mock_request, org_id, user_id, spec_id, qu
     table_calls = {
         "specifications": [spec_chain, spec_update_chain],
         "quotes": [quote_chain, quote_update_chain],
-        "deals": [count_chain, deal_insert_chain],
+        "deals": [deal_insert_chain],
     }
     table_counters = {k: 0 for k in table_calls}
 
@@ -170,6 +169,8 @@ async def test_create_deal_happy_path(mock_request, org_id, user_id, spec_id, qu
     assert body["success"] is True
     assert body["data"]["deal_id"] == deal_id
     assert body["data"]["deal_number"].startswith("DEAL-")
+    assert body["data"]["deal_number"].endswith("-0004")
+    assert mock_sb.rpc.call_args[0][0] == "next_document_number"
     assert body["data"]["logistics_stages"] == 7
     assert body["data"]["invoices_created"] == 2
     assert body["data"]["invoices_skipped_reason"] is None
@@ -368,8 +369,7 @@ async def test_create_deal_invoices_skip_no_items(
         "seller_companies": {"id": make_uuid(), "name": "Seller Co"},
     })
 
-    count_chain = _chain_mock()
-    count_chain.execute.return_value = MagicMock(count=0, data=[])
+    mock_sb.rpc.return_value.execute.return_value = MagicMock(data=1)
 
     spec_update_chain = _chain_mock()
     spec_update_chain.execute.return_value = MagicMock(data=[{}])
@@ -383,7 +383,7 @@ async def test_create_deal_invoices_skip_no_items(
     table_calls = {
         "specifications": [spec_chain, spec_update_chain],
         "quotes": [quote_chain, quote_update_chain],
-        "deals": [count_chain, deal_insert_chain],
+        "deals": [deal_insert_chain],
     }
     table_counters = {k: 0 for k in table_calls}
 
@@ -444,8 +444,7 @@ async def test_create_deal_invoices_skip_no_buyer_companies(
         "seller_companies": {"id": make_uuid(), "name": "Seller Co"},
     })
 
-    count_chain = _chain_mock()
-    count_chain.execute.return_value = MagicMock(count=0, data=[])
+    mock_sb.rpc.return_value.execute.return_value = MagicMock(data=1)
 
     spec_update_chain = _chain_mock()
     spec_update_chain.execute.return_value = MagicMock(data=[{}])
@@ -459,7 +458,7 @@ async def test_create_deal_invoices_skip_no_buyer_companies(
     table_calls = {
         "specifications": [spec_chain, spec_update_chain],
         "quotes": [quote_chain, quote_update_chain],
-        "deals": [count_chain, deal_insert_chain],
+        "deals": [deal_insert_chain],
     }
     table_counters = {k: 0 for k in table_calls}
 
@@ -523,8 +522,7 @@ async def test_create_deal_invoices_skip_no_seller_company(
         "seller_companies": None,  # No seller company
     })
 
-    count_chain = _chain_mock()
-    count_chain.execute.return_value = MagicMock(count=0, data=[])
+    mock_sb.rpc.return_value.execute.return_value = MagicMock(data=1)
 
     spec_update_chain = _chain_mock()
     spec_update_chain.execute.return_value = MagicMock(data=[{}])
@@ -538,7 +536,7 @@ async def test_create_deal_invoices_skip_no_seller_company(
     table_calls = {
         "specifications": [spec_chain, spec_update_chain],
         "quotes": [quote_chain, quote_update_chain],
-        "deals": [count_chain, deal_insert_chain],
+        "deals": [deal_insert_chain],
     }
     table_counters = {k: 0 for k in table_calls}
 
@@ -607,8 +605,7 @@ async def test_create_deal_insert_failure_rollbacks_spec(
         "seller_companies": {"id": make_uuid(), "name": "Seller"},
     })
 
-    count_chain = _chain_mock()
-    count_chain.execute.return_value = MagicMock(count=0, data=[])
+    mock_sb.rpc.return_value.execute.return_value = MagicMock(data=1)
 
     spec_update_chain = _chain_mock()
     spec_update_chain.execute.return_value = MagicMock(data=[{}])
@@ -624,7 +621,7 @@ async def test_create_deal_insert_failure_rollbacks_spec(
     table_calls = {
         "specifications": [spec_chain, spec_update_chain, spec_rollback_chain],
         "quotes": [quote_chain],
-        "deals": [count_chain, deal_insert_chain],
+        "deals": [deal_insert_chain],
     }
     table_counters = {k: 0 for k in table_calls}
 
@@ -683,8 +680,7 @@ async def test_create_deal_insert_returns_empty_data(
         "seller_companies": {"id": make_uuid(), "name": "Seller"},
     })
 
-    count_chain = _chain_mock()
-    count_chain.execute.return_value = MagicMock(count=0, data=[])
+    mock_sb.rpc.return_value.execute.return_value = MagicMock(data=1)
 
     spec_update_chain = _chain_mock()
     spec_update_chain.execute.return_value = MagicMock(data=[{}])
@@ -696,7 +692,7 @@ async def test_create_deal_insert_returns_empty_data(
     table_calls = {
         "specifications": [spec_chain, spec_update_chain],
         "quotes": [quote_chain],
-        "deals": [count_chain, deal_insert_chain],
+        "deals": [deal_insert_chain],
     }
     table_counters = {k: 0 for k in table_calls}
 
@@ -24,6 +24,7 @@ from api.app import api_sub_app  # noqa: E402
 from api.documents import (  # noqa: E402
     delete_document_api,
     download_document,
+    download_documents_zip,
 )
 
 
@@ -195,6 +196,97 @@ class TestDeleteDocument:
         assert _body(resp) == {"success": True}
 
 
+class TestDownloadDocumentsZip:
+    """GET /api/documents/bundle handler behaviour."""
+
+    @staticmethod
+    def _doc(doc_id: str, org_id: str = "o-1"):
+        return SimpleNamespace(id=doc_id, organization_id=org_id)
+
+    @staticmethod
+    def _bundle_request(roles_mock, roles=("sales",), **params):
+        roles_mock.return_value = list(roles)
+        req = _make_request(api_user_id="user-1", user_metadata={"org_id": "o-1"})
+        req.query_params = params
+        return req
+
+    def test_unauthenticated_returns_401(self):
+        req = _make_request(api_user_id=None)
+        req.query_params = {"quote_id": "q-1"}
+        resp = _run(download_documents_zip(req))
+        assert resp.status_code == 401
+
+    @pytest.mark.parametrize("params", [{}, {"quote_id": "q-1", "deal_id": "d-1"}])
+    @patch("api.documents.get_user_role_codes")
+    def test_requires_exactly_one_param(self, mock_roles, params):
+        resp = _run(download_documents_zip(self._bundle_request(mock_roles, **params)))
+        assert resp.status_code == 400
+        assert _body(resp)["error"]["code"] == "VALIDATION_ERROR"
+
+    @patch("api.documents.get_user_role_codes")
+    def test_user_without_role_returns_403(self, mock_roles):
+        req = self._bundle_request(mock_roles, roles=(), quote_id="q-1")
+        resp = _run(download_documents_zip(req))
+        assert resp.status_code == 403
+
+    @patch("api.documents.get_deal")
+    @patch("api.documents.get_user_role_codes")
+    def test_deal_of_other_org_returns_404(self, mock_roles, mock_get_deal):
+        mock_get_deal.return_value = None
+        resp = _run(download_documents_zip(self._bundle_request(mock_roles, deal_id="d-1")))
+        assert resp.status_code == 404
+        mock_get_deal.assert_called_once_with("d-1", organization_id="o-1")
+
+    @patch("api.documents.get_supabase")
+    @patch("api.documents.get_user_role_codes")
+    def test_quote_of_other_org_returns_404(self, mock_roles, mock_sb):
+        chain = mock_sb.return_value.table.return_value.select.return_value
+        chain.eq.return_value.eq.return_value.limit.return_value.execute.return_value = (
+            SimpleNamespace(data=[])
+        )
+        resp = _run(download_documents_zip(self._bundle_request(mock_roles, quote_id="q-1")))
+        assert resp.status_code == 404
+        assert _body(resp)["error"]["message"] == "Quote not found"
+
+    @patch("api.documents.stream_documents_zip")
+    @patch("api.documents.get_documents_for_entity")
+    @patch("api.documents.get_all_documents_for_quote")
+    @patch("api.documents.get_deal")
+    @patch("api.documents.get_user_role_codes")
+    def test_deal_bundle_streams_org_documents(
+        self, mock_roles, mock_get_deal, mock_quote_docs, mock_deal_docs, mock_stream
+    ):
+        mock_get_deal.return_value = SimpleNamespace(quote_id="q-1", deal_number="СД-7")
+        mock_quote_docs.return_value = [self._doc("a"), self._doc("x", org_id="o-2")]
+        mock_deal_docs.return_value = [self._doc("b"), self._doc("a")]
+
+        async def _chunks():
+            yield b"PK"
+
+        mock_stream.return_value = _chunks()
+        resp = _run(download_documents_zip(self._bundle_request(mock_roles, deal_id="d-1")))
+
+        assert resp.status_code == 200
+        assert resp.media_type == "application/zip"
+        assert "documents-%D0%A1%D0%94-7.zip" in resp.headers["content-disposition"]
+        (docs,), _ = mock_stream.call_args
+        assert [d.id for d in docs] == ["a", "b"]
+        mock_deal_docs.assert_called_once_with("deal", "d-1")
+
+    @patch("api.documents.get_all_documents_for_quote")
+    @patch("api.documents.get_supabase")
+    @patch("api.documents.get_user_role_codes")
+    def test_quote_without_documents_returns_404(self, mock_roles, mock_sb, mock_docs):
+        chain = mock_sb.return_value.table.return_value.select.return_value
+        chain.eq.return_value.eq.return_value.limit.return_value.execute.return_value = (
+            SimpleNamespace(data=[{"id": "q-1", "idn_quote": "Q-1"}])
+        )
+        mock_docs.return_value = []
+        resp = _run(download_documents_zip(self._bundle_request(mock_roles, quote_id="q-1")))
+        assert resp.status_code == 404
+        assert _body(resp)["error"]["message"] == "No documents found"
+
+
 # ----------------------------------------------------------------------------
 # Route registration (sub-app)
 # ----------------------------------------------------------------------------
@@ -228,6 +320,16 @@ class TestDocumentRoutesRegistered:
             f"Body: {response.text[:200]}"
         )
 
+    def test_get_bundle_registered(self, subapp_client: TestClient) -> None:
+        """GET /documents/bundle must exist and not be captured as a document id."""
+        response = subapp_client.get(
+            "/documents/bundle?quote_id=q-1", follow_redirects=False
+        )
+        assert response.status_code != 404, (
+            f"Route not registered: GET /documents/bundle returned 404. "
+            f"Body: {response.text[:200]}"
+        )
+
     def test_openapi_schema_includes_download(
         self, subapp_client: TestClient
     ) -> None:
@@ -1000,6 +1000,10 @@ class TestGetStatusHistory:
                 ]
             elif name == "status_history":
                 tbl.select.return_value.eq.return_value.order.return_value.execute.return_value.data = history_rows
+            elif name == "quotes":
+                tbl.select.return_value.eq.return_value.eq.return_value.is_.return_value.limit.return_value.execute.return_value.data = [
+                    {"id": "q1"}
+                ]
             elif name == "user_profiles":
                 tbl.select.return_value.in_.return_value.execute.return_value.data = [
                     {"user_id": "user-1", "full_name": "Иван Иванов"}
@@ -1039,6 +1043,10 @@ class TestGetStatusHistory:
                 ]
             elif name == "status_history":
                 tbl.select.return_value.eq.return_value.order.return_value.execute.return_value.data = []
+            elif name == "quotes":
+                tbl.select.return_value.eq.return_value.eq.return_value.is_.return_value.limit.return_value.execute.return_value.data = [
+                    {"id": "q-empty"}
+                ]
             return tbl
 
         sb.table.side_effect = table_side_effect
@@ -373,6 +373,33 @@ class TestTransitionWorkflow:
             comment="Ready for review",
         )
 
+    @patch("api.quotes.job_service.enqueue")
+    @patch("api.quotes.transition_quote_status")
+    @patch("api.quotes.get_user_role_codes")
+    @patch("api.quotes.get_supabase")
+    def test_prefer_respond_async_queues_job_and_returns_202(
+        self, mock_get_sb, mock_roles, mock_transition, mock_enqueue
+    ):
+        """Prefer: respond-async → job queued, 202 + Location, no inline transition."""
+        mock_get_sb.return_value = _mock_supabase_for_workflow()
+        mock_roles.return_value = ["top_manager"]
+        mock_enqueue.return_value = SimpleNamespace(id="job-1", status="queued")
+
+        req = _make_request(api_user_id="u-1", body={"to_status": "approved"})
+        req.headers["prefer"] = "respond-async"
+        resp = _run(transition_workflow(req, "q-1"))
+
+        assert resp.status_code == 202
+        assert resp.headers["location"] == "/api/jobs/job-1"
+        assert _body(resp)["data"] == {
+            "job_id": "job-1", "status": "queued", "status_url": "/api/jobs/job-1",
+        }
+        mock_transition.assert_not_called()
+        kind, payload = mock_enqueue.call_args.args
+        assert kind == "quote_transition"
+        assert payload["to_status"] == "approved" and payload["actor_roles"] == ["top_manager"]
+        assert mock_enqueue.call_args.kwargs["organization_id"] == "org-1"
+
     @patch("api.quotes.complete_procurement")
     @patch("api.quotes.get_user_role_codes")
     @patch("api.quotes.get_supabase")
@@ -11,6 +11,8 @@ Tests cover:
 - Total payments: fee (1010), duty (2010), VAT (5010) from B_1/B_2/B_3
 - Encoding: windows-1251 handling
 - Error handling: invalid XML, non-AltaGTD XML, empty blocks, zero INVOICCOST
+- Streaming: scaled-up fixtures parse block by block
+- match_items_to_deals(): one joined SKU lookup + one UPDATE per deal
 
 Fixtures:
 - tests/fixtures/gtd_sample_3313.xml — 1 BLOCK, 1 TOVG (2 units MANITOU), EUR, 3 payments
@@ -686,3 +688,144 @@ class TestDataclassFields:
         }
         for field in expected:
             assert field in field_names, f"GTDParseResult missing field: {field}"
+
+
+# =============================================================================
+# STREAMING — scaled-up declarations parse block by block
+# =============================================================================
+
+def _scaled_copy(src_path: str, copies: int) -> str:
+    """Write a temp copy of a fixture with its BLOCK repeated ``copies`` times."""
+    with open(src_path, "rb") as f:
+        raw = f.read()
+    start = raw.index(b"<BLOCK>")
+    end = raw.index(b"</BLOCK>") + len(b"</BLOCK>")
+    scaled = raw[:start] + raw[start:end] * copies + raw[end:]
+    with tempfile.NamedTemporaryFile(suffix=".xml", delete=False) as f:
+        f.write(scaled)
+        return f.name
+
+
+class TestStreamingParse:
+    """parse_gtd_xml streams BLOCKs instead of holding the whole tree."""
+
+    def test_scaled_declaration_matches_single_block(self):
+        from services.customs_declaration_service import parse_gtd_xml
+        single = parse_gtd_xml(SAMPLE_3328)
+        tmp_path = _scaled_copy(SAMPLE_3328, 1500)
+        try:
+            result = parse_gtd_xml(tmp_path)
+        finally:
+            os.unlink(tmp_path)
+
+        assert result.errors == []
+        assert len(result.items) == 1500 * len(single.items)
+        # Every block distributes its own payments identically
+        assert result.items[-1].fee_rub == single.items[-1].fee_rub
+        assert result.items[-2].sku == single.items[0].sku
+        # Header fields after the blocks are still read
+        assert result.regnum == single.regnum
+        assert result.total_fee_rub == single.total_fee_rub
+
+    def test_blocks_are_detached_from_the_tree(self):
+        import xml.etree.ElementTree as ET
+        from services.customs_declaration_service import (
+            GTDParseResult,
+            _stream_blocks,
+        )
+        tmp_path = _scaled_copy(SAMPLE_3313, 50)
+        try:
+            result = GTDParseResult()
+            with open(tmp_path, "rb") as f:
+                root = _stream_blocks(f, result)
+        finally:
+            os.unlink(tmp_path)
+
+        assert isinstance(root, ET.Element)
+        assert len(result.items) == 50
+        assert root.find("BLOCK") is None
+        assert root.find("REGNUM") is not None
+
+
+# =============================================================================
+# DEAL MATCHING — one joined lookup + one update per deal
+# =============================================================================
+
+class TestMatchItemsToDeals:
+    """match_items_to_deals resolves all SKUs in one joined query."""
+
+    @staticmethod
+    def _client(quote_item_rows):
+        from unittest.mock import MagicMock
+
+        client = MagicMock()
+        qi_chain = MagicMock()
+        (qi_chain.select.return_value.ilike_any_of.return_value
+            .eq.return_value.execute.return_value) = MagicMock(data=quote_item_rows)
+        items_chain = MagicMock()
+        items_chain.update.return_value.in_.return_value.execute.return_value = (
+            MagicMock(data=[])
+        )
+        client.table.side_effect = lambda name: {
+            "quote_items": qi_chain,
+            "customs_declaration_items": items_chain,
+        }[name]
+        return client, qi_chain, items_chain
+
+    def test_single_lookup_and_update_per_deal(self):
+        from unittest.mock import patch
+        from services import customs_declaration_service as svc
+
+        items = [
+            {"id": "i-1", "sku": "K90-A"},
+            {"id": "i-2", "sku": "k90-a"},
+            {"id": "i-3", "sku": "K270-1"},
+            {"id": "i-4", "sku": "UNKNOWN"},
+            {"id": "i-5", "sku": None},
+        ]
+        rows = [
+            {"sku": "K90-A", "quote_id": "q-1", "quotes": {
+                "id": "q-1", "organization_id": "org-1",
+                "specifications": [{"id": "s-1", "deals": [{"id": "deal-1"}]}],
+            }},
+            {"sku": "K270-1", "quote_id": "q-2", "quotes": {
+                "id": "q-2", "organization_id": "org-1",
+                "specifications": [{"id": "s-2", "deals": [{"id": "deal-2"}]}],
+            }},
+        ]
+        client, qi_chain, items_chain = self._client(rows)
+
+        with patch.object(svc, "_get_supabase", return_value=client), \
+             patch.object(svc, "get_declaration_items", return_value=items):
+            matched = svc.match_items_to_deals("decl-1", "org-1")
+
+        assert matched == 3
+        # One joined lookup carrying every distinct SKU
+        assert qi_chain.select.call_count == 1
+        column, pattern = qi_chain.select.return_value.ilike_any_of.call_args.args
+        assert column == "sku"
+        assert pattern == '"K90-A","K270-1","UNKNOWN"'
+        # One UPDATE per deal
+        updates = {
+            call.args[0]["deal_id"]: in_call.args[1]
+            for call, in_call in zip(
+                items_chain.update.call_args_list,
+                items_chain.update.return_value.in_.call_args_list,
+            )
+        }
+        assert updates == {"deal-1": ["i-1", "i-2"], "deal-2": ["i-3"]}
+
+    def test_no_skus_makes_no_queries(self):
+        from unittest.mock import patch
+        from services import customs_declaration_service as svc
+
+        client, qi_chain, items_chain = self._client([])
+        with patch.object(svc, "_get_supabase", return_value=client), \
+             patch.object(svc, "get_declaration_items",
+                          return_value=[{"id": "i-1", "sku": ""}]):
+            assert svc.match_items_to_deals("decl-1", "org-1") == 0
+        client.table.assert_not_called()
+
+    def test_sku_quoting_survives_commas(self):
+        from services.customs_declaration_service import _ilike_any_pattern
+        assert _ilike_any_pattern(['A,B', 'C"D']) == '"A,B","C\\"D"'
@@ -865,23 +865,27 @@ class TestUtilityFunctions:
 
     @patch('services.deal_service.get_supabase')
     def test_generate_deal_number(self, mock_get_supabase):
-        """Should generate sequential deal number."""
+        """Should generate sequential deal number from the org's counter."""
         mock_supabase = MagicMock()
         mock_get_supabase.return_value = mock_supabase
-        mock_supabase.table.return_value.select.return_value.eq.return_value.gte.return_value.execute.return_value.count = 5
+        mock_supabase.rpc.return_value.execute.return_value.data = 6
 
         deal_number = generate_deal_number('org-123')
 
         assert deal_number.startswith('DEAL-')
         assert '2026' in deal_number or '2025' in deal_number
-        assert deal_number.endswith('-0006')  # 5 existing + 1
+        assert deal_number.endswith('-0006')
+        rpc_name, params = mock_supabase.rpc.call_args[0]
+        assert rpc_name == 'next_document_number'
+        assert params['p_organization_id'] == 'org-123' and params['p_kind'] == 'deal'
+        mock_supabase.table.assert_not_called()  # no count query
 
     @patch('services.deal_service.get_supabase')
     def test_generate_deal_number_with_custom_prefix(self, mock_get_supabase):
         """Should use custom prefix."""
         mock_supabase = MagicMock()
         mock_get_supabase.return_value = mock_supabase
-        mock_supabase.table.return_value.select.return_value.eq.return_value.gte.return_value.execute.return_value.count = 0
+        mock_supabase.rpc.return_value.execute.return_value.data = 1
 
         deal_number = generate_deal_number('org-123', prefix='CONTRACT')
 
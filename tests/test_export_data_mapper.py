@@ -2,8 +2,9 @@
 Tests for Export Data Mapper — Phase 5d Pattern A.
 
 Asserts that ``fetch_export_data`` sources items via
-``composition_service.get_composed_items(quote_id, supabase)`` rather than
-reading the raw ``quote_items`` table directly. Downstream exports
+``composition_service.compose_items`` over the rows of the single
+``get_export_bundle`` RPC (services/export_loader.py) rather than reading
+the raw ``quote_items`` columns directly. Downstream exports
 (specification PDF, invoice PDF, validation XLSX) therefore see the
 composed, calc-ready shape where supplier-side fields (``weight_in_kg``,
 ``base_price_vat``, ``purchase_price_original``, ``purchase_currency``,
@@ -37,76 +38,58 @@ def _make_mock_supabase(
     summary: dict | None = None,
     seller_company: dict | None = None,
     bank_accounts: list | None = None,
+    quote_items: list | None = None,
+    coverage: list | None = None,
 ):
-    """Build a mock supabase client whose ``.table(name)`` returns a
-    chainable query that respects ``.eq("id", value)`` / ``.eq(...)``
-    filtering for the tables fetch_export_data reads.
-
-    The ``quote_items`` / ``quote_calculation_results`` tables are NOT
-    stubbed here — the whole point of Pattern A is that fetch_export_data
-    sources items via ``composition_service.get_composed_items``, not via
-    a raw ``quote_items`` SELECT. Tests verify this by asserting the mock
-    composition_service was called, and that no ``quote_items`` SELECT was
-    made.
+    """Build a mock supabase client whose ``.rpc("get_export_bundle", ...)``
+    returns the bundle fetch_export_data loads (services/export_loader.py).
+
+    ``.table()`` is recorded but returns nothing: every read must go
+    through the single bundle RPC, and items must come from
+    ``composition_service.compose_items`` over the bundle rows — a
+    regression to per-table reads surfaces as missing item fields in the
+    assertions below.
     """
-    calc_results_by_item = calc_results_by_item or {}
-    customer = customer or {}
-    organization = organization or {}
-    variables = variables or {}
-    summary = summary or {}
+    payload = {
+        "quote": quote,
+        "specification": None,
+        "spec_position": 1,
+        "customer": customer,
+        "organization": organization,
+        "seller_company": seller_company,
+        "signatory": None,
+        "bank_accounts": bank_accounts or [],
+        "quote_items": quote_items or [],
+        "coverage": coverage or [],
+        "calc_results": [
+            {"quote_item_id": qi_id, "phase_results": phase_results}
+            for qi_id, phase_results in (calc_results_by_item or {}).items()
+        ],
+        "variables": variables,
+        "summary": summary,
+    }
 
     called_tables: list[str] = []
+    rpc_calls: list[tuple[str, dict]] = []
 
     def table(name):
         called_tables.append(name)
         builder = MagicMock()
-
-        def select(*a, **kw):
-            return builder
-
-        def eq(*a, **kw):
-            return builder
-
-        def is_(*a, **kw):
-            return builder
-
-        def order(*a, **kw):
-            return builder
-
-        def execute():
-            if name == "quotes":
-                return MagicMock(data=[quote])
-            if name == "customers":
-                return MagicMock(data=[customer] if customer else [])
-            if name == "organizations":
-                return MagicMock(data=[organization] if organization else [])
-            if name == "quote_calculation_variables":
-                return MagicMock(
-                    data=[{"variables": variables}] if variables else []
-                )
-            if name == "quote_calculation_summaries":
-                return MagicMock(data=[summary] if summary else [])
-            if name == "seller_companies":
-                return MagicMock(
-                    data=[seller_company] if seller_company else []
-                )
-            if name == "bank_accounts":
-                return MagicMock(data=bank_accounts or [])
-            # Anything else (quote_items, quote_calculation_results)
-            # returns empty so a regression to Pattern B surfaces as
-            # missing item fields in the assertions below.
-            return MagicMock(data=[])
-
-        builder.select = select
-        builder.eq = eq
-        builder.is_ = is_
-        builder.order = order
-        builder.execute = execute
+        builder.execute.return_value = MagicMock(data=[])
         return builder
 
+    def rpc(name, params):
+        rpc_calls.append((name, params))
+        call = MagicMock()
+        call.execute.return_value = MagicMock(data=payload)
+        return call
+
     sb = MagicMock()
     sb.table = table
+    sb.rpc = rpc
     sb.called_tables = called_tables  # for assertions
+    sb.rpc_calls = rpc_calls
+    sb.payload = payload
     return sb
 
 
@@ -124,7 +107,7 @@ def _composed_item(
     brand: str = "",
 ):
     """Build a composed item dict in the shape
-    ``composition_service.get_composed_items`` emits."""
+    ``composition_service.compose_items`` emits."""
     return {
         # Identity
         "product_name": product_name,
@@ -160,7 +143,7 @@ def _composed_item(
 
 
 # ============================================================================
-# Pattern A — items sourced via composition_service.get_composed_items
+# Pattern A — items sourced via composition_service.compose_items
 # ============================================================================
 
 
@@ -169,7 +152,7 @@ def _composed_item(
 def test_fetch_export_data_sources_items_via_composition_service(
     mock_get_supabase, mock_composition_service
 ):
-    """Pattern A: items come from composition_service.get_composed_items."""
+    """Pattern A: items come from composition_service.compose_items."""
     quote = {
         "id": "q-001",
         "customer_id": "c-001",
@@ -188,13 +171,19 @@ def test_fetch_export_data_sources_items_via_composition_service(
     ]
     mock_sb = _make_mock_supabase(quote=quote)
     mock_get_supabase.return_value = mock_sb
-    mock_composition_service.get_composed_items.return_value = composed
+    mock_composition_service.compose_items.return_value = composed
 
     data = fetch_export_data("q-001", "org-001")
 
-    # Composition service was called with the quote_id and supabase client.
-    mock_composition_service.get_composed_items.assert_called_once_with(
-        "q-001", mock_sb
+    # One bundle RPC, no per-table reads.
+    assert mock_sb.rpc_calls == [(
+        "get_export_bundle",
+        {"p_org_id": "org-001", "p_quote_id": "q-001", "p_spec_id": None},
+    )]
+    assert mock_sb.called_tables == []
+    # Composition ran over the bundle's quote_items + coverage rows.
+    mock_composition_service.compose_items.assert_called_once_with(
+        mock_sb.payload["quote_items"], mock_sb.payload["coverage"]
     )
     # The returned ExportData.items carry the composed shape.
     assert len(data.items) == 1
@@ -236,7 +225,7 @@ def test_fetch_export_data_enriches_effective_quantity(
     composed[1]["minimum_order_quantity"] = None  # unset → ordered (invoice qty) 7
     mock_sb = _make_mock_supabase(quote=quote)
     mock_get_supabase.return_value = mock_sb
-    mock_composition_service.get_composed_items.return_value = composed
+    mock_composition_service.compose_items.return_value = composed
 
     data = fetch_export_data("q-001", "org-001")
 
@@ -252,13 +241,13 @@ def test_fetch_export_data_supplier_fields_come_from_composition_service(
 ):
     """Pattern A: supplier-side fields (weight_in_kg, base_price_vat,
     purchase_price_original, purchase_currency, customs_code, ...) must
-    come from composition_service.get_composed_items — never from a raw
-    quote_items SELECT.
+    come from composition_service.compose_items — never from the raw
+    quote_items columns.
 
     A direct fallback to quote_items for pricing would defeat Task 6's
     column rename (weight_in_kg / base_price_vat now mapped from
     invoice_items). This test guards against a regression where composed
-    fields are silently overwritten by a later quote_items read.
+    fields are silently overwritten by the bundle's quote_items rows.
     """
     quote = {
         "id": "q-001",
@@ -278,7 +267,7 @@ def test_fetch_export_data_supplier_fields_come_from_composition_service(
         )
     ]
 
-    # A potential quote_items enrichment read (for customer-side display
+    # The bundle's raw quote_items rows (read for customer-side display
     # fields like product_code / unit) must NOT clobber supplier-side
     # fields. Return shadow values that would be wrong if picked up.
     shadow_qi_row = {
@@ -294,47 +283,9 @@ def test_fetch_export_data_supplier_fields_come_from_composition_service(
         "purchase_price_original": 99.9,
     }
 
-    def table(name):
-        builder = MagicMock()
-
-        def select(*a, **kw):
-            return builder
-
-        def eq(*a, **kw):
-            return builder
-
-        def is_(*a, **kw):
-            return builder
-
-        def in_(*a, **kw):
-            return builder
-
-        def order(*a, **kw):
-            return builder
-
-        def execute():
-            if name == "quotes":
-                return MagicMock(data=[quote])
-            if name == "customers":
-                return MagicMock(data=[])
-            if name == "organizations":
-                return MagicMock(data=[])
-            if name == "quote_items":
-                return MagicMock(data=[shadow_qi_row])
-            return MagicMock(data=[])
-
-        builder.select = select
-        builder.eq = eq
-        builder.is_ = is_
-        builder.in_ = in_
-        builder.order = order
-        builder.execute = execute
-        return builder
-
-    mock_sb = MagicMock()
-    mock_sb.table = table
+    mock_sb = _make_mock_supabase(quote=quote, quote_items=[shadow_qi_row])
     mock_get_supabase.return_value = mock_sb
-    mock_composition_service.get_composed_items.return_value = composed
+    mock_composition_service.compose_items.return_value = composed
 
     data = fetch_export_data("q-001", "org-001")
 
@@ -396,7 +347,7 @@ def test_fetch_export_data_output_shape_matches_composed_items(
     ]
     mock_sb = _make_mock_supabase(quote=quote)
     mock_get_supabase.return_value = mock_sb
-    mock_composition_service.get_composed_items.return_value = composed
+    mock_composition_service.compose_items.return_value = composed
 
     data = fetch_export_data("q-001", "org-001")
 
@@ -449,57 +400,14 @@ def test_fetch_export_data_merges_calc_results_onto_composed_items(
         )
     ]
 
-    # Build a mock supabase that also returns calc_results when queried
-    # for quote_calculation_results (the fetcher still merges per-item
-    # calc results via the quote_item_id traceability field).
-    def table(name):
-        builder = MagicMock()
-
-        def select(*a, **kw):
-            return builder
-
-        def eq(col, val):
-            builder._filter_col = col
-            builder._filter_val = val
-            return builder
-
-        def is_(*a, **kw):
-            return builder
-
-        def order(*a, **kw):
-            return builder
-
-        def execute():
-            if name == "quotes":
-                return MagicMock(data=[quote])
-            if name == "customers":
-                return MagicMock(data=[])
-            if name == "organizations":
-                return MagicMock(data=[])
-            if name == "quote_calculation_results":
-                # Keyed by quote_item_id
-                if getattr(builder, "_filter_val", None) == "qi-001":
-                    return MagicMock(
-                        data=[{"phase_results": {"AL16": 1200.00}}]
-                    )
-                return MagicMock(data=[])
-            if name == "quote_calculation_variables":
-                return MagicMock(data=[])
-            if name == "quote_calculation_summaries":
-                return MagicMock(data=[])
-            return MagicMock(data=[])
-
-        builder.select = select
-        builder.eq = eq
-        builder.is_ = is_
-        builder.order = order
-        builder.execute = execute
-        return builder
-
-    mock_sb = MagicMock()
-    mock_sb.table = table
+    # calc_results come back in the bundle keyed by quote_item_id; the
+    # fetcher merges them via the composed item's traceability field.
+    mock_sb = _make_mock_supabase(
+        quote=quote,
+        calc_results_by_item={"qi-001": {"AL16": 1200.00}, "qi-other": {"AL16": 1.0}},
+    )
     mock_get_supabase.return_value = mock_sb
-    mock_composition_service.get_composed_items.return_value = composed
+    mock_composition_service.compose_items.return_value = composed
 
     data = fetch_export_data("q-001", "org-001")
 
@@ -370,6 +370,39 @@ class TestListQuoteVersions:
         assert version["seller_company"] == "ООО Квота"
 
 
+    @patch('services.quote_version_service.get_supabase')
+    def test_list_versions_reads_summary_columns_not_snapshot(self, mock_supabase):
+        """The listing selects the migration-347 summary columns, never input_variables."""
+        mock_client = MagicMock()
+        mock_supabase.return_value = mock_client
+        versions_chain = MagicMock()
+        versions_chain.select.return_value.eq.return_value.order.return_value.execute.return_value = MagicMock(
+            data=[{
+                "id": "v1", "version": 1, "status": "sent",
+                "change_reason": "Пересчёт", "total_quote_currency": 0,
+                "created_at": "2026-10-18T10:00:00Z",
+            }]
+        )
+
+        def mock_table(table_name):
+            if table_name == "quotes":
+                chain = MagicMock()
+                chain.select.return_value.eq.return_value.eq.return_value.execute.return_value = MagicMock(
+                    data=[{"id": "quote-uuid"}]
+                )
+                return chain
+            return versions_chain
+
+        mock_client.table.side_effect = mock_table
+
+        result = list_quote_versions("quote-uuid", "org-uuid")
+
+        selected = versions_chain.select.call_args.args[0]
+        assert "input_variables" not in selected
+        assert result[0]["change_reason"] == "Пересчёт"
+        assert result[0]["total_quote_currency"] == 0
+
+
 # =============================================================================
 # GET VERSION TESTS
 # =============================================================================
@@ -12,6 +12,7 @@ Tests for route-logistics manager assignment operations:
 import pytest
 from dataclasses import asdict
 from datetime import datetime
+import re
 import uuid
 
 # Import functions to test
@@ -27,7 +28,15 @@ from services.route_logistics_assignment_service import (
     _parse_assignment,
     _parse_assignment_with_user,
     _match_route_python,
+    # Compiled matcher
+    RouteMatcher,
+    get_route_matcher,
+    match_routes_to_logistics_managers,
+    get_logistics_manager_for_locations,
+    get_logistics_managers_for_locations,
+    create_route_logistics_assignment,
 )
+from services import route_logistics_assignment_service as route_service
 
 
 # =============================================================================
@@ -295,6 +304,164 @@ class TestMatchRoutePython:
         pass
 
 
+# =============================================================================
+# Test: Compiled Route Matcher
+# =============================================================================
+
+def _like_reference(assignments, route):
+    """Straight port of the SQL function match_route_to_logistics_manager()."""
+    for a in assignments:
+        if a["route_pattern"] == route:
+            return a["user_id"]
+    matches = []
+    for a in assignments:
+        pattern = a["route_pattern"]
+        regex = "".join(
+            ".*" if ch in "*%" else "." if ch in "?_" else re.escape(ch) for ch in pattern
+        )
+        if re.fullmatch(regex, route, re.DOTALL):
+            matches.append((pattern.count("*"), -len(pattern), pattern, a["user_id"]))
+    return min(matches)[3] if matches else None
+
+
+class _AssignmentsTable:
+    """route_logistics_assignments stand-in counting SELECTs."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.selects = 0
+
+    def table(self, _name):
+        return self
+
+    def select(self, *_a, **_k):
+        self.selects += 1
+        self._filters = {}
+        return self
+
+    def insert(self, row):
+        self.rows.append(dict(row, id=str(uuid.uuid4())))
+        self._inserted = self.rows[-1]
+        return self
+
+    def eq(self, col, val):
+        self._filters = {**getattr(self, "_filters", {}), col: val}
+        return self
+
+    def order(self, *_a):
+        return self
+
+    def range(self, start, end):
+        self._range = (start, end)
+        return self
+
+    def execute(self):
+        if getattr(self, "_inserted", None):
+            row, self._inserted = self._inserted, None
+            return type("R", (), {"data": [row]})()
+        rows = [r for r in self.rows if all(r.get(k) == v for k, v in self._filters.items())]
+        start, end = self._range
+        return type("R", (), {"data": rows[start:end + 1]})()
+
+
+ASSIGNMENTS = [
+    {"organization_id": "org-1", "route_pattern": "Китай-*", "user_id": "china-all"},
+    {"organization_id": "org-1", "route_pattern": "Китай-Москва", "user_id": "china-msk"},
+    {"organization_id": "org-1", "route_pattern": "*-Москва", "user_id": "to-msk"},
+    {"organization_id": "org-1", "route_pattern": "Турция-Санкт-Петербург", "user_id": "tr-spb"},
+    {"organization_id": "org-1", "route_pattern": "Герм?ния-*", "user_id": "de"},
+    {"organization_id": "org-2", "route_pattern": "Китай-*", "user_id": "other-org"},
+]
+
+
+class TestRouteMatcher:
+    """RouteMatcher mirrors the SQL function and serves lookups from memory."""
+
+    @pytest.fixture
+    def table(self, monkeypatch):
+        fake = _AssignmentsTable([dict(a) for a in ASSIGNMENTS])
+        monkeypatch.setattr(route_service, "_get_supabase", lambda: fake)
+        return fake
+
+    def test_priority_rules(self):
+        matcher = RouteMatcher(ASSIGNMENTS[:5])
+        assert matcher.match("Китай-Москва") == "china-msk"       # exact
+        assert matcher.match("Китай-Казань") == "china-all"       # 1 wildcard, longer
+        assert matcher.match("Индия-Москва") == "to-msk"
+        assert matcher.match("Турция-Санкт-Петербург") == "tr-spb"
+        assert matcher.match("Германия-Гамбург") == "de"          # '?' = one char
+        assert matcher.match("Китай-*") == "china-all"            # missing destination
+        assert matcher.match("китай-Казань") is None              # case-sensitive like LIKE
+        assert matcher.match("США-Казань") is None
+
+    def test_agrees_with_sql_semantics_on_random_data(self):
+        import random
+
+        rng = random.Random(7)
+        places = ["Китай", "Турция", "Москва", "Санкт-Петербург", "Казань", "Индия", "*", "Ки*", "*ань"]
+        assignments = [
+            {"route_pattern": f"{rng.choice(places)}-{rng.choice(places)}", "user_id": f"u{i}"}
+            for i in range(60)
+        ]
+        # Unique (organization_id, route_pattern), as in the table
+        assignments = list({a["route_pattern"]: a for a in reversed(assignments)}.values())
+        matcher = RouteMatcher(assignments)
+        for origin in places[:6]:
+            for destination in places[:6] + ["*"]:
+                route = f"{origin}-{destination}"
+                assert matcher.match(route) == _like_reference(assignments, route), route
+
+    def test_matcher_is_loaded_once_per_org(self, table):
+        assert get_logistics_manager_for_locations("org-1", "Китай", "Казань") == "china-all"
+        assert get_logistics_manager_for_locations("org-1", "Индия", "Москва") == "to-msk"
+        assert get_logistics_manager_for_locations("org-2", "Китай", None) == "other-org"
+        assert table.selects == 2
+
+    def test_batch_api(self, table):
+        by_location = get_logistics_managers_for_locations(
+            "org-1", [("Китай", "Москва"), ("США", "Казань"), ("Китай", "Москва")]
+        )
+        assert by_location == {("Китай", "Москва"): "china-msk", ("США", "Казань"): None}
+        assert match_routes_to_logistics_managers("org-1", ["Индия-Москва"]) == {"Индия-Москва": "to-msk"}
+        assert table.selects == 1
+
+    def test_write_invalidates_matcher(self, table):
+        assert get_route_matcher("org-1").match("США-Казань") is None
+        create_route_logistics_assignment("org-1", "США-*", "usa")
+        assert get_route_matcher("org-1").match("США-Казань") == "usa"
+        assert table.selects == 2
+
+    def test_ttl_expiry_reloads_and_failed_reload_serves_previous(self, table, monkeypatch):
+        first = get_route_matcher("org-1")
+        monkeypatch.setattr(route_service, "MATCHER_TTL_SECONDS", 0.0)
+
+        def broken():
+            raise RuntimeError("db down")
+
+        monkeypatch.setattr(route_service, "_get_supabase", broken)
+        assert get_route_matcher("org-1") is first
+
+    def test_python_fallback_uses_matcher(self, table):
+        assert _match_route_python("org-1", "Китай-Казань") == "china-all"
+
+    def test_lookup_cost_does_not_grow_with_pattern_count(self):
+        import time
+
+        assignments = [
+            {"route_pattern": f"Страна{i}-*", "user_id": f"u{i}"} for i in range(5000)
+        ] + [{"route_pattern": "*-Москва", "user_id": "to-msk"}]
+        matcher = RouteMatcher(assignments)
+        routes = [f"Страна{i}-Город{i}" for i in range(0, 5000, 7)] + ["Китай-Москва"]
+
+        started = time.perf_counter()
+        result = matcher.match_many(routes)
+        elapsed = time.perf_counter() - started
+
+        assert result["Страна14-Город14"] == "u14"
+        assert result["Китай-Москва"] == "to-msk"
+        assert elapsed < 0.5  # ~700 lookups over 5,000 patterns
+
+
 # =============================================================================
 # Test: Route Pattern Examples (Documentation)
 # =============================================================================
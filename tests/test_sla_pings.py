@@ -40,8 +40,9 @@ class _StubQuery:
     """Minimal chainable query emulating supabase-py's PostgREST builder.
 
     Supports the subset used by api.cron.cron_sla_check:
-      table(...).select(...).or_(...).execute()
+      table(...).select(...).or_(...).gt(...).order(...).limit(...).execute()
       table(...).select(...).eq(...).eq(...).execute()
+      table(...).select(...).in_(...).execute()
       table(...).insert({...}).execute()
     """
 
@@ -50,6 +51,8 @@ class _StubQuery:
         self._table = table_name
         self._filters: list[tuple[str, Any, Any]] = []
         self._insert_payload: dict | None = None
+        self._order: str | None = None
+        self._limit: int | None = None
 
     def select(self, *_args: Any, **_kwargs: Any) -> "_StubQuery":
         return self
@@ -58,6 +61,22 @@ class _StubQuery:
         self._filters.append(("eq", col, val))
         return self
 
+    def in_(self, col: str, vals: list) -> "_StubQuery":
+        self._filters.append(("in", col, set(vals)))
+        return self
+
+    def gt(self, col: str, val: Any) -> "_StubQuery":
+        self._filters.append(("gt", col, val))
+        return self
+
+    def order(self, col: str, **_kwargs: Any) -> "_StubQuery":
+        self._order = col
+        return self
+
+    def limit(self, n: int) -> "_StubQuery":
+        self._limit = n
+        return self
+
     def or_(self, _expr: str) -> "_StubQuery":
         # We don't parse the or_ expression — rely on the in-memory rows we
         # seeded. `cron_sla_check` applies its own completion filter in Python.
@@ -77,6 +96,14 @@ class _StubQuery:
         for op, col, val in self._filters:
             if op == "eq":
                 rows = [r for r in rows if r.get(col) == val]
+            elif op == "in":
+                rows = [r for r in rows if r.get(col) in val]
+            elif op == "gt":
+                rows = [r for r in rows if r.get(col) > val]
+        if self._order:
+            rows = sorted(rows, key=lambda r: r.get(self._order))
+        if self._limit is not None:
+            rows = rows[: self._limit]
         return MagicMock(data=list(rows))
 
     def _do_insert(self, payload: dict) -> Any:
@@ -400,3 +427,68 @@ class TestSlaCheckCompleted:
             "customs_overdue": 0,
         }
         assert telegram_send.await_count == 0
+
+
+class TestSlaCheckPaging:
+    """Invoices are read in keyset pages; the ledger is preloaded per page."""
+
+    def test_all_pages_processed_and_ledger_skips_without_insert(
+        self,
+        subapp_client: TestClient,
+        cron_secret: str,
+        stub_sb: _StubSupabase,
+        telegram_send: AsyncMock,
+        patched_cron,
+    ) -> None:
+        _seed_base(stub_sb)
+        now = datetime.now(timezone.utc)
+        _seed_invoice(stub_sb, logistics_deadline_at=now + timedelta(hours=12))
+        first = stub_sb.tables["invoices"][0]
+        second = {**first, "id": "33333333-3333-3333-3333-333333333334", "invoice_number": "INV-002"}
+        stub_sb.tables["invoices"].append(second)
+        stub_sb.tables["invoice_sla_notifications_sent"] = [
+            {"invoice_id": first["id"], "kind": "logistics_reminder"}
+        ]
+
+        with patch.object(cron_module, "CRON_SCAN_PAGE_SIZE", 1), \
+             patch.object(cron_module, "_try_mark_sent", wraps=cron_module._try_mark_sent) as mark:
+            r = subapp_client.post(
+                "/cron/sla-check", headers={"X-Cron-Secret": cron_secret}
+            )
+
+        assert r.status_code == 200, r.text
+        data = r.json()["data"]
+        assert data["scanned"] == 2
+        assert data["sent"]["logistics_reminder"] == 1
+        assert [c.args[1:] for c in mark.call_args_list] == [
+            (second["id"], "logistics_reminder")
+        ]
+        assert telegram_send.await_count == 1
+
+    def test_page_context_lookups_are_chunked(self, stub_sb: _StubSupabase) -> None:
+        invoices = [
+            {"id": f"inv-{i}", "quote_id": f"q-{i % 3}"} for i in range(5)
+        ]
+        stub_sb.tables["quotes"] = [
+            {"id": f"q-{i}", "organization_id": ORG_ID} for i in range(3)
+        ]
+        stub_sb.tables["invoice_sla_notifications_sent"] = [
+            {"invoice_id": "inv-0", "kind": "logistics_reminder"},
+            {"invoice_id": "inv-4", "kind": "customs_overdue"},
+        ]
+        sizes: list[tuple[str, int]] = []
+        original_in = _StubQuery.in_
+
+        def spy_in(query: _StubQuery, col: str, vals: list) -> _StubQuery:
+            sizes.append((query._table, len(vals)))
+            return original_in(query, col, vals)
+
+        with patch.object(cron_module, "_SLA_LOOKUP_CHUNK", 2), \
+             patch.object(_StubQuery, "in_", spy_in):
+            sent, orgs = cron_module._load_sla_page_context(stub_sb, invoices)
+
+        assert sent == {"inv-0": {"logistics_reminder"}, "inv-4": {"customs_overdue"}}
+        assert orgs == {f"q-{i}": ORG_ID for i in range(3)}
+        assert max(n for _, n in sizes) == 2
+        assert [t for t, _ in sizes].count("invoice_sla_notifications_sent") == 3
+        assert [t for t, _ in sizes].count("quotes") == 2
@@ -406,15 +406,15 @@ class TestUtilityFunctions:
         mock_client = MagicMock()
         mock_supabase.return_value = mock_client
 
-        # Mock no existing specs
-        mock_response = MagicMock()
-        mock_response.data = []
-        mock_client.table.return_value.select.return_value.eq.return_value.like.return_value.order.return_value.limit.return_value.execute.return_value = mock_response
+        # First number of the year from the org's counter
+        mock_client.rpc.return_value.execute.return_value.data = 1
 
         result = generate_specification_number("org-uuid", prefix="SPEC")
 
         assert result is not None
         assert result.startswith("SPEC-")
+        assert result.endswith("-0001")
+        assert mock_client.rpc.call_args[0][1]["p_kind"] == "specification"
 
     @patch('services.specification_service.get_supabase')
     def test_get_specifications_for_signing(self, mock_supabase):
@@ -315,6 +315,11 @@ class TestGetBulkTimers:
             t.eq.return_value = t
             t.in_.return_value = t
             t.is_.return_value = t
+            t.order.return_value = t
+            t.range.return_value = t
+            t.limit.return_value = t
+            t.gt.return_value = t
+            t.not_ = t
             if name == "quotes":
                 t.execute.return_value = MagicMock(data=[
                     {
@@ -332,7 +337,8 @@ class TestGetBulkTimers:
                 ])
             else:
                 t.execute.return_value = MagicMock(data=[
-                    {"stage": "pending_procurement", "deadline_hours": 48}
+                    {"organization_id": org_id, "stage": "pending_procurement",
+                     "deadline_hours": 48}
                 ])
             return t
 
@@ -367,6 +373,11 @@ class TestGetOverdueQuotes:
             t.eq.return_value = t
             t.in_.return_value = t
             t.is_.return_value = t
+            t.order.return_value = t
+            t.range.return_value = t
+            t.limit.return_value = t
+            t.gt.return_value = t
+            t.not_ = t
             if name == "quotes":
                 t.execute.return_value = MagicMock(data=[
                     {
@@ -392,7 +403,8 @@ class TestGetOverdueQuotes:
                 ])
             else:  # stage_deadlines
                 t.execute.return_value = MagicMock(data=[
-                    {"stage": "pending_procurement", "deadline_hours": 48}
+                    {"organization_id": org_id, "stage": "pending_procurement",
+                     "deadline_hours": 48}
                 ])
             return t
 
@@ -472,3 +484,40 @@ class TestModuleImports:
     def test_warning_threshold_constant(self):
         from services.stage_timer_service import WARNING_THRESHOLD
         assert WARNING_THRESHOLD == 0.8
+
+
+class TestIterOverdueQuotes:
+    """iter_overdue_quotes() walks quotes in keyset pages."""
+
+    def test_pages_by_id_and_skips_pages_without_overdue(self, org_id, mock_supabase):
+        from services.stage_timer_service import TERMINAL_STATUSES, iter_overdue_quotes
+
+        now = datetime.now(timezone.utc)
+
+        def row(qid, hours):
+            return {
+                "id": qid, "idn": qid, "workflow_status": "pending_sales_review",
+                "stage_entered_at": (now - timedelta(hours=hours)).isoformat(),
+                "stage_deadline_override_hours": 10, "overdue_notified_at": None,
+                "created_by_user_id": "manager",
+            }
+
+        quotes = MagicMock()
+        for method in ("select", "eq", "is_", "in_", "gt", "order", "limit"):
+            getattr(quotes, method).return_value = quotes
+        quotes.not_ = quotes
+        quotes.execute.side_effect = [
+            MagicMock(data=[row("a", 20), row("b", 1)]),
+            MagicMock(data=[row("c", 2), row("d", 3)]),
+            MagicMock(data=[row("e", 30)]),
+        ]
+        mock_supabase.table.return_value = quotes
+
+        with patch("services.stage_timer_service._get_supabase", return_value=mock_supabase), \
+             patch("services.stage_timer_service._fetch_deadlines_map", return_value={}):
+            pages = list(iter_overdue_quotes(org_id, page_size=2))
+
+        assert [[q["quote_id"] for q in page] for page in pages] == [["a"], ["e"]]
+        assert [c.args for c in quotes.gt.call_args_list] == [("id", "b"), ("id", "d")]
+        quotes.not_.in_.assert_called_with("workflow_status", sorted(TERMINAL_STATUSES))
+        assert pages[0][0]["stage_entered_at"] is not None
@@ -65,10 +65,10 @@ class TestDomesticMatch:
         # Mock for resolver's buyer fetch
         supabase_client = _buyer_chain("RU")
 
-        # Mock for inner get_vat_rate() lookup against vat_rates_by_country
+        # Mock for inner get_vat_rate() snapshot of vat_rates_by_country
         inner = MagicMock()
-        inner.table.return_value.select.return_value.eq.return_value.single.return_value.execute.return_value = MagicMock(
-            data={"rate": "22.00"}
+        inner.table.return_value.select.return_value.order.return_value.range.return_value.execute.return_value = MagicMock(
+            data=[{"country_code": "RU", "rate": "22.00"}]
         )
         mock_get_sb.return_value = inner
 
@@ -88,8 +88,8 @@ class TestDomesticMatch:
         supabase_client = _buyer_chain("CH")
 
         inner = MagicMock()
-        inner.table.return_value.select.return_value.eq.return_value.single.return_value.execute.return_value = MagicMock(
-            data={"rate": "7.7"}
+        inner.table.return_value.select.return_value.order.return_value.range.return_value.execute.return_value = MagicMock(
+            data=[{"country_code": "CH", "rate": "7.7"}]
         )
         mock_get_sb.return_value = inner
 
@@ -110,8 +110,8 @@ class TestDomesticMatch:
         supabase_client = _buyer_chain("DE")
 
         inner = MagicMock()
-        inner.table.return_value.select.return_value.eq.return_value.single.return_value.execute.return_value = MagicMock(
-            data={"rate": "19.00"}
+        inner.table.return_value.select.return_value.order.return_value.range.return_value.execute.return_value = MagicMock(
+            data=[{"country_code": "DE", "rate": "19.00"}]
         )
         mock_get_sb.return_value = inner
 
@@ -99,8 +99,15 @@ class TestModuleImports:
 # get_vat_rate TESTS
 # =============================================================================
 
+def _snapshot_chain(mock_client, rows):
+    """Route the whole-table vat_rates_by_country snapshot read to ``rows``."""
+    chain = mock_client.table.return_value.select.return_value.order.return_value.range.return_value
+    chain.execute.return_value = MagicMock(data=rows)
+    return chain
+
+
 class TestGetVatRate:
-    """Test VAT rate lookup by country code."""
+    """Test VAT rate lookup by country code (served from the reference cache)."""
 
     @patch('services.vat_service._get_supabase')
     def test_returns_rate_for_eaeu_country(self, mock_get_supabase, eaeu_rate_row):
@@ -109,9 +116,7 @@ class TestGetVatRate:
 
         mock_client = MagicMock()
         mock_get_supabase.return_value = mock_client
-        mock_client.table.return_value.select.return_value.eq.return_value.single.return_value.execute.return_value = MagicMock(
-            data=eaeu_rate_row
-        )
+        _snapshot_chain(mock_client, [eaeu_rate_row])
 
         result = get_vat_rate("KZ")
         assert result == Decimal("0.00")
@@ -123,28 +128,35 @@ class TestGetVatRate:
 
         mock_client = MagicMock()
         mock_get_supabase.return_value = mock_client
-        mock_client.table.return_value.select.return_value.eq.return_value.single.return_value.execute.return_value = MagicMock(
-            data=import_rate_row
-        )
+        _snapshot_chain(mock_client, [import_rate_row])
 
         result = get_vat_rate("CN")
         assert result == Decimal("20.00")
 
     @patch('services.vat_service._get_supabase')
-    def test_returns_default_for_unknown_country(self, mock_get_supabase):
+    def test_returns_default_for_unknown_country(self, mock_get_supabase, all_rate_rows):
         """Unknown country code should return default 20.00."""
         from services.vat_service import get_vat_rate
 
         mock_client = MagicMock()
         mock_get_supabase.return_value = mock_client
-        # Supabase .single() raises an exception when no row is found
-        mock_client.table.return_value.select.return_value.eq.return_value.single.return_value.execute.side_effect = Exception(
-            "No rows found"
-        )
+        _snapshot_chain(mock_client, all_rate_rows)
 
         result = get_vat_rate("XX")
         assert result == Decimal("20.00")
 
+    @patch('services.vat_service._get_supabase')
+    def test_returns_default_when_table_unreadable(self, mock_get_supabase):
+        """DB failure on a cold cache falls back to the 20.00 default."""
+        from services.vat_service import get_vat_rate
+
+        mock_client = MagicMock()
+        mock_get_supabase.return_value = mock_client
+        _snapshot_chain(mock_client, []).execute.side_effect = Exception("db down")
+
+        result = get_vat_rate("KZ")
+        assert result == Decimal("20.00")
+
     @patch('services.vat_service._get_supabase')
     def test_queries_vat_rates_by_country_table(self, mock_get_supabase, eaeu_rate_row):
         """Should query the vat_rates_by_country table."""
@@ -152,40 +164,65 @@ class TestGetVatRate:
 
         mock_client = MagicMock()
         mock_get_supabase.return_value = mock_client
-        mock_client.table.return_value.select.return_value.eq.return_value.single.return_value.execute.return_value = MagicMock(
-            data=eaeu_rate_row
-        )
+        _snapshot_chain(mock_client, [eaeu_rate_row])
 
         get_vat_rate("KZ")
         mock_client.table.assert_called_with("vat_rates_by_country")
 
     @patch('services.vat_service._get_supabase')
-    def test_filters_by_country_code(self, mock_get_supabase, eaeu_rate_row):
-        """Should filter by country_code column."""
+    def test_picks_row_by_country_code(self, mock_get_supabase, all_rate_rows):
+        """Should pick the row matching country_code out of the snapshot."""
         from services.vat_service import get_vat_rate
 
         mock_client = MagicMock()
         mock_get_supabase.return_value = mock_client
-        mock_client.table.return_value.select.return_value.eq.return_value.single.return_value.execute.return_value = MagicMock(
-            data=eaeu_rate_row
-        )
+        _snapshot_chain(mock_client, all_rate_rows)
 
-        get_vat_rate("KZ")
-        mock_client.table.return_value.select.return_value.eq.assert_called_with("country_code", "KZ")
+        assert get_vat_rate("KZ") == Decimal("0.00")
+        assert get_vat_rate("DE") == Decimal("20.00")
 
     @patch('services.vat_service._get_supabase')
     def test_uppercases_country_code(self, mock_get_supabase, eaeu_rate_row):
-        """Should uppercase the country code before querying."""
+        """Should uppercase the country code before looking it up."""
+        from services.vat_service import get_vat_rate
+
+        mock_client = MagicMock()
+        mock_get_supabase.return_value = mock_client
+        _snapshot_chain(mock_client, [eaeu_rate_row])
+
+        assert get_vat_rate("kz") == Decimal("0.00")
+
+    @patch('services.vat_service._get_supabase')
+    def test_repeated_lookups_read_table_once(self, mock_get_supabase, all_rate_rows):
+        """The whole table is read once and served from memory afterwards."""
         from services.vat_service import get_vat_rate
 
         mock_client = MagicMock()
         mock_get_supabase.return_value = mock_client
-        mock_client.table.return_value.select.return_value.eq.return_value.single.return_value.execute.return_value = MagicMock(
-            data=eaeu_rate_row
+        chain = _snapshot_chain(mock_client, all_rate_rows)
+
+        for code in ("KZ", "CN", "RU", "DE", "KZ"):
+            get_vat_rate(code)
+        assert chain.execute.call_count == 1
+
+    @patch('services.vat_service._get_supabase')
+    def test_upsert_invalidates_cached_rates(self, mock_get_supabase, eaeu_rate_row, user_id):
+        """An admin upsert is visible to the next lookup in this process."""
+        from services.vat_service import get_vat_rate, upsert_rate
+
+        mock_client = MagicMock()
+        mock_get_supabase.return_value = mock_client
+        chain = _snapshot_chain(mock_client, [eaeu_rate_row])
+        assert get_vat_rate("KZ") == Decimal("0.00")
+
+        mock_client.table.return_value.upsert.return_value.execute.return_value = MagicMock(
+            data=[{**eaeu_rate_row, "rate": "12.00"}]
         )
+        upsert_rate("KZ", Decimal("12.00"), None, user_id)
+        chain.execute.return_value = MagicMock(data=[{**eaeu_rate_row, "rate": "12.00"}])
 
-        get_vat_rate("kz")
-        mock_client.table.return_value.select.return_value.eq.assert_called_with("country_code", "KZ")
+        assert get_vat_rate("KZ") == Decimal("12.00")
+        assert chain.execute.call_count == 2
 
 
 # =============================================================================
@@ -1259,6 +1259,8 @@ class TestCompleteProcurementForInvoice:
         assert payload["workflow_status"] == WorkflowStatus.PENDING_LOGISTICS_AND_CUSTOMS.value
         assert payload["procurement_completed_at"] is not None
         assert payload["stage_entered_at"] is not None
+        # Actor of the quote_status change event (migration 353)
+        assert payload["stage_entered_by"] == "user-1"
 
     @patch('services.workflow_service.get_supabase')
     def test_race_condition_lost_returns_advanced_false_no_error(
@@ -0,0 +1,79 @@
+"""Unit tests for the load-test harness (tools/loadtest) — no database needed."""
+
+from __future__ import annotations
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from tools.loadtest import standin, stats, synthetic
+from tools.loadtest.synthetic import OrgSpec
+
+
+SMALL = OrgSpec(quotes=60, customers=10, suppliers=5, sales_users=3, procurement_users=2)
+
+
+def test_generation_is_deterministic():
+    a, b = synthetic.generate(SMALL), synthetic.generate(SMALL)
+
+    assert a.tables == b.tables
+    assert synthetic.generate(OrgSpec(quotes=60, seed=7)).org_id != a.org_id
+
+
+def test_generated_rows_are_referentially_consistent():
+    ds = synthetic.generate(SMALL)
+    t = ds.tables
+    ids = {table: {r.get("id") for r in rows} for table, rows in t.items()}
+
+    assert len(t["quotes"]) == 60
+    assert all(set(r) == set(rows[0]) for rows in t.values() if rows for r in rows)  # uniform columns
+    assert {r["quote_id"] for r in t["invoices"]} <= ids["quotes"]
+    assert {r["composition_selected_invoice_id"] for r in t["quote_items"]} - {None} <= ids["invoices"]
+    assert {r["invoice_item_id"] for r in t["invoice_item_coverage"]} == ids["invoice_items"]
+    assert {r["specification_id"] for r in t["deals"]} <= ids["specifications"]
+    assert {r["created_by"] for r in t["quotes"]} <= set(ds.users["sales"])
+    assert len(ds.tables["deals"]) == len(ds.quotes_by_status.get("deal", []))
+
+
+def test_percentiles_and_regressions():
+    rec = stats.Recorder()
+    for ms in range(1, 101):
+        rec.record("kanban", ms / 1000, ok=ms != 100)
+
+    row = rec.summary()["kanban"]
+
+    assert (row["count"], row["errors"], row["p50_ms"], row["p95_ms"], row["max_ms"]) == (100, 1, 50.0, 95.0, 100.0)
+    assert stats.regressions({"kanban": row}, {"kanban": {"p95_ms": 70.0}}, 0.2) == ["kanban: p95_ms 70.0 -> 95.0"]
+    assert stats.regressions({"kanban": row}, {"kanban": {"p95_ms": 90.0}}, 0.2) == []
+
+
+def test_standin_proxies_rest_and_resolves_tokens():
+    seen = {}
+
+    async def postgrest(request: Request):
+        seen.update(path=request.url.path, query=str(request.query_params), headers=dict(request.headers))
+        return JSONResponse([{"id": 1}], headers={"Content-Range": "0-0/1"})
+
+    upstream = Starlette(routes=[Route("/{path:path}", postgrest, methods=["GET"])])
+    app = standin.create_app("http://postgrest", transport=httpx.ASGITransport(app=upstream))
+
+    with TestClient(app) as client:
+        response = client.get(
+            "/rest/v1/quotes?select=id&limit=1",
+            headers={"Accept-Profile": "kvota", "Authorization": "Bearer service-key", "apikey": "k"},
+        )
+        user = client.get("/auth/v1/user", headers={"Authorization": f"Bearer {standin.token_for('u-1')}"})
+        anonymous = client.get("/auth/v1/user", headers={"Authorization": "Bearer real-jwt"})
+        client.post("/storage/v1/object/kp-exports/q/1.pdf", content=b"%PDF")
+        stored = client.get("/storage/v1/object/kp-exports/q/1.pdf")
+
+    assert response.json() == [{"id": 1}] and response.headers["content-range"] == "0-0/1"
+    assert seen["path"] == "/quotes" and seen["query"] == "select=id&limit=1"
+    assert seen["headers"]["accept-profile"] == "kvota"
+    assert "authorization" not in seen["headers"] and "apikey" not in seen["headers"]
+    assert user.json()["id"] == "u-1"
+    assert anonymous.status_code == 401
+    assert stored.content == b"%PDF"
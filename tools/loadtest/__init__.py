@@ -0,0 +1,28 @@
+"""Offline load-test harness for the FastAPI ``api_app``.
+
+Runs the real app against a local Supabase stand-in seeded with a synthetic
+organization, drives scripted user journeys and reports latency percentiles
+per request, so N+1 patterns (``api/quotes.calculate_quote``,
+``api/procurement.get_kanban``) can be measured at realistic data volume
+before shipping.
+
+Pieces:
+    standin.py    — ASGI app answering the Supabase URLs the backend calls:
+                    ``/rest/v1`` proxied to a local PostgREST container
+                    (docker-compose.dev.yml, profile ``loadtest``),
+                    ``/auth/v1/user`` resolving ``Bearer loadtest.<user_id>``
+                    tokens, ``/storage/v1`` kept in memory.
+    synthetic.py  — deterministic synthetic org (users, customers, suppliers,
+                    quotes, items, invoices, specifications, deals) and its
+                    bulk insert into the local PostgreSQL.
+    journeys.py   — scripted journeys (kanban, calculate, export).
+    stats.py      — latency recorder, percentiles, baseline comparison.
+    __main__.py   — CLI: ``seed`` and ``run``.
+
+Usage (local PostgreSQL from ``make dev-setup``):
+    make loadtest-up                      # PostgreSQL + PostgREST
+    make loadtest-seed                    # python -m tools.loadtest seed
+    make loadtest                         # python -m tools.loadtest run
+    python -m tools.loadtest run --users 20 --duration 60 \\
+        --json out.json --baseline main.json --max-regression 0.2
+"""
@@ -0,0 +1,176 @@
+"""CLI: ``python -m tools.loadtest seed|run`` (see package docstring)."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from .journeys import JOURNEYS, Context
+from .stats import Recorder, format_table, regressions
+from .synthetic import OrgSpec, generate, purge, write
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def _spec_args(parser: argparse.ArgumentParser) -> None:
+    defaults = OrgSpec()
+    for name in ("quotes", "customers", "suppliers", "sales_users", "procurement_users", "seed"):
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=getattr(defaults, name))
+
+
+def _spec(args) -> OrgSpec:
+    return OrgSpec(
+        quotes=args.quotes, customers=args.customers, suppliers=args.suppliers,
+        sales_users=args.sales_users, procurement_users=args.procurement_users, seed=args.seed,
+    )
+
+
+def cmd_seed(args) -> int:
+    import psycopg2
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        print("ERROR: DATABASE_URL not set (see .env.dev.example).")
+        return 1
+
+    dataset = generate(_spec(args))
+    conn = psycopg2.connect(database_url)
+    try:
+        if args.reset:
+            print(f"Purging organization {dataset.org_id}...")
+            purge(conn, dataset.org_id)
+        print(f"Seeding organization {dataset.org_id}...")
+        write(conn, dataset)
+    finally:
+        conn.close()
+    return 0
+
+
+def _serve(app, port: int):
+    """Run ``app`` under uvicorn in a daemon thread; return once it listens."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"server on port {port} did not start")
+        time.sleep(0.05)
+    return server
+
+
+async def _drive(base_url: str, dataset, names: list[str], users: int, duration: float,
+                 iterations: int | None, seed: int) -> Recorder:
+    import httpx
+
+    recorder = Recorder()
+    weights = [JOURNEYS[n][0] for n in names]
+    deadline = time.monotonic() + duration
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0) as client:
+        async def virtual_user(n: int) -> None:
+            ctx = Context(client, recorder, dataset, random.Random(seed + n))
+            done = 0
+            while time.monotonic() < deadline and (iterations is None or done < iterations):
+                await JOURNEYS[ctx.rng.choices(names, weights)[0]][1](ctx)
+                done += 1
+
+        await asyncio.gather(*(virtual_user(n) for n in range(users)))
+    return recorder
+
+
+def cmd_run(args) -> int:
+    names = [n.strip() for n in args.journeys.split(",") if n.strip()]
+    unknown = [n for n in names if n not in JOURNEYS]
+    if unknown:
+        print(f"ERROR: unknown journeys: {', '.join(unknown)} (known: {', '.join(JOURNEYS)})")
+        return 2
+
+    # The app reads these at import time — point it at the stand-in first.
+    os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{args.standin_port}"
+    os.environ["SUPABASE_SERVICE_ROLE_KEY"] = "loadtest"
+    os.environ["SUPABASE_ANON_KEY"] = "loadtest"
+    os.environ["SENTRY_DSN"] = ""
+
+    from api.app import api_app
+
+    from .standin import create_app
+
+    dataset = generate(_spec(args))
+    _serve(create_app(args.postgrest_url), args.standin_port)
+    _serve(api_app, args.api_port)
+
+    print(f"Running {', '.join(names)} with {args.users} users for {args.duration:g}s...")
+    started = time.monotonic()
+    recorder = asyncio.run(_drive(
+        f"http://127.0.0.1:{args.api_port}", dataset, names, args.users,
+        args.duration, args.iterations, args.seed,
+    ))
+    elapsed = time.monotonic() - started
+
+    summary = recorder.summary()
+    total = sum(row["count"] for row in summary.values())
+    print(format_table(summary))
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "config": {"journeys": names, "users": args.users, "duration": args.duration,
+                       "spec": asdict(_spec(args))},
+            "summary": summary,
+        }, ensure_ascii=False, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["summary"]
+        found = regressions(summary, baseline, args.max_regression)
+        if found:
+            print("\nRegressions over baseline:")
+            print("\n".join(f"  {line}" for line in found))
+            return 1
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    env_dev = PROJECT_ROOT / ".env.dev"
+    load_dotenv(env_dev if env_dev.exists() else None)
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+    parser = argparse.ArgumentParser(prog="python -m tools.loadtest")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    seed = sub.add_parser("seed", help="insert the synthetic organization into DATABASE_URL")
+    _spec_args(seed)
+    seed.add_argument("--reset", action="store_true", help="delete the organization first")
+    seed.set_defaults(func=cmd_seed)
+
+    run = sub.add_parser("run", help="drive journeys against api_app, report latency percentiles")
+    _spec_args(run)
+    run.add_argument("--journeys", default=",".join(JOURNEYS))
+    run.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    run.add_argument("--duration", type=float, default=60.0, help="seconds")
+    run.add_argument("--iterations", type=int, default=None, help="journeys per user (default: until --duration)")
+    run.add_argument("--postgrest-url", default=None, help="default: LOADTEST_POSTGREST_URL or http://localhost:3001")
+    run.add_argument("--standin-port", type=int, default=54330)
+    run.add_argument("--api-port", type=int, default=8765)
+    run.add_argument("--json", help="write the summary here")
+    run.add_argument("--baseline", help="summary JSON of an earlier run to compare p95 against")
+    run.add_argument("--max-regression", type=float, default=0.2, help="allowed p95 growth (0.2 = +20%%)")
+    run.set_defaults(func=cmd_run)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
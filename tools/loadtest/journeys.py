@@ -0,0 +1,89 @@
+"""Scripted user journeys against ``api_app``.
+
+A journey is a coroutine ``(ctx) -> None`` issuing the requests one user
+action causes; every request is timed under its own label. Users and
+quotes come from the synthetic dataset, tokens are resolved by the
+stand-in (``standin.token_for``).
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+
+import httpx
+
+from .standin import token_for
+from .stats import Recorder
+from .synthetic import Dataset
+
+# Quotes a sales manager recalculates (procurement prices are in).
+CALCULABLE_STATUSES = ("pending_logistics_and_customs", "pending_sales_review", "pending_quote_control")
+
+CALCULATE_BODY = {"markup": "15", "exchange_rate": "1.0", "delivery_time": "30"}
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    recorder: Recorder
+    dataset: Dataset
+    rng: random.Random
+
+    async def request(self, label: str, user_id: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(
+                method, url, headers={"Authorization": f"Bearer {token_for(user_id)}"}, **kwargs
+            )
+        except httpx.HTTPError:
+            self.recorder.record(label, time.perf_counter() - start, ok=False)
+            return None
+        self.recorder.record(label, time.perf_counter() - start, ok=response.status_code < 400)
+        return response
+
+    def pick_quote(self, statuses) -> tuple[str, str] | None:
+        """(quote_id, owner) of a random quote in one of ``statuses``."""
+        pool = [q for s in statuses for q in self.dataset.quotes_by_status.get(s, ())]
+        if not pool:
+            return None
+        quote_id = self.rng.choice(pool)
+        return quote_id, self.dataset.quote_owner[quote_id]
+
+
+async def kanban(ctx: Context) -> None:
+    """Head of procurement and a regular МОЗ open the procurement board."""
+    params = {"status": "pending_procurement"}
+    await ctx.request("kanban:head", ctx.dataset.users["head_of_procurement"][0],
+                      "GET", "/api/quotes/kanban", params=params)
+    await ctx.request("kanban:procurement", ctx.rng.choice(ctx.dataset.users["procurement"]),
+                      "GET", "/api/quotes/kanban", params=params)
+
+
+async def calculate(ctx: Context) -> None:
+    """A sales manager recalculates one of their quotes."""
+    picked = ctx.pick_quote(CALCULABLE_STATUSES)
+    if picked:
+        quote_id, owner = picked
+        await ctx.request("calculate", owner, "POST", f"/api/quotes/{quote_id}/calculate", json=CALCULATE_BODY)
+
+
+async def export(ctx: Context) -> None:
+    """Calculate a quote, then download its validation workbook."""
+    picked = ctx.pick_quote(CALCULABLE_STATUSES)
+    if not picked:
+        return
+    quote_id, owner = picked
+    response = await ctx.request("export:calculate", owner, "POST",
+                                 f"/api/quotes/{quote_id}/calculate", json=CALCULATE_BODY)
+    if response is not None and response.status_code < 400:
+        await ctx.request("export:validation", owner, "GET", f"/api/quotes/{quote_id}/export/validation")
+
+
+# name -> (weight, journey)
+JOURNEYS = {
+    "kanban": (5, kanban),
+    "calculate": (3, calculate),
+    "export": (1, export),
+}
@@ -0,0 +1,129 @@
+"""Local Supabase stand-in: PostgREST proxy, token auth, in-memory storage.
+
+The backend talks to Supabase through supabase-py, i.e. plain HTTP under one
+base URL (``SUPABASE_URL``):
+
+    /rest/v1/...      PostgREST      → forwarded to LOADTEST_POSTGREST_URL
+    /auth/v1/user     GoTrue         → user for ``Bearer loadtest.<user_id>``
+    /storage/v1/...   Storage        → bytes kept in process memory
+
+PostgREST runs with the table owner as its anonymous role, so the service
+key supabase-py sends is dropped instead of verified — the backend uses the
+service role everywhere, which bypasses RLS in production as well.
+"""
+
+from __future__ import annotations
+
+import os
+import secrets
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+DEFAULT_POSTGREST_URL = "http://localhost:3001"
+TOKEN_PREFIX = "loadtest."
+
+# Request headers PostgREST acts on; everything else (apikey, the service
+# role JWT, hop-by-hop headers) stays behind.
+_FORWARD_REQUEST_HEADERS = (
+    "accept", "accept-profile", "content-profile", "content-type", "prefer", "range",
+)
+_DROP_RESPONSE_HEADERS = {
+    "content-length", "content-encoding", "transfer-encoding", "connection", "keep-alive",
+}
+
+
+def token_for(user_id: str) -> str:
+    """Bearer token the stand-in resolves to ``user_id``."""
+    return f"{TOKEN_PREFIX}{user_id}"
+
+
+def _user_payload(user_id: str) -> dict:
+    """GoTrue ``/user`` response shape (fields supabase_auth.User requires)."""
+    return {
+        "id": user_id,
+        "aud": "authenticated",
+        "role": "authenticated",
+        "email": f"{user_id[:8]}@loadtest.local",
+        "app_metadata": {"provider": "email"},
+        "user_metadata": {},
+        "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc).isoformat(),
+    }
+
+
+def create_app(postgrest_url: str | None = None, *, transport: httpx.AsyncBaseTransport | None = None) -> Starlette:
+    """Build the stand-in ASGI app (one shared upstream connection pool)."""
+    upstream = (postgrest_url or os.getenv("LOADTEST_POSTGREST_URL") or DEFAULT_POSTGREST_URL).rstrip("/")
+    client = httpx.AsyncClient(base_url=upstream, timeout=60.0, transport=transport)
+    objects: dict[tuple[str, str], tuple[bytes, str]] = {}
+
+    async def rest(request: Request) -> Response:
+        headers = {k: v for k, v in request.headers.items() if k in _FORWARD_REQUEST_HEADERS}
+        try:
+            upstream_response = await client.request(
+                request.method,
+                "/" + request.path_params["path"],
+                params=request.url.query,
+                content=await request.body(),
+                headers=headers,
+            )
+        except httpx.HTTPError as exc:
+            return JSONResponse({"message": f"PostgREST unreachable at {upstream}: {exc}"}, status_code=502)
+        return Response(
+            upstream_response.content,
+            status_code=upstream_response.status_code,
+            headers={
+                k: v for k, v in upstream_response.headers.items()
+                if k.lower() not in _DROP_RESPONSE_HEADERS
+            },
+        )
+
+    async def auth_user(request: Request) -> Response:
+        token = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not token.startswith(TOKEN_PREFIX):
+            return JSONResponse({"code": 401, "msg": "invalid token"}, status_code=401)
+        return JSONResponse(_user_payload(token[len(TOKEN_PREFIX):]))
+
+    async def storage_object(request: Request) -> Response:
+        key = (request.path_params["bucket"], request.path_params["path"])
+        if request.method in ("POST", "PUT"):
+            objects[key] = (await request.body(), request.headers.get("content-type", "application/octet-stream"))
+            return JSONResponse({"Key": "/".join(key)})
+        if key not in objects:
+            return JSONResponse({"statusCode": "404", "error": "not_found"}, status_code=404)
+        body, content_type = objects[key]
+        return Response(body, media_type=content_type)
+
+    async def storage_remove(request: Request) -> Response:
+        bucket = request.path_params["bucket"]
+        prefixes = (await request.json()).get("prefixes") or []
+        removed = [p for p in prefixes if objects.pop((bucket, p), None) is not None]
+        return JSONResponse([{"name": p} for p in removed])
+
+    async def storage_sign(request: Request) -> Response:
+        bucket, path = request.path_params["bucket"], request.path_params["path"]
+        return JSONResponse({
+            "signedURL": f"/object/{bucket}/{path}?token={secrets.token_hex(8)}",
+        })
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await client.aclose()
+
+    methods = ["GET", "HEAD", "POST", "PATCH", "PUT", "DELETE"]
+    return Starlette(
+        routes=[
+            Route("/rest/v1/{path:path}", rest, methods=methods),
+            Route("/auth/v1/user", auth_user, methods=["GET"]),
+            Route("/storage/v1/object/sign/{bucket}/{path:path}", storage_sign, methods=["POST"]),
+            Route("/storage/v1/object/{bucket}", storage_remove, methods=["DELETE"]),
+            Route("/storage/v1/object/{bucket}/{path:path}", storage_object, methods=["GET", "POST", "PUT"]),
+        ],
+        lifespan=lifespan,
+    )
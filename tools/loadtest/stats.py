@@ -0,0 +1,66 @@
+"""Latency recording, percentiles and baseline comparison."""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list (0.0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Per-label latencies (seconds) and error counts."""
+
+    def __init__(self):
+        self._latencies: dict[str, list[float]] = defaultdict(list)
+        self._errors: dict[str, int] = defaultdict(int)
+
+    def record(self, label: str, seconds: float, ok: bool = True) -> None:
+        self._latencies[label].append(seconds)
+        if not ok:
+            self._errors[label] += 1
+
+    def summary(self) -> dict[str, dict]:
+        """{label: {count, errors, mean_ms, p50_ms, ..., max_ms}} in label order."""
+        out = {}
+        for label in sorted(self._latencies):
+            values = sorted(self._latencies[label])
+            row = {
+                "count": len(values),
+                "errors": self._errors.get(label, 0),
+                "mean_ms": round(sum(values) / len(values) * 1000, 1),
+            }
+            for p in PERCENTILES:
+                row[f"p{p}_ms"] = round(percentile(values, p) * 1000, 1)
+            row["max_ms"] = round(values[-1] * 1000, 1)
+            out[label] = row
+        return out
+
+
+def format_table(summary: dict[str, dict]) -> str:
+    columns = ["count", "errors", "mean_ms"] + [f"p{p}_ms" for p in PERCENTILES] + ["max_ms"]
+    width = max([len("request")] + [len(label) for label in summary])
+    lines = ["  ".join(["request".ljust(width)] + [c.rjust(9) for c in columns])]
+    for label, row in summary.items():
+        lines.append("  ".join([label.ljust(width)] + [str(row[c]).rjust(9) for c in columns]))
+    return "\n".join(lines)
+
+
+def regressions(
+    summary: dict[str, dict], baseline: dict[str, dict], max_ratio: float, metric: str = "p95_ms"
+) -> list[str]:
+    """Labels whose ``metric`` grew more than ``max_ratio`` over the baseline."""
+    found = []
+    for label, row in summary.items():
+        before = (baseline.get(label) or {}).get(metric)
+        if before and row[metric] > before * (1 + max_ratio):
+            found.append(f"{label}: {metric} {before} -> {row[metric]}")
+    return found
@@ -0,0 +1,271 @@
+"""Deterministic synthetic organization for load tests.
+
+``generate(spec)`` builds every row in memory — same spec, same rows, same
+UUIDs — so the seeder and the journey runner agree on which quotes and
+users exist without querying the database, and re-seeding is idempotent
+(``ON CONFLICT DO NOTHING``).
+
+The shape follows production: quotes spread over the workflow, 3–15 items
+each grouped into one supplier invoice per brand group (Phase 5d
+composition: quote_items → invoice_item_coverage → invoice_items), a
+procurement kanban row per (quote, brand), specifications and deals for
+the late stages.
+"""
+
+from __future__ import annotations
+
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+NAMESPACE = uuid.UUID("6c6f6164-7465-7374-0000-6b766f746100")
+
+BRANDS = (
+    "SKF", "FAG", "NSK", "Timken", "Bosch Rexroth", "Festo", "Siemens", "Schneider",
+    "Danfoss", "Parker", "Garlock", "Gates", "ABB", "Omron", "Lenze", "SMC",
+)
+PRODUCT_KINDS = (
+    "Подшипник", "Муфта", "Ремень приводной", "Уплотнение", "Датчик", "Клапан", "Привод", "Фильтр",
+)
+CITIES = ("Москва", "Санкт-Петербург", "Екатеринбург", "Казань", "Новосибирск", "Самара")
+CURRENCIES = ("USD", "EUR", "CNY", "RUB")
+
+# (workflow_status, weight). Quotes past procurement keep their kanban rows
+# with procurement_completed_at set, as in production.
+STATUS_WEIGHTS = (
+    ("draft", 15),
+    ("pending_procurement", 25),
+    ("pending_logistics_and_customs", 10),
+    ("pending_sales_review", 10),
+    ("pending_quote_control", 5),
+    ("pending_approval", 5),
+    ("approved", 5),
+    ("sent_to_client", 5),
+    ("client_negotiation", 5),
+    ("pending_spec_control", 5),
+    ("deal", 10),
+)
+SUBSTATUSES = ("distributing", "searching_supplier", "waiting_prices", "prices_ready")
+
+# Insert order (foreign keys first).
+TABLES = (
+    "organizations", "roles", "organization_members", "user_roles", "user_profiles",
+    "customers", "suppliers", "seller_companies",
+    "quotes", "invoices", "quote_items", "invoice_items", "invoice_item_coverage",
+    "quote_brand_substates", "specifications", "deals",
+)
+
+
+@dataclass(frozen=True)
+class OrgSpec:
+    """Size of the synthetic organization."""
+    quotes: int = 2000
+    customers: int = 300
+    suppliers: int = 80
+    sales_users: int = 20
+    procurement_users: int = 10
+    min_items: int = 3
+    max_items: int = 15
+    seed: int = 2026
+
+
+@dataclass
+class Dataset:
+    """Generated rows per table plus lookup lists for the journeys."""
+    org_id: str
+    tables: dict[str, list[dict]] = field(default_factory=lambda: {t: [] for t in TABLES})
+    users: dict[str, list[str]] = field(default_factory=dict)          # role slug -> user ids
+    quotes_by_status: dict[str, list[str]] = field(default_factory=dict)
+    quote_owner: dict[str, str] = field(default_factory=dict)          # quote id -> created_by
+
+    def counts(self) -> dict[str, int]:
+        return {t: len(rows) for t, rows in self.tables.items()}
+
+
+def _id(kind: str, n: int | str) -> str:
+    return str(uuid.uuid5(NAMESPACE, f"{kind}:{n}"))
+
+
+def _code(n: int) -> str:
+    """3-letter supplier code: AAA, AAB, ..."""
+    letters = []
+    for _ in range(3):
+        n, r = divmod(n, 26)
+        letters.append(chr(ord("A") + r))
+    return "".join(reversed(letters))
+
+
+def _users(ds: Dataset, spec: OrgSpec) -> None:
+    people = [("admin", 0)] + [("head_of_procurement", 0)]
+    people += [("sales", n) for n in range(spec.sales_users)]
+    people += [("procurement", n) for n in range(spec.procurement_users)]
+
+    slugs = sorted({slug for slug, _ in people})
+    role_ids = {slug: _id("role", slug) for slug in slugs}
+    ds.tables["roles"] = [
+        {"id": role_ids[s], "organization_id": ds.org_id, "slug": s, "name": s} for s in slugs
+    ]
+    for slug, n in people:
+        user_id = _id(f"user:{slug}", n)
+        ds.users.setdefault(slug, []).append(user_id)
+        ds.tables["organization_members"].append({
+            "id": _id("member", user_id), "user_id": user_id, "organization_id": ds.org_id,
+            "status": "active", "is_owner": slug == "admin",
+        })
+        ds.tables["user_roles"].append({
+            "id": _id("user_role", user_id), "user_id": user_id,
+            "organization_id": ds.org_id, "role_id": role_ids[slug],
+        })
+        ds.tables["user_profiles"].append({
+            "id": _id("profile", user_id), "user_id": user_id, "organization_id": ds.org_id,
+            "full_name": f"Нагрузочный {slug} {n + 1}",
+        })
+
+
+def generate(spec: OrgSpec | None = None) -> Dataset:
+    """Build the synthetic organization described by ``spec`` (default: ``OrgSpec()``)."""
+    if spec is None:
+        spec = OrgSpec()
+    rng = random.Random(spec.seed)
+    ds = Dataset(org_id=_id("organization", spec.seed))
+    t = ds.tables
+    t["organizations"].append({"id": ds.org_id, "name": f"ООО Нагрузка {spec.seed}"})
+    _users(ds, spec)
+
+    customer_ids = [_id("customer", n) for n in range(spec.customers)]
+    t["customers"] = [
+        {"id": cid, "organization_id": ds.org_id, "name": f"ООО Клиент {n + 1:04d}", "inn": f"77{n:08d}"}
+        for n, cid in enumerate(customer_ids)
+    ]
+    supplier_ids = [_id("supplier", n) for n in range(spec.suppliers)]
+    t["suppliers"] = [
+        {"id": sid, "organization_id": ds.org_id, "name": f"Supplier {n + 1:03d} GmbH",
+         "supplier_code": _code(n), "is_active": True}
+        for n, sid in enumerate(supplier_ids)
+    ]
+    seller_id = _id("seller_company", 0)
+    t["seller_companies"].append({
+        "id": seller_id, "organization_id": ds.org_id, "name": "ООО Нагрузка Трейд",
+        "supplier_code": "NGT", "is_active": True,
+    })
+
+    statuses = [s for s, _ in STATUS_WEIGHTS]
+    weights = [w for _, w in STATUS_WEIGHTS]
+    base = datetime(2026, 1, 1, 9, 0)
+    item_n = 0
+
+    for n in range(spec.quotes):
+        quote_id = _id("quote", n)
+        status = rng.choices(statuses, weights)[0]
+        owner = rng.choice(ds.users["sales"])
+        created = base + timedelta(hours=rng.randrange(24 * 270))
+        past_procurement = status not in ("draft", "pending_procurement")
+        currency = rng.choice(CURRENCIES)
+        ds.quotes_by_status.setdefault(status, []).append(quote_id)
+        ds.quote_owner[quote_id] = owner
+        t["quotes"].append({
+            "id": quote_id, "organization_id": ds.org_id, "idn_quote": f"LT-{n + 1:06d}",
+            "title": f"КП {n + 1}", "customer_id": rng.choice(customer_ids),
+            "seller_company_id": seller_id, "currency": currency, "delivery_terms": "DDP",
+            "delivery_city": rng.choice(CITIES), "status": "draft", "workflow_status": status,
+            "created_by": owner, "created_at": created.isoformat(),
+            "stage_entered_at": (created + timedelta(days=1)).isoformat(),
+            "procurement_completed_at": (created + timedelta(days=3)).isoformat() if past_procurement else None,
+        })
+
+        brands = rng.sample(BRANDS, rng.randint(1, 4))
+        invoice_of_brand = {}
+        if status != "draft":
+            for brand in brands:
+                invoice_id = _id("invoice", f"{n}:{brand}")
+                invoice_of_brand[brand] = invoice_id
+                t["invoices"].append({
+                    "id": invoice_id, "quote_id": quote_id, "supplier_id": rng.choice(supplier_ids),
+                    "invoice_number": f"INV-{n + 1:06d}-{len(invoice_of_brand)}",
+                    "currency": currency if currency != "RUB" else "EUR",
+                    "total_weight_kg": round(rng.uniform(5, 500), 3),
+                })
+            for brand in brands:
+                t["quote_brand_substates"].append({
+                    "quote_id": quote_id, "brand": brand,
+                    "substatus": "prices_ready" if past_procurement else rng.choice(SUBSTATUSES),
+                    "updated_at": (created + timedelta(days=2)).isoformat(),
+                })
+
+        for position in range(rng.randint(spec.min_items, spec.max_items)):
+            item_n += 1
+            brand = rng.choice(brands)
+            qty = rng.randint(1, 200)
+            price = round(rng.uniform(5, 2500), 2)
+            name = f"{rng.choice(PRODUCT_KINDS)} {brand} {item_n:06d}"
+            qi_id = _id("quote_item", item_n)
+            invoice_id = invoice_of_brand.get(brand)
+            t["quote_items"].append({
+                "id": qi_id, "quote_id": quote_id, "position": position, "product_name": name,
+                "brand": brand, "quantity": qty, "supplier_sku": f"SKU-{item_n:06d}",
+                "assigned_procurement_user": rng.choice(ds.users["procurement"]),
+                "composition_selected_invoice_id": invoice_id,
+                "production_time_days": rng.choice((0, 7, 14, 30)),
+            })
+            if invoice_id:
+                ii_id = _id("invoice_item", item_n)
+                t["invoice_items"].append({
+                    "id": ii_id, "invoice_id": invoice_id, "organization_id": ds.org_id,
+                    "position": position, "product_name": name, "brand": brand, "quantity": qty,
+                    "purchase_price_original": price,
+                    "purchase_currency": currency if currency != "RUB" else "EUR",
+                    "base_price_vat": price, "supplier_sku": f"SKU-{item_n:06d}",
+                    "weight_in_kg": round(rng.uniform(0.1, 20), 3), "version": 1,
+                })
+                t["invoice_item_coverage"].append({"invoice_item_id": ii_id, "quote_item_id": qi_id, "ratio": 1})
+
+        if status in ("pending_spec_control", "deal"):
+            spec_id = _id("specification", n)
+            t["specifications"].append({
+                "id": spec_id, "quote_id": quote_id, "organization_id": ds.org_id,
+                "specification_number": f"СП-LT-{n + 1:06d}", "specification_currency": currency,
+                "status": "signed" if status == "deal" else "draft", "created_by": owner,
+            })
+            if status == "deal":
+                t["deals"].append({
+                    "id": _id("deal", n), "specification_id": spec_id, "quote_id": quote_id,
+                    "organization_id": ds.org_id, "deal_number": f"СД-LT-{n + 1:06d}",
+                    "signed_at": (created + timedelta(days=20)).date().isoformat(),
+                    "total_amount": round(rng.uniform(1e4, 5e6), 2), "currency": currency,
+                    "status": "active", "created_by": owner,
+                })
+
+    return ds
+
+
+def write(conn, ds: Dataset, page_size: int = 1000) -> None:
+    """Bulk-insert ``ds`` into the kvota schema (idempotent), one transaction."""
+    from psycopg2.extras import execute_values
+
+    with conn.cursor() as cur:
+        for table in TABLES:
+            rows = ds.tables[table]
+            if not rows:
+                continue
+            columns = list(rows[0])
+            print(f"  {table}: {len(rows)} rows")
+            execute_values(
+                cur,
+                f"INSERT INTO kvota.{table} ({', '.join(columns)}) VALUES %s ON CONFLICT DO NOTHING",
+                [tuple(row[c] for c in columns) for row in rows],
+                page_size=page_size,
+            )
+    conn.commit()
+
+
+def purge(conn, org_id: str) -> None:
+    """Delete the synthetic organization (quotes cascade to their children)."""
+    with conn.cursor() as cur:
+        for table in (
+            "deals", "specifications", "quotes", "customers", "suppliers", "seller_companies",
+            "user_roles", "user_profiles", "organization_members", "roles",
+        ):
+            cur.execute(f"DELETE FROM kvota.{table} WHERE organization_id = %s", (org_id,))
+        cur.execute("DELETE FROM kvota.organizations WHERE id = %s", (org_id,))
+    conn.commit()